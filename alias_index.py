@@ -0,0 +1,362 @@
+"""Blocked alias-candidate matching for company names.
+
+scripts/analysis/alias_candidates.py used to compare every candidate name with
+every canonical company name twice: once with difflib.SequenceMatcher and once
+with token-set overlap. That is O(candidates x canonicals) ratio() calls and
+does not scale past a few thousand companies.
+
+`AliasIndex` keeps two inverted indexes over the canonical names: character
+trigrams and word tokens. One numpy bincount over the query's posting lists
+gives the number of keys it shares with every indexed name, and only names
+that can reach the threshold are scored:
+- ratio candidates need a trigram Dice of at least BLOCK_DICE, then pass
+  SequenceMatcher's length and character-multiset upper bounds (vectorized).
+  For the best match they are scored in descending order of that bound,
+  stopping once no remaining candidate can beat the best ratio found. Each
+  canonical's matcher is built once and reused
+- overlap candidates are exact: token Jaccard comes straight from the counts
+
+`MatchStore` persists the best match per name in
+json/alias_index_state.json, so a run only compares names it has not seen
+against the full index and previously seen names against canonicals added
+since the last run.
+"""
+
+# alias_index.py
+
+import json
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+STATE_PATH = Path(__file__).parent / "json" / "alias_index_state.json"
+STATE_FORMAT = 1
+
+SIMILARITY_THRESHOLD = 0.75  # SequenceMatcher ratio for a canonical match
+OVERLAP_THRESHOLD = 0.35  # token Jaccard for the fallback match
+# Minimum trigram Dice for a pair to be scored with SequenceMatcher. Pairs
+# below it practically never reach SIMILARITY_THRESHOLD (see
+# scripts/benchmark_alias_candidates.py for the measured recall).
+BLOCK_DICE = 0.25
+
+TOKEN_RE = re.compile(r"[A-Za-z0-9&\-]+")
+# Characters counted separately for the quick_ratio bound; all others share
+# one bucket, which can only raise the bound
+CHAR_BUCKETS = {c: i for i, c in enumerate("abcdefghijklmnopqrstuvwxyz0123456789 &-.,")}
+EPSILON = 1e-9  # slack so float rounding never drops a pair at the threshold
+
+Scored = Tuple[str, float]
+
+
+def trigrams(name: str) -> frozenset:
+    """Character trigrams of the lowercased, space-collapsed name, padded at both ends."""
+    text = " " + " ".join((name or "").lower().split()) + " "
+    return frozenset(text[i : i + 3] for i in range(len(text) - 2))
+
+
+def tokens(name: str) -> frozenset:
+    """Word tokens as compared by token_set_overlap in alias_candidates.py."""
+    return frozenset(TOKEN_RE.findall((name or "").lower()))
+
+
+def char_counts(name: str) -> np.ndarray:
+    """Character multiset of the lowercased name over CHAR_BUCKETS."""
+    counts = np.zeros(len(CHAR_BUCKETS) + 1, dtype=np.int64)
+    other = len(CHAR_BUCKETS)
+    for ch in (name or "").lower():
+        counts[CHAR_BUCKETS.get(ch, other)] += 1
+    return counts
+
+
+def similarity(a: str, b: str) -> float:
+    """SequenceMatcher ratio of the lowercased names (0.0 if either is empty)."""
+    if not a or not b:
+        return 0.0
+    return SequenceMatcher(None, a.lower(), b.lower()).ratio()
+
+
+def token_overlap(a: str, b: str) -> float:
+    """Jaccard overlap of the names' word tokens."""
+    ta, tb = tokens(a), tokens(b)
+    if not ta or not tb:
+        return 0.0
+    return len(ta & tb) / len(ta | tb)
+
+
+def _better(current: Optional[Scored], name: str, score: float) -> bool:
+    # Highest score wins; ties go to the alphabetically first name, so results
+    # do not depend on index or set order.
+    return current is None or score > current[1] or (score == current[1] and name < current[0])
+
+
+@dataclass
+class Match:
+    """Best canonical matches for one name.
+
+    sim: best (canonical, ratio) with ratio >= SIMILARITY_THRESHOLD
+    overlap: best (canonical, jaccard) with jaccard >= OVERLAP_THRESHOLD
+    """
+
+    sim: Optional[Scored] = None
+    overlap: Optional[Scored] = None
+
+    @property
+    def best(self) -> Tuple[Optional[str], float]:
+        """(canonical, score) as alias_candidates.py picks it: ratio match first, then overlap."""
+        hit = self.sim or self.overlap
+        return (hit[0], hit[1]) if hit else (None, 0.0)
+
+    def merge(self, other: "Match") -> "Match":
+        merged = Match(self.sim, self.overlap)
+        for attr in ("sim", "overlap"):
+            hit = getattr(other, attr)
+            if hit and _better(getattr(merged, attr), *hit):
+                setattr(merged, attr, hit)
+        return merged
+
+    def references(self, names: Iterable[str]) -> bool:
+        names = set(names)
+        return any(hit and hit[0] in names for hit in (self.sim, self.overlap))
+
+    def to_json(self) -> Dict:
+        return {"sim": list(self.sim) if self.sim else None, "overlap": list(self.overlap) if self.overlap else None}
+
+    @classmethod
+    def from_json(cls, data: Dict) -> "Match":
+        return cls(
+            sim=tuple(data["sim"]) if data.get("sim") else None,
+            overlap=tuple(data["overlap"]) if data.get("overlap") else None,
+        )
+
+
+class AliasIndex:
+    """Trigram and token inverted indexes over a set of canonical names."""
+
+    def __init__(self, names: Iterable[str] = ()):
+        self.names: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self._grams: List[frozenset] = []
+        self._tokens: List[frozenset] = []
+        self._chars: List[np.ndarray] = []
+        self._by_gram: Dict[str, List[int]] = defaultdict(list)
+        self._by_token: Dict[str, List[int]] = defaultdict(list)
+        # SequenceMatcher per indexed name, as seq2: its b2j/fullbcount tables
+        # are then built once instead of once per comparison
+        self._matchers: Dict[int, SequenceMatcher] = {}
+        self._arrays = None  # numpy views of the above, rebuilt after add()
+        for name in names:
+            self.add(name)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._ids
+
+    def add(self, name: str) -> bool:
+        """Index `name`; False if it is empty or already indexed."""
+        if not name or name in self._ids:
+            return False
+        idx = self._ids[name] = len(self.names)
+        self.names.append(name)
+        grams, toks = trigrams(name), tokens(name)
+        self._grams.append(grams)
+        self._tokens.append(toks)
+        self._chars.append(char_counts(name))
+        for gram in grams:
+            self._by_gram[gram].append(idx)
+        for tok in toks:
+            self._by_token[tok].append(idx)
+        self._arrays = None
+        return True
+
+    def _refresh(self) -> dict:
+        if self._arrays is None:
+            self._arrays = {
+                "lengths": np.array([len(n.lower()) for n in self.names], dtype=np.int64),
+                "gram_sizes": np.array([len(g) for g in self._grams], dtype=np.int64),
+                "token_sizes": np.array([len(t) for t in self._tokens], dtype=np.int64),
+                "chars": np.array(self._chars, dtype=np.int64).reshape(len(self.names), len(CHAR_BUCKETS) + 1),
+                "postings": {},
+            }
+        return self._arrays
+
+    def _shared(self, keys: frozenset, postings: Dict[str, List[int]]) -> np.ndarray:
+        """Number of `keys` each indexed name shares with the query (one bincount)."""
+        cache = self._refresh()["postings"]
+        lists = []
+        for key in keys:
+            if key in postings:
+                arr = cache.get((id(postings), key))
+                if arr is None:
+                    arr = cache[(id(postings), key)] = np.array(postings[key], dtype=np.int64)
+                lists.append(arr)
+        if not lists:
+            return np.zeros(len(self.names), dtype=np.int64)
+        return np.bincount(np.concatenate(lists), minlength=len(self.names))
+
+    def _ratio_candidates(self, name: str, threshold: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Ids that can reach `threshold`, with their quick_ratio upper bound.
+
+        Cheap filters first, all vectorized: the trigram Dice block, then
+        real_quick_ratio (lengths) and quick_ratio (character multisets),
+        both upper bounds of SequenceMatcher.ratio().
+        """
+        empty = np.zeros(0, dtype=np.int64)
+        if not name or not self.names:
+            return empty, empty.astype(float)
+        arrays = self._refresh()
+        grams = trigrams(name)
+        size = len(name.lower())
+        lengths = arrays["lengths"]
+        total = size + lengths
+        keep = 2 * self._shared(grams, self._by_gram) >= BLOCK_DICE * (len(grams) + arrays["gram_sizes"])
+        keep &= 2 * np.minimum(size, lengths) >= threshold * total - EPSILON
+        candidates = np.flatnonzero(keep)
+        common = np.minimum(arrays["chars"][candidates], char_counts(name)).sum(axis=1)
+        bounds = 2 * common / total[candidates]
+        keep = bounds >= threshold - EPSILON
+        return candidates[keep], bounds[keep]
+
+    def _ratio(self, idx: int, lowered: str) -> float:
+        matcher = self._matchers.get(idx)
+        if matcher is None:
+            matcher = self._matchers[idx] = SequenceMatcher(None, "", self.names[idx].lower())
+        matcher.set_seq1(lowered)
+        return matcher.ratio()
+
+    def similar(self, name: str, threshold: float = SIMILARITY_THRESHOLD) -> List[Scored]:
+        """Indexed names with similarity(name, other) >= threshold, best first."""
+        lowered = (name or "").lower()
+        hits = []
+        for idx in self._ratio_candidates(name, threshold)[0].tolist():
+            score = self._ratio(idx, lowered)
+            if score >= threshold:
+                hits.append((self.names[idx], score))
+        hits.sort(key=lambda hit: (-hit[1], hit[0]))
+        return hits
+
+    def best_similar(self, name: str, threshold: float = SIMILARITY_THRESHOLD) -> Optional[Scored]:
+        """similar(name, threshold)[0], or None, without scoring every candidate.
+
+        Candidates are scored in descending order of their quick_ratio bound;
+        once the bound drops below the best ratio found, nothing left can win.
+        """
+        candidates, bounds = self._ratio_candidates(name, threshold)
+        lowered = (name or "").lower()
+        best = None
+        for pos in np.argsort(-bounds, kind="stable").tolist():
+            if best is not None and bounds[pos] < best[1] - EPSILON:
+                break
+            idx = int(candidates[pos])
+            score = self._ratio(idx, lowered)
+            if score >= threshold and _better(best, self.names[idx], score):
+                best = (self.names[idx], score)
+        return best
+
+    def best_overlap(self, name: str, min_overlap: float = OVERLAP_THRESHOLD) -> Optional[Scored]:
+        """Indexed name with the highest token Jaccard >= min_overlap, or None."""
+        toks = tokens(name)
+        if not toks or not self.names:
+            return None
+        shared = self._shared(toks, self._by_token)
+        union = len(toks) + self._refresh()["token_sizes"] - shared
+        best = None
+        for idx in np.flatnonzero(shared >= min_overlap * union - EPSILON).tolist():
+            score = int(shared[idx]) / int(union[idx])
+            other = self.names[idx]
+            if score >= min_overlap and _better(best, other, score):
+                best = (other, score)
+        return best
+
+    def match(self, name: str) -> Match:
+        """Best ratio match and best overlap match for `name`."""
+        return Match(sim=self.best_similar(name), overlap=self.best_overlap(name))
+
+
+class MatchStore:
+    """Per-name Match results persisted between alias_candidates runs.
+
+    `update()` compares names without a stored result against all canonicals,
+    and names with one only against canonicals added since it was stored.
+    Names whose stored match points at a canonical that has since been
+    removed are recompared in full.
+    """
+
+    def __init__(self, path=STATE_PATH):
+        self.path = Path(path)
+        self.canonical: List[str] = []
+        self.matches: Dict[str, Match] = {}
+        self.stats: Dict[str, int] = {}
+
+    def _settings(self) -> Dict:
+        return {
+            "format": STATE_FORMAT,
+            "similarity_threshold": SIMILARITY_THRESHOLD,
+            "overlap_threshold": OVERLAP_THRESHOLD,
+            "block_dice": BLOCK_DICE,
+        }
+
+    def load(self) -> "MatchStore":
+        """Read the state file; a missing, unreadable or outdated file starts empty."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            return self
+        if not isinstance(data, dict) or any(data.get(k) != v for k, v in self._settings().items()):
+            return self
+        self.canonical = list(data.get("canonical", []))
+        self.matches = {name: Match.from_json(m) for name, m in data.get("matches", {}).items()}
+        return self
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = dict(self._settings())
+        data["canonical"] = self.canonical
+        data["matches"] = {name: m.to_json() for name, m in sorted(self.matches.items())}
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(data, fh, ensure_ascii=False, indent=1)
+        tmp.replace(self.path)
+
+    def update(self, names: Iterable[str], canonical: Iterable[str]) -> Dict[str, Match]:
+        """Match results for `names` against `canonical`, reusing stored ones.
+
+        Only the given names are kept in the store afterwards.
+        """
+        canonical = sorted(set(c for c in canonical if c))
+        previous = set(self.canonical)
+        added = [c for c in canonical if c not in previous]
+        removed = previous - set(canonical)
+
+        full_index = None
+        added_index = AliasIndex(added) if added else None
+        results: Dict[str, Match] = {}
+        stats = {"names": 0, "compared_full": 0, "compared_new_canonicals": 0, "reused": 0}
+        for name in dict.fromkeys(names):
+            if not name:
+                continue
+            stats["names"] += 1
+            stored = self.matches.get(name)
+            if stored is None or (removed and stored.references(removed)):
+                if full_index is None:
+                    full_index = AliasIndex(canonical)
+                results[name] = full_index.match(name)
+                stats["compared_full"] += 1
+            elif added_index is not None:
+                results[name] = stored.merge(added_index.match(name))
+                stats["compared_new_canonicals"] += 1
+            else:
+                results[name] = stored
+                stats["reused"] += 1
+
+        self.canonical = canonical
+        self.matches = results
+        self.stats = stats
+        return results
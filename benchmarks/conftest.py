@@ -0,0 +1,50 @@
+"""Fixtures for the pytest-benchmark suite (run with ``make bench``).
+
+The corpus is a fixed synthetic mailbox (synthetic_mailbox.py with a fixed
+seed and end date), so results are comparable across runs and machines.
+View benchmarks load BENCH_SIZES rows (comma-separated, default 10000) of
+synthetic messages into the test database once per size.
+"""
+
+import os
+from datetime import datetime, timezone
+
+import pytest
+
+import synthetic_mailbox
+
+SEED = 0
+END = datetime(2025, 6, 1, tzinfo=timezone.utc)
+CORPUS_SIZE = 500
+BENCH_SIZES = [int(n) for n in os.environ.get("BENCH_SIZES", "10000").split(",") if n.strip()]
+BENCH_TIMEOUT = 1800  # seconds per benchmark, including loading 100k rows
+
+
+def pytest_collection_modifyitems(items):
+    # pytest.ini's 30s timeout is meant for unit tests
+    for item in items:
+        item.add_marker(pytest.mark.timeout(BENCH_TIMEOUT))
+
+
+@pytest.fixture(scope="session")
+def corpus():
+    """The fixed benchmark corpus: CORPUS_SIZE synthetic messages of every kind."""
+    return list(synthetic_mailbox.generate(CORPUS_SIZE, seed=SEED, end=END))
+
+
+@pytest.fixture(scope="session")
+def eml_corpus(corpus):
+    return [msg.to_email().as_string() for msg in corpus]
+
+
+@pytest.fixture(scope="module", params=BENCH_SIZES, ids=lambda n: f"{n}rows")
+def mailbox_rows(request, django_db_setup, django_db_blocker):
+    """Load `param` synthetic messages into the test database for the module."""
+    from tracker.utils import synthetic_load
+
+    with django_db_blocker.unblock():
+        synthetic_load.clear_synthetic()
+        synthetic_load.load_mailbox(request.param, seed=SEED, end=END)
+    yield request.param
+    with django_db_blocker.unblock():
+        synthetic_load.clear_synthetic()
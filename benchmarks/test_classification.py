@@ -0,0 +1,62 @@
+"""RuleClassifier.classify and predict_subject_type on the fixed corpus."""
+
+import pytest
+
+import ml_subject_classifier
+import parser
+
+
+def test_rule_classifier_classify(benchmark, corpus):
+    classifier = parser.RuleClassifier(parser.PATTERNS)
+
+    def run():
+        return [
+            classifier.classify(
+                subject=msg.subject,
+                body=msg.text,
+                sender_domain=msg.sender_domain,
+                headhunter_domains=parser.HEADHUNTER_DOMAINS,
+                job_board_domains=parser.JOB_BOARD_DOMAINS,
+                is_ats_domain_fn=parser._is_ats_domain,
+                map_company_by_domain_fn=parser._map_company_by_domain,
+            )
+            for msg in corpus
+        ]
+
+    labels = benchmark(run)
+    benchmark.extra_info["messages"] = len(corpus)
+    benchmark.extra_info["labelled"] = sum(1 for label in labels if label)
+
+
+def test_predict_subject_type_single(benchmark, corpus):
+    results = benchmark(
+        lambda: [ml_subject_classifier.predict_subject_type(m.subject, m.text, sender=m.sender) for m in corpus]
+    )
+    benchmark.extra_info["messages"] = len(corpus)
+    benchmark.extra_info["ml"] = sum(1 for r in results if r["method"].startswith("ml"))
+
+
+def test_predict_subject_type_batch(benchmark, corpus):
+    """The ML stage of predict_subject_type vectorized over the whole corpus at once.
+
+    predict_subject_type has no batch entry point; this is the lower bound a
+    batched call would reach, to compare with the single-message loop above.
+    """
+    from scipy.sparse import hstack
+
+    ml_subject_classifier.reload_if_changed()
+    if ml_subject_classifier.model is None or ml_subject_classifier.subject_vectorizer is None:
+        pytest.skip("No trained model in model/ (run train_model.py)")
+
+    def run():
+        X = hstack(
+            [
+                ml_subject_classifier.subject_vectorizer.transform([m.subject for m in corpus]),
+                ml_subject_classifier.body_vectorizer.transform([m.text for m in corpus]),
+            ]
+        )
+        return ml_subject_classifier.model.predict_proba(X)
+
+    proba = benchmark(run)
+    assert proba.shape[0] == len(corpus)
+    benchmark.extra_info["messages"] = len(corpus)
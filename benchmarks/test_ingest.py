@@ -0,0 +1,33 @@
+"""ingest_message_from_eml end to end: parse, classify, resolve company, write rows."""
+
+import collections
+import itertools
+
+import pytest
+
+import parser
+
+INGEST_MESSAGES = 100
+ROUNDS = 3
+
+
+@pytest.mark.django_db
+def test_ingest_message_from_eml(benchmark, eml_corpus, monkeypatch):
+    # email_text goes through db.py's own sqlite3 connection to DB_PATH, outside the test database
+    monkeypatch.setattr("parser.insert_email_text", lambda *a, **k: None)
+    emls = eml_corpus[:INGEST_MESSAGES]
+    rounds = itertools.count()
+    outcomes = collections.Counter()
+
+    def setup():
+        # Fresh message ids every round so nothing is skipped as already ingested
+        return (f"bench{next(rounds):03d}",), {}
+
+    def run(prefix):
+        for i, raw in enumerate(emls):
+            outcomes[parser.ingest_message_from_eml(raw, fake_msg_id=f"{prefix}{i:05d}")] += 1
+
+    benchmark.pedantic(run, setup=setup, rounds=ROUNDS)
+    assert outcomes["inserted"] > 0
+    benchmark.extra_info["messages"] = len(emls)
+    benchmark.extra_info["outcomes"] = {str(k): v // ROUNDS for k, v in outcomes.items()}
@@ -0,0 +1,20 @@
+"""HTML-to-text parsing: parse_raw_message (.eml) and extract_metadata (Gmail API)."""
+
+import parser
+from fake_gmail import FakeGmailService
+
+
+def test_parse_raw_message(benchmark, corpus, eml_corpus):
+    parsed = benchmark(lambda: [parser.parse_raw_message(raw) for raw in eml_corpus])
+    assert len(parsed) == len(corpus)
+    benchmark.extra_info["messages"] = len(corpus)
+    benchmark.extra_info["html_bytes"] = sum(len(m.html) for m in corpus)
+
+
+def test_extract_metadata(benchmark, corpus):
+    service = FakeGmailService(m.to_gmail() for m in corpus)
+    ids = [m.msg_id for m in corpus]
+    metadata = benchmark(lambda: [parser.extract_metadata(service, msg_id) for msg_id in ids])
+    assert all(meta["body"] for meta in metadata)
+    benchmark.extra_info["messages"] = len(corpus)
+    benchmark.extra_info["html_bytes"] = sum(len(m.html) for m in corpus)
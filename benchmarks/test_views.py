@@ -0,0 +1,39 @@
+"""Dashboard, labeling and domain-management views at BENCH_SIZES rows.
+
+Besides timing, each view's query count is recorded in extra_info (compared
+against the baseline by scripts/compare_benchmarks.py) and must not grow with
+the number of rows: a view whose count rises from one size to the next has
+a per-row query.
+"""
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+VIEWS = ["dashboard", "label_messages", "manage_domains"]
+ROUNDS = 3
+
+# view -> {rows: queries}, filled as sizes run
+QUERY_COUNTS = {}
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("view", VIEWS)
+def test_view(benchmark, admin_client, mailbox_rows, view):
+    url = reverse(view)
+    with CaptureQueriesContext(connection) as ctx:
+        response = admin_client.get(url)
+    assert response.status_code == 200
+    queries = len(ctx.captured_queries)
+
+    counts = QUERY_COUNTS.setdefault(view, {})
+    smaller = [n for rows, n in counts.items() if rows < mailbox_rows]
+    assert not smaller or queries <= min(smaller), (
+        f"{view} ran {queries} queries at {mailbox_rows} rows vs {min(smaller)} at fewer rows"
+    )
+    counts[mailbox_rows] = queries
+
+    benchmark.pedantic(admin_client.get, args=(url,), rounds=ROUNDS)
+    benchmark.extra_info["rows"] = mailbox_rows
+    benchmark.extra_info["queries"] = queries
@@ -0,0 +1,139 @@
+"""Bounded text window used for message classification.
+
+Rule regexes and the ML vectorizers used to run over the whole body plus
+headers. A few marketing emails with huge HTML-derived text then dominate ingest
+time, and quoted replies drag the previous message's wording into the label.
+`window()` cuts the text down before classification:
+
+1. quoted replies are dropped: `>`-prefixed lines, and everything from an
+   "On ... wrote:" line, an "-----Original Message-----" line or an Outlook
+   "From: ... Sent: ..." reply header onward
+2. a signature after a "-- " delimiter line is dropped
+3. what is left is capped at the first CLASSIFICATION_WINDOW_CHARS characters
+   plus the last CLASSIFICATION_TAIL_CHARS (footers carry "unsubscribe" and
+   other noise cues the rules rely on)
+
+Only classification sees the window; the full body is still stored.
+`stats` records text length and time per classification call so ingest
+commands can report p50/p99.
+
+Settings (environment):
+    CLASSIFICATION_WINDOW_CHARS   head size, 0 = no cap (default 20000)
+    CLASSIFICATION_TAIL_CHARS     tail size kept after a cut (default 2000)
+    CLASSIFICATION_STRIP_QUOTED   drop quoted replies (default 1)
+    CLASSIFICATION_STRIP_SIGNATURE drop "-- " signatures (default 1)
+"""
+
+# classification_window.py
+
+import os
+import re
+import threading
+
+WINDOW_CHARS = int(os.environ.get("CLASSIFICATION_WINDOW_CHARS", "20000"))
+TAIL_CHARS = int(os.environ.get("CLASSIFICATION_TAIL_CHARS", "2000"))
+STRIP_QUOTED = os.environ.get("CLASSIFICATION_STRIP_QUOTED", "1") == "1"
+STRIP_SIGNATURE = os.environ.get("CLASSIFICATION_STRIP_SIGNATURE", "1") == "1"
+
+# Start of a quoted reply: everything from here on is the previous message.
+# "On ... wrote:" is case-sensitive: "... followed up on it and the recruiter
+# wrote: ..." is part of the message, not a reply header.
+_ON_WROTE = re.compile(
+    r"^On\s[^\n]{0,300}?\swrote:[ \t\r]*$"  # Gmail / Apple Mail, on a line of its own
+    r"|(?<=\s)On\s[^\n]{0,300}?[\w.+-]+@[\w-]+(?:\.[\w-]+)+>?\swrote:",  # inline in HTML text, with the sender address
+    re.MULTILINE,
+)
+_REPLY_HEADER = re.compile(
+    r"^[ \t]*-{2,}\s*Original Message\s*-{2,}"  # Outlook (plain)
+    r"|^[ \t]*From:[^\n]*\n[ \t]*(?:Sent|Date):[^\n]*\n[ \t]*To:",  # Outlook reply header block
+    re.IGNORECASE | re.MULTILINE,
+)
+_QUOTED_LINE = re.compile(r"^[ \t]*>[^\n]*(?:\n|$)", re.MULTILINE)
+_SIGNATURE = re.compile(r"^-- ?$", re.MULTILINE)
+
+
+def strip_quoted(text: str) -> str:
+    """Remove quoted replies (reply headers and everything after, `>` lines)."""
+    starts = [m.start() for m in (_ON_WROTE.search(text), _REPLY_HEADER.search(text)) if m]
+    if starts and min(starts) > 0:
+        text = text[: min(starts)]
+    if ">" in text:
+        text = _QUOTED_LINE.sub("", text)
+    return text
+
+
+def strip_signature(text: str) -> str:
+    """Remove an RFC 3676 signature block (a "-- " line and what follows)."""
+    matches = list(_SIGNATURE.finditer(text))
+    if matches and matches[-1].start() > 0:
+        text = text[: matches[-1].start()]
+    return text
+
+
+def window(text: str, max_chars: int | None = None, tail_chars: int | None = None) -> str:
+    """Return the part of `text` that rules and the ML model should see."""
+    if not text:
+        return text or ""
+    max_chars = WINDOW_CHARS if max_chars is None else max_chars
+    tail_chars = TAIL_CHARS if tail_chars is None else tail_chars
+    if STRIP_QUOTED:
+        text = strip_quoted(text)
+    if STRIP_SIGNATURE:
+        text = strip_signature(text)
+    if max_chars and len(text) > max_chars + tail_chars:
+        text = text[:max_chars] + "\n...\n" + (text[-tail_chars:] if tail_chars else "")
+    return text
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of `values` (0 when empty); also used by stage_timing."""
+    if not values:
+        return 0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+class WindowStats:
+    """Text length and time per classification call, for p50/p99 reports."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.raw_chars = []
+            self.window_chars = []
+            self.seconds = []
+
+    def record(self, raw_chars: int, window_chars: int, seconds: float):
+        with self._lock:
+            self.raw_chars.append(raw_chars)
+            self.window_chars.append(window_chars)
+            self.seconds.append(seconds)
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {
+                "calls": len(self.seconds),
+                "cut": sum(1 for r, w in zip(self.raw_chars, self.window_chars) if w < r),
+                "raw_chars_p50": percentile(self.raw_chars, 50),
+                "raw_chars_p99": percentile(self.raw_chars, 99),
+                "window_chars_p50": percentile(self.window_chars, 50),
+                "window_chars_p99": percentile(self.window_chars, 99),
+                "classify_ms_p50": round(percentile(self.seconds, 50) * 1000, 2),
+                "classify_ms_p99": round(percentile(self.seconds, 99) * 1000, 2),
+                "classify_ms_max": round(max(self.seconds, default=0) * 1000, 2),
+            }
+
+    def line(self) -> str:
+        s = self.summary()
+        return (
+            f"classification window: {s['calls']} calls ({s['cut']} shortened), "
+            f"text p50={s['window_chars_p50']} p99={s['window_chars_p99']} chars "
+            f"(raw p50={s['raw_chars_p50']} p99={s['raw_chars_p99']}), "
+            f"classify p50={s['classify_ms_p50']}ms p99={s['classify_ms_p99']}ms max={s['classify_ms_max']}ms"
+        )
+
+
+stats = WindowStats()
@@ -267,14 +267,14 @@ def load_training_data():
     qs = (
         Message.objects.filter(reviewed=True, ml_label__isnull=False)
         .exclude(ml_label__in=["", "unknown"])
-        .values("subject", "body", "ml_label")
+        .values("id", "subject", "body", "body_hash", "ml_label")
     )
 
     df = pd.DataFrame(list(qs))
 
     if df.empty:
         print("[Warning] No human-labeled messages found in database")
-        return pd.DataFrame(columns=["subject", "body", "label"])
+        return pd.DataFrame(columns=["id", "subject", "body", "body_hash", "label"])
 
     # Rename ml_label to label for consistency with training script
     df = df.rename(columns={"ml_label": "label"})
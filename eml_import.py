@@ -0,0 +1,353 @@
+"""In-process bulk import of raw email files for GmailJobTracker.
+
+Streams messages from `.eml` files/directories, `.mbox` files and Maildir
+trees through the parser without spawning a process per file:
+
+- dry run (default): parse_raw_message -> parse_subject / predict_subject_type /
+  rule_label, producing the same report columns as scripts/batch_parse_emls.py
+- write: ingest_message_from_eml (the same path as the EML upload page)
+
+Dry runs can fan out over a worker pool; each worker loads Django, spaCy and the
+model once. DB writes always run in the calling process because SQLite allows a
+single writer. Completed sources are appended to a progress file so an
+interrupted import resumes where it stopped.
+
+Used by `manage.py import_emails`. Kept outside the tracker package so pool
+workers can import it before Django is configured.
+"""
+
+# eml_import.py
+
+import json
+import mailbox
+import os
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+import classification_window
+
+REPORT_COLUMNS = (
+    "file",
+    "subject",
+    "sender_domain",
+    "ml_label",
+    "ml_conf",
+    "rule_label",
+    "final_label",
+    "body_len",
+    "body_preview",
+    "header_hints",
+)
+
+SUMMARY_KEYS = (
+    "total",
+    "body_empty",
+    "rl_overrides_ml",
+    "final_differs_from_ml",
+    "rl_is_none",
+)
+
+EML_SUFFIXES = {".eml"}
+MBOX_SUFFIXES = {".mbox", ".mbx"}
+
+
+def _decode(raw: bytes) -> str:
+    # Same decoding the single-file command uses when reading an .eml
+    return raw.decode("utf-8", errors="replace")
+
+
+def _is_maildir(path: Path) -> bool:
+    return all((path / sub).is_dir() for sub in ("cur", "new", "tmp"))
+
+
+def iter_sources(paths) -> Iterator[Tuple[str, Callable[[], str]]]:
+    """Yield (source key, loader) for every message under `paths`.
+
+    Keys are stable across runs (file path, `mbox#key`, `maildir#key`) so they
+    can be recorded in the progress file. Loaders read lazily, so skipping an
+    already-imported message costs no I/O.
+    """
+    for raw_path in paths:
+        path = Path(raw_path)
+        if path.is_dir() and _is_maildir(path):
+            box = mailbox.Maildir(str(path), factory=None, create=False)
+            for key in sorted(box.iterkeys()):
+                yield f"{path}#{key}", (lambda box=box, key=key: _decode(box.get_bytes(key)))
+            # Maildir++ sub-folders
+            for folder in sorted(box.list_folders()):
+                yield from iter_sources([path / f".{folder}"])
+        elif path.is_dir():
+            for child in sorted(path.rglob("*")):
+                if child.is_file() and child.suffix.lower() in EML_SUFFIXES | MBOX_SUFFIXES:
+                    yield from iter_sources([child])
+                elif child.is_dir() and _is_maildir(child):
+                    yield from iter_sources([child])
+        elif path.suffix.lower() in MBOX_SUFFIXES:
+            box = mailbox.mbox(str(path), factory=None, create=False)
+            for key in box.iterkeys():
+                yield f"{path}#{key}", (lambda box=box, key=key: _decode(box.get_bytes(key)))
+        elif path.is_file():
+            yield str(path), (lambda path=path: _decode(path.read_bytes()))
+        else:
+            raise FileNotFoundError(f"No such file or directory: {path}")
+
+
+# --- per-message work (runs in pool workers too) ---
+
+
+def init_worker():
+    """Pool initializer: configure Django and import the parser once per worker."""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "dashboard.settings")
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+    import parser  # noqa: F401  (loads spaCy, patterns and the model)
+
+
+def classify_raw(key: str, raw: str) -> Dict:
+    """Dry-run classification of one raw message; returns a report row."""
+    from parser import parse_raw_message, parse_subject, predict_subject_type, rule_label
+
+    meta = parse_raw_message(raw)
+    subject = meta.get("subject", "") or ""
+    body = meta.get("body", "") or ""
+    sender = meta.get("sender", "") or ""
+    sender_domain = meta.get("sender_domain") or ""
+    parsed = parse_subject(subject, body, sender=sender, sender_domain=sender_domain) or {}
+    # Same text window predict_with_fallback classifies on
+    started = time.perf_counter()
+    window = classification_window.window(body)
+    ml = predict_subject_type(subject, window, sender=sender)
+    rl = rule_label(subject, window, sender_domain)
+    classification_window.stats.record(len(body), len(window), time.perf_counter() - started)
+    ml_label = ml.get("label") if isinstance(ml, dict) else None
+    ml_conf = float(ml.get("confidence", ml.get("proba", 0.0))) if isinstance(ml, dict) else 0.0
+    body_preview = body[:800] + ("..." if len(body) > 800 else "")
+    return {
+        "file": key,
+        "subject": subject[:120],
+        "sender_domain": sender_domain,
+        "ml_label": ml_label,
+        "ml_conf": ml_conf,
+        "rule_label": rl,
+        "final_label": parsed.get("label"),
+        "body_len": len(body_preview),
+        "body_preview": body_preview.replace("\n", "\\n"),
+        "header_hints": meta.get("header_hints", {}),
+    }
+
+
+def _classify_task(item):
+    key, raw = item
+    try:
+        return classify_raw(key, raw), len(raw), None
+    except Exception as e:  # one bad message must not stop the import
+        return {"file": key}, len(raw), f"{type(e).__name__}: {e}"
+
+
+def ingest_raw(raw: str) -> str:
+    """Write one raw message to the DB via the EML ingest path; returns the outcome."""
+    from parser import ingest_message_from_eml
+
+    result = ingest_message_from_eml(raw)
+    return str(result) if result else "error"
+
+
+# --- progress ---
+
+
+class ImportProgress:
+    """Append-only JSON-lines log of completed source keys, for resuming.
+
+    Dry-run report rows are stored alongside, so a resumed run still reports
+    every message.
+    """
+
+    def __init__(self, path: Optional[Path]):
+        self.path = Path(path) if path else None
+        self.done = set()
+        self.rows = []
+        self._fh = None
+
+    def load(self):
+        if not self.path or not self.path.exists():
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    self.done.add(entry["key"])
+                except (ValueError, KeyError, TypeError):
+                    continue  # a torn final line from an interrupted run
+                if entry.get("row"):
+                    self.rows.append(entry["row"])
+
+    def reset(self):
+        if self.path and self.path.exists():
+            self.path.unlink()
+        self.done.clear()
+        self.rows.clear()
+
+    def record(self, key: str, outcome: str, row: Optional[Dict] = None):
+        if not self.path:
+            return
+        if self._fh is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._fh = open(self.path, "a", encoding="utf-8")
+        entry = {"key": key, "outcome": outcome}
+        if row is not None:
+            entry["row"] = row
+        self._fh.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self.done.add(key)
+
+    def flush(self):
+        if self._fh:
+            self._fh.flush()
+
+    def close(self):
+        if self._fh:
+            self._fh.close()
+            self._fh = None
+
+
+# --- throughput ---
+
+
+class ImportStats:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.messages = 0
+        self.bytes = 0
+        self.outcomes = Counter()
+        self.skipped_done = 0
+        self.errors = []
+
+    def add(self, outcome: str, size: int):
+        self.messages += 1
+        self.bytes += size
+        self.outcomes[outcome] += 1
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def summary(self) -> Dict:
+        elapsed = max(self.elapsed, 1e-9)
+        return {
+            "messages": self.messages,
+            "skipped_already_done": self.skipped_done,
+            "elapsed_seconds": round(elapsed, 2),
+            "messages_per_second": round(self.messages / elapsed, 2),
+            "mb_per_second": round(self.bytes / elapsed / 1_000_000, 3),
+            "outcomes": dict(self.outcomes),
+            "errors": len(self.errors),
+        }
+
+    def line(self) -> str:
+        s = self.summary()
+        return (
+            f"{s['messages']} msgs in {s['elapsed_seconds']}s "
+            f"({s['messages_per_second']} msg/s, {s['mb_per_second']} MB/s) {s['outcomes']}"
+        )
+
+
+def summarize_rows(rows) -> Dict:
+    """Summary counters with the same keys as scripts/batch_parse_emls.py."""
+    counts = dict.fromkeys(SUMMARY_KEYS, 0)
+    for r in rows:
+        if "subject" not in r:
+            continue  # failed row
+        counts["total"] += 1
+        if not r["body_len"]:
+            counts["body_empty"] += 1
+        if r["rule_label"] is None:
+            counts["rl_is_none"] += 1
+        if r["rule_label"] and r["ml_label"] and r["rule_label"] != r["ml_label"]:
+            counts["rl_overrides_ml"] += 1
+        if r["final_label"] and r["ml_label"] and r["final_label"] != r["ml_label"]:
+            counts["final_differs_from_ml"] += 1
+    return counts
+
+
+def run_import(
+    paths,
+    write: bool = False,
+    workers: int = 1,
+    progress_path: Optional[Path] = None,
+    restart: bool = False,
+    limit: Optional[int] = None,
+    report_every: int = 500,
+    log: Callable[[str], None] = print,
+):
+    """Import/classify every message under `paths`.
+
+    Returns (rows, stats): report rows (dry run only, including rows recorded
+    by earlier runs of a resumed import) and ImportStats for this run.
+    """
+    progress = ImportProgress(progress_path)
+    if restart:
+        progress.reset()
+    progress.load()
+    stats = ImportStats()
+    rows = [] if write else list(progress.rows)
+
+    def pending():
+        taken = 0
+        for key, loader in iter_sources(paths):
+            if key in progress.done:
+                stats.skipped_done += 1
+                continue
+            if limit is not None and taken >= limit:
+                return
+            taken += 1
+            yield key, loader()
+
+    def handle(key, outcome, size, row=None, error=None):
+        if error:
+            stats.errors.append((key, error))
+            outcome = "error"
+        stats.add(outcome, size)
+        if row is not None and not error:
+            rows.append(row)
+        # Failed messages are not recorded, so a resumed run retries them
+        if outcome != "error":
+            progress.record(key, outcome, row=row)
+        if stats.messages % report_every == 0:
+            progress.flush()
+            log(f"[progress] {stats.line()}")
+
+    try:
+        if write:
+            init_worker()
+            from tracker.utils.label_propagation import ThreadStateAggregator
+
+            # Label propagation for re-imported messages is applied in batches.
+            # The messages are already saved, so pending threads are flushed
+            # even if the import is interrupted.
+            with ThreadStateAggregator(save_messages=False) as thread_batch:
+                try:
+                    for key, raw in pending():
+                        try:
+                            handle(key, ingest_raw(raw), len(raw))
+                        except Exception as e:
+                            handle(key, "error", len(raw), error=f"{type(e).__name__}: {e}")
+                finally:
+                    thread_batch.flush()
+        elif workers > 1:
+            import multiprocessing
+
+            with multiprocessing.Pool(workers, initializer=init_worker) as pool:
+                for row, size, error in pool.imap(_classify_task, pending(), chunksize=8):
+                    handle(row["file"], row.get("final_label") or "none", size, row=row, error=error)
+        else:
+            init_worker()
+            for item in pending():
+                row, size, error = _classify_task(item)
+                handle(row["file"], row.get("final_label") or "none", size, row=row, error=error)
+    finally:
+        progress.close()
+    return rows, stats
@@ -0,0 +1,535 @@
+"""Local stand-in for the Gmail API service, for benchmarks and tests.
+
+`FakeGmailService` answers the calls this project makes on the
+googleapiclient service returned by `gmail_auth.get_gmail_service()`:
+
+    users().messages().list / get       (formats full, metadata, minimal, raw)
+    users().labels().list / get
+    users().history().list
+    users().getProfile
+    new_batch_http_request              (up to 100 calls per batch)
+
+Messages are Gmail API resources (format=full), either passed in directly or
+loaded from a fixture directory written by `write_fixture_dir`:
+
+    <dir>/messages/<id>.json   one message resource each; "raw" is optional
+    <dir>/index.json           ids, labels, dates and headers used by list/q
+    <dir>/labels.json          optional {"labels": [...]}
+
+The directory can hold recorded messages (scripts/record_gmail_fixtures.py) or
+synthetic ones. Set GMAIL_FAKE_DIR to such a directory and
+`get_gmail_service()` returns a FakeGmailService instead of calling Google,
+so ingest_gmail, compare_gmail_labels and the reingest scripts run unchanged.
+
+`FakeGmailConfig` adds what a real mailbox costs:
+- latency (plus jitter) per HTTP round trip; a batch is one round trip
+- an error rate: seeded random 5xx responses
+- quotas: Gmail's per-method quota units, spent from a per-second budget
+  (429 rateLimitExceeded when exceeded) and an optional total budget (403
+  dailyLimitExceeded)
+
+Errors are googleapiclient HttpErrors, so callers' retry paths are exercised.
+Every response is counted in ingest_run.api_usage like CountingHttpRequest
+does, so IngestionRun api_calls and bytes_fetched stay meaningful.
+
+`q` supports a subset of Gmail search, with all terms ANDed: after:, before:,
+newer_than:, older_than:, from:, to:, subject:, label:, in:, is:, a leading
+"-" to negate, and bare words (matched against subject, sender and snippet).
+"""
+
+# fake_gmail.py
+
+import base64
+import json
+import os
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import httplib2
+from googleapiclient.errors import BatchError, HttpError
+
+import ingest_run
+
+MAX_BATCH = 100
+MAX_PAGE_SIZE = 500
+DEFAULT_PAGE_SIZE = 100
+# Gmail quota units per method
+QUOTA_UNITS = {
+    "messages.list": 5,
+    "messages.get": 5,
+    "labels.list": 1,
+    "labels.get": 1,
+    "history.list": 2,
+    "getProfile": 1,
+}
+SYSTEM_LABELS = [
+    "INBOX", "SENT", "DRAFT", "UNREAD", "STARRED", "IMPORTANT", "SPAM", "TRASH",
+    "CATEGORY_PERSONAL", "CATEGORY_SOCIAL", "CATEGORY_PROMOTIONS", "CATEGORY_UPDATES", "CATEGORY_FORUMS",
+]
+ADDRESS = "me@example.com"
+
+
+@dataclass
+class FakeGmailConfig:
+    latency: float = 0.0  # seconds per HTTP round trip
+    jitter: float = 0.0  # up to this many extra seconds, uniformly
+    error_rate: float = 0.0  # fraction of calls answered with error_status
+    error_status: int = 503
+    units_per_second: Optional[int] = None  # Gmail allows 250 per user
+    units_total: Optional[int] = None
+    seed: int = 0
+
+    @classmethod
+    def from_env(cls) -> "FakeGmailConfig":
+        def number(name, cast, default=None):
+            value = os.environ.get(f"GMAIL_FAKE_{name}")
+            return cast(value) if value not in (None, "") else default
+
+        return cls(
+            latency=number("LATENCY_MS", float, 0.0) / 1000,
+            jitter=number("JITTER_MS", float, 0.0) / 1000,
+            error_rate=number("ERROR_RATE", float, 0.0),
+            error_status=number("ERROR_STATUS", int, 503),
+            units_per_second=number("UNITS_PER_SECOND", int),
+            units_total=number("UNITS_TOTAL", int),
+            seed=number("SEED", int, 0),
+        )
+
+
+def _http_error(status: int, reason: str, message: str, uri: str = "") -> HttpError:
+    content = json.dumps({"error": {"code": status, "message": message, "errors": [{"reason": reason, "message": message}]}})
+    return HttpError(httplib2.Response({"status": status, "reason": reason}), content.encode(), uri=uri)
+
+
+def _b64(text: str) -> str:
+    return base64.urlsafe_b64encode(text.encode("utf-8")).decode("ascii")
+
+
+def build_message(
+    msg_id: str,
+    thread_id: str,
+    sender: str,
+    subject: str,
+    date: datetime,
+    text: str = "",
+    html: str = "",
+    to: str = ADDRESS,
+    label_ids: Iterable[str] = ("INBOX",),
+    headers: Optional[Dict[str, str]] = None,
+    history_id: Optional[int] = None,
+) -> Dict:
+    """A Gmail API message resource (format=full) with text and/or HTML parts."""
+    all_headers = {
+        "From": sender,
+        "To": to,
+        "Subject": subject,
+        "Date": date.strftime("%a, %d %b %Y %H:%M:%S %z"),
+        "Message-ID": f"<{msg_id}@fake.gmail>",
+        **(headers or {}),
+    }
+    header_list = [{"name": k, "value": v} for k, v in all_headers.items()]
+    parts = []
+    if text:
+        parts.append({"mimeType": "text/plain", "body": {"size": len(text), "data": _b64(text)}})
+    if html:
+        parts.append({"mimeType": "text/html", "body": {"size": len(html), "data": _b64(html)}})
+    if len(parts) == 1:
+        payload = {**parts[0], "headers": header_list}
+    else:
+        payload = {"mimeType": "multipart/alternative", "headers": header_list, "body": {"size": 0}, "parts": parts}
+    snippet = re.sub(r"\s+", " ", re.sub(r"<[^>]+>", " ", text or html)).strip()[:200]
+    resource = {
+        "id": msg_id,
+        "threadId": thread_id,
+        "labelIds": list(label_ids),
+        "snippet": snippet,
+        "internalDate": str(int(date.timestamp() * 1000)),
+        "sizeEstimate": len(text) + len(html) + 500,
+        "payload": payload,
+    }
+    if history_id is not None:
+        resource["historyId"] = str(history_id)
+    return resource
+
+
+def _index_entry(resource: Dict) -> Dict:
+    headers = {h.get("name", "").lower(): h.get("value", "") for h in (resource.get("payload") or {}).get("headers") or []}
+    return {
+        "id": resource["id"],
+        "threadId": resource.get("threadId", resource["id"]),
+        "labelIds": list(resource.get("labelIds") or []),
+        "internalDate": int(resource.get("internalDate") or 0),
+        "historyId": int(resource.get("historyId") or 0),
+        "from": headers.get("from", ""),
+        "to": headers.get("to", ""),
+        "subject": headers.get("subject", ""),
+        "snippet": resource.get("snippet", ""),
+    }
+
+
+def write_fixture_dir(path, messages: Iterable[Dict], labels: Optional[List[Dict]] = None) -> int:
+    """Write message resources (and optional labels) as a fixture directory; returns the count."""
+    path = Path(path)
+    (path / "messages").mkdir(parents=True, exist_ok=True)
+    index = []
+    for resource in messages:
+        with open(path / "messages" / f"{resource['id']}.json", "w", encoding="utf-8") as f:
+            json.dump(resource, f)
+        index.append(_index_entry(resource))
+    with open(path / "index.json", "w", encoding="utf-8") as f:
+        json.dump(index, f)
+    if labels is not None:
+        with open(path / "labels.json", "w", encoding="utf-8") as f:
+            json.dump({"labels": labels}, f, indent=2)
+    return len(index)
+
+
+class _Query:
+    """A parsed `q` string; see the module docstring for the supported subset."""
+
+    TOKEN = re.compile(r'(-?)(\w+):("[^"]*"|\([^)]*\)|\S+)|(-?)"([^"]*)"|(-?)(\S+)')
+    IN_LABELS = {"inbox": "INBOX", "sent": "SENT", "spam": "SPAM", "trash": "TRASH", "draft": "DRAFT"}
+    IS_LABELS = {"unread": "UNREAD", "starred": "STARRED", "important": "IMPORTANT"}
+
+    def __init__(self, q: Optional[str], label_names: Dict[str, str]):
+        self.terms = []  # (negate, test(entry) -> bool)
+        self.touches_spam_trash = False
+        for m in self.TOKEN.finditer(q or ""):
+            if m.group(2):
+                negate, op, value = m.group(1) == "-", m.group(2).lower(), m.group(3).strip('"()').lower()
+                test = self._operator(op, value, label_names)
+            else:
+                negate = (m.group(4) or m.group(6)) == "-"
+                word = (m.group(5) if m.group(5) is not None else m.group(7)).lower()
+                if word == "or" or not word:
+                    continue
+                test = lambda e, w=word: w in e["subject"].lower() or w in e["from"].lower() or w in e["snippet"].lower()
+            if test is not None:
+                self.terms.append((negate, test))
+
+    def _operator(self, op, value, label_names):
+        if op in ("after", "before"):
+            if value.isdigit():
+                ms = int(value) * 1000
+            else:
+                ms = int(datetime.strptime(value.replace("-", "/"), "%Y/%m/%d").replace(tzinfo=timezone.utc).timestamp() * 1000)
+            return (lambda e: e["internalDate"] >= ms) if op == "after" else (lambda e: e["internalDate"] < ms)
+        if op in ("newer_than", "older_than"):
+            m = re.fullmatch(r"(\d+)([dmy])", value)
+            if not m:
+                return None
+            days = int(m.group(1)) * {"d": 1, "m": 30, "y": 365}[m.group(2)]
+            ms = int((datetime.now(timezone.utc) - timedelta(days=days)).timestamp() * 1000)
+            return (lambda e: e["internalDate"] >= ms) if op == "newer_than" else (lambda e: e["internalDate"] < ms)
+        if op in ("from", "to", "subject"):
+            return lambda e: value in e[op].lower()
+        if op in ("label", "in", "is"):
+            label = self.IN_LABELS.get(value) if op == "in" else self.IS_LABELS.get(value) if op == "is" else None
+            label = label or label_names.get(value) or label_names.get(value.replace("-", " ")) or value.upper()
+            if label in ("SPAM", "TRASH"):
+                self.touches_spam_trash = True
+            return lambda e: label in e["labelIds"]
+        return None  # unsupported operator (has:, filename:, ...): ignored
+
+    def matches(self, entry) -> bool:
+        return all(test(entry) != negate for negate, test in self.terms)
+
+
+class FakeGmailService:
+    """In-process replacement for the googleapiclient Gmail service; see module docstring."""
+
+    def __init__(self, messages: Iterable[Dict] = (), labels: Optional[List[Dict]] = None, config: Optional[FakeGmailConfig] = None, path=None):
+        self.config = config or FakeGmailConfig()
+        self.path = Path(path) if path else None
+        self._lock = threading.Lock()
+        self._rng = random.Random(self.config.seed)
+        self._resources: Dict[str, Dict] = {}
+        entries = []
+        for resource in messages:
+            self._resources[resource["id"]] = resource
+            entries.append(_index_entry(resource))
+        self._set_index(entries, labels)
+        self.calls: Dict[str, int] = {}
+        self.http_requests = 0
+        self._units_second = 0
+        self._units_spent_second = 0
+        self.units_spent = 0
+        self._list_cache = {}
+
+    @classmethod
+    def from_dir(cls, path, config: Optional[FakeGmailConfig] = None) -> "FakeGmailService":
+        path = Path(path)
+        service = cls(config=config, path=path)
+        index_path = path / "index.json"
+        if index_path.exists():
+            with open(index_path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        else:
+            entries = [_index_entry(json.loads(p.read_text(encoding="utf-8"))) for p in sorted((path / "messages").glob("*.json"))]
+        labels = None
+        if (path / "labels.json").exists():
+            labels = json.loads((path / "labels.json").read_text(encoding="utf-8")).get("labels")
+        service._set_index(entries, labels)
+        return service
+
+    def _set_index(self, entries: List[Dict], labels: Optional[List[Dict]]):
+        # Newest first, like Gmail; messages without a historyId get one in date order
+        self._entries = sorted(entries, key=lambda e: (-e["internalDate"], e["id"]))
+        history_id = max((e["historyId"] for e in self._entries), default=0)
+        for entry in reversed(self._entries):
+            if not entry["historyId"]:
+                history_id += 1
+                entry["historyId"] = history_id
+        self._by_id = {e["id"]: e for e in self._entries}
+        self.history_id = max((e["historyId"] for e in self._entries), default=1)
+        labels = list(labels or [])
+        known = {lab["id"] for lab in labels}
+        for lab_id in SYSTEM_LABELS:
+            if lab_id not in known:
+                labels.append({"id": lab_id, "name": lab_id, "type": "system"})
+                known.add(lab_id)
+        for entry in self._entries:
+            for lab_id in entry["labelIds"]:
+                if lab_id not in known:
+                    labels.append({"id": lab_id, "name": lab_id, "type": "user"})
+                    known.add(lab_id)
+        self._labels = labels
+        self._label_names = {lab["name"].lower(): lab["id"] for lab in labels}
+        self._list_cache = {}
+
+    # --- googleapiclient resource chain -------------------------------------------------
+
+    def users(self):
+        return _Users(self)
+
+    def new_batch_http_request(self, callback=None):
+        return FakeBatch(self, callback)
+
+    # --- call accounting ---------------------------------------------------------------
+
+    def _round_trip(self):
+        """One HTTP request's latency, outside the lock so threads overlap."""
+        with self._lock:
+            self.http_requests += 1
+            delay = self.config.latency + (self._rng.random() * self.config.jitter if self.config.jitter else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _admit(self, method: str, uri: str):
+        """Count the call and apply quotas and injected errors; raises HttpError."""
+        units = QUOTA_UNITS.get(method, 1)
+        with self._lock:
+            self.calls[method] = self.calls.get(method, 0) + 1
+            cfg = self.config
+            if cfg.units_total is not None and self.units_spent + units > cfg.units_total:
+                raise _http_error(403, "dailyLimitExceeded", "Quota exceeded for quota metric 'Queries'", uri)
+            if cfg.units_per_second is not None:
+                second = int(time.monotonic())
+                if second != self._units_second:
+                    self._units_second, self._units_spent_second = second, 0
+                if self._units_spent_second + units > cfg.units_per_second:
+                    raise _http_error(429, "rateLimitExceeded", "User-rate limit exceeded.", uri)
+                self._units_spent_second += units
+            self.units_spent += units
+            if cfg.error_rate and self._rng.random() < cfg.error_rate:
+                raise _http_error(cfg.error_status, "backendError", "Backend Error", uri)
+
+    def _respond(self, method: str, uri: str, handler):
+        self._admit(method, uri)
+        response = handler()
+        ingest_run.api_usage.record(len(json.dumps(response)))
+        return response
+
+    # --- handlers ---------------------------------------------------------------------
+
+    def _resource(self, msg_id: str) -> Optional[Dict]:
+        resource = self._resources.get(msg_id)
+        if resource is None and self.path is not None and msg_id in self._by_id:
+            with open(self.path / "messages" / f"{msg_id}.json", "r", encoding="utf-8") as f:
+                resource = json.load(f)
+        return resource
+
+    def _list(self, labelIds=None, q=None, pageToken=None, maxResults=None, includeSpamTrash=False, **_):
+        if isinstance(labelIds, str):
+            labelIds = [labelIds]
+        key = (tuple(labelIds or ()), q or "", bool(includeSpamTrash))
+        with self._lock:
+            ids = self._list_cache.get(key)
+        if ids is None:
+            query = _Query(q, self._label_names)
+            wanted = set(labelIds or ())
+            skip = set() if includeSpamTrash or query.touches_spam_trash or wanted & {"SPAM", "TRASH"} else {"SPAM", "TRASH"}
+            ids = [
+                e["id"]
+                for e in self._entries
+                if wanted.issubset(e["labelIds"]) and not skip.intersection(e["labelIds"]) and query.matches(e)
+            ]
+            with self._lock:
+                self._list_cache = {key: ids}  # keep only the listing being paged
+        size = min(int(maxResults or DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE)
+        start = int(pageToken or 0)
+        page = ids[start : start + size]
+        resp = {"resultSizeEstimate": len(ids)}
+        if page:
+            resp["messages"] = [{"id": mid, "threadId": self._by_id[mid]["threadId"]} for mid in page]
+        if start + size < len(ids):
+            resp["nextPageToken"] = str(start + size)
+        return resp
+
+    def _get(self, id, format="full", metadataHeaders=None, uri="", **_):
+        resource = self._resource(id)
+        if resource is None:
+            raise _http_error(404, "notFound", "Requested entity was not found.", uri)
+        entry = self._by_id.get(id) or _index_entry(resource)
+        base = {
+            "id": id,
+            "threadId": resource.get("threadId", id),
+            "labelIds": list(resource.get("labelIds") or []),
+            "snippet": resource.get("snippet", ""),
+            "historyId": str(entry["historyId"]),
+            "internalDate": str(resource.get("internalDate", "0")),
+            "sizeEstimate": resource.get("sizeEstimate", 0),
+        }
+        if format == "minimal":
+            return base
+        if format == "raw":
+            if "raw" not in resource:
+                raise _http_error(400, "invalidArgument", "raw format was not recorded for this message", uri)
+            return {**base, "raw": resource["raw"]}
+        payload = resource.get("payload") or {}
+        if format == "metadata":
+            headers = payload.get("headers") or []
+            if metadataHeaders:
+                wanted = {h.lower() for h in metadataHeaders}
+                headers = [h for h in headers if h.get("name", "").lower() in wanted]
+            return {**base, "payload": {"mimeType": payload.get("mimeType", ""), "headers": headers}}
+        return {**base, "payload": payload}
+
+    def _history(self, startHistoryId=None, labelId=None, pageToken=None, maxResults=None, **_):
+        if startHistoryId is None:
+            raise _http_error(400, "invalidArgument", "startHistoryId is required")
+        start = int(startHistoryId)
+        records = [
+            e
+            for e in sorted(self._entries, key=lambda e: e["historyId"])
+            if e["historyId"] > start and (labelId is None or labelId in e["labelIds"])
+        ]
+        size = min(int(maxResults or DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE)
+        offset = int(pageToken or 0)
+        page = records[offset : offset + size]
+        resp = {"historyId": str(self.history_id)}
+        if page:
+            resp["history"] = [
+                {
+                    "id": str(e["historyId"]),
+                    "messages": [{"id": e["id"], "threadId": e["threadId"]}],
+                    "messagesAdded": [{"message": {"id": e["id"], "threadId": e["threadId"], "labelIds": e["labelIds"]}}],
+                }
+                for e in page
+            ]
+        if offset + size < len(records):
+            resp["nextPageToken"] = str(offset + size)
+        return resp
+
+    def _label(self, id, uri="", **_):
+        for lab in self._labels:
+            if lab["id"] == id:
+                total = sum(1 for e in self._entries if id in e["labelIds"])
+                return {**lab, "messagesTotal": total, "threadsTotal": len({e["threadId"] for e in self._entries if id in e["labelIds"]})}
+        raise _http_error(404, "notFound", "Requested entity was not found.", uri)
+
+
+class FakeRequest:
+    """Stands in for googleapiclient.http.HttpRequest."""
+
+    def __init__(self, service: FakeGmailService, method: str, handler, **kwargs):
+        self.service, self.method, self.handler, self.kwargs = service, method, handler, kwargs
+        self.uri = f"fake://gmail/v1/users/me/{method}"
+
+    def _call(self):
+        return self.service._respond(self.method, self.uri, lambda: self.handler(uri=self.uri, **self.kwargs))
+
+    def execute(self, http=None, num_retries=0):
+        self.service._round_trip()
+        return self._call()
+
+
+class FakeBatch:
+    """Stands in for googleapiclient.http.BatchHttpRequest: one round trip, per-call callbacks."""
+
+    def __init__(self, service: FakeGmailService, callback=None):
+        self.service, self.callback = service, callback
+        self._requests = []
+        self._last_id = 0
+
+    def add(self, request: FakeRequest, callback=None, request_id=None):
+        if len(self._requests) >= MAX_BATCH:
+            raise BatchError(f"Exceeded the maximum calls({MAX_BATCH}) in a single batch request.")
+        if request_id is None:
+            self._last_id += 1
+            request_id = str(self._last_id)
+        if any(rid == request_id for rid, _, _ in self._requests):
+            raise KeyError(f"A request with this ID already exists: {request_id}")
+        self._requests.append((request_id, request, callback))
+
+    def execute(self, http=None):
+        self.service._round_trip()
+        for request_id, request, callback in self._requests:
+            response, exception = None, None
+            try:
+                response = request._call()
+            except HttpError as exc:
+                exception = exc
+            for cb in (callback, self.callback):
+                if cb is not None:
+                    cb(request_id, response, exception)
+
+
+class _Users:
+    def __init__(self, service):
+        self.service = service
+
+    def messages(self):
+        return _Collection(self.service, "messages", {"list": self.service._list, "get": self.service._get})
+
+    def labels(self):
+        return _Collection(
+            self.service, "labels", {"list": lambda **_: {"labels": list(self.service._labels)}, "get": self.service._label}
+        )
+
+    def history(self):
+        return _Collection(self.service, "history", {"list": self.service._history})
+
+    def getProfile(self, userId="me", **kwargs):
+        service = self.service
+        return FakeRequest(
+            service,
+            "getProfile",
+            lambda **_: {
+                "emailAddress": ADDRESS,
+                "messagesTotal": len(service._entries),
+                "threadsTotal": len({e["threadId"] for e in service._entries}),
+                "historyId": str(service.history_id),
+            },
+        )
+
+
+class _Collection:
+    def __init__(self, service, name, handlers):
+        self.service, self.name, self.handlers = service, name, handlers
+
+    def __getattr__(self, method):
+        handler = self.handlers.get(method)
+        if handler is None:
+            raise AttributeError(f"FakeGmailService does not implement {self.name}.{method}")
+
+        def build(userId="me", fields=None, **kwargs):
+            return FakeRequest(self.service, f"{self.name}.{method}", handler, **kwargs)
+
+        return build
@@ -0,0 +1,248 @@
+"""Persisted per-message feature cache for training and evaluation.
+
+Tokenizing every subject and body (unigrams + bigrams) is the dominant cost of
+a training run. Because hashed features do not depend on the rest of the
+corpus, each message's raw term counts only need computing once. The store
+keeps them in `model/features.npz`: one CSR row per message for subject and
+body, plus an index of message id -> content key (body_hash + subject
+checksum). `sync()` vectorizes only messages that are new or whose content
+changed; everything else is assembled by row selection.
+
+On top of the cached counts, `fit_vectorizer()` reproduces TfidfVectorizer's
+min_df / max_df / max_features pruning and IDF weighting, and returns a
+servable Pipeline (hash -> column selection -> TF-IDF) so published models
+keep working from raw text in ml_subject_classifier.
+"""
+
+# feature_store.py
+
+import hashlib
+import os
+import zlib
+
+import numpy as np
+from scipy import sparse
+from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+from sklearn.pipeline import Pipeline
+from sklearn.utils import murmurhash3_32
+
+import model_store
+
+STORE_PATH = model_store.MODEL_DIR / "features.npz"
+
+SUBJECT_FEATURES = 2**18
+BODY_FEATURES = 2**20
+
+# Rewrite the store without superseded rows once they exceed this share
+COMPACT_STALE_RATIO = 0.25
+STORE_FORMAT = 1
+
+
+def hasher(n_features: int) -> HashingVectorizer:
+    """Raw-count hashing vectorizer with the same tokenization as the TfidfVectorizers."""
+    return HashingVectorizer(
+        lowercase=True,
+        ngram_range=(1, 2),
+        n_features=n_features,
+        alternate_sign=False,
+        norm=None,
+    )
+
+
+def content_key(subject: str, body: str, body_hash: str | None = None) -> str:
+    """Cache key for a message's text: body_hash (or a digest of the body) + subject checksum."""
+    body_key = body_hash if isinstance(body_hash, str) and body_hash else None
+    if body_key is None:
+        body_key = hashlib.sha1((body or "").encode("utf-8", "replace")).hexdigest()
+    return f"{body_key}:{zlib.crc32((subject or '').encode('utf-8', 'replace')):08x}"
+
+
+class ColumnSelector(BaseEstimator, TransformerMixin):
+    """Keep a fixed set of hashed feature columns (the pruned vocabulary)."""
+
+    def __init__(self, columns=None):
+        self.columns = columns
+
+    def fit(self, X, y=None):
+        return self
+
+    def transform(self, X):
+        return sparse.csr_matrix(X)[:, self.columns]
+
+
+def select_columns(counts, min_df=1, max_df=1.0, max_features=None) -> np.ndarray:
+    """Column indices TfidfVectorizer would keep for this count matrix."""
+    n_docs = counts.shape[0]
+    doc_freq = np.bincount(counts.indices, minlength=counts.shape[1])
+    max_doc_count = max_df if isinstance(max_df, int) else max_df * n_docs
+    min_doc_count = min_df if isinstance(min_df, int) else min_df * n_docs
+    keep = np.flatnonzero((doc_freq >= min_doc_count) & (doc_freq <= max_doc_count))
+    if max_features is not None and len(keep) > max_features:
+        term_freq = np.asarray(counts[:, keep].sum(axis=0)).ravel()
+        # Stable sort so ties resolve the same way on every run
+        keep = np.sort(keep[np.argsort(-term_freq, kind="stable")[:max_features]])
+    return keep
+
+
+def fit_vectorizer(counts, n_features: int, min_df=1, max_df=1.0, max_features=None) -> Pipeline:
+    """Fit pruning + IDF on cached counts and return a servable text Pipeline."""
+    columns = select_columns(counts, min_df=min_df, max_df=max_df, max_features=max_features)
+    tfidf = TfidfTransformer(norm="l2", use_idf=True, smooth_idf=True)
+    tfidf.fit(counts[:, columns])
+    return Pipeline(
+        [
+            ("hash", hasher(n_features)),
+            ("select", ColumnSelector(columns)),
+            ("tfidf", tfidf),
+        ]
+    )
+
+
+def transform_counts(vectorizer, counts):
+    """Apply a hashed Pipeline to cached counts (skipping tokenization).
+
+    Returns None for vectorizers that are not hash-based (e.g. legacy TfidfVectorizer).
+    """
+    steps = getattr(vectorizer, "steps", None)
+    if not steps or not isinstance(steps[0][1], HashingVectorizer):
+        return None
+    if steps[0][1].n_features != counts.shape[1]:
+        return None
+    rest = steps[1:]
+    return Pipeline(rest).transform(counts) if rest else counts
+
+
+def feature_names_sample(texts, n_features: int, columns=None, limit: int = 500) -> list:
+    """Recover readable terms for hashed columns by re-analyzing a sample of texts."""
+    analyzer = hasher(n_features).build_analyzer()
+    wanted = None if columns is None else set(int(c) for c in columns)
+    names = set()
+    for text in list(texts)[:limit]:
+        for term in analyzer(text or ""):
+            idx = abs(murmurhash3_32(term, seed=0)) % n_features
+            if wanted is None or idx in wanted:
+                names.add(term)
+    return sorted(names)
+
+
+class FeatureStore:
+    """Message id -> cached hashed subject/body counts, persisted in one .npz file."""
+
+    def __init__(self, path=None):
+        self.path = path or STORE_PATH
+        self.subject = sparse.csr_matrix((0, SUBJECT_FEATURES), dtype=np.float64)
+        self.body = sparse.csr_matrix((0, BODY_FEATURES), dtype=np.float64)
+        self.index = {}  # message id -> (row, content key)
+        self.last_sync = {"cached": 0, "vectorized": 0}
+
+    @classmethod
+    def open(cls, path=None) -> "FeatureStore":
+        store = cls(path)
+        store.load()
+        return store
+
+    def load(self):
+        try:
+            data = np.load(self.path, allow_pickle=False)
+        except (FileNotFoundError, ValueError, OSError):
+            return
+        with data:
+            if int(data["format"]) != STORE_FORMAT or int(data["subject_shape"][1]) != SUBJECT_FEATURES or int(
+                data["body_shape"][1]
+            ) != BODY_FEATURES:
+                return
+            self.subject = sparse.csr_matrix(
+                (data["subject_data"], data["subject_indices"], data["subject_indptr"]),
+                shape=tuple(data["subject_shape"]),
+            )
+            self.body = sparse.csr_matrix(
+                (data["body_data"], data["body_indices"], data["body_indptr"]),
+                shape=tuple(data["body_shape"]),
+            )
+            self.index = {
+                int(mid): (int(row), str(key))
+                for mid, row, key in zip(data["ids"], data["rows"], data["keys"])
+            }
+
+    def save(self):
+        """Write the whole store to a temp file and os.replace it into place."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f".{self.path.stem}.{os.getpid()}.tmp.npz")
+        ids = np.fromiter(self.index.keys(), dtype=np.int64, count=len(self.index))
+        rows = np.array([r for r, _ in self.index.values()], dtype=np.int64)
+        keys = np.array([k for _, k in self.index.values()], dtype=str)
+        np.savez(
+            tmp,
+            format=STORE_FORMAT,
+            subject_data=self.subject.data,
+            subject_indices=self.subject.indices,
+            subject_indptr=self.subject.indptr,
+            subject_shape=np.array(self.subject.shape),
+            body_data=self.body.data,
+            body_indices=self.body.indices,
+            body_indptr=self.body.indptr,
+            body_shape=np.array(self.body.shape),
+            ids=ids,
+            rows=rows,
+            keys=keys,
+        )
+        os.replace(tmp, self.path)
+
+    def sync(self, df, save: bool = True) -> np.ndarray:
+        """Make sure every row of `df` (id, subject, body[, body_hash]) is cached.
+
+        Only new messages and messages whose content key changed are vectorized.
+        Returns the store row of each df row, in df order.
+        """
+        hashes = df["body_hash"] if "body_hash" in df.columns else [None] * len(df)
+        subjects = df["subject"].fillna("").tolist()
+        bodies = df["body"].fillna("").tolist()
+        positions = np.empty(len(df), dtype=np.int64)
+        todo = []  # (df position, id, key)
+        for i, (mid, subject, body, bh) in enumerate(zip(df["id"], subjects, bodies, hashes)):
+            mid = int(mid)
+            key = content_key(subject, body, bh)
+            cached = self.index.get(mid)
+            if cached is not None and cached[1] == key:
+                positions[i] = cached[0]
+            else:
+                todo.append((i, mid, key))
+
+        self.last_sync = {"cached": len(df) - len(todo), "vectorized": len(todo)}
+        if not todo:
+            return positions
+
+        sel = [i for i, _, _ in todo]
+        new_subject = hasher(SUBJECT_FEATURES).transform([subjects[i] for i in sel])
+        new_body = hasher(BODY_FEATURES).transform([bodies[i] for i in sel])
+        start = self.subject.shape[0]
+        self.subject = sparse.vstack([self.subject, new_subject], format="csr")
+        self.body = sparse.vstack([self.body, new_body], format="csr")
+        for offset, (i, mid, key) in enumerate(todo):
+            self.index[mid] = (start + offset, key)
+            positions[i] = start + offset
+
+        if self.stale_rows() > COMPACT_STALE_RATIO * self.subject.shape[0]:
+            positions = self._compact(positions)
+        if save:
+            self.save()
+        return positions
+
+    def stale_rows(self) -> int:
+        """Rows superseded by a newer version of the same message."""
+        return self.subject.shape[0] - len(self.index)
+
+    def _compact(self, positions: np.ndarray) -> np.ndarray:
+        live = np.array(sorted(r for r, _ in self.index.values()), dtype=np.int64)
+        remap = np.full(self.subject.shape[0], -1, dtype=np.int64)
+        remap[live] = np.arange(len(live))
+        self.subject = self.subject[live]
+        self.body = self.body[live]
+        self.index = {mid: (int(remap[r]), key) for mid, (r, key) in self.index.items()}
+        return remap[positions]
+
+    def rows(self, positions):
+        """(subject_counts, body_counts) for the given store rows."""
+        positions = np.asarray(positions, dtype=np.int64)
+        return self.subject[positions], self.body[positions]
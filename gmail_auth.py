@@ -12,17 +12,41 @@ import pickle
 from google.auth.transport.requests import Request
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
+from googleapiclient.http import HttpRequest
+
+import ingest_run
 
 SCOPES = ["https://www.googleapis.com/auth/gmail.readonly"]
 
 
+class CountingHttpRequest(HttpRequest):
+    """HttpRequest that counts API calls and response bytes in ingest_run.api_usage."""
+
+    def __init__(self, http, postproc, uri, **kwargs):
+        def counting_postproc(resp, content):
+            ingest_run.api_usage.record(len(content or b""))
+            return postproc(resp, content)
+
+        super().__init__(http, counting_postproc, uri, **kwargs)
+
+
 def get_gmail_service():
     """Authorize and return a Gmail API service (read-only).
 
     Uses OAuth client secrets from `credentials.json` and persists the
     token in `token.pickle`. Automatically refreshes expired tokens.
     Returns a `googleapiclient.discovery.Resource` or None on failure.
+
+    If GMAIL_FAKE_DIR is set, returns a `fake_gmail.FakeGmailService` over
+    that fixture directory instead (configured by the GMAIL_FAKE_* variables),
+    for benchmarks and offline runs.
     """
+    fake_dir = os.environ.get("GMAIL_FAKE_DIR")
+    if fake_dir:
+        import fake_gmail
+
+        return fake_gmail.FakeGmailService.from_dir(fake_dir, fake_gmail.FakeGmailConfig.from_env())
+
     creds = None
 
     # Support both old (json/) and new (root) paths for backward compatibility
@@ -92,7 +116,9 @@ def get_gmail_service():
         return None
 
     try:
-        service = build("gmail", "v1", credentials=creds)
+        service = build(
+            "gmail", "v1", credentials=creds, requestBuilder=CountingHttpRequest
+        )
         return service
     except Exception as e:
         print(f"Error building Gmail service: {e}")
@@ -0,0 +1,292 @@
+"""Batched, cached Gmail message listing and metadata lookups.
+
+`compare_gmail_labels` used to page through messages.list one request at a
+time and then call messages.get(format="metadata") once per Gmail-only id, so
+a label audit over a large mailbox was dominated by round-trip latency. This
+module provides the same lookups with fewer, overlapping round trips:
+
+- `list_message_ids` pages messages.list asking only for ids
+  (``fields=messages/id,nextPageToken``). With ``match="any"`` each label is
+  listed on its own worker and the results are unioned. ``match="all"`` keeps
+  Gmail's labelIds semantics (a message must carry every label) in one listing.
+- `fetch_metadata` sends metadata gets as Gmail batch requests of up to
+  BATCH_SIZE calls, with up to `workers` batches in flight. Ids that fail with
+  a rate-limit or 5xx error are retried in a later batch with exponential
+  backoff; other failures are reported and left out of the result.
+- `MetadataCache` stores thread id, subject and label ids per message id in a
+  local SQLite file, so a repeated audit only fetches ids it has not seen.
+  Cached label ids are as of the fetch; pass ``refresh=True`` to refetch.
+
+googleapiclient service objects are not thread-safe, so the functions take a
+`service_factory` and build one service per worker thread.
+"""
+
+# gmail_metadata.py
+
+import json
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+# Gmail allows 100 calls per batch but recommends at most 50 to avoid rate limits
+BATCH_SIZE = 50
+WORKERS = 4
+MAX_RETRIES = 4
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+RATE_LIMIT_REASONS = ("rateLimitExceeded", "userRateLimitExceeded")
+LIST_PAGE_SIZE = 500
+CACHE_CHUNK = 500  # ids per SELECT ... IN (...)
+
+METADATA_FIELDS = "id,threadId,labelIds,payload/headers"
+
+
+@dataclass
+class MessageMeta:
+    msg_id: str
+    thread_id: str = ""
+    subject: str = ""
+    label_ids: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_api(cls, msg_id: str, resource: Dict) -> "MessageMeta":
+        subject = ""
+        for header in (resource.get("payload") or {}).get("headers") or []:
+            if header.get("name") == "Subject":
+                subject = header.get("value", "")
+                break
+        return cls(
+            msg_id=resource.get("id") or msg_id,
+            thread_id=resource.get("threadId", ""),
+            subject=subject,
+            label_ids=list(resource.get("labelIds") or []),
+        )
+
+
+@dataclass
+class FetchStats:
+    requested: int = 0
+    cached: int = 0
+    fetched: int = 0
+    failed: int = 0
+    batches: int = 0
+    retries: int = 0
+    seconds: float = 0.0
+
+
+class MetadataCache:
+    """Message metadata keyed by Gmail message id, in a local SQLite file."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS gmail_metadata ("
+            "msg_id TEXT PRIMARY KEY, thread_id TEXT, subject TEXT, label_ids TEXT, fetched_at TEXT)"
+        )
+        self.conn.commit()
+
+    def get_many(self, ids: Iterable[str]) -> Dict[str, MessageMeta]:
+        ids = list(ids)
+        found: Dict[str, MessageMeta] = {}
+        for i in range(0, len(ids), CACHE_CHUNK):
+            chunk = ids[i : i + CACHE_CHUNK]
+            rows = self.conn.execute(
+                "SELECT msg_id, thread_id, subject, label_ids FROM gmail_metadata "
+                f"WHERE msg_id IN ({','.join('?' * len(chunk))})",
+                chunk,
+            )
+            for msg_id, thread_id, subject, label_ids in rows:
+                found[msg_id] = MessageMeta(msg_id, thread_id or "", subject or "", json.loads(label_ids or "[]"))
+        return found
+
+    def put_many(self, metas: Iterable[MessageMeta]) -> None:
+        now = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO gmail_metadata (msg_id, thread_id, subject, label_ids, fetched_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            [(m.msg_id, m.thread_id, m.subject, json.dumps(m.label_ids), now) for m in metas],
+        )
+        self.conn.commit()
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM gmail_metadata").fetchone()[0]
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _is_retryable(exc: Exception) -> bool:
+    """Rate-limit and transient server errors; anything without an HTTP status is a transport error."""
+    status = getattr(getattr(exc, "resp", None), "status", None)
+    if status is None:
+        return True
+    status = int(status)
+    if status in RETRY_STATUSES:
+        return True
+    return status == 403 and any(reason in str(exc) for reason in RATE_LIMIT_REASONS)
+
+
+def _thread_service(service_factory: Callable):
+    """Return a function giving each worker thread its own service."""
+    local = threading.local()
+
+    def get():
+        if getattr(local, "service", None) is None:
+            local.service = service_factory()
+        return local.service
+
+    return get
+
+
+def _list_one(service, label_ids: Optional[List[str]], query: Optional[str], limit: Optional[int]) -> List[str]:
+    ids: List[str] = []
+    page_token = None
+    while True:
+        resp = (
+            service.users()
+            .messages()
+            .list(
+                userId="me",
+                labelIds=label_ids,
+                q=query,
+                pageToken=page_token,
+                maxResults=LIST_PAGE_SIZE,
+                fields="messages/id,nextPageToken",
+            )
+            .execute()
+        )
+        for m in resp.get("messages", []) or []:
+            ids.append(m.get("id"))
+            if limit and len(ids) >= limit:
+                return ids
+        page_token = resp.get("nextPageToken")
+        if not page_token:
+            return ids
+
+
+def list_message_ids(
+    service_factory: Callable,
+    label_ids: Optional[List[str]] = None,
+    query: Optional[str] = None,
+    limit: Optional[int] = None,
+    match: str = "all",
+    workers: int = WORKERS,
+) -> Set[str]:
+    """Gmail message ids under `label_ids` and/or matching `query`.
+
+    ``match="all"`` returns messages carrying every label (Gmail's labelIds
+    semantics, one listing). ``match="any"`` lists each label concurrently,
+    on at most `workers` threads, and returns the union. `limit` caps the
+    number of ids returned.
+    """
+    if match not in ("all", "any"):
+        raise ValueError(f"match must be 'all' or 'any', not {match!r}")
+    if match == "all" or not label_ids or len(label_ids) == 1:
+        return set(_list_one(service_factory(), label_ids, query, limit))
+
+    get_service = _thread_service(service_factory)
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(label_ids)))) as pool:
+        listings = pool.map(lambda label: _list_one(get_service(), [label], query, limit), label_ids)
+        ids: Set[str] = set()
+        for listing in listings:
+            ids.update(listing)
+    if limit and len(ids) > limit:
+        ids = set(sorted(ids)[:limit])
+    return ids
+
+
+def _fetch_batch(service, ids: List[str]):
+    """One batch request; returns (metas, retryable ids, failed ids)."""
+    metas: Dict[str, MessageMeta] = {}
+    retry: List[str] = []
+    failed: List[str] = []
+
+    def callback(request_id, response, exception):
+        if exception is None:
+            metas[request_id] = MessageMeta.from_api(request_id, response)
+        elif _is_retryable(exception):
+            retry.append(request_id)
+        else:
+            failed.append(request_id)
+
+    batch = service.new_batch_http_request(callback=callback)
+    messages = service.users().messages()
+    for msg_id in ids:
+        batch.add(
+            messages.get(userId="me", id=msg_id, format="metadata", metadataHeaders=["Subject"], fields=METADATA_FIELDS),
+            request_id=msg_id,
+        )
+    try:
+        batch.execute()
+    except Exception as exc:  # the whole batch failed, e.g. a dropped connection
+        if not _is_retryable(exc):
+            raise
+        done = set(metas) | set(retry) | set(failed)
+        retry.extend(mid for mid in ids if mid not in done)
+    return metas, retry, failed
+
+
+def fetch_metadata(
+    service_factory: Callable,
+    ids: Iterable[str],
+    cache: Optional[MetadataCache] = None,
+    batch_size: int = BATCH_SIZE,
+    workers: int = WORKERS,
+    refresh: bool = False,
+    max_retries: int = MAX_RETRIES,
+    backoff: float = 1.0,
+    sleep: Callable[[float], None] = time.sleep,
+):
+    """Metadata for `ids`, from `cache` where present and batch requests otherwise.
+
+    Returns (metas by id, FetchStats). Ids that still fail after `max_retries`
+    rounds, or fail with a non-retryable error, are missing from the result.
+    New metadata is written to `cache` on the calling thread.
+    """
+    started = time.perf_counter()
+    ids = list(dict.fromkeys(ids))
+    stats = FetchStats(requested=len(ids))
+    result: Dict[str, MessageMeta] = {}
+    if cache is not None and not refresh:
+        result = cache.get_many(ids)
+        stats.cached = len(result)
+    pending = [mid for mid in ids if mid not in result]
+
+    batch_size = max(1, min(batch_size, 100))
+    get_service = _thread_service(service_factory)
+    attempt = 0
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        while pending:
+            chunks = [pending[i : i + batch_size] for i in range(0, len(pending), batch_size)]
+            stats.batches += len(chunks)
+            pending = []
+            fetched: Dict[str, MessageMeta] = {}
+            for metas, retry, failed in pool.map(lambda chunk: _fetch_batch(get_service(), chunk), chunks):
+                fetched.update(metas)
+                pending.extend(retry)
+                stats.failed += len(failed)
+            if cache is not None and fetched:
+                cache.put_many(fetched.values())
+            result.update(fetched)
+            stats.fetched += len(fetched)
+            if pending:
+                attempt += 1
+                if attempt > max_retries:
+                    stats.failed += len(pending)
+                    break
+                stats.retries += len(pending)
+                sleep(backoff * 2 ** (attempt - 1))
+    stats.seconds = round(time.perf_counter() - started, 3)
+    return result, stats
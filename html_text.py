@@ -0,0 +1,199 @@
+"""HTML -> plain text extraction for message bodies, with selectable backends.
+
+Building a BeautifulSoup tree just to call `get_text()` is the most expensive
+step per message. The `stream` backend runs the same stdlib tokenizer
+BeautifulSoup's "html.parser" builder uses, but keeps only the text and link
+targets instead of building a tree. It follows BeautifulSoup's rules for which
+strings count as text (script/style/template/rt/rp contents, comments,
+doctypes and processing instructions are dropped; CDATA is kept; entities are
+decoded the same way), so both backends return identical output.
+
+Backends:
+- `stream` (default): streaming html.parser.HTMLParser subclass, no tree
+- `bs4`: BeautifulSoup(html, "html.parser") + get_text(), the reference output
+
+Select with the HTML_TEXT_BACKEND environment variable. lxml is not a
+dependency of this project, so there is no lxml backend.
+"""
+
+# html_text.py
+
+import os
+from html.parser import HTMLParser
+from typing import List, NamedTuple
+
+from bs4 import BeautifulSoup
+from bs4.builder import HTMLTreeBuilder
+from bs4.dammit import EntitySubstitution
+
+BACKENDS = ("stream", "bs4")
+DEFAULT_BACKEND = os.environ.get("HTML_TEXT_BACKEND", "stream").strip().lower()
+if DEFAULT_BACKEND not in BACKENDS:
+    print(f"[Warn] Unknown HTML_TEXT_BACKEND={DEFAULT_BACKEND!r}; using 'stream'")
+    DEFAULT_BACKEND = "stream"
+
+# Tags whose strings BeautifulSoup's get_text() leaves out, and void elements,
+# taken from bs4 itself so the two backends stay in step
+HIDDEN_TAGS = frozenset(HTMLTreeBuilder.DEFAULT_STRING_CONTAINERS)
+VOID_TAGS = frozenset(HTMLTreeBuilder.DEFAULT_EMPTY_ELEMENT_TAGS)
+
+
+class HtmlText(NamedTuple):
+    text: str
+    links: List[str]
+
+
+class _TextExtractor(HTMLParser):
+    """Collects get_text()-equivalent strings and <a href> values in one pass.
+
+    Mirrors bs4's BeautifulSoupHTMLParser: character references are decoded by
+    hand (convert_charrefs=False), every tag/comment/declaration boundary ends
+    the current string, and a string is dropped when any enclosing open tag is
+    hidden. `skip` adds tags whose whole subtree is dropped, like decompose().
+    """
+
+    def __init__(self, skip=()):
+        super().__init__(convert_charrefs=False)
+        self.hidden = HIDDEN_TAGS | frozenset(skip)
+        self.dropped = frozenset(("script", "style", *skip))
+        self.strings = []
+        self.links = []
+        self._stack = []
+        self._hidden_depth = 0
+        self._dropped_depth = 0
+        self._buffer = []
+        self._already_closed = []
+
+    def _end_data(self, cdata=False):
+        if self._buffer:
+            # bs4 keeps CDATA sections even inside hidden tags (but not decomposed ones)
+            if not (self._dropped_depth if cdata else self._hidden_depth):
+                text = "".join(self._buffer).strip()
+                if text:
+                    self.strings.append(text)
+            self._buffer = []
+
+    def _push(self, tag):
+        self._stack.append(tag)
+        if tag in self.hidden:
+            self._hidden_depth += 1
+        if tag in self.dropped:
+            self._dropped_depth += 1
+
+    def _pop_to(self, tag):
+        if tag not in self._stack:
+            return
+        while self._stack:
+            popped = self._stack.pop()
+            if popped in self.hidden:
+                self._hidden_depth -= 1
+            if popped in self.dropped:
+                self._dropped_depth -= 1
+            if popped == tag:
+                break
+
+    def handle_starttag(self, tag, attrs, handle_empty_element=True):
+        self._end_data()
+        if tag == "a" and not self._dropped_depth:
+            href = None
+            for key, value in attrs:
+                if key == "href":
+                    href = "" if value is None else value
+            if href is not None:
+                self.links.append(href)
+        if tag in VOID_TAGS and handle_empty_element:
+            # Opened and closed at once; a later explicit end tag is ignored
+            self._already_closed.append(tag)
+            return
+        self._push(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs, handle_empty_element=False)
+        self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in self._already_closed:
+            # bs4 drops this event entirely, so the current string continues
+            self._already_closed.remove(tag)
+        else:
+            self._end_data()
+            self._pop_to(tag)
+
+    def handle_data(self, data):
+        self._buffer.append(data)
+
+    def handle_charref(self, name):
+        if name.startswith(("x", "X")):
+            code = int(name.lstrip("xX"), 16)
+        else:
+            code = int(name)
+        data = None
+        if code < 256:
+            # Same Windows-1252 guess bs4 makes for e.g. &#147;
+            try:
+                data = bytearray([code]).decode("windows-1252")
+            except UnicodeDecodeError:
+                pass
+        if not data:
+            try:
+                data = chr(code)
+            except (ValueError, OverflowError):
+                pass
+        self._buffer.append(data or "\N{REPLACEMENT CHARACTER}")
+
+    def handle_entityref(self, name):
+        character = EntitySubstitution.HTML_ENTITY_TO_CHARACTER.get(name)
+        self._buffer.append(character if character is not None else f"&{name}")
+
+    def handle_comment(self, data):
+        self._end_data()
+
+    def handle_decl(self, decl):
+        self._end_data()
+
+    def handle_pi(self, data):
+        self._end_data()
+
+    def unknown_decl(self, data):
+        self._end_data()
+        if data.upper().startswith("CDATA["):
+            self._buffer.append(data[len("CDATA[") :])
+            self._end_data(cdata=True)
+
+    def close(self):
+        super().close()
+        self._end_data()
+
+
+def _extract_stream(html: str, separator: str, skip) -> HtmlText:
+    parser = _TextExtractor(skip)
+    parser.feed(html)
+    parser.close()
+    return HtmlText(separator.join(parser.strings), parser.links)
+
+
+def _extract_bs4(html: str, separator: str, skip) -> HtmlText:
+    soup = BeautifulSoup(html, "html.parser")
+    for tag in soup(["script", "style", *skip]):
+        tag.decompose()
+    links = [a["href"] for a in soup.find_all("a", href=True)]
+    return HtmlText(soup.get_text(separator=separator, strip=True), links)
+
+
+_EXTRACTORS = {"stream": _extract_stream, "bs4": _extract_bs4}
+
+
+def extract(html: str, separator: str = " ", skip=(), backend: str | None = None) -> HtmlText:
+    """Visible text (stripped strings joined by `separator`) and <a href> targets.
+
+    Script and style contents are always dropped; `skip` names extra tags to
+    drop with everything inside them (e.g. "noscript").
+    """
+    if not html:
+        return HtmlText("", [])
+    return _EXTRACTORS[backend or DEFAULT_BACKEND](html, separator, tuple(skip))
+
+
+def html_to_text(html: str, separator: str = " ", skip=(), backend: str | None = None) -> str:
+    """Plain text of an HTML document; see extract()."""
+    return extract(html, separator, skip, backend).text
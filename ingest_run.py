@@ -0,0 +1,255 @@
+"""Ingest run bookkeeping: buffered daily counters and IngestionRun history.
+
+`ingest_message` used to bump IngestionStats with one F() UPDATE per message.
+Those increments now go through `stats_buffer`. Outside a run the buffer
+writes through at once, so the web views and single-message callers behave
+as before. Inside a run, increments are kept in memory and written as one
+UPDATE every INGEST_STATS_FLUSH_EVERY increments and when the run ends.
+
+`RunRecorder` wraps one ingest command run and writes an IngestionRun row:
+- start/end time and messages per second
+- Gmail API calls and response bytes, counted by the request class that
+  gmail_auth builds the service with
+- per-outcome counts
+- the stage_timing summary
+- the last errors
+
+While the run is going, the same row is the run-state registry read by
+/api/ingestion_status/: `set_phase()` records the phase and total, and
+count()/error() write processed, ETA and a heartbeat every PROGRESS_EVERY
+messages or PROGRESS_SECONDS, whichever comes first.
+
+    recorder = ingest_run.RunRecorder(source="gmail").start()
+    for msg_id in ids:
+        try:
+            recorder.count(ingest_message(service, msg_id))
+        except Exception as e:
+            recorder.error(msg_id, e)
+    recorder.finish()
+"""
+
+# ingest_run.py
+
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+
+import stage_timing
+
+FLUSH_EVERY = int(os.environ.get("INGEST_STATS_FLUSH_EVERY", "100"))
+MAX_ERRORS = 50  # errors kept per run (the total is always counted)
+OUTCOMES = ("inserted", "ignored", "skipped", "failed")
+PROGRESS_EVERY = 10  # messages between progress writes
+PROGRESS_SECONDS = 5.0  # ...or seconds, whichever comes first
+
+
+class ApiUsage:
+    """Running totals of Gmail API calls and response bytes."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.bytes = 0
+
+    def record(self, nbytes: int):
+        with self._lock:
+            self.calls += 1
+            self.bytes += nbytes
+
+    def snapshot(self):
+        with self._lock:
+            return self.calls, self.bytes
+
+
+api_usage = ApiUsage()
+
+
+class StatsBuffer:
+    """Pending IngestionStats increments, written as one UPDATE per day and flush."""
+
+    def __init__(self, flush_every: int = FLUSH_EVERY):
+        self._lock = threading.Lock()
+        self.flush_every = flush_every
+        self.buffering = False
+        self._pending = defaultdict(Counter)
+        self._events = 0
+
+    def add(self, date, field: str, n: int = 1):
+        with self._lock:
+            self._pending[date][field] += n
+            self._events += 1
+            due = not self.buffering or (self.flush_every and self._events >= self.flush_every)
+        if due:
+            self.flush()
+
+    def begin(self):
+        """Start holding increments in memory until flush()/end()."""
+        self.buffering = True
+
+    def end(self):
+        self.flush()
+        self.buffering = False
+
+    def flush(self):
+        from django.db.models import F
+
+        from tracker.models import IngestionStats
+
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(Counter)
+            self._events = 0
+        for date, fields in pending.items():
+            changes = {field: F(field) + n for field, n in fields.items() if n}
+            if not changes:
+                continue
+            if not IngestionStats.objects.filter(date=date).update(**changes):
+                IngestionStats.objects.get_or_create(date=date)
+                IngestionStats.objects.filter(date=date).update(**changes)
+
+
+stats_buffer = StatsBuffer()
+
+
+class RunRecorder:
+    """Collects one ingest run's counters and saves them as an IngestionRun."""
+
+    def __init__(self, source: str = "gmail"):
+        self.source = source
+        self.run = None
+        self.outcomes = Counter()
+        self.reasons = Counter()  # "ignored:newsletter_headers" etc.
+        self.errors = []
+        self._started = None
+        self._api_start = (0, 0)
+        self._phase_started = None
+        self._phase_start_count = 0
+        self._last_progress = (0, 0.0)  # (processed, perf_counter) at the last write
+
+    def start(self):
+        from django.utils import timezone
+
+        from tracker.models import IngestionRun
+
+        self._started = time.perf_counter()
+        self._api_start = api_usage.snapshot()
+        stage_timing.timer.reset()
+        stats_buffer.begin()
+        self.run = IngestionRun.objects.create(
+            source=self.source, phase="starting", pid=os.getpid(), heartbeat_at=timezone.now()
+        )
+        return self
+
+    def set_phase(self, phase: str, total: int = None):
+        """Record the current phase (and the number of messages it will process)."""
+        if self.run is None:
+            return
+        self.run.phase = phase
+        if total is not None:
+            self.run.total = total
+        self._phase_started = time.perf_counter()
+        self._phase_start_count = self.processed
+        self._write_progress(force=True)
+
+    def heartbeat(self):
+        """Refresh the heartbeat during long steps that process no messages."""
+        self._write_progress(force=True)
+
+    def _write_progress(self, force: bool = False):
+        from django.utils import timezone
+
+        from tracker.models import IngestionRun
+
+        if self.run is None:
+            return
+        now = time.perf_counter()
+        processed = self.processed
+        last_count, last_time = self._last_progress
+        if not force and processed - last_count < PROGRESS_EVERY and now - last_time < PROGRESS_SECONDS:
+            return
+        self._last_progress = (processed, now)
+        run = self.run
+        run.processed = processed
+        run.heartbeat_at = timezone.now()
+        elapsed = now - self._started
+        run.messages_per_sec = round(processed / elapsed, 2) if elapsed > 0 else 0.0
+        # ETA from the rate within the current phase (listing time is excluded)
+        done = processed - self._phase_start_count
+        phase_elapsed = now - (self._phase_started or self._started)
+        if run.total and done > 0 and phase_elapsed > 0:
+            run.eta_seconds = round(max(run.total - processed, 0) * phase_elapsed / done, 1)
+        IngestionRun.objects.filter(pk=run.pk).update(
+            phase=run.phase,
+            total=run.total,
+            processed=run.processed,
+            heartbeat_at=run.heartbeat_at,
+            messages_per_sec=run.messages_per_sec,
+            eta_seconds=run.eta_seconds,
+        )
+
+    def count(self, ret):
+        """Count one ingest_message return value."""
+        outcome = outcome_of(ret)
+        self.outcomes[outcome] += 1
+        if isinstance(ret, dict) and ret.get("reason"):
+            self.reasons[f"{outcome}:{ret['reason']}"] += 1
+        self._write_progress()
+
+    def error(self, msg_id: str, exc: Exception, count: bool = True):
+        if count:
+            self.outcomes["failed"] += 1
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append({"msg_id": msg_id, "error": f"{type(exc).__name__}: {exc}"[:500]})
+        if count:
+            self._write_progress()
+
+    @property
+    def processed(self) -> int:
+        return sum(self.outcomes.values())
+
+    def finish(self, status: str = "completed"):
+        """Flush buffered counters and save the run; returns the IngestionRun."""
+        from django.utils import timezone
+
+        stats_buffer.end()
+        if self.run is None:
+            return None
+        elapsed = time.perf_counter() - self._started
+        calls, nbytes = api_usage.snapshot()
+        run = self.run
+        run.finished_at = run.heartbeat_at = timezone.now()
+        run.status = status
+        run.phase = "done"
+        run.eta_seconds = None
+        run.duration_seconds = round(elapsed, 3)
+        run.processed = self.processed
+        run.messages_per_sec = round(self.processed / elapsed, 2) if elapsed > 0 else 0.0
+        run.api_calls = calls - self._api_start[0]
+        run.bytes_fetched = nbytes - self._api_start[1]
+        run.inserted = self.outcomes["inserted"]
+        run.ignored = self.outcomes["ignored"]
+        run.skipped = self.outcomes["skipped"]
+        run.failed = self.outcomes["failed"]
+        run.outcome_counts = {**self.outcomes, **self.reasons}
+        run.stage_timings = stage_timing.timer.summary()
+        run.errors = self.errors
+        run.save()
+        return run
+
+    def line(self) -> str:
+        run = self.run
+        return (
+            f"Run #{run.pk}: {run.processed} messages in {run.duration_seconds:.1f}s "
+            f"({run.messages_per_sec:.2f} msg/s), {run.api_calls} API calls, "
+            f"{run.bytes_fetched / 1_000_000:.2f} MB fetched, "
+            f"inserted={run.inserted} ignored={run.ignored} skipped={run.skipped} failed={run.failed}"
+        )
+
+
+def outcome_of(ret) -> str:
+    """Map an ingest_message return value onto one of OUTCOMES."""
+    if isinstance(ret, dict):
+        ret = ret.get("status")
+    if ret in OUTCOMES:
+        return ret
+    return "inserted" if ret else "skipped"
@@ -0,0 +1,299 @@
+"""Incremental (warm-start) training mode for the message classifier.
+
+Full training re-fits two TfidfVectorizers and a CalibratedClassifierCV (three
+LogisticRegression fits) on the whole reviewed corpus every run. Incremental
+mode instead keeps, in `model/incremental_state.joblib`:
+
+- a fixed hashed vocabulary (HashingVectorizer) for subject and body, plus the
+  persisted document-frequency counts, so IDF is updated from new rows only
+  (the per-message hashed counts themselves come from `feature_store`);
+- an SGDClassifier(loss="log_loss") updated with `partial_fit` on rows that
+  were reviewed or relabeled since the previous run;
+- the id -> (label, body_hash) map of rows already trained on.
+
+The published vectorizers are plain sklearn Pipelines (hashing + TfidfTransformer
+with the persisted IDF) and the classifier exposes predict_proba, so
+ml_subject_classifier serves them unchanged.
+
+Every INCREMENTAL_FULL_EVERY updates, when a new label appears, or when the
+state is missing, the state is rebuilt from the full corpus. A rebuild that
+replaces an existing state reports how well the old incremental model agreed
+with the rebuilt one on the holdout set (the consistency check).
+
+Evaluation always uses a stable holdout (message id % HOLDOUT_MODULUS == 0)
+that is never trained on, so metrics are comparable across runs.
+"""
+
+# ml_incremental.py
+
+import os
+import time
+from datetime import datetime
+
+import joblib
+import numpy as np
+import pandas as pd
+from scipy.sparse import hstack
+from sklearn.feature_extraction.text import TfidfTransformer
+from sklearn.linear_model import SGDClassifier
+from sklearn.pipeline import Pipeline
+
+import model_store
+from feature_store import BODY_FEATURES, SUBJECT_FEATURES, FeatureStore, hasher
+
+STATE_PATH = model_store.MODEL_DIR / "incremental_state.joblib"
+HOLDOUT_MODULUS = 5  # 20% holdout, same share as the full-mode train_test_split
+FULL_EVERY = max(1, int(os.getenv("INCREMENTAL_FULL_EVERY", "20") or 20))
+REBUILD_EPOCHS = 5
+UPDATE_EPOCHS = 2
+STATE_FORMAT = 1
+
+
+def _idf(doc_freq: np.ndarray, n_docs: int) -> np.ndarray:
+    # TfidfTransformer(smooth_idf=True) formula
+    return np.log((1.0 + n_docs) / (1.0 + doc_freq)) + 1.0
+
+
+def _tfidf(n_features: int, doc_freq: np.ndarray, n_docs: int) -> TfidfTransformer:
+    tfidf = TfidfTransformer(norm="l2", use_idf=True, smooth_idf=True)
+    tfidf.idf_ = _idf(doc_freq, n_docs)
+    tfidf.n_features_in_ = n_features
+    return tfidf
+
+
+def make_vectorizer(n_features: int, doc_freq: np.ndarray, n_docs: int) -> Pipeline:
+    """Build a servable hashing+TF-IDF pipeline from persisted document frequencies."""
+    return Pipeline(
+        [("hash", hasher(n_features)), ("tfidf", _tfidf(n_features, doc_freq, n_docs))]
+    )
+
+
+def is_holdout(message_ids) -> np.ndarray:
+    return np.asarray(message_ids, dtype=np.int64) % HOLDOUT_MODULUS == 0
+
+
+def _doc_freq(counts) -> np.ndarray:
+    return np.asarray((counts > 0).sum(axis=0)).ravel().astype(np.int64)
+
+
+def _sample_weight(labels, class_counts: dict) -> np.ndarray:
+    # Running equivalent of compute_sample_weight("balanced")
+    total = sum(class_counts.values())
+    n_classes = max(1, len(class_counts))
+    return np.array(
+        [total / (n_classes * max(1, class_counts.get(lbl, 1))) for lbl in labels]
+    )
+
+
+def _body_hashes(df: pd.DataFrame) -> list:
+    """body_hash column as a list with missing values normalized to None (NaN != NaN)."""
+    if "body_hash" not in df.columns:
+        return [None] * len(df)
+    return [h if isinstance(h, str) and h else None for h in df["body_hash"]]
+
+
+def _new_classifier() -> SGDClassifier:
+    return SGDClassifier(loss="log_loss", alpha=1e-5, random_state=42)
+
+
+def load_state():
+    try:
+        state = joblib.load(STATE_PATH)
+    except (FileNotFoundError, EOFError, ValueError, OSError):
+        return None
+    if not isinstance(state, dict) or state.get("format") != STATE_FORMAT:
+        return None
+    return state
+
+
+def save_state(state: dict):
+    """Persist state atomically so a crashed run never leaves a truncated file."""
+    STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp = STATE_PATH.with_name(f".{STATE_PATH.name}.{os.getpid()}.tmp")
+    joblib.dump(state, tmp)
+    os.replace(tmp, STATE_PATH)
+
+
+def _features(state: dict, subject_counts, body_counts):
+    """TF-IDF features from cached hashed counts, weighted with the state's IDF."""
+    n_docs = state["n_docs"]
+    return hstack(
+        [
+            _tfidf(SUBJECT_FEATURES, state["subject_df"], n_docs).transform(subject_counts),
+            _tfidf(BODY_FEATURES, state["body_df"], n_docs).transform(body_counts),
+        ]
+    ).tocsr()
+
+
+def _fit_epochs(clf, X, y, weights, classes, epochs: int, seed: int = 42):
+    rng = np.random.default_rng(seed)
+    y = np.asarray(y)
+    for _ in range(epochs):
+        order = rng.permutation(X.shape[0])
+        clf.partial_fit(X[order], y[order], classes=classes, sample_weight=weights[order])
+
+
+def rebuild(df: pd.DataFrame, y: pd.Series, counts) -> dict:
+    """Build a fresh incremental state from the full corpus (non-holdout rows).
+
+    `counts` is the (subject, body) pair of cached hashed count matrices aligned with df.
+    """
+    train = ~is_holdout(df["id"])
+    subject_counts, body_counts = counts[0][train], counts[1][train]
+    labels = y[train].tolist()
+
+    class_counts = pd.Series(labels).value_counts().to_dict()
+    state = {
+        "format": STATE_FORMAT,
+        "classes": sorted(y.unique().tolist()),
+        "n_docs": int(len(labels)),
+        "subject_df": _doc_freq(subject_counts),
+        "body_df": _doc_freq(body_counts),
+        "class_counts": {str(k): int(v) for k, v in class_counts.items()},
+        "trained": {},
+        "clf": _new_classifier(),
+        "updates_since_full": 0,
+        "built_at": datetime.now().isoformat(),
+    }
+    X = _features(state, subject_counts, body_counts)
+    weights = _sample_weight(labels, state["class_counts"])
+    _fit_epochs(state["clf"], X, labels, weights, state["classes"], REBUILD_EPOCHS)
+
+    hashes = [h for h, t in zip(_body_hashes(df), train) if t]
+    for mid, lbl, bh in zip(df["id"][train], labels, hashes):
+        state["trained"][int(mid)] = (lbl, bh)
+    return state
+
+
+def pending_rows(state: dict, df: pd.DataFrame, y: pd.Series) -> np.ndarray:
+    """Mask of non-holdout rows that are new, relabeled or whose body changed."""
+    trained = state["trained"]
+    mask = []
+    for mid, lbl, bh in zip(df["id"], y, _body_hashes(df)):
+        seen = trained.get(int(mid))
+        mask.append(seen is None or seen[0] != lbl or seen[1] != bh)
+    return np.array(mask, dtype=bool) & ~is_holdout(df["id"])
+
+
+def update(state: dict, df: pd.DataFrame, y: pd.Series, mask: np.ndarray, counts) -> int:
+    """partial_fit the classifier on the masked rows; returns the number of rows used."""
+    if not mask.any():
+        return 0
+    ids = df["id"][mask].astype(int).tolist()
+    subject_counts, body_counts = counts[0][mask], counts[1][mask]
+    labels = y[mask].tolist()
+    hashes = [h for h, m in zip(_body_hashes(df), mask) if m]
+
+    # Only never-seen documents add to document frequencies (relabels keep their text)
+    unseen = np.array([mid not in state["trained"] for mid in ids], dtype=bool)
+    if unseen.any():
+        state["subject_df"] += _doc_freq(subject_counts[unseen])
+        state["body_df"] += _doc_freq(body_counts[unseen])
+        state["n_docs"] += int(unseen.sum())
+
+    for mid, lbl in zip(ids, labels):
+        previous = state["trained"].get(mid)
+        if previous is not None:
+            state["class_counts"][previous[0]] = max(0, state["class_counts"].get(previous[0], 1) - 1)
+        state["class_counts"][lbl] = state["class_counts"].get(lbl, 0) + 1
+
+    X = _features(state, subject_counts, body_counts)
+    weights = _sample_weight(labels, state["class_counts"])
+    _fit_epochs(state["clf"], X, labels, weights, state["classes"], UPDATE_EPOCHS)
+
+    for mid, lbl, bh in zip(ids, labels, hashes):
+        state["trained"][mid] = (lbl, bh)
+    state["updates_since_full"] += 1
+    return len(ids)
+
+
+def train(
+    df: pd.DataFrame,
+    y: pd.Series,
+    force_full: bool = False,
+    verbose: bool = False,
+    store: FeatureStore | None = None,
+) -> dict:
+    """Run one incremental training step (or a periodic full rebuild).
+
+    `df` must contain id, subject, body (and ideally body_hash); `y` the labels.
+    Returns a dict with clf, subject_vec, body_vec, y_test, y_pred and run info
+    for train_model.py to publish and evaluate.
+    """
+    started = time.perf_counter()
+    y = y.reset_index(drop=True)
+    df = df.reset_index(drop=True)
+    classes = sorted(y.unique().tolist())
+
+    store = store or FeatureStore.open()
+    counts = store.rows(store.sync(df))
+    if verbose:
+        print(f"[Info] Feature cache: {store.last_sync}")
+
+    state = load_state()
+    reason = None
+    if force_full:
+        reason = "forced"
+    elif state is None:
+        reason = "no incremental state"
+    elif set(classes) - set(state["classes"]):
+        reason = f"new label(s) {sorted(set(classes) - set(state['classes']))}"
+    elif state["updates_since_full"] >= FULL_EVERY:
+        reason = f"periodic full retrain after {state['updates_since_full']} updates"
+
+    holdout = is_holdout(df["id"])
+    holdout_counts = (counts[0][holdout], counts[1][holdout])
+    consistency = None
+    rows_used = 0
+    if reason:
+        print(f"[Info] Incremental mode: full rebuild ({reason})")
+        previous = state
+        state = rebuild(df, y, counts)
+        rows_used = int((~holdout).sum())
+        if previous is not None and holdout.any():
+            # Consistency check: how far had the incremental model drifted from a clean rebuild?
+            old_pred = previous["clf"].predict(_features(previous, *holdout_counts))
+            new_pred = state["clf"].predict(_features(state, *holdout_counts))
+            y_hold = y[holdout].to_numpy()
+            consistency = {
+                "agreement": float(np.mean(old_pred == new_pred)),
+                "incremental_accuracy": float(np.mean(old_pred == y_hold)),
+                "rebuilt_accuracy": float(np.mean(new_pred == y_hold)),
+                "updates_since_full": int(previous["updates_since_full"]),
+            }
+            print(
+                "[Info] Consistency check: incremental vs rebuilt agreement "
+                f"{consistency['agreement']:.3f}, accuracy "
+                f"{consistency['incremental_accuracy']:.3f} -> {consistency['rebuilt_accuracy']:.3f}"
+            )
+    else:
+        mask = pending_rows(state, df, y)
+        rows_used = update(state, df, y, mask, counts)
+        print(f"[Info] Incremental mode: partial_fit on {rows_used} new/changed rows")
+
+    save_state(state)
+
+    y_test = y[holdout]
+    y_pred = state["clf"].predict(_features(state, *holdout_counts)) if len(y_test) else np.array([])
+    elapsed = round(time.perf_counter() - started, 3)
+    if verbose:
+        print(f"[Info] Incremental step took {elapsed}s; {len(state['trained'])} rows in state")
+
+    return {
+        "clf": state["clf"],
+        "subject_vec": make_vectorizer(SUBJECT_FEATURES, state["subject_df"], state["n_docs"]),
+        "body_vec": make_vectorizer(BODY_FEATURES, state["body_df"], state["n_docs"]),
+        "y_test": y_test,
+        "y_pred": y_pred,
+        "info": {
+            "mode": "incremental",
+            "full_rebuild": bool(reason),
+            "rebuild_reason": reason,
+            "rows_used": rows_used,
+            "updates_since_full": state["updates_since_full"],
+            "total_features": SUBJECT_FEATURES + BODY_FEATURES,
+            "seconds": elapsed,
+            "consistency": consistency,
+            "feature_cache": dict(store.last_sync),
+        },
+    }
@@ -1,8 +1,10 @@
 """Message/company classification utilities for GmailJobTracker.
 
-Loads trained scikit-learn artifacts from the local `model/` directory and
-provides `predict_subject_type` which prioritizes rule-based decisions with ML
-fallback. Also includes pattern loading from `json/patterns.json` and support
+Loads trained scikit-learn artifacts from the currently published version in
+the local `model/` directory (see `model_store`), preferring the compact
+memory-mapped bundle (see `model_bundle`), picks up newly published
+versions without a restart, and provides `predict_subject_type` which
+prioritizes rule-based decisions with ML fallback. Also includes pattern loading from `json/patterns.json` and support
 for suppressing labels.
 """
 
@@ -11,56 +13,121 @@ for suppressing labels.
 import json
 import os
 import re
+import time
 from pathlib import Path
 
 import joblib
 import numpy as np
 
+import model_bundle
+import model_store
+
 # --- Paths ---
 MODEL_DIR = os.path.join(os.path.dirname(__file__), "model")
-MESSAGE_MODEL_PATH = os.path.join(MODEL_DIR, "message_classifier.pkl")
-MESSAGE_SUBJECT_VECTORIZER_PATH = os.path.join(MODEL_DIR, "subject_vectorizer.pkl")
-MESSAGE_BODY_VECTORIZER_PATH = os.path.join(MODEL_DIR, "body_vectorizer.pkl")
-MESSAGE_LABEL_ENCODER_PATH = os.path.join(MODEL_DIR, "message_label_encoder.pkl")
 
 COMPANY_MODEL_PATH = os.path.join(MODEL_DIR, "company_classifier.pkl")
 COMPANY_VECTORIZER_PATH = os.path.join(MODEL_DIR, "vectorizer.pkl")
 COMPANY_LABEL_ENCODER_PATH = os.path.join(MODEL_DIR, "label_encoder.pkl")
 
+# Load the compact memory-mapped bundle when one was published (MODEL_USE_BUNDLE=0 forces pickles)
+USE_BUNDLE = os.getenv("MODEL_USE_BUNDLE", "1").strip().lower() not in {"0", "false", "no"}
+
+# How often (seconds) predict_subject_type checks model/current.json for a new version
+RELOAD_CHECK_SECONDS = float(os.getenv("MODEL_RELOAD_CHECK_SECONDS", "30") or 30)
+
+model = None
+subject_vectorizer = None
+body_vectorizer = None
+label_encoder = None
+mode = None
+model_version = None
+_last_reload_check = 0.0
+
+
+def load_models():
+    """(Re)load classifier artifacts from the currently published model version.
+
+    Falls back to the flat model/*.pkl layout (and then to the legacy company
+    classifier) when no versioned model has been published yet. On failure the
+    previously loaded model, if any, stays active.
+    """
+    global model, subject_vectorizer, body_vectorizer, label_encoder, mode
+    global model_version, _MODEL, _LABEL_ENCODER
+    version = model_store.current_version()
+    message_model_path = model_store.artifact_path("message_classifier.pkl")
+    bundle_dir = model_store.artifact_path(model_bundle.BUNDLE_DIRNAME)
+    try:
+        bundle = None
+        if USE_BUNDLE and version and bundle_dir.is_dir():
+            try:
+                bundle = model_bundle.load_bundle(bundle_dir)
+            except (OSError, ValueError, KeyError) as error:
+                print(f"⚠️ Could not load model bundle ({error}); using pickled artifacts.")
+        if bundle is not None:
+            new = (
+                bundle.classifier,
+                bundle.subject_vectorizer,
+                bundle.body_vectorizer,
+                bundle.manifest["classes"],
+                "message",
+            )
+            print(f"🤖 Loaded message-level classifier bundle (version {version}).")
+        elif message_model_path.exists():
+            new = (
+                joblib.load(message_model_path),
+                joblib.load(model_store.artifact_path("subject_vectorizer.pkl")),
+                joblib.load(model_store.artifact_path("body_vectorizer.pkl")),
+                joblib.load(model_store.artifact_path("message_label_encoder.pkl")),
+                "message",
+            )
+            print(f"🤖 Loaded message-level classifier (version {version or 'legacy'}).")
+        elif os.path.exists(COMPANY_MODEL_PATH):
+            new = (
+                joblib.load(COMPANY_MODEL_PATH),
+                joblib.load(COMPANY_VECTORIZER_PATH),
+                None,  # company mode doesn't use separate body vec
+                joblib.load(COMPANY_LABEL_ENCODER_PATH),
+                "company",
+            )
+            print("🤖 Loaded company-level classifier.")
+        else:
+            new = (None, None, None, None, None)
+            print("No classifier found. Predictions will be skipped.")
+    except (FileNotFoundError, EOFError, ValueError) as error:
+        print(f"⚠️ Error loading classifier: {error}. Predictions will be skipped.")
+        if model is not None:
+            return
+        new = (None, None, None, None, None)
+    model, subject_vectorizer, body_vectorizer, label_encoder, mode = new
+    model_version = version
+    # Optional aliases
+    _MODEL = model
+    _LABEL_ENCODER = label_encoder
+
+
+def reload_if_changed(force: bool = False) -> bool:
+    """Reload artifacts if a newer model version was published. Returns True on reload.
+
+    The check is a single small file read, throttled to RELOAD_CHECK_SECONDS, so it
+    is cheap enough to call on every prediction.
+    """
+    global _last_reload_check
+    now_ts = time.monotonic()
+    if not force and now_ts - _last_reload_check < RELOAD_CHECK_SECONDS:
+        return False
+    _last_reload_check = now_ts
+    version = model_store.current_version()
+    if version and version != model_version:
+        load_models()
+        return True
+    return False
+
+
 # --- Load whichever model is available ---
-try:
-    if os.path.exists(MESSAGE_MODEL_PATH):
-        model = joblib.load(MESSAGE_MODEL_PATH)
-        subject_vectorizer = joblib.load(MESSAGE_SUBJECT_VECTORIZER_PATH)
-        body_vectorizer = joblib.load(MESSAGE_BODY_VECTORIZER_PATH)
-        label_encoder = joblib.load(MESSAGE_LABEL_ENCODER_PATH)
-        mode = "message"
-        print("🤖 Loaded message-level classifier.")
-    elif os.path.exists(COMPANY_MODEL_PATH):
-        model = joblib.load(COMPANY_MODEL_PATH)
-        subject_vectorizer = joblib.load(COMPANY_VECTORIZER_PATH)
-        body_vectorizer = None  # company mode doesn't use separate body vec
-        label_encoder = joblib.load(COMPANY_LABEL_ENCODER_PATH)
-        mode = "company"
-        print("🤖 Loaded company-level classifier.")
-    else:
-        model = None
-        subject_vectorizer = None
-        body_vectorizer = None
-        label_encoder = None
-        mode = None
-        print("No classifier found. Predictions will be skipped.")
-except (FileNotFoundError, EOFError, ValueError) as error:
-    model = None
-    subject_vectorizer = None
-    body_vectorizer = None
-    label_encoder = None
-    mode = None
-    print(f"⚠️ Error loading classifier: {error}. Predictions will be skipped.")
-
-# Optional aliases
-_MODEL = model
-_LABEL_ENCODER = label_encoder
+_MODEL = None
+_LABEL_ENCODER = None
+load_models()
+_last_reload_check = time.monotonic()
 
 # Toggle verbose debug logging with env var: CLASSIFIER_DEBUG=1
 DEBUG = os.getenv("CLASSIFIER_DEBUG", "0") in {"1", "true", "True"}
@@ -248,7 +315,8 @@ def predict_subject_type(
     if DEBUG:
         print("[DEBUG] No rule match, evaluating ML...")
 
-    # Fall back to ML model
+    # Fall back to ML model (picking up a freshly published version if there is one)
+    reload_if_changed()
     if model is None or subject_vectorizer is None or body_vectorizer is None:
         if DEBUG:
             print("[DEBUG] ML artifacts missing, returning unknown")
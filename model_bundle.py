@@ -0,0 +1,287 @@
+"""Compact, memory-mappable export of the message classifier.
+
+The joblib pickles written by train_model.py are slow to load (the
+CalibratedClassifierCV pickle carries three fitted LogisticRegressions plus
+their calibrators) and every process ends up with a private copy. At publish
+time `export_bundle()` flattens the fitted objects into a `bundle/` directory
+inside the model version:
+
+- `bundle.json`        manifest: format, version, training-run id, classes,
+                       vectorizer settings, classifier kind
+- `<part>_vocab.txt`   vocabulary, one term per line (vocabulary vectorizers)
+- `<part>_columns.npy` kept hashed columns (hashed vectorizers)
+- `<part>_idf.npy`     IDF weights
+- `coef.npy`, `intercept.npy`, `active.npy`
+                       every linear model stacked into one matrix (one row per
+                       fold x class), restricted to the feature columns any of
+                       them use, so scoring is a single sparse matmul
+- `iso_*.npy`          isotonic calibration curves, one row per coef row
+
+`load_bundle()` opens the arrays with `np.load(mmap_mode="r")`, so loading takes
+milliseconds and the pages are shared between worker processes. The returned
+object exposes the same `predict_proba` / `classes_` / vectorizer `transform`
+interface ml_subject_classifier already uses, and reproduces the pickled
+model's probabilities.
+"""
+
+# model_bundle.py
+
+import json
+from pathlib import Path
+
+import numpy as np
+from scipy import sparse
+from sklearn.calibration import CalibratedClassifierCV
+from sklearn.feature_extraction.text import (
+    CountVectorizer,
+    HashingVectorizer,
+    TfidfVectorizer,
+)
+from sklearn.linear_model import SGDClassifier
+from sklearn.preprocessing import normalize
+
+BUNDLE_DIRNAME = "bundle"
+BUNDLE_FORMAT = 1
+
+
+# --- export ---
+
+
+def _export_vectorizer(vec, directory: Path, part: str) -> dict:
+    """Write vocabulary/columns + IDF for one vectorizer and return its spec."""
+    if isinstance(vec, TfidfVectorizer):
+        terms = vec.get_feature_names_out()
+        if any("\n" in t for t in terms):
+            raise ValueError(f"{part} vocabulary contains a newline; cannot bundle")
+        (directory / f"{part}_vocab.txt").write_text("\n".join(terms), encoding="utf-8")
+        np.save(directory / f"{part}_idf.npy", np.asarray(vec.idf_, dtype=np.float64))
+        return {
+            "kind": "vocabulary",
+            "n_terms": int(len(terms)),
+            "lowercase": bool(vec.lowercase),
+            "ngram_range": list(vec.ngram_range),
+            "norm": vec.norm,
+            "sublinear_tf": bool(vec.sublinear_tf),
+        }
+
+    steps = dict(getattr(vec, "named_steps", {}))
+    hasher = steps.get("hash")
+    tfidf = steps.get("tfidf")
+    if not isinstance(hasher, HashingVectorizer) or tfidf is None:
+        raise ValueError(f"Unsupported {part} vectorizer: {type(vec).__name__}")
+    select = steps.get("select")
+    if select is not None:
+        np.save(directory / f"{part}_columns.npy", np.asarray(select.columns, dtype=np.int64))
+    np.save(directory / f"{part}_idf.npy", np.asarray(tfidf.idf_, dtype=np.float64))
+    return {
+        "kind": "hashed",
+        "n_features": int(hasher.n_features),
+        "lowercase": bool(hasher.lowercase),
+        "ngram_range": list(hasher.ngram_range),
+        "norm": tfidf.norm,
+        "sublinear_tf": bool(tfidf.sublinear_tf),
+        "selected": select is not None,
+    }
+
+
+def _stack_calibrated(clf: CalibratedClassifierCV, classes: list):
+    """One coef row per (fold, calibrated class) plus its isotonic curve."""
+    coefs, intercepts, folds, pos_class, curves = [], [], [], [], []
+    for fold, cal in enumerate(clf.calibrated_classifiers_):
+        est = cal.estimator
+        if not hasattr(est, "coef_"):
+            raise ValueError(f"Unsupported calibrated estimator: {type(est).__name__}")
+        # Binary estimators have one decision column, for the positive class
+        est_classes = list(est.classes_) if est.coef_.shape[0] > 1 else [est.classes_[1]]
+        for row, (cls, calibrator) in enumerate(zip(est_classes, cal.calibrators)):
+            if not hasattr(calibrator, "X_thresholds_"):
+                raise ValueError("Only isotonic calibration can be bundled")
+            coefs.append(np.asarray(est.coef_[row], dtype=np.float64))
+            intercepts.append(float(est.intercept_[row]))
+            folds.append(fold)
+            pos_class.append(classes.index(cls))
+            curves.append((calibrator.X_thresholds_, calibrator.y_thresholds_))
+    width = max(len(x) for x, _ in curves)
+    iso_x = np.zeros((len(curves), width))
+    iso_y = np.zeros((len(curves), width))
+    iso_len = np.zeros(len(curves), dtype=np.int64)
+    for i, (x, y) in enumerate(curves):
+        iso_x[i, : len(x)] = x
+        iso_y[i, : len(y)] = y
+        iso_len[i] = len(x)
+    arrays = {
+        "fold": np.array(folds, dtype=np.int64),
+        "pos_class": np.array(pos_class, dtype=np.int64),
+        "iso_x": iso_x,
+        "iso_y": iso_y,
+        "iso_len": iso_len,
+    }
+    return np.vstack(coefs), np.array(intercepts), arrays, len(clf.calibrated_classifiers_)
+
+
+def export_bundle(clf, subject_vec, body_vec, directory, manifest: dict | None = None) -> Path:
+    """Flatten a fitted classifier + vectorizers into `<directory>/bundle/`.
+
+    Supports CalibratedClassifierCV (isotonic) over linear models and
+    SGDClassifier(loss="log_loss"). Raises ValueError for anything else.
+    """
+    out = Path(directory) / BUNDLE_DIRNAME
+    out.mkdir(parents=True, exist_ok=True)
+    classes = [c.item() if hasattr(c, "item") else c for c in clf.classes_]
+    spec = {
+        "format": BUNDLE_FORMAT,
+        **(manifest or {}),
+        "classes": [str(c) for c in classes],
+        "subject": _export_vectorizer(subject_vec, out, "subject"),
+        "body": _export_vectorizer(body_vec, out, "body"),
+    }
+
+    if isinstance(clf, CalibratedClassifierCV):
+        coef, intercept, extra, n_folds = _stack_calibrated(clf, classes)
+        spec["classifier"] = {"kind": "calibrated_isotonic", "n_folds": n_folds}
+    elif isinstance(clf, SGDClassifier) and clf.loss == "log_loss":
+        coef, intercept, extra = np.asarray(clf.coef_, dtype=np.float64), np.asarray(clf.intercept_), {}
+        spec["classifier"] = {"kind": "linear_ovr"}
+    else:
+        raise ValueError(f"Unsupported classifier: {type(clf).__name__}")
+
+    # Drop feature columns no model uses; hashed models are mostly empty columns
+    active = np.flatnonzero(np.any(coef != 0, axis=0))
+    spec["classifier"]["n_features"] = int(coef.shape[1])
+    spec["classifier"]["n_active"] = int(len(active))
+    np.save(out / "active.npy", active.astype(np.int64))
+    np.save(out / "coef.npy", np.ascontiguousarray(coef[:, active]))
+    np.save(out / "intercept.npy", intercept.astype(np.float64))
+    for name, arr in extra.items():
+        np.save(out / f"{name}.npy", arr)
+
+    (out / "bundle.json").write_text(json.dumps(spec, indent=2), encoding="utf-8")
+    return out
+
+
+# --- loading ---
+
+
+class BundledVectorizer:
+    """TF-IDF transform rebuilt from bundled vocabulary/columns + IDF arrays."""
+
+    def __init__(self, spec: dict, directory: Path, part: str, mmap_mode="r"):
+        self.spec = spec
+        ngram_range = tuple(spec["ngram_range"])
+        if spec["kind"] == "vocabulary":
+            text = (directory / f"{part}_vocab.txt").read_text(encoding="utf-8")
+            terms = text.split("\n") if text else []
+            self._counter = CountVectorizer(
+                lowercase=spec["lowercase"],
+                ngram_range=ngram_range,
+                vocabulary={t: i for i, t in enumerate(terms)},
+            )
+            self.columns = None
+        else:
+            self._counter = HashingVectorizer(
+                lowercase=spec["lowercase"],
+                ngram_range=ngram_range,
+                n_features=spec["n_features"],
+                alternate_sign=False,
+                norm=None,
+            )
+            self.columns = (
+                np.load(directory / f"{part}_columns.npy", mmap_mode=mmap_mode)
+                if spec.get("selected")
+                else None
+            )
+        self.idf = np.load(directory / f"{part}_idf.npy", mmap_mode=mmap_mode)
+
+    def transform(self, texts):
+        X = sparse.csr_matrix(self._counter.transform(texts), dtype=np.float64)
+        if self.columns is not None:
+            X = X[:, self.columns]
+        if self.spec.get("sublinear_tf"):
+            np.log(X.data, X.data)
+            X.data += 1
+        X = sparse.csr_matrix(X.multiply(self.idf))
+        if self.spec.get("norm"):
+            X = normalize(X, norm=self.spec["norm"], copy=False)
+        return X
+
+
+class BundledClassifier:
+    """predict_proba over the stacked linear models (+ isotonic calibration)."""
+
+    def __init__(self, spec: dict, directory: Path, mmap_mode="r"):
+        self.spec = spec
+        self.classes_ = np.array(spec["classes"], dtype=object)
+        self.kind = spec["classifier"]["kind"]
+        load = lambda name: np.load(directory / f"{name}.npy", mmap_mode=mmap_mode)
+        self.active = load("active")
+        self.coef = load("coef")
+        self.intercept = load("intercept")
+        if self.kind == "calibrated_isotonic":
+            self.n_folds = spec["classifier"]["n_folds"]
+            self.fold = load("fold")
+            self.pos_class = load("pos_class")
+            self.iso_x = load("iso_x")
+            self.iso_y = load("iso_y")
+            self.iso_len = load("iso_len")
+
+    def decision_function(self, X):
+        X = sparse.csr_matrix(X)[:, self.active]
+        return np.asarray(X @ self.coef.T) + self.intercept
+
+    def predict_proba(self, X):
+        scores = self.decision_function(X)
+        n_classes = len(self.classes_)
+        if self.kind == "linear_ovr":
+            proba = 1.0 / (1.0 + np.exp(-scores))
+            if proba.shape[1] == 1:
+                return np.hstack([1.0 - proba, proba])
+            return proba / proba.sum(axis=1, keepdims=True)
+
+        mean_proba = np.zeros((scores.shape[0], n_classes))
+        for fold in range(self.n_folds):
+            proba = np.zeros_like(mean_proba)
+            for row in np.flatnonzero(self.fold == fold):
+                n = self.iso_len[row]
+                class_idx = self.pos_class[row]
+                if n_classes == 2:
+                    class_idx = 1
+                proba[:, class_idx] = np.interp(scores[:, row], self.iso_x[row, :n], self.iso_y[row, :n])
+            if n_classes == 2:
+                proba[:, 0] = 1.0 - proba[:, 1]
+            else:
+                denominator = proba.sum(axis=1, keepdims=True)
+                proba = np.divide(
+                    proba,
+                    denominator,
+                    out=np.full_like(proba, 1 / n_classes),
+                    where=denominator != 0,
+                )
+            proba[(1.0 < proba) & (proba <= 1.0 + 1e-5)] = 1.0
+            mean_proba += proba
+        return mean_proba / self.n_folds
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+class ModelBundle:
+    def __init__(self, directory, mmap_mode="r"):
+        self.directory = Path(directory)
+        self.manifest = json.loads((self.directory / "bundle.json").read_text(encoding="utf-8"))
+        if self.manifest.get("format") != BUNDLE_FORMAT:
+            raise ValueError(f"Unsupported bundle format {self.manifest.get('format')}")
+        self.subject_vectorizer = BundledVectorizer(self.manifest["subject"], self.directory, "subject", mmap_mode)
+        self.body_vectorizer = BundledVectorizer(self.manifest["body"], self.directory, "body", mmap_mode)
+        self.classifier = BundledClassifier(self.manifest, self.directory, mmap_mode)
+
+    @property
+    def version(self):
+        return self.manifest.get("version")
+
+
+def load_bundle(directory, mmap_mode="r") -> ModelBundle:
+    """Open a bundle directory (the version dir or its `bundle/` subdir)."""
+    directory = Path(directory)
+    if (directory / BUNDLE_DIRNAME / "bundle.json").exists():
+        directory = directory / BUNDLE_DIRNAME
+    return ModelBundle(directory, mmap_mode=mmap_mode)
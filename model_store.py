@@ -0,0 +1,328 @@
+"""Versioned, atomically published model artifacts for GmailJobTracker.
+
+`train_model.py` writes every run into its own directory under
+`model/versions/<version>/` and publishes it by atomically replacing the
+`model/current.json` pointer. The flat `model/*.pkl` files are still written
+(each via temp file + `os.replace`) for scripts that load them directly.
+`ml_subject_classifier` follows the pointer and reloads when the version
+changes, so long-running ingestors never read a half-written pickle.
+
+Also provides `TrainingLock`, the lock file that guarantees at most one
+training process runs at a time.
+"""
+
+# model_store.py
+
+import json
+import os
+import shutil
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+import joblib
+
+MODEL_DIR = Path(__file__).parent / "model"
+VERSIONS_DIR = MODEL_DIR / "versions"
+CURRENT_POINTER = MODEL_DIR / "current.json"
+TRAINING_LOCK_PATH = MODEL_DIR / ".training.lock"
+
+# train_model.py exit status when another run holds TRAINING_LOCK_PATH (EX_TEMPFAIL)
+EXIT_LOCKED = 75
+
+# Number of published versions kept on disk (the current one is never pruned)
+KEEP_VERSIONS = max(1, int(os.getenv("MODEL_KEEP_VERSIONS", "5") or 5))
+
+# Artifacts mirrored to the legacy flat layout in model/
+LEGACY_ARTIFACTS = (
+    "message_classifier.pkl",
+    "message_label_encoder.pkl",
+    "subject_vectorizer.pkl",
+    "body_vectorizer.pkl",
+    "model_info.json",
+)
+
+
+def _pid_alive(pid: int) -> bool:
+    """Return True if a process with this pid is still running."""
+    if not pid or pid <= 0:
+        return False
+    try:
+        import psutil
+
+        return psutil.pid_exists(pid)
+    except ImportError:
+        try:
+            os.kill(pid, 0)
+        except OSError:
+            return False
+        return True
+
+
+class TrainingLock:
+    """Cross-platform lock file holding the owner's pid.
+
+    The lock file is written in full ({pid, acquired_at, token}) to a temp file
+    and hard-linked into place, which fails if the lock exists, so no other
+    process ever sees a half-written lock. An empty or unreadable lock file
+    counts as held until it is LOCK_GRACE_SECONDS old.
+
+    A lock left behind by a crashed process (pid no longer alive) is stale.
+    Stale locks are removed under a short-lived `<lock>.break` file, and only
+    if the lock file is still the same one (inode, pid and token) judged
+    stale, so two waiters can never remove each other's fresh locks.
+    """
+
+    LOCK_GRACE_SECONDS = 10.0
+
+    def __init__(self, path: Path | None = None):
+        self.path = Path(path or TRAINING_LOCK_PATH)
+        self.held = False
+        self._token = None
+
+    def _read(self):
+        """Return (stat, info) for the lock file, info None if empty/unreadable; None if absent."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                st = os.fstat(f.fileno())
+                text = f.read()
+        except FileNotFoundError:
+            return None
+        except OSError:
+            try:
+                return self.path.stat(), None
+            except OSError:
+                return None
+        try:
+            info = json.loads(text)
+        except ValueError:
+            info = None
+        return st, info if isinstance(info, dict) else None
+
+    def _is_stale(self, st, info) -> bool:
+        if info is None:
+            return time.time() - st.st_mtime > self.LOCK_GRACE_SECONDS
+        return not _pid_alive(int(info.get("pid") or 0))
+
+    def owner(self) -> dict | None:
+        """Return the lock holder info ({pid, acquired_at}) or None if unlocked/stale.
+
+        A lock file that is still being written (or cannot be read) reports
+        {"pid": None}.
+        """
+        found = self._read()
+        if found is None or self._is_stale(*found):
+            return None
+        return found[1] or {"pid": None, "acquired_at": None}
+
+    def is_locked(self) -> bool:
+        return self.owner() is not None
+
+    def _create(self) -> bool:
+        """Atomically create the lock file with its content. False if it already exists."""
+        token = uuid.uuid4().hex
+        tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.{token}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"pid": os.getpid(), "acquired_at": datetime.now().isoformat(), "token": token}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            os.link(tmp, self.path)
+        except FileExistsError:
+            return False
+        except OSError:
+            # Filesystem without hard links: exclusive create, then write
+            try:
+                fd = os.open(str(self.path), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                return False
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(tmp.read_text(encoding="utf-8"))
+        finally:
+            tmp.unlink(missing_ok=True)
+        self._token = token
+        return True
+
+    def _break_stale(self, st, info) -> bool:
+        """Remove the lock file judged stale if it is still that same file."""
+        breaker = self.path.with_name(self.path.name + ".break")
+        try:
+            fd = os.open(str(breaker), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            # Another waiter is breaking the lock; a breaker left by a crash expires
+            try:
+                if time.time() - breaker.stat().st_mtime > self.LOCK_GRACE_SECONDS:
+                    breaker.unlink()
+            except OSError:
+                pass
+            return False
+        os.close(fd)
+        try:
+            found = self._read()
+            if found is None:
+                return True
+            now_st, now_info = found
+            same = (now_st.st_ino, now_st.st_dev) == (st.st_ino, st.st_dev) and now_info == info
+            if not same or not self._is_stale(now_st, now_info):
+                return False
+            self.path.unlink(missing_ok=True)
+            return True
+        finally:
+            breaker.unlink(missing_ok=True)
+
+    def acquire(self, timeout: float = 0.0, poll: float = 0.5) -> bool:
+        """Try to take the lock, waiting up to `timeout` seconds. Returns True on success."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        deadline = time.monotonic() + timeout
+        while True:
+            if self._create():
+                self.held = True
+                return True
+            found = self._read()
+            if found is None:
+                continue  # released in the meantime
+            if self._is_stale(*found) and self._break_stale(*found):
+                continue
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(poll)
+
+    def release(self):
+        """Remove the lock file if this process owns it."""
+        if not self.held:
+            return
+        self.held = False
+        found = self._read()
+        if found and found[1] and found[1].get("token") == self._token:
+            self.path.unlink(missing_ok=True)
+
+    def __enter__(self):
+        if not self.acquire():
+            raise RuntimeError(f"Lock {self.path} is held by another process")
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+def atomic_write_text(path: Path, text: str):
+    """Write text to `path` via a temp file in the same directory + os.replace."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def atomic_write_json(path: Path, data):
+    atomic_write_text(path, json.dumps(data, indent=2))
+
+
+def atomic_copy(src: Path, dest: Path):
+    """Copy `src` over `dest` so readers see either the old or the new file, never a partial one."""
+    dest = Path(dest)
+    tmp = dest.with_name(f".{dest.name}.{os.getpid()}.tmp")
+    shutil.copyfile(src, tmp)
+    os.replace(tmp, dest)
+
+
+def new_version_id() -> str:
+    """Sortable, unique-enough version id: timestamp plus pid."""
+    return f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+
+
+def staging_dir(version: str) -> Path:
+    """Create and return the private directory a training run writes into."""
+    path = VERSIONS_DIR / f".staging-{version}"
+    if path.exists():
+        shutil.rmtree(path)
+    path.mkdir(parents=True)
+    return path
+
+
+def version_dir(version: str) -> Path:
+    return VERSIONS_DIR / version
+
+
+def read_current() -> dict | None:
+    """Return the published manifest ({version, published_at, ...}) or None."""
+    try:
+        with open(CURRENT_POINTER, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (FileNotFoundError, ValueError, OSError):
+        return None
+    if not isinstance(data, dict) or not data.get("version"):
+        return None
+    if not version_dir(data["version"]).is_dir():
+        return None
+    return data
+
+
+def current_version() -> str | None:
+    current = read_current()
+    return current["version"] if current else None
+
+
+def artifact_path(name: str) -> Path:
+    """Path of artifact `name` in the current version, falling back to the flat layout."""
+    current = read_current()
+    if current:
+        candidate = version_dir(current["version"]) / name
+        if candidate.exists():
+            return candidate
+    return MODEL_DIR / name
+
+
+def dump(obj, directory: Path, name: str) -> Path:
+    """joblib.dump into a staging directory (callers publish afterwards)."""
+    path = Path(directory) / name
+    joblib.dump(obj, path)
+    return path
+
+
+def publish_version(version: str, staged: Path, manifest: dict | None = None) -> Path:
+    """Promote a staged directory to `versions/<version>` and point current.json at it.
+
+    The directory rename and the pointer replace are both atomic, so a reader
+    resolving the pointer always sees a complete set of artifacts.
+    """
+    manifest = dict(manifest or {})
+    manifest.setdefault("version", version)
+    manifest["published_at"] = datetime.now().isoformat()
+    manifest["files"] = sorted(p.name for p in Path(staged).iterdir() if p.is_file())
+    atomic_write_json(Path(staged) / "manifest.json", manifest)
+
+    final = version_dir(version)
+    os.replace(staged, final)
+    atomic_write_json(CURRENT_POINTER, manifest)
+
+    # Keep the flat layout in sync for tools that read model/*.pkl directly
+    for name in LEGACY_ARTIFACTS:
+        src = final / name
+        if src.exists():
+            atomic_copy(src, MODEL_DIR / name)
+
+    prune_versions()
+    return final
+
+
+def list_versions() -> list[str]:
+    if not VERSIONS_DIR.is_dir():
+        return []
+    return sorted(
+        p.name for p in VERSIONS_DIR.iterdir() if p.is_dir() and not p.name.startswith(".")
+    )
+
+
+def prune_versions(keep: int = KEEP_VERSIONS):
+    """Delete the oldest versions beyond `keep`, never the current one."""
+    current = current_version()
+    versions = list_versions()
+    for old in versions[:-keep] if len(versions) > keep else []:
+        if old == current:
+            continue
+        shutil.rmtree(version_dir(old), ignore_errors=True)
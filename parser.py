@@ -41,6 +41,7 @@ import os
 # from joblib import load  # not needed here
 import quopri
 import re
+import time
 from datetime import datetime, timedelta, date
 from email.utils import parseaddr, parsedate_to_datetime
 from email import message_from_string as eml_from_string
@@ -50,7 +51,6 @@ from pathlib import Path
 import django
 import joblib
 from bs4 import BeautifulSoup
-from django.db.models import F
 from django.utils import timezone
 from django.utils.timezone import now
 
@@ -61,7 +61,12 @@ from db import (
     insert_or_update_application,
     is_valid_company,
 )
+import classification_window
 from db_helpers import build_company_job_index, get_application_by_sender
+import html_text
+import ingest_run
+import stage_timing
+import tracker_logger
 from ml_entity_extraction import extract_entities
 from ml_subject_classifier import predict_subject_type
 from tracker.models import (
@@ -75,7 +80,14 @@ from tracker.models import (
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "dashboard.settings")
 django.setup()
-DEBUG = True
+# Truthy while the "tracker.parser" logger is enabled for DEBUG (PARSER_LOG_LEVEL,
+# or tracker_logger.set_level("tracker.parser", "DEBUG") at runtime)
+DEBUG = tracker_logger.LevelFlag("tracker.parser")
+
+# Bounds for MIME body extraction, so multi-MB newsletters stay cheap:
+# decoded bytes kept per text part, and MIME nodes visited per message
+MIME_MAX_PART_BYTES = int(os.environ.get("MIME_MAX_PART_BYTES", "1000000"))
+MIME_MAX_PARTS = int(os.environ.get("MIME_MAX_PARTS", "200"))
 
 
 # ======================================================================================
@@ -846,6 +858,130 @@ class RuleClassifier:
         return None
 
 
+class ParsedBody:
+    """One message body, parsed at most once and shared by every extractor.
+
+    Company/ATS/job-board extraction used to re-run BeautifulSoup on the same
+    HTML body at each step. A ParsedBody is created once per message in the
+    ingest path and passed down instead; the HTML is parsed lazily on first
+    use, in a single pass that yields both the plain text and the links (via
+    the html_text backend selected by HTML_TEXT_BACKEND). A BeautifulSoup tree
+    is only built if a caller asks for `soup`.
+
+    Attributes:
+        raw: The body string as received (HTML or plain text)
+        parses: HTML parses done by this instance
+        parse_count: HTML parses done by all instances (class-wide counter)
+    """
+
+    parse_count = 0
+
+    def __init__(self, raw: str):
+        self.raw = raw or ""
+        self.parses = 0
+        self._raw_lower = None
+        self._soup = None
+        self._text = None
+        self._lower = None
+        self._links = None
+
+    @classmethod
+    def of(cls, body):
+        """Return `body` if it is already a ParsedBody, else wrap it."""
+        return body if isinstance(body, cls) else cls(body)
+
+    def _count_parse(self):
+        self.parses += 1
+        ParsedBody.parse_count += 1
+
+    @property
+    def raw_lower(self) -> str:
+        if self._raw_lower is None:
+            self._raw_lower = self.raw.lower()
+        return self._raw_lower
+
+    @property
+    def looks_like_html(self) -> bool:
+        """Same check the extractors used before deciding to strip HTML."""
+        return "<html" in self.raw_lower or "<style" in self.raw_lower
+
+    @property
+    def soup(self):
+        """BeautifulSoup tree with script/style removed (built on first access)."""
+        if self._soup is None:
+            self._soup = BeautifulSoup(self.raw, "html.parser")
+            for tag in self._soup(["script", "style"]):
+                tag.decompose()
+            self._count_parse()
+        return self._soup
+
+    def _parse(self):
+        try:
+            with stage_timing.span("html_to_text"):
+                self._text, self._links = html_text.extract(self.raw)
+        except Exception:
+            self._text, self._links = self.raw, []
+        self._count_parse()
+
+    @property
+    def text(self) -> str:
+        """Visible text of the body parsed as HTML; the raw body if parsing fails."""
+        if self._text is None:
+            if not self.raw:
+                self._text = ""
+            else:
+                self._parse()
+        return self._text
+
+    @property
+    def plain(self) -> str:
+        """Plain text for pattern matching: stripped HTML, or the body as-is."""
+        return self.text if self.looks_like_html else self.raw
+
+    @property
+    def lower(self) -> str:
+        if self._lower is None:
+            self._lower = self.plain.lower()
+        return self._lower
+
+    @property
+    def links(self) -> list:
+        """Link targets: <a href> values for HTML bodies, bare URLs otherwise."""
+        if self._links is None:
+            if self.looks_like_html:
+                self._parse()
+            else:
+                self._links = re.findall(r"https?://[^\s<>\"')\]]+", self.raw)
+        return self._links
+
+
+class MimeBody:
+    """Preferred text bodies found by one walk over a message's MIME tree.
+
+    Attributes:
+        text: First text/plain part, decoded (None if there was none)
+        html: First text/html part, decoded (None if there was none)
+        stats: Walk counters: nodes, leaves, decoded, failed, attachments_skipped,
+            other_skipped, bytes_decoded, truncated, stopped_early, limit_hit
+    """
+
+    def __init__(self):
+        self.text = None
+        self.html = None
+        self.stats = {
+            "nodes": 0,
+            "leaves": 0,
+            "decoded": 0,
+            "failed": 0,
+            "attachments_skipped": 0,
+            "other_skipped": 0,
+            "bytes_decoded": 0,
+            "truncated": 0,
+            "stopped_early": False,
+            "limit_hit": False,
+        }
+
+
 class EmailBodyParser:
     """Parses and extracts body text from email messages.
 
@@ -879,6 +1015,144 @@ class EmailBodyParser:
         else:
             return data
 
+    @staticmethod
+    def iter_gmail_parts(payload: dict):
+        """Yield every MIME node of a Gmail API payload, depth first.
+
+        Each item is (mime_type, is_attachment, is_leaf, decode) where
+        decode(max_bytes) returns (text, truncated). Nothing is decoded until
+        decode is called, and attachment subtrees are not descended into.
+        """
+        mime_type = (payload.get("mimeType") or "").lower()
+        body = payload.get("body") or {}
+        disposition = next(
+            (
+                h.get("value", "")
+                for h in payload.get("headers") or []
+                if h.get("name", "").lower() == "content-disposition"
+            ),
+            "",
+        )
+        is_attachment = bool(
+            payload.get("filename")
+            or body.get("attachmentId")
+            or "attachment" in disposition.lower()
+        )
+        children = payload.get("parts") or []
+
+        def decode(max_bytes):
+            data = body.get("data") or ""
+            truncated = len(data) // 4 * 3 > max_bytes
+            if truncated:
+                data = data[: max_bytes // 3 * 4]
+            data += "=" * (-len(data) % 4)
+            return (
+                base64.urlsafe_b64decode(data).decode("utf-8", errors="ignore"),
+                truncated,
+            )
+
+        yield mime_type, is_attachment, not children, decode
+        if is_attachment:
+            return
+        for child in children:
+            yield from EmailBodyParser.iter_gmail_parts(child)
+
+    @staticmethod
+    def iter_email_parts(msg):
+        """Yield every MIME node of an email.message.Message, depth first.
+
+        Same items as iter_gmail_parts. Parts within the size bound are decoded
+        with get_payload(decode=True); larger ones only have their first
+        max_bytes decoded.
+        """
+        mime_type = msg.get_content_type()
+        disposition = str(msg.get("Content-Disposition", "")).lower()
+        is_attachment = "attachment" in disposition
+        is_leaf = not msg.is_multipart()
+
+        def decode(max_bytes):
+            charset = msg.get_content_charset() or "utf-8"
+            cte = str(msg.get("Content-Transfer-Encoding", "")).strip().lower()
+            encoded = msg.get_payload()
+            truncated = isinstance(encoded, str) and (
+                len(encoded) // 4 * 3 if cte == "base64" else len(encoded)
+            ) > max_bytes
+            if not truncated:
+                payload = msg.get_payload(decode=True) or b""
+            elif cte == "base64":
+                compact = re.sub(r"[^A-Za-z0-9+/]", "", encoded)
+                payload = base64.b64decode(compact[: max_bytes // 3 * 4])
+            elif cte == "quoted-printable":
+                payload = quopri.decodestring(encoded[:max_bytes].encode("ascii", errors="ignore"))
+            else:
+                payload = encoded[:max_bytes].encode("utf-8", errors="surrogateescape")
+            try:
+                return payload.decode(charset, errors="ignore"), truncated
+            except LookupError:
+                return payload.decode("utf-8", errors="ignore"), truncated
+
+        yield mime_type, is_attachment, is_leaf, decode
+        if is_attachment or is_leaf:
+            return
+        for child in msg.get_payload():
+            yield from EmailBodyParser.iter_email_parts(child)
+
+    @staticmethod
+    def collect_bodies(nodes, max_part_bytes=None, max_parts=None) -> MimeBody:
+        """Pick the first text/plain and text/html parts from a MIME walk.
+
+        Decodes only those two parts (or the body of a single-part message),
+        each once and capped at max_part_bytes, skips attachments and other
+        leaf types without decoding them, and stops as soon as both are found
+        or after max_parts nodes.
+
+        Args:
+            nodes: Iterator from iter_gmail_parts / iter_email_parts
+            max_part_bytes: Decoded bytes kept per part (default MIME_MAX_PART_BYTES)
+            max_parts: MIME nodes visited at most (default MIME_MAX_PARTS)
+
+        Returns:
+            MimeBody with text, html and walk stats
+        """
+        max_part_bytes = max_part_bytes or MIME_MAX_PART_BYTES
+        max_parts = max_parts or MIME_MAX_PARTS
+        result = MimeBody()
+        stats = result.stats
+        for mime_type, is_attachment, is_leaf, decode in nodes:
+            stats["nodes"] += 1
+            if stats["nodes"] > max_parts:
+                stats["limit_hit"] = True
+                break
+            if is_attachment:
+                stats["attachments_skipped"] += 1
+                continue
+            if not is_leaf:
+                continue
+            stats["leaves"] += 1
+            slot = {"text/plain": "text", "text/html": "html"}.get(mime_type)
+            if slot is None and stats["nodes"] == 1:
+                slot = "text"  # single-part message: its body is the text
+            if slot is None or getattr(result, slot) is not None:
+                stats["other_skipped"] += 1
+                continue
+            try:
+                decoded, truncated = decode(max_part_bytes)
+            except Exception as e:
+                stats["failed"] += 1
+                if DEBUG:
+                    print(f"[DEBUG] Failed to decode {mime_type} part: {e}")
+                continue
+            stats["decoded"] += 1
+            stats["bytes_decoded"] += len(decoded)
+            stats["truncated"] += int(truncated)
+            setattr(result, slot, decoded)
+            if result.text is not None and result.html is not None:
+                stats["stopped_early"] = True
+                break
+        if DEBUG and (stats["truncated"] or stats["limit_hit"]):
+            print(f"[DEBUG] MIME walk bounded: {stats}")
+        return result
+
     @staticmethod
     def extract_from_gmail_parts(parts: list) -> str:
         """Extract the first HTML part's body from a Gmail message payload tree.
@@ -950,7 +1224,7 @@ class EmailBodyParser:
         """Convert HTML to plain text using BeautifulSoup.
 
         Args:
-            html: HTML content
+            html: HTML content (str or an already-built ParsedBody)
 
         Returns:
             Plain text with HTML tags removed
@@ -958,14 +1232,7 @@ class EmailBodyParser:
         if not html:
             return ""
 
-        try:
-            soup = BeautifulSoup(html, "html.parser")
-            # Remove script and style tags
-            for tag in soup(["script", "style"]):
-                tag.decompose()
-            return soup.get_text(separator=" ", strip=True)
-        except Exception:
-            return html
+        return ParsedBody.of(html).text
 
     @staticmethod
     def parse_raw_eml(raw_text: str, now_fn=None):
@@ -1038,40 +1305,12 @@ class EmailBodyParser:
         sender_domain = match.group(1).lower() if match else ""
 
         # Walk parts for body (prefer HTML) else text/plain
-        body_html = ""
-        body_text = ""
-
-        if eml.is_multipart():
-            for part in eml.walk():
-                ctype = part.get_content_type()
-                disp = (part.get("Content-Disposition") or "").lower()
-
-                if "attachment" in disp:
-                    continue  # skip attachments
-
-                try:
-                    payload = part.get_payload(decode=True)
-                    if payload is None:
-                        continue
-                    decoded = payload.decode(
-                        part.get_content_charset() or "utf-8", errors="ignore"
-                    )
-                except Exception:
-                    continue
-
-                if ctype == "text/html" and not body_html:
-                    body_html = decoded
-                elif ctype == "text/plain" and not body_text:
-                    body_text = decoded
-        else:
-            try:
-                payload = eml.get_payload(decode=True)
-                if payload:
-                    body_text = payload.decode(
-                        eml.get_content_charset() or "utf-8", errors="ignore"
-                    )
-            except Exception:
-                body_text = raw_text
+        mime = EmailBodyParser.collect_bodies(EmailBodyParser.iter_email_parts(eml))
+        body_html = mime.html or ""
+        body_text = mime.text or ""
+        if not eml.is_multipart() and mime.stats["failed"]:
+            # Undecodable single-part body: keep the raw message text
+            body_text = raw_text
 
         if body_html and not body_text:
             # Provide plain text fallback from HTML
@@ -1169,6 +1408,7 @@ class CompanyResolver:
         self.job_board_domains = job_board_domains
         self.ats_domains = ats_domains
 
+    @stage_timing.timed("company.extract_from_ats_sender")
     def extract_from_ats_sender(self, sender: str, sender_domain):
         """Extract company from ATS sender prefix (e.g., ngc@myworkday.com -> Northrop Grumman).
 
@@ -1213,8 +1453,9 @@ class CompanyResolver:
 
         return None
 
+    @stage_timing.timed("company.extract_from_job_board_body")
     def extract_from_job_board_body(
-        self, body: str, subject: str, sender_email: str, sender_domain
+        self, body, subject: str, sender_email: str, sender_domain
     ):
         """Extract actual employer from job board application confirmation body.
 
@@ -1222,7 +1463,7 @@ class CompanyResolver:
         and sender is from a job board domain.
 
         Args:
-            body: Email body text (may be HTML)
+            body: Email body text (may be HTML) or the message's ParsedBody
             subject: Email subject line
             sender_email: Sender's email address
             sender_domain: Sender's email domain
@@ -1230,6 +1471,8 @@ class CompanyResolver:
         Returns:
             Extracted company name if found, None otherwise
         """
+        parsed_body = ParsedBody.of(body)
+        body = parsed_body.raw
         if not body or not subject:
             return None
 
@@ -1254,15 +1497,7 @@ class CompanyResolver:
             )
 
         # Extract plain text body for pattern matching
-        body_plain = body
-        try:
-            if "<html" in body.lower() or "<style" in body.lower():
-                soup = BeautifulSoup(body, "html.parser")
-                for tag in soup(["style", "script"]):
-                    tag.decompose()
-                body_plain = soup.get_text(separator=" ", strip=True)
-        except Exception:
-            body_plain = body
+        body_plain = parsed_body.plain
 
         if not body_plain:
             return None
@@ -1310,6 +1545,7 @@ class CompanyResolver:
 
         return None
 
+    @stage_timing.timed("company.extract_from_ats_display_name")
     def extract_from_ats_display_name(self, sender: str, check_known: bool = False):
         """Extract company from ATS display name with validation.
 
@@ -1379,6 +1615,7 @@ class CompanyResolver:
 
         return cleaned
 
+    @stage_timing.timed("company.extract_from_subject_patterns")
     def extract_from_subject_patterns(self, subject: str):
         """Extract company and job title from subject using regex patterns.
 
@@ -1464,6 +1701,7 @@ class CompanyResolver:
 
         return company, job_title
 
+    @stage_timing.timed("company.canonicalize_company_name")
     def canonicalize_company_name(self, company: str, subject: str) -> str:
         """Map company candidate to canonical known name or alias.
 
@@ -1778,8 +2016,32 @@ def predict_with_fallback(
     Wrap ML predictor; if low confidence or empty features, fall back to rules.
     ALWAYS check high-priority noise patterns (newsletter, digest, OTP) to override ML.
     Expects ML to return dict with keys: label, confidence (or proba).
+
+    Rules and ML only see the classification window of `body` (see
+    classification_window.py); length and timing go to classification_window.stats.
     """
-    ml = predict_subject_type_fn(subject, body, sender=sender)
+    started = time.perf_counter()
+    window = classification_window.window(body or "")
+    try:
+        return _predict_with_fallback(
+            predict_subject_type_fn, subject, window, threshold, sender
+        )
+    finally:
+        elapsed = time.perf_counter() - started
+        classification_window.stats.record(len(body or ""), len(window), elapsed)
+        if stage_timing.ENABLED:
+            stage_timing.timer.record("predict_with_fallback", elapsed)
+
+
+def _predict_with_fallback(
+    predict_subject_type_fn,
+    subject: str,
+    body: str = "",
+    threshold: float = 0.55,
+    sender: str = "",
+):
+    with stage_timing.span("ml_predict"):
+        ml = predict_subject_type_fn(subject, body, sender=sender)
     conf = float(ml.get("confidence", ml.get("proba", 0.0)) if ml else 0.0)
 
     # CRITICAL: Always check for noise patterns FIRST (even if ML has high confidence)
@@ -1795,7 +2057,8 @@ def predict_with_fallback(
         except Exception:
             sender_domain = ""
 
-    rl = rule_label(subject, body, sender_domain)
+    with stage_timing.span("rules"):
+        rl = rule_label(subject, body, sender_domain)
     if DEBUG:
         print(
             f"[DEBUG predict_with_fallback] ML label={ml.get('label')}, confidence={conf}"
@@ -2291,6 +2554,7 @@ def is_correlated_message(sender_email, sender_domain, msg_date):
     return app_date <= msg_dt <= one_year_later
 
 
+@stage_timing.timed("company.predict_company")
 def predict_company(subject, body):
     """Predict company name using the trained ML model."""
     # Use optional company-specific classifier if available; otherwise skip
@@ -2321,12 +2585,14 @@ def should_ignore(subject, _body):
     return any(p.lower() in subj_lower for p in ignore_patterns)
 
 
+@stage_timing.timed("extract_metadata")
 def extract_metadata(service, msg_id):
     """Extract subject, date, thread_id, labels, sender, sender_domain, and body text from a Gmail message."""
     body_html = ""
-    msg = (
-        service.users().messages().get(userId="me", id=msg_id, format="full").execute()
-    )
+    with stage_timing.span("gmail_fetch"):
+        msg = (
+            service.users().messages().get(userId="me", id=msg_id, format="full").execute()
+        )
     headers = msg["payload"]["headers"]
 
     subject = next((h["value"] for h in headers if h["name"] == "Subject"), "")
@@ -2352,36 +2618,21 @@ def extract_metadata(service, msg_id):
     label_ids = msg.get("labelIds", [])
     labels = ",".join(label_ids)  # raw IDs unless you re-add get_label_map()
 
+    # One walk over the whole (possibly nested) payload; prefer the HTML part,
+    # with the plain-text part as fallback
+    mime = EmailBodyParser.collect_bodies(
+        EmailBodyParser.iter_gmail_parts(msg["payload"])
+    )
     body = ""
-    parts = msg["payload"].get("parts", [])
-    body = extract_body_from_parts(parts)
-
-    for part in parts:
-        mime_type = part.get("mimeType")
-        data = part["body"].get("data")
-        if not data:
-            continue
-        # decoded = base64.urlsafe_b64decode(data).decode("utf-8", errors="ignore")
-        encoding = part.get("body", {}).get("encoding", "base64").lower()
-        data = part.get("body", {}).get("data")
-        decoded = ""
-        if data:
-            decoded = decode_part(data, encoding)
-
-        if mime_type == "text/plain" and body == "Empty Body" and decoded:
-            body = decoded.strip()
-        elif mime_type == "text/html" and body != "Empty Body" and decoded:
-            body_html = html.unescape(decoded)
-            # also provide a plain-text fallback
-            body = BeautifulSoup(body_html, "html.parser").get_text(
-                separator=" ", strip=True
-            )
-
-    # Fallback if no parts
-    if not body and "body" in msg["payload"]:
-        data = msg["payload"]["body"].get("data")
-        if data:
-            body = base64.urlsafe_b64decode(data).decode("utf-8", errors="ignore")
+    if mime.html:
+        body_html = html.unescape(mime.html)
+        # Same text as BeautifulSoup(body_html).get_text(" ", strip=True), which also
+        # leaves out <script>/<style> strings (see test_parsed_body.py)
+        body = ParsedBody(body_html).text
+    if not body and mime.text:
+        body = mime.text.strip()
+    if not body and mime.html is not None:
+        body = "Empty Body"
 
     # Extract and analyze headers for improved classification and metadata
     header_hints = {
@@ -2496,8 +2747,14 @@ def extract_organizer_from_icalendar(body):
     return MetadataExtractor.extract_organizer_from_icalendar(body, debug=DEBUG)
 
 
-def parse_subject(subject, body="", sender=None, sender_domain=None):
-    """Extract company, job title, and job ID from subject line, sender, and optionally sender domain."""
+@stage_timing.timed("parse_subject")
+def parse_subject(subject, body="", sender=None, sender_domain=None, parsed_body=None):
+    """Extract company, job title, and job ID from subject line, sender, and optionally sender domain.
+
+    Pass the message's ParsedBody as `parsed_body` to reuse its HTML parse.
+    """
+    if parsed_body is None or parsed_body.raw != (body or ""):
+        parsed_body = ParsedBody(body)
 
     # Reload companies.json if it has changed
     _domain_mapper.reload_if_needed()
@@ -2528,9 +2785,8 @@ def parse_subject(subject, body="", sender=None, sender_domain=None):
     label = result["label"]
     bool(result.get("ignore", False))
 
-    print("=== PARSE_SUBJECT CALLED ===", flush=True)
-    print(f"DEBUG={DEBUG}", flush=True)
     if DEBUG:
+        print("=== PARSE_SUBJECT CALLED ===", flush=True)
         print(f"[DEBUG parse_subject] subject='{subject[:80]}'", flush=True)
         print(f"[DEBUG parse_subject] sender='{sender}'", flush=True)
         print(f"[DEBUG parse_subject] sender_domain='{sender_domain}'", flush=True)
@@ -2756,21 +3012,9 @@ def parse_subject(subject, body="", sender=None, sender_domain=None):
                 print(f"[DEBUG] Body length: {len(body) if body else 0} chars")
 
             # Extract plain text body for pattern matching
-            body_plain = body
-            try:
-                if body and ("<html" in body.lower() or "<style" in body.lower()):
-                    soup = BeautifulSoup(body, "html.parser")
-                    for tag in soup(["style", "script"]):
-                        tag.decompose()
-                    body_plain = soup.get_text(separator=" ", strip=True)
-                    if DEBUG:
-                        print(
-                            f"[DEBUG] Extracted plain text, length: {len(body_plain)} chars"
-                        )
-            except Exception as e:
-                body_plain = body
-                if DEBUG:
-                    print(f"[DEBUG] HTML parsing failed: {e}, using raw body")
+            body_plain = parsed_body.plain
+            if DEBUG and parsed_body.looks_like_html:
+                print(f"[DEBUG] Extracted plain text, length: {len(body_plain)} chars")
 
             # Look for "The following items were sent to COMPANY" or "about your application" patterns
             if body_plain:
@@ -2850,15 +3094,7 @@ def parse_subject(subject, body="", sender=None, sender_domain=None):
     ):
         if DEBUG:
             print(f"[DEBUG] Entering ATS body pattern extraction")
-        body_plain = body
-        try:
-            if body and ("<html" in body.lower() or "<style" in body.lower()):
-                soup = BeautifulSoup(body, "html.parser")
-                for tag in soup(["style", "script"]):
-                    tag.decompose()
-                body_plain = soup.get_text(separator=" ", strip=True)
-        except Exception:
-            body_plain = body
+        body_plain = parsed_body.plain
 
         if body_plain:
             if DEBUG:
@@ -2907,15 +3143,7 @@ def parse_subject(subject, body="", sender=None, sender_domain=None):
         # Special case: IntelligenceCareers.gov (NSA ATS) - extract agency from body
         if not company and domain_lower == "intelligencecareers.gov" and body:
             # Extract plain text body for pattern matching
-            body_plain = body
-            try:
-                if body and ("<html" in body.lower() or "<style" in body.lower()):
-                    soup = BeautifulSoup(body, "html.parser")
-                    for tag in soup(["style", "script"]):
-                        tag.decompose()
-                    body_plain = soup.get_text(separator=" ", strip=True)
-            except Exception:
-                body_plain = body
+            body_plain = parsed_body.plain
 
             # Look for "application to the AGENCY" or "application to AGENCY" pattern
             if body_plain:
@@ -3054,7 +3282,8 @@ def parse_subject(subject, body="", sender=None, sender_domain=None):
 
     # PRIORITY 4: Entity extraction (spaCy NER)
     if not company:
-        entities = extract_entities(subject)
+        with stage_timing.span("ner"):
+            entities = extract_entities(subject)
         company = entities.get("company", "")
         if not job_title:
             job_title = entities.get("job_title", "")
@@ -3369,6 +3598,7 @@ def parse_subject(subject, body="", sender=None, sender_domain=None):
     }
 
 
+@stage_timing.timed("ingest_message")
 def ingest_message(service, msg_id):
     """Ingest a single Gmail message by id into the local database.
 
@@ -3384,6 +3614,7 @@ def ingest_message(service, msg_id):
     try:
         metadata = extract_metadata(service, msg_id)
         body = metadata["body"]  # RFC 5322 compliant body (no headers)
+        parsed_body = ParsedBody(body)  # shared by every body extractor below
         classification_text = metadata.get(
             "classification_text", body
         )  # Body + headers for classification
@@ -3397,9 +3628,7 @@ def ingest_message(service, msg_id):
                 )
                 print("Stats: ignored++ (blank body)")
             log_ignored_message(msg_id, metadata, reason="blank_body")
-            IngestionStats.objects.filter(date=stats.date).update(
-                total_ignored=F("total_ignored") + 1
-            )
+            ingest_run.stats_buffer.add(stats.date, "total_ignored")
             if hasattr(stats, "total_ignored"):
                 stats.total_ignored += 1
             return {"status": "ignored", "reason": "blank_body"}
@@ -3446,9 +3675,7 @@ def ingest_message(service, msg_id):
                 existing.delete()
 
             log_ignored_message(msg_id, metadata, reason="newsletter_headers")
-            IngestionStats.objects.filter(date=stats.date).update(
-                total_ignored=F("total_ignored") + 1
-            )
+            ingest_run.stats_buffer.add(stats.date, "total_ignored")
             if hasattr(stats, "total_ignored"):
                 stats.total_ignored += 1
             return {"status": "ignored", "reason": "newsletter_headers"}
@@ -3504,9 +3731,7 @@ def ingest_message(service, msg_id):
                 existing.delete()
 
             log_ignored_message(msg_id, metadata, reason="user_personal_email")
-            IngestionStats.objects.filter(date=stats.date).update(
-                total_ignored=F("total_ignored") + 1
-            )
+            ingest_run.stats_buffer.add(stats.date, "total_ignored")
             if hasattr(stats, "total_ignored"):
                 stats.total_ignored += 1
             return {"status": "ignored", "reason": "user_personal_email"}
@@ -3548,6 +3773,7 @@ def ingest_message(service, msg_id):
             metadata.get("body", ""),
             sender=metadata.get("sender"),
             sender_domain=metadata.get("sender_domain"),
+            parsed_body=parsed_body,
         )
         or {}
     )
@@ -3609,9 +3835,7 @@ def ingest_message(service, msg_id):
             metadata,
             reason=ignore_reason,
         )
-        IngestionStats.objects.filter(date=stats.date).update(
-            total_ignored=F("total_ignored") + 1
-        )
+        ingest_run.stats_buffer.add(stats.date, "total_ignored")
         if hasattr(stats, "total_ignored"):
             stats.total_ignored += 1
         return {"status": "ignored", "reason": ignore_reason}
@@ -3823,6 +4047,8 @@ def ingest_message(service, msg_id):
             )  # Boost confidence
 
     # --- NEW LOGIC: Robust company extraction order ---
+    # Sections below are timed as consecutive laps (see stage_timing.Stopwatch)
+    watch = stage_timing.Stopwatch()
     # Add guard: skip company assignment for noise and head_hunter labels
     label_guard = result.get("label") if result else None
     skip_company_assignment = label_guard in ("noise", "head_hunter")
@@ -3911,9 +4137,7 @@ def ingest_message(service, msg_id):
 
             # Log as ignored
             log_ignored_message(msg_id, metadata, reason="personal_domain")
-            IngestionStats.objects.filter(date=stats.date).update(
-                total_ignored=F("total_ignored") + 1
-            )
+            ingest_run.stats_buffer.add(stats.date, "total_ignored")
             if hasattr(stats, "total_ignored"):
                 stats.total_ignored += 1
             return "ignored"
@@ -3968,15 +4192,7 @@ def ingest_message(service, msg_id):
         # 1.5. USAStaffing.gov job board special case - extract agency/organization from body
         if not company and sender_domain == "usastaffing.gov":
             # Extract plain text body for pattern matching
-            body_plain = body
-            try:
-                if body and ("<html" in body.lower() or "<style" in body.lower()):
-                    soup = BeautifulSoup(body, "html.parser")
-                    for tag in soup(["style", "script"]):
-                        tag.decompose()
-                    body_plain = soup.get_text(separator=" ", strip=True)
-            except Exception:
-                body_plain = body
+            body_plain = parsed_body.plain
 
             # Look for "at the ORGANIZATION, in the Department of" pattern
             if body_plain:
@@ -4001,15 +4217,7 @@ def ingest_message(service, msg_id):
                 or "indeedapply@indeed.com" in metadata.get("sender", "").lower()
             ):
                 # Extract plain text body for pattern matching
-                body_plain = body
-                try:
-                    if body and ("<html" in body.lower() or "<style" in body.lower()):
-                        soup = BeautifulSoup(body, "html.parser")
-                        for tag in soup(["style", "script"]):
-                            tag.decompose()
-                        body_plain = soup.get_text(separator=" ", strip=True)
-                except Exception:
-                    body_plain = body
+                body_plain = parsed_body.plain
 
                 # Look for "The following items were sent to COMPANY" pattern
                 if body_plain:
@@ -4051,17 +4259,7 @@ def ingest_message(service, msg_id):
                     and is_valid_company_name(predicted)
                 ):
                     # Extra guard: require presence in subject/body (plain text) to avoid artifacts like 'Font'
-                    body_plain = body
-                    try:
-                        if body and (
-                            "<html" in body.lower() or "<style" in body.lower()
-                        ):
-                            soup = BeautifulSoup(body, "html.parser")
-                            for tag in soup(["style", "script"]):
-                                tag.decompose()
-                            body_plain = soup.get_text(separator=" ", strip=True)
-                    except Exception:
-                        body_plain = body
+                    body_plain = parsed_body.plain
 
                     if predicted.lower() in subject.lower() or (
                         body_plain and predicted.lower() in body_plain.lower()
@@ -4082,16 +4280,7 @@ def ingest_message(service, msg_id):
         # Strip HTML tags from body to avoid matching CSS @import, @media, etc.
         if not company:
             # Remove HTML tags and CSS to get plain text
-            body_plain = body
-            if body and ("<html" in body.lower() or "<style" in body.lower()):
-                try:
-                    soup = BeautifulSoup(body, "html.parser")
-                    # Remove style and script tags entirely
-                    for tag in soup(["style", "script"]):
-                        tag.decompose()
-                    body_plain = soup.get_text(separator=" ", strip=True)
-                except Exception:
-                    body_plain = body  # fallback to original if parsing fails
+            body_plain = parsed_body.plain
 
             # Now search in plain text body
             at_match = re.search(
@@ -4216,11 +4405,14 @@ def ingest_message(service, msg_id):
         print(f"ML label: {result.get('label') if result else 'unknown'}")
         print(f"confidence: {confidence}")
 
+    watch.lap("company_resolution")
+
     #
     # This is the re-ingest logic
     #
     #  Skip logic (now safe to run after enrichment)
     existing = Message.objects.filter(msg_id=msg_id).first()
+    watch.lap("db_lookup")
     if existing:
         # Snapshot original fields so we can avoid overwriting reviewed messages
         _ORIG_ML_LABEL = existing.ml_label
@@ -4512,9 +4704,8 @@ def ingest_message(service, msg_id):
                         f"Warning: Could not update Application during re-ingest: {e}"
                     )
 
-        IngestionStats.objects.filter(date=stats.date).update(
-            total_skipped=F("total_skipped") + 1
-        )
+        watch.lap("db_reingest")
+        ingest_run.stats_buffer.add(stats.date, "total_skipped")
         if hasattr(stats, "total_skipped"):
             stats.total_skipped += 1
         return "skipped"
@@ -4569,9 +4760,7 @@ def ingest_message(service, msg_id):
                 },
             )
             stats.total_ignored += 1
-            IngestionStats.objects.filter(date=stats.date).update(
-                total_ignored=F("total_ignored") + 1
-            )
+            ingest_run.stats_buffer.add(stats.date, "total_ignored")
             return "ignored"
 
     # Second check: Exact timestamp match (for messages with empty/malformed bodies)
@@ -4605,9 +4794,7 @@ def ingest_message(service, msg_id):
             },
         )
         stats.total_ignored += 1
-        IngestionStats.objects.filter(date=stats.date).update(
-            total_ignored=F("total_ignored") + 1
-        )
+        ingest_run.stats_buffer.add(stats.date, "total_ignored")
         return "ignored"
 
     # Third check: Near-duplicate (within 5-second window for quick re-sends)
@@ -4644,11 +4831,11 @@ def ingest_message(service, msg_id):
             },
         )
         stats.total_ignored += 1
-        IngestionStats.objects.filter(date=stats.date).update(
-            total_ignored=F("total_ignored") + 1
-        )
+        ingest_run.stats_buffer.add(stats.date, "total_ignored")
         return "ignored"
 
+    watch.lap("db_dedup")
+
     # Headhunter enforcement: ALL messages from headhunter domains/companies should be labeled head_hunter
     if result:
         sender_domain = (metadata.get("sender_domain") or "").lower()
@@ -4723,39 +4910,41 @@ def ingest_message(service, msg_id):
                         ),
                     },
                 )
-            Message.objects.create(
-                msg_id=msg_id,
-                thread_id=metadata["thread_id"],
-                subject=subject,
-                sender=metadata["sender"],
-                body=metadata.get("body", ""),
-                body_html=metadata.get("body_html", metadata.get("body", "")),
-                body_hash=body_hash,
-                timestamp=metadata["timestamp"],
-                ml_label="other",
-                confidence=result["confidence"] if result else 0.0,
-                classification_source="rule",
-                reviewed=reviewed,
-                company=company_obj if mapped_company else None,
-                company_source="user_sent_to_company",
-            )
+            with stage_timing.span("db_write.message"):
+                Message.objects.create(
+                    msg_id=msg_id,
+                    thread_id=metadata["thread_id"],
+                    subject=subject,
+                    sender=metadata["sender"],
+                    body=metadata.get("body", ""),
+                    body_html=metadata.get("body_html", metadata.get("body", "")),
+                    body_hash=body_hash,
+                    timestamp=metadata["timestamp"],
+                    ml_label="other",
+                    confidence=result["confidence"] if result else 0.0,
+                    classification_source="rule",
+                    reviewed=reviewed,
+                    company=company_obj if mapped_company else None,
+                    company_source="user_sent_to_company",
+                )
         else:
-            Message.objects.create(
-                msg_id=msg_id,
-                thread_id=metadata["thread_id"],
-                subject=subject,
-                sender=metadata["sender"],
-                body=metadata.get("body", ""),
-                body_html=metadata.get("body_html", metadata.get("body", "")),
-                body_hash=body_hash,
-                timestamp=metadata["timestamp"],
-                ml_label=result["label"],
-                confidence=result["confidence"],
-                classification_source=result.get("fallback") or "ml",
-                reviewed=reviewed,
-                company=company_obj,
-                company_source=company_source,
-            )
+            with stage_timing.span("db_write.message"):
+                Message.objects.create(
+                    msg_id=msg_id,
+                    thread_id=metadata["thread_id"],
+                    subject=subject,
+                    sender=metadata["sender"],
+                    body=metadata.get("body", ""),
+                    body_html=metadata.get("body_html", metadata.get("body", "")),
+                    body_hash=body_hash,
+                    timestamp=metadata["timestamp"],
+                    ml_label=result["label"],
+                    confidence=result["confidence"],
+                    classification_source=result.get("fallback") or "ml",
+                    reviewed=reviewed,
+                    company=company_obj,
+                    company_source=company_source,
+                )
     # ✅ Create or update Application record using Django ORM
 
     # ✅ Fallback: if pattern-based extraction didn't find rejection/interview dates,
@@ -4907,17 +5096,13 @@ def ingest_message(service, msg_id):
                     if created:
                         if DEBUG:
                             print("Stats: inserted++ (new application)")
-                        IngestionStats.objects.filter(date=stats.date).update(
-                            total_inserted=F("total_inserted") + 1
-                        )
+                        ingest_run.stats_buffer.add(stats.date, "total_inserted")
                         if hasattr(stats, "total_inserted"):
                             stats.total_inserted += 1
                     else:
                         if DEBUG:
                             print("Stats: ignored++ (duplicate application)")
-                        IngestionStats.objects.filter(date=stats.date).update(
-                            total_ignored=F("total_ignored") + 1
-                        )
+                        ingest_run.stats_buffer.add(stats.date, "total_ignored")
                         if hasattr(stats, "total_ignored"):
                             stats.total_ignored += 1
                 else:
@@ -5023,9 +5208,7 @@ def ingest_message(service, msg_id):
 
             if DEBUG:
                 print("Stats: skipped++ (missing company/message)")
-            IngestionStats.objects.filter(date=stats.date).update(
-                total_skipped=F("total_skipped") + 1
-            )
+            ingest_run.stats_buffer.add(stats.date, "total_skipped")
             if hasattr(stats, "total_skipped"):
                 stats.total_skipped += 1
 
@@ -5035,9 +5218,7 @@ def ingest_message(service, msg_id):
             import traceback
 
             traceback.print_exc()
-        IngestionStats.objects.filter(date=stats.date).update(
-            total_skipped=F("total_skipped") + 1
-        )
+        ingest_run.stats_buffer.add(stats.date, "total_skipped")
         if hasattr(stats, "total_skipped"):
             stats.total_skipped += 1
 
@@ -5093,9 +5274,7 @@ def ingest_message(service, msg_id):
             print(f"Ignored due to: {reason} -> {metadata['subject']}")
             print("Stats: ignored++ (unclassified)")
         log_ignored_message(msg_id, metadata, reason=reason)
-        IngestionStats.objects.filter(date=stats.date).update(
-            total_ignored=F("total_ignored") + 1
-        )
+        ingest_run.stats_buffer.add(stats.date, "total_ignored")
         if hasattr(stats, "total_ignored"):
             stats.total_ignored += 1
         return "ignored"
@@ -5116,14 +5295,13 @@ def ingest_message(service, msg_id):
             print(f"Ignored by pattern: {metadata['subject']}")
             print("Stats: ignored++ (pattern ignore)")
         log_ignored_message(msg_id, metadata, reason="pattern_ignore")
-        IngestionStats.objects.filter(date=stats.date).update(
-            total_ignored=F("total_ignored") + 1
-        )
+        ingest_run.stats_buffer.add(stats.date, "total_ignored")
         if hasattr(stats, "total_ignored"):
             stats.total_ignored += 1
         return "ignored"
 
-    insert_or_update_application(record)
+    with stage_timing.span("db_write.application"):
+        insert_or_update_application(record)
 
     if DEBUG:
         print(f"Logged: {metadata['subject']}")
@@ -5173,6 +5351,7 @@ def _reload_domain_map_if_needed():
     company_data = _domain_mapper.company_data
 
 
+@stage_timing.timed("ingest_message_from_eml")
 def ingest_message_from_eml(eml_content: str, fake_msg_id: str = None):
     """Ingest a message directly from .eml file content.
 
@@ -5233,44 +5412,13 @@ def ingest_message_from_eml(eml_content: str, fake_msg_id: str = None):
         body = ""
         body_html = ""
 
-        if msg.is_multipart():
-            for part in msg.walk():
-                content_type = part.get_content_type()
-                content_disposition = str(part.get("Content-Disposition", ""))
-
-                # Skip attachments
-                if "attachment" in content_disposition:
-                    continue
-
-                try:
-                    payload = part.get_payload(decode=True)
-                    if payload is None:
-                        continue
-
-                    charset = part.get_content_charset() or "utf-8"
-                    decoded = payload.decode(charset, errors="ignore")
-
-                    if content_type == "text/plain" and not body:
-                        body = decoded.strip()
-                    elif content_type == "text/html":
-                        body_html = html.unescape(decoded)
-                        # Extract text from HTML
-                        soup = BeautifulSoup(body_html, "html.parser")
-                        body = soup.get_text(separator=" ", strip=True)
-                except Exception as e:
-                    if DEBUG:
-                        print(f"[EML] Error decoding part: {e}")
-                    continue
-        else:
-            # Not multipart
-            try:
-                payload = msg.get_payload(decode=True)
-                if payload:
-                    charset = msg.get_content_charset() or "utf-8"
-                    body = payload.decode(charset, errors="ignore").strip()
-            except Exception as e:
-                if DEBUG:
-                    print(f"[EML] Error decoding body: {e}")
+        mime = EmailBodyParser.collect_bodies(EmailBodyParser.iter_email_parts(msg))
+        if mime.html:
+            body_html = html.unescape(mime.html)
+            # Extract text from HTML (same output as the former soup.get_text(" ", strip=True))
+            body = ParsedBody(body_html).text
+        if not body and mime.text:
+            body = mime.text.strip()
 
         # Prepare metadata dictionary matching extract_metadata format
         # RFC 5322 compliance: body should not contain headers
@@ -5314,6 +5462,7 @@ def ingest_message_from_eml(eml_content: str, fake_msg_id: str = None):
     classification_text = metadata.get(
         "classification_text", body
     )  # For classification
+    parsed_body = ParsedBody(classification_text)
 
     # Skip blank bodies
     if not body or not body.strip():
@@ -5322,9 +5471,7 @@ def ingest_message_from_eml(eml_content: str, fake_msg_id: str = None):
                 f"[EML BLANK BODY] Skipping message: {metadata.get('subject','(no subject)')}"
             )
         log_ignored_message(fake_msg_id, metadata, reason="blank_body")
-        IngestionStats.objects.filter(date=stats.date).update(
-            total_ignored=F("total_ignored") + 1
-        )
+        ingest_run.stats_buffer.add(stats.date, "total_ignored")
         return "ignored"
 
     # Check if application-related (use classification_text for pattern matching)
@@ -5348,9 +5495,7 @@ def ingest_message_from_eml(eml_content: str, fake_msg_id: str = None):
                     f"[EML HEADER HINTS] Auto-ignoring newsletter/bulk mail: {metadata['subject']}"
                 )
             log_ignored_message(fake_msg_id, metadata, reason="newsletter_headers")
-            IngestionStats.objects.filter(date=stats.date).update(
-                total_ignored=F("total_ignored") + 1
-            )
+            ingest_run.stats_buffer.add(stats.date, "total_ignored")
             return "ignored"
 
     # Continue with classification and company resolution
@@ -5372,6 +5517,7 @@ def ingest_message_from_eml(eml_content: str, fake_msg_id: str = None):
         classification_text,
         metadata["sender"],
         metadata["sender_domain"],
+        parsed_body=parsed_body,
     )
 
     # Extract company name from parse result
@@ -5487,8 +5633,10 @@ def ingest_message_from_eml(eml_content: str, fake_msg_id: str = None):
         # Propagate label to ThreadTracking
         if ml_label in ("job_application", "interview_invite") and company_obj:
             try:
-                from tracker.utils import propagate_message_label_to_thread
-                propagate_message_label_to_thread(existing)
+                from tracker.utils.label_propagation import propagate_or_defer
+
+                # Queued when a bulk import has a ThreadStateAggregator open
+                propagate_or_defer(existing)
                 if DEBUG:
                     print(f"[EML] Updated ThreadTracking for existing message")
             except Exception as e:
@@ -5503,23 +5651,25 @@ def ingest_message_from_eml(eml_content: str, fake_msg_id: str = None):
         normalized_body = re.sub(r"\s+", " ", body or "").strip()
         body_hash = hashlib.sha256(normalized_body.encode("utf-8")).hexdigest()
 
-        msg_obj = Message.objects.create(
-            msg_id=fake_msg_id,
-            thread_id=metadata["thread_id"],
-            subject=metadata["subject"],
-            sender=metadata["sender"],
-            timestamp=metadata["date"],
-            company=company_obj,
-            ml_label=ml_label,
-            confidence=ml_confidence,
-            body=body,
-            body_html=body_html,
-            body_hash=body_hash,
-            reviewed=False,
-        )
+        with stage_timing.span("db_write.message"):
+            msg_obj = Message.objects.create(
+                msg_id=fake_msg_id,
+                thread_id=metadata["thread_id"],
+                subject=metadata["subject"],
+                sender=metadata["sender"],
+                timestamp=metadata["date"],
+                company=company_obj,
+                ml_label=ml_label,
+                confidence=ml_confidence,
+                body=body,
+                body_html=body_html,
+                body_hash=body_hash,
+                reviewed=False,
+            )
 
         # Store body text in separate search table
-        insert_email_text(fake_msg_id, metadata["subject"], body)
+        with stage_timing.span("db_write.email_text"):
+            insert_email_text(fake_msg_id, metadata["subject"], body)
 
         # Create or update ThreadTracking for job applications and interview invites
         if ml_label in ("job_application", "interview_invite") and company_obj:
@@ -5561,9 +5711,7 @@ def ingest_message_from_eml(eml_content: str, fake_msg_id: str = None):
                 # Don't fail the entire ingestion if ThreadTracking creation fails
 
         # Update stats
-        IngestionStats.objects.filter(date=stats.date).update(
-            total_inserted=F("total_inserted") + 1
-        )
+        ingest_run.stats_buffer.add(stats.date, "total_inserted")
 
         if DEBUG:
             print(f"[EML] Successfully ingested message (ID={msg_obj.id})")
@@ -3,21 +3,30 @@ import csv
 import json
 import re
 from datetime import datetime
-from difflib import SequenceMatcher
 
 import pandas as pd
 
+from alias_index import STATE_PATH, MatchStore
 from db import COMPANIES_PATH, PATTERNS_PATH, get_db_connection, is_valid_company
 
 parser = argparse.ArgumentParser(
     description="Detect alias candidates from company names"
 )
 parser.add_argument("--export", help="Path to export alias suggestions (JSON or CSV)")
+parser.add_argument(
+    "--state",
+    default=str(STATE_PATH),
+    help="Match state file; only names/canonicals not in it are compared",
+)
+parser.add_argument(
+    "--full", action="store_true", help="Ignore the saved state and compare everything"
+)
 args = parser.parse_args()
 
 # --- Config ---
 MIN_COUNT = 1  # flag companies with <= this many occurrences
-SIMILARITY_THRESHOLD = 0.75  # 0..1, higher = stricter match
+# Canonical matching thresholds live in alias_index (SIMILARITY_THRESHOLD 0.75,
+# OVERLAP_THRESHOLD 0.35)
 DEBUG = True  # set True to enable verbose debug prints
 
 
@@ -54,13 +63,6 @@ def is_clean_company(name):
     return True
 
 
-# --- Similarity helper ---
-def similar(a, b):
-    if not a or not b:
-        return 0.0
-    return SequenceMatcher(None, a.lower(), b.lower()).ratio()
-
-
 # additional heuristics
 PERSONAL_NAME_RE = re.compile(r"^[A-Z][a-z]{1,20} [A-Z][a-z]{1,20}$")
 NOISE_TOKEN_RE = re.compile(
@@ -171,17 +173,6 @@ def likely_noise(name):
     return False
 
 
-def best_canonical_by_overlap(name, canonical_names, min_overlap=0.4):
-    best = None
-    best_score = 0.0
-    for canon in canonical_names:
-        ov = token_set_overlap(name, canon)
-        if ov > best_score:
-            best_score = ov
-            best = canon
-    return (best, round(best_score, 2)) if best_score >= min_overlap else (None, 0.0)
-
-
 # --- Main ---
 if __name__ == "__main__":
     df = load_raw_companies()
@@ -224,6 +215,18 @@ if __name__ == "__main__":
         # Will collect final export rows
         export_data = []
 
+        # Best canonical per candidate from the blocked index; names already
+        # matched on a previous run are only compared with new canonicals
+        store = MatchStore(args.state)
+        if not args.full:
+            store.load()
+        matches = store.update(candidates["company"], canonical_names)
+        print(
+            f"  compared {store.stats['compared_full']} new name(s) against "
+            f"{len(canonical_names)} canonicals, {store.stats['compared_new_canonicals']} "
+            f"against new canonicals only, reused {store.stats['reused']}"
+        )
+
         for idx, row in candidates.iterrows():
 
             name = row["company"]
@@ -239,25 +242,11 @@ if __name__ == "__main__":
             # cleaned fallback
             clean = cleaned_candidate(name)
 
-            # 1) try exact/similarity-based canonical candidates
-            sims = [
-                canon
-                for canon in canonical_names
-                if similar(name, canon) >= SIMILARITY_THRESHOLD
-            ]
-            best_canon = sims[0] if sims else None
-            sim_score = round(similar(name, best_canon) if best_canon else 0.0, 2)
-
-            # 2) if no good similarity match, try token-overlap based canonical matching (captures "UIC & the Bowhead...")
-            if not best_canon:
-                overlap_canon, overlap_score = best_canonical_by_overlap(
-                    name, canonical_names, min_overlap=0.35
-                )
-                if overlap_canon:
-                    best_canon = overlap_canon
-                    sim_score = (
-                        overlap_score  # reuse sim_score field for export/decision
-                    )
+            # 1) best similarity-based canonical (ratio >= 0.75), else
+            # 2) best token-overlap canonical (captures "UIC & the Bowhead..."),
+            # whose score reuses the sim_score field for export/decision
+            best_canon, sim_score = matches[name].best
+            sim_score = round(sim_score, 2)
 
             clean_vs_name_overlap = token_set_overlap(clean, name)
             clean_shorter = 0 < len(clean) < len(name)
@@ -340,6 +329,8 @@ if __name__ == "__main__":
                         f'  ✅ Exported: "{name}" → "{suggestion}" | reason={reason} | thread_id={thread_id}'
                     )
 
+        store.save()
+
         # Export if requested
         if args.export:
             if args.export.endswith(".json"):
@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+"""
+Benchmark alias-candidate matching: all-pairs scan versus the blocked index.
+
+For each --sizes value N, builds N synthetic canonical company names
+(random brand names, industry words, corporate suffixes) and N candidate
+names, half of them alias variants of a canonical (other suffix, "The"
+prefix, "Family of Companies" tail or a dropped character) and half
+unrelated. Candidates are matched against the canonicals the way
+scripts/analysis/alias_candidates.py does it:
+- scan: SequenceMatcher ratio + token overlap against every canonical. Timed on
+  --sample candidates and extrapolated to N, since a full 50k scan takes hours.
+- index: alias_index.AliasIndex for all N candidates. Results are compared
+  with the scan on the sampled candidates.
+- incremental: a MatchStore holding all N results takes 1% new candidates and
+  1% new canonicals.
+
+No database is needed.
+
+Usage:
+    python scripts/benchmark_alias_candidates.py
+    python scripts/benchmark_alias_candidates.py --sizes 5000 --sample 500
+    python scripts/benchmark_alias_candidates.py --json review_reports/alias_bench.json
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import alias_index  # noqa: E402
+from alias_index import AliasIndex, Match, MatchStore  # noqa: E402
+
+SYLLABLES = [c + v for c in "bcdfghjklmnprstvwxz" for v in "aeiou"] + ["ar", "en", "ex", "in", "or"]
+PREFIXES = ["", "", "", "", "New ", "First ", "United ", "American ", "Global "]
+FIELDS = [
+    "analytics", "bio", "capital", "consulting", "data", "defense", "dynamics", "energy", "health", "labs",
+    "logistics", "networks", "research", "robotics", "security", "software", "solutions", "systems", "tech",
+]
+SUFFIXES = ["", "", "", " Inc", " LLC", ", Inc.", " Corp", " Group", " Holdings"]
+
+
+def _variant(rng, name):
+    """An alias-like spelling of `name`."""
+    kind = rng.randrange(4)
+    if kind == 0:
+        return name.split(",")[0].rsplit(" Inc", 1)[0] + rng.choice(SUFFIXES[3:])
+    if kind == 1:
+        return "The " + name
+    if kind == 2:
+        return name + " & the Bowhead Family of Companies"
+    i = rng.randrange(len(name))
+    return name[:i] + name[i + 1 :]
+
+
+def build_names(count, seed=0, exclude=()):
+    rng = random.Random(seed)
+    names = []
+    seen = set(exclude)
+    while len(names) < count:
+        brand = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+        words = [brand] + rng.sample(FIELDS, rng.randint(0, 2))
+        name = rng.choice(PREFIXES) + " ".join(words).title() + rng.choice(SUFFIXES)
+        if name not in seen:
+            seen.add(name)
+            names.append(name)
+    return names
+
+
+def build_candidates(canonical, count, seed=1):
+    """Alias variants of canonical names plus unrelated names, shuffled."""
+    rng = random.Random(seed)
+    seen = set(canonical)
+    names = []
+    while len(names) < count // 2:
+        name = _variant(rng, rng.choice(canonical))
+        if name and name not in seen:
+            seen.add(name)
+            names.append(name)
+    names += build_names(count - len(names), seed=seed + 1, exclude=seen)
+    rng.shuffle(names)
+    return names
+
+
+def scan(name, canonical):
+    """The pre-index matching: every canonical, both measures."""
+    sim = overlap = None
+    for canon in canonical:
+        ratio = alias_index.similarity(name, canon)
+        if ratio >= alias_index.SIMILARITY_THRESHOLD and alias_index._better(sim, canon, ratio):
+            sim = (canon, ratio)
+        jaccard = alias_index.token_overlap(name, canon)
+        if jaccard >= alias_index.OVERLAP_THRESHOLD and alias_index._better(overlap, canon, jaccard):
+            overlap = (canon, jaccard)
+    return Match(sim=sim, overlap=overlap)
+
+
+def run_size(count, sample):
+    canonical = build_names(count)
+    candidates = build_candidates(canonical, count)
+    sampled = candidates[: min(sample, count)]
+
+    started = time.perf_counter()
+    expected = {name: scan(name, canonical) for name in sampled}
+    scan_per_name = (time.perf_counter() - started) / len(sampled)
+
+    started = time.perf_counter()
+    index = AliasIndex(canonical)
+    build_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    found = {name: index.match(name) for name in candidates}
+    match_seconds = time.perf_counter() - started
+
+    want = [(n, hit) for n, m in expected.items() for hit in (m.sim, m.overlap) if hit]
+    got = sum(1 for n, hit in want if hit in (found[n].sim, found[n].overlap))
+    agree = sum(1 for n in sampled if found[n] == expected[n])
+
+    new_canonical = build_names(count // 100, seed=3, exclude=canonical)
+    new_candidates = build_candidates(new_canonical, count // 100, seed=4)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = MatchStore(os.path.join(tmp, "state.json"))
+        store.matches, store.canonical = found, sorted(canonical)
+        started = time.perf_counter()
+        store.update(candidates + new_candidates, canonical + new_canonical)
+        incremental_seconds = time.perf_counter() - started
+
+    return {
+        "names": count,
+        "scan_seconds_estimated": round(scan_per_name * count, 1),
+        "index_build_seconds": round(build_seconds, 3),
+        "index_match_seconds": round(match_seconds, 3),
+        "speedup": round(scan_per_name * count / (build_seconds + match_seconds), 1),
+        "sampled_names": len(sampled),
+        "sampled_matches": len(want),
+        "recall": round(got / len(want), 4) if want else 1.0,
+        "identical_results": round(agree / len(sampled), 4),
+        "incremental_seconds": round(incremental_seconds, 3),
+        "incremental_stats": store.stats,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", type=int, nargs="+", default=[5000, 50000], help="Name counts (default: 5000 50000)")
+    ap.add_argument("--sample", type=int, default=100, help="Candidates timed with the full scan (default: 100)")
+    ap.add_argument("--json", help="Write results to this JSON file")
+    args = ap.parse_args()
+
+    results = {"block_dice": alias_index.BLOCK_DICE, "sizes": []}
+    print(f"{'names':>7} {'scan s (est)':>13} {'index s':>8} {'speedup':>8} {'recall':>7} {'incr s':>7}")
+    for count in args.sizes:
+        r = run_size(count, args.sample)
+        results["sizes"].append(r)
+        index_seconds = r["index_build_seconds"] + r["index_match_seconds"]
+        print(
+            f"{count:>7} {r['scan_seconds_estimated']:>13.1f} {index_seconds:>8.2f} {r['speedup']:>7.0f}x"
+            f" {r['recall']:>7.2%} {r['incremental_seconds']:>7.2f}"
+        )
+    print("[OK] scan is estimated from the sampled names; recall compares the index with it on the same names")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+        print(f"[OK] Wrote {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
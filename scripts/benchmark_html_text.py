@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+"""
+Benchmark the HTML -> text backends in html_text.py on stored message bodies.
+
+Loads up to --limit stored Message.body_html values (plus Message.body values
+that contain HTML), checks that every backend returns exactly the same text and
+links as the BeautifulSoup reference, then times each backend. Exits non-zero
+if any sample differs, so it doubles as a golden-output check against real mail.
+
+Usage:
+    python scripts/benchmark_html_text.py
+    python scripts/benchmark_html_text.py --limit 5000 --repeat 3
+    python scripts/benchmark_html_text.py --json review_reports/html_text_bench.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import html_text
+
+# (separator, skip) combinations used by the parser and the message views
+MODES = {"ingest": (" ", ()), "snippet": ("\n", ("noscript",))}
+
+
+def load_samples(limit):
+    import django
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "dashboard.settings")
+    django.setup()
+    from django.db.models import Q
+
+    from tracker.models import Message
+
+    samples = []
+    for msg_id, body_html in (
+        Message.objects.exclude(body_html__isnull=True).exclude(body_html="").values_list("msg_id", "body_html")[:limit]
+    ):
+        samples.append((f"{msg_id}:body_html", body_html))
+    remaining = limit - len(samples)
+    if remaining > 0:
+        html_bodies = Message.objects.filter(Q(body__icontains="<html") | Q(body__icontains="<style"))
+        for msg_id, body in html_bodies.values_list("msg_id", "body")[:remaining]:
+            samples.append((f"{msg_id}:body", body))
+    return samples
+
+
+def check_equivalence(samples):
+    mismatches = []
+    for key, doc in samples:
+        for mode, (separator, skip) in MODES.items():
+            expected = html_text.extract(doc, separator, skip, backend="bs4")
+            for backend in html_text.BACKENDS:
+                if backend != "bs4" and html_text.extract(doc, separator, skip, backend=backend) != expected:
+                    mismatches.append({"sample": key, "mode": mode, "backend": backend})
+    return mismatches
+
+
+def time_backend(samples, backend, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _, doc in samples:
+            html_text.extract(doc, backend=backend)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--limit", type=int, default=2000, help="Maximum stored bodies to load (default: 2000)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing runs per backend; best is reported")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    samples = load_samples(args.limit)
+    if not samples:
+        print("[Error] No HTML message bodies found in the database")
+        return 1
+    total_bytes = sum(len(doc.encode("utf-8")) for _, doc in samples)
+    print(f"[Info] {len(samples)} samples, {total_bytes / 1_000_000:.1f} MB")
+
+    mismatches = check_equivalence(samples)
+    if mismatches:
+        print(f"[Warn] {len(mismatches)} outputs differ from the bs4 reference:")
+        for m in mismatches[:20]:
+            print(f"  {m['sample']} ({m['mode']}, {m['backend']})")
+    else:
+        print("[OK] All backends match the bs4 reference output")
+
+    results = {"samples": len(samples), "bytes": total_bytes, "mismatches": mismatches, "backends": {}}
+    for backend in html_text.BACKENDS:
+        seconds = time_backend(samples, backend, max(1, args.repeat))
+        results["backends"][backend] = {
+            "seconds": round(seconds, 4),
+            "docs_per_second": round(len(samples) / seconds, 1),
+            "mb_per_second": round(total_bytes / seconds / 1_000_000, 2),
+        }
+    reference = results["backends"]["bs4"]["seconds"]
+    print(f"{'backend':<8} {'seconds':>9} {'docs/s':>10} {'MB/s':>8} {'speedup':>8}")
+    for backend, r in results["backends"].items():
+        print(
+            f"{backend:<8} {r['seconds']:>9.3f} {r['docs_per_second']:>10.1f} "
+            f"{r['mb_per_second']:>8.2f} {reference / r['seconds']:>7.2f}x"
+        )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+        print(f"[OK] Wrote {args.json}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+"""
+Benchmark Gmail ingestion end to end against the local Gmail stand-in.
+
+For each --sizes value N, writes N messages from synthetic_mailbox.generate()
+(ATS and company mail, headhunters, job-board alerts, newsletters, threads,
+HTML bodies of varying size and near-duplicates) as a fake_gmail fixture
+directory, copies a freshly migrated database and runs the real command in a
+subprocess with GMAIL_FAKE_DIR set, so gmail_auth hands it a
+fake_gmail.FakeGmailService:
+
+- ingest:  manage.py ingest_gmail. Results come from the IngestionRun row the
+           run writes: msgs/sec, API calls, bytes, outcomes and per-stage
+           timings (stage_timing).
+- compare: manage.py compare_gmail_labels --gmail-label-ids INBOX against the
+           empty database, so every id goes through the batched metadata
+           lookups. Reports wall time and ids/sec.
+
+--fixtures runs once over an existing fixture directory (e.g. recorded with
+scripts/record_gmail_fixtures.py) instead of synthetic messages; --sizes is
+ignored and --days-back must cover the messages.
+--latency-ms, --error-rate and --units-per-second configure the fake (see
+fake_gmail.FakeGmailConfig). Your own database and json/ files are not
+touched beyond what the command itself reads.
+
+Usage:
+    python scripts/benchmark_ingest.py --sizes 1000
+    python scripts/benchmark_ingest.py --latency-ms 40 --json review_reports/ingest_bench.json
+    python scripts/benchmark_ingest.py --pipeline compare --sizes 10000 --latency-ms 40
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import synthetic_mailbox  # noqa: E402
+
+DAYS = 30  # synthetic messages are spread over this many days
+
+
+def build_corpus(count, seed=0):
+    """`count` synthetic_mailbox messages over the last DAYS days, using the repo's companies.json."""
+    company_data = synthetic_mailbox.load_company_data(os.path.join(ROOT, synthetic_mailbox.COMPANIES_JSON))
+    return synthetic_mailbox.generate(count, seed=seed, days=DAYS, company_data=company_data)
+
+
+def migrated_db(workdir):
+    """Path of a freshly migrated SQLite database (migrations run once)."""
+    path = os.path.join(workdir, "template.db")
+    if not os.path.exists(path):
+        env = {**os.environ, "JOB_TRACKER_DB": path}
+        subprocess.run([sys.executable, "manage.py", "migrate", "--noinput", "--skip-checks", "-v", "0"], cwd=ROOT, env=env, check=True)
+    return path
+
+
+def latest_run(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    row = conn.execute("SELECT * FROM tracker_ingestionrun ORDER BY id DESC LIMIT 1").fetchone()
+    conn.close()
+    return dict(row) if row else None
+
+
+def run_size(count, args, workdir):
+    fixtures = args.fixtures
+    if not fixtures:
+        fixtures = os.path.join(workdir, f"mailbox_{count}")
+        if not os.path.exists(fixtures):
+            synthetic_mailbox.write_gmail_dir(fixtures, build_corpus(count, seed=args.seed))
+    db_path = os.path.join(workdir, f"bench_{count}.db")
+    shutil.copyfile(migrated_db(workdir), db_path)
+    env = {
+        **os.environ,
+        "JOB_TRACKER_DB": db_path,
+        "GMAIL_FAKE_DIR": fixtures,
+        "GMAIL_FAKE_LATENCY_MS": str(args.latency_ms),
+        "GMAIL_FAKE_ERROR_RATE": str(args.error_rate),
+        "GMAIL_FAKE_UNITS_PER_SECOND": str(args.units_per_second or ""),
+        "GMAIL_FAKE_SEED": str(args.seed),
+    }
+    if args.pipeline == "ingest":
+        cmd = ["manage.py", "ingest_gmail", "--skip-checks", "--days-back", str(args.days_back)]
+    else:
+        cmd = [
+            "manage.py", "compare_gmail_labels", "--skip-checks", "--gmail-label-ids", "INBOX", "--include-ignored",
+            "--export-dir", os.path.join(workdir, "label_compare"), "--no-metadata-cache",
+        ]
+    log_path = os.path.join(workdir, f"{args.pipeline}_{count}.log")
+    started = time.perf_counter()
+    with open(log_path, "w", encoding="utf-8") as log:
+        proc = subprocess.run([sys.executable] + cmd, cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+    wall = time.perf_counter() - started
+    result = {"messages": count, "wall_seconds": round(wall, 2), "exit_code": proc.returncode, "log": log_path}
+    if args.pipeline == "compare":
+        result["msgs_per_sec"] = round(count / wall, 1) if wall else 0.0
+        return result
+
+    run = latest_run(db_path)
+    if run is None:
+        return result
+    for key in ("processed", "duration_seconds", "messages_per_sec", "api_calls", "bytes_fetched", "inserted", "ignored", "skipped", "failed"):
+        result[key] = run[key]
+    result["msgs_per_sec"] = run["messages_per_sec"]
+    result["stage_timings"] = json.loads(run["stage_timings"] or "{}")
+    return result
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000], help="Message counts (default: 1000 10000 50000)")
+    ap.add_argument("--pipeline", choices=["ingest", "compare"], default="ingest", help="Command to benchmark (default: ingest)")
+    ap.add_argument("--fixtures", help="Existing fake_gmail fixture directory instead of synthetic messages")
+    ap.add_argument("--days-back", type=int, default=DAYS + 1, help=f"ingest_gmail --days-back (default: {DAYS + 1})")
+    ap.add_argument("--latency-ms", type=float, default=0.0, help="Fake round-trip latency per HTTP request (default: 0)")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="Fraction of calls failing with 503 (default: 0)")
+    ap.add_argument("--units-per-second", type=int, default=None, help="Fake per-user quota; Gmail's is 250 (default: off)")
+    ap.add_argument("--seed", type=int, default=0, help="Corpus and error seed (default: 0)")
+    ap.add_argument("--workdir", help="Keep fixtures, databases and logs here (default: a temp dir, removed)")
+    ap.add_argument("--top-stages", type=int, default=8, help="Stages listed per size (default: 8)")
+    ap.add_argument("--json", help="Write results to this JSON file")
+    args = ap.parse_args()
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="ingest_bench_")
+    os.makedirs(workdir, exist_ok=True)
+    results = {
+        "pipeline": args.pipeline,
+        "latency_ms": args.latency_ms,
+        "error_rate": args.error_rate,
+        "units_per_second": args.units_per_second,
+        "sizes": [],
+    }
+    sizes = args.sizes
+    if args.fixtures:
+        with open(os.path.join(args.fixtures, "index.json"), "r", encoding="utf-8") as fh:
+            sizes = [len(json.load(fh))]
+    try:
+        for count in sizes:
+            r = run_size(count, args, workdir)
+            results["sizes"].append(r)
+            if r["exit_code"] != 0:
+                with open(r["log"], "r", encoding="utf-8", errors="replace") as fh:
+                    tail = fh.readlines()[-15:]
+                print(f"[Info] {args.pipeline} exited with {r['exit_code']} for {count} messages:")
+                print("".join("    " + line for line in tail), end="")
+            line = f"{count:>7} msgs  {r['wall_seconds']:>8.1f}s wall  {r.get('msgs_per_sec', 0):>8.1f} msg/s"
+            if "api_calls" in r:
+                line += (
+                    f"  {r['api_calls']} API calls, {r['bytes_fetched'] / 1_000_000:.1f} MB,"
+                    f" inserted={r['inserted']} ignored={r['ignored']} skipped={r['skipped']} failed={r['failed']}"
+                )
+            print(line)
+            for stage, s in list(r.get("stage_timings", {}).items())[: args.top_stages]:
+                print(f"          {stage:<32} {s['count']:>7} x  p50 {s['p50_ms']:>8.2f} ms  p95 {s['p95_ms']:>8.2f} ms  total {s['total_ms'] / 1000:>8.1f}s")
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+        print(f"[OK] Wrote {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+"""
+Benchmark the mark_ghosted command on a synthetic set of open applications.
+
+Creates --apps ThreadTracking rows spread over --apps/4 companies, with a
+mix of stale, recently active, rejected and headhunter companies, plus a few
+messages per company. The command then runs in --dry-run mode and in write
+mode. Everything happens inside a transaction that is rolled back, so the
+database is left untouched.
+
+Usage:
+    python scripts/benchmark_mark_ghosted.py
+    python scripts/benchmark_mark_ghosted.py --apps 10000 --json review_reports/mark_ghosted_bench.json
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import time
+from datetime import timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def build_dataset(apps):
+    from django.utils import timezone
+
+    from tracker.models import Company, Message, ThreadTracking
+
+    now = timezone.now()
+    n_companies = max(1, apps // 4)
+    companies = Company.objects.bulk_create(
+        Company(
+            name=f"Bench Company {i}",
+            domain=f"bench{i}.example",
+            status="headhunter" if i % 20 == 0 else "application",
+            first_contact=now,
+            last_contact=now,
+        )
+        for i in range(n_companies)
+    )
+    threads, messages = [], []
+    for i in range(apps):
+        company = companies[i % n_companies]
+        days_ago = 10 + (i * 7) % 120
+        thread_id = f"bench-thread-{i}"
+        threads.append(
+            ThreadTracking(
+                thread_id=thread_id,
+                company=company,
+                job_title="Software Engineer",
+                status="application",
+                sent_date=(now - timedelta(days=days_ago)).date(),
+                ml_label="noise" if i % 25 == 0 else "job_application",
+            )
+        )
+        # Roughly one rejection thread in ten, the rest plain follow-ups
+        messages.append(
+            Message(
+                msg_id=f"bench-msg-{i}",
+                thread_id=thread_id,
+                company=company,
+                subject="Your application",
+                sender=f"jobs@{company.domain}",
+                timestamp=now - timedelta(days=days_ago - 2),
+                ml_label="rejected" if i % 10 == 0 else "job_application",
+            )
+        )
+    ThreadTracking.objects.bulk_create(threads, batch_size=2000)
+    Message.objects.bulk_create(messages, batch_size=2000)
+
+
+def run_command(dry_run):
+    from django.core.management import call_command
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    out = io.StringIO()
+    args = ["--days", "30"] + (["--dry-run"] if dry_run else [])
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        call_command("mark_ghosted", *args, stdout=out)
+        elapsed = time.perf_counter() - started
+    summary = out.getvalue().strip().splitlines()[-1]
+    return {"seconds": round(elapsed, 3), "queries": len(queries), "summary": summary}
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--apps", type=int, default=10_000, help="Applications to create (default: 10000)")
+    ap.add_argument("--json", help="Write results to this JSON file")
+    args = ap.parse_args()
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "dashboard.settings")
+    import django
+
+    django.setup()
+    from django.db import transaction
+
+    results = {"applications": args.apps, "modes": {}}
+    with transaction.atomic():
+        started = time.perf_counter()
+        build_dataset(args.apps)
+        print(f"[Info] Built {args.apps} applications in {time.perf_counter() - started:.1f}s")
+        results["modes"]["dry_run"] = run_command(dry_run=True)
+        results["modes"]["write"] = run_command(dry_run=False)
+        transaction.set_rollback(True)
+
+    print(f"{'mode':<8} {'seconds':>9} {'queries':>8}")
+    for mode, r in results["modes"].items():
+        print(f"{mode:<8} {r['seconds']:>9.3f} {r['queries']:>8}  {r['summary']}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+        print(f"[OK] Wrote {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+"""
+Benchmark ingest throughput with parser debug output on versus off.
+
+Builds --count job-search emails with synthetic_mailbox.generate() (fixed
+seed and end date: ATS and company mail, headhunters, job-board alerts,
+newsletters) and runs them through parser.ingest_message_from_eml, once with
+the "tracker.parser" logger at DEBUG and once at INFO. Every pass runs inside
+a transaction that is rolled back, and the email_text copy of each body
+(written by db.insert_email_text over its own sqlite3 connection) is skipped,
+so the database is left untouched. Debug prints go to os.devnull by default,
+so the numbers measure formatting and writing rather than terminal speed.
+Pass --stdout to keep them.
+
+Usage:
+    python scripts/benchmark_parser_debug.py
+    python scripts/benchmark_parser_debug.py --count 500 --repeat 3
+    python scripts/benchmark_parser_debug.py --json review_reports/parser_debug_bench.json
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import synthetic_mailbox  # noqa: E402
+
+SEED = 0
+END = datetime(2025, 6, 1, tzinfo=timezone.utc)  # fixed, so every run parses the same mailbox
+
+
+def build_messages(count):
+    """(msg_id, raw .eml) pairs for `count` synthetic_mailbox messages."""
+    company_data = synthetic_mailbox.load_company_data(os.path.join(ROOT, synthetic_mailbox.COMPANIES_JSON))
+    return [
+        (msg.msg_id, msg.to_email().as_string())
+        for msg in synthetic_mailbox.generate(count, seed=SEED, end=END, company_data=company_data)
+    ]
+
+
+def run_pass(messages, parser, tracker_logger, level, quiet):
+    from django.db import transaction
+
+    tracker_logger.set_level("tracker.parser", level)
+    sink = open(os.devnull, "w") if quiet else contextlib.nullcontext(sys.stdout)
+    with sink as out, contextlib.redirect_stdout(out):
+        with transaction.atomic():
+            started = time.perf_counter()
+            for msg_id, raw in messages:
+                parser.ingest_message_from_eml(raw, fake_msg_id=msg_id)
+            elapsed = time.perf_counter() - started
+            transaction.set_rollback(True)
+    return elapsed
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--count", type=int, default=200, help="Synthetic messages per pass (default: 200)")
+    ap.add_argument("--repeat", type=int, default=2, help="Passes per mode; best is reported")
+    ap.add_argument("--stdout", action="store_true", help="Write debug output to stdout instead of os.devnull")
+    ap.add_argument("--json", help="Write results to this JSON file")
+    args = ap.parse_args()
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "dashboard.settings")
+    import django
+
+    django.setup()
+    import parser
+    import tracker_logger
+
+    # email_text is written through a second sqlite3 connection, which would wait
+    # on the rolled-back transaction's lock; the benchmark measures parsing only
+    parser.insert_email_text = lambda *a, **k: None
+
+    messages = build_messages(args.count)
+    # Warm-up pass (model loading, regex compilation, first queries)
+    run_pass(messages[: min(20, len(messages))], parser, tracker_logger, "INFO", True)
+
+    results = {"messages": len(messages), "modes": {}}
+    for mode, level in (("debug_off", "INFO"), ("debug_on", "DEBUG")):
+        best = min(
+            run_pass(messages, parser, tracker_logger, level, not args.stdout) for _ in range(max(1, args.repeat))
+        )
+        results["modes"][mode] = {"seconds": round(best, 3), "messages_per_second": round(len(messages) / best, 1)}
+    tracker_logger.set_level("tracker.parser", tracker_logger.PARSER_LOG_LEVEL)
+
+    off, on = results["modes"]["debug_off"], results["modes"]["debug_on"]
+    results["speedup"] = round(on["seconds"] / off["seconds"], 2)
+    print(f"{'mode':<10} {'seconds':>9} {'msg/s':>9}")
+    for mode, r in results["modes"].items():
+        print(f"{mode:<10} {r['seconds']:>9.3f} {r['messages_per_second']:>9.1f}")
+    print(f"[OK] debug off is {results['speedup']:.2f}x the throughput of debug on")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+        print(f"[OK] Wrote {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+"""
+Benchmark full vs incremental training of the message classifier.
+
+Replays the labeled corpus as if it had been reviewed in batches: the first
+--initial fraction is trained up front, then each of --steps batches of newly
+reviewed rows is added. At every step the full mode (TF-IDF + calibrated
+LogisticRegression, same settings as train_model.py) is refit from scratch and
+the incremental mode (ml_incremental) is updated with only the new batch. Both
+are scored on the same stable holdout (id % 5 == 0).
+
+The incremental state and feature cache are written to a temporary directory;
+the real model/incremental_state.joblib, model/features.npz and published
+artifacts are never touched.
+
+Usage:
+    python scripts/benchmark_training_modes.py
+    python scripts/benchmark_training_modes.py --steps 10 --initial 0.5
+    python scripts/benchmark_training_modes.py --csv labeled_subjects.csv --json out.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scipy.sparse import hstack
+from sklearn.calibration import CalibratedClassifierCV
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.utils.class_weight import compute_sample_weight
+
+import feature_store
+import ml_incremental
+
+
+def load_corpus(csv_path=None):
+    if csv_path:
+        df = pd.read_csv(csv_path)
+        if "id" not in df.columns:
+            df["id"] = np.arange(1, len(df) + 1)
+    else:
+        import django
+
+        os.environ.setdefault("DJANGO_SETTINGS_MODULE", "dashboard.settings")
+        django.setup()
+        from db import load_training_data
+
+        df = load_training_data()
+    df = df[df["body"].fillna("").str.strip() != ""].copy()
+    df["label"] = df["label"].str.lower().str.strip()
+    # Same rare-class handling as train_model.py
+    counts = df["label"].value_counts()
+    rare = counts[counts < 10].index
+    df.loc[df["label"].isin(rare), "label"] = "other"
+    return df.sort_values("id").reset_index(drop=True)
+
+
+def fit_full(train_df, test_df):
+    """Refit the full-mode pipeline (mirrors train_model.py) and return accuracy."""
+    subject_vec = TfidfVectorizer(
+        lowercase=True, ngram_range=(1, 2), max_df=0.9, min_df=2, max_features=10000
+    )
+    body_vec = TfidfVectorizer(
+        lowercase=True, ngram_range=(1, 2), max_df=0.9, min_df=2, max_features=40000
+    )
+    Xtr = hstack(
+        [
+            subject_vec.fit_transform(train_df["subject"].fillna("")),
+            body_vec.fit_transform(train_df["body"].fillna("")),
+        ]
+    )
+    Xte = hstack(
+        [
+            subject_vec.transform(test_df["subject"].fillna("")),
+            body_vec.transform(test_df["body"].fillna("")),
+        ]
+    )
+    clf = CalibratedClassifierCV(
+        LogisticRegression(solver="lbfgs", max_iter=2000, C=0.5), method="isotonic", cv=3
+    )
+    clf.fit(Xtr, train_df["label"], sample_weight=compute_sample_weight("balanced", train_df["label"]))
+    return float(np.mean(clf.predict(Xte) == test_df["label"].to_numpy()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv", help="Read subject/body/label(/id) from CSV instead of the DB")
+    parser.add_argument("--initial", type=float, default=0.7, help="Fraction trained up front (default 0.7)")
+    parser.add_argument("--steps", type=int, default=5, help="Number of incremental batches (default 5)")
+    parser.add_argument("--json", help="Write per-step results to this JSON file")
+    args = parser.parse_args()
+
+    df = load_corpus(args.csv)
+    holdout = ml_incremental.is_holdout(df["id"])
+    test_df = df[holdout]
+    pool = df[~holdout]
+    if len(pool) < 20 or test_df.empty:
+        raise SystemExit(f"[Error] Not enough labeled rows to benchmark ({len(df)})")
+
+    initial_n = int(len(pool) * args.initial)
+    batch_bounds = np.linspace(initial_n, len(pool), args.steps + 1).astype(int)
+    print(
+        f"[Info] {len(df)} rows: {initial_n} initial, {len(pool) - initial_n} added over "
+        f"{args.steps} steps, {len(test_df)} holdout"
+    )
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        ml_incremental.STATE_PATH = Path(tmp) / "incremental_state.joblib"
+        feature_store.STORE_PATH = Path(tmp) / "features.npz"
+        ml_incremental.FULL_EVERY = args.steps + 1  # no periodic rebuild inside the run
+
+        for step, end in enumerate(batch_bounds):
+            seen_ids = set(pool["id"].iloc[:end])
+            current = df[df["id"].isin(seen_ids) | holdout]
+
+            t0 = time.perf_counter()
+            full_acc = fit_full(pool.iloc[:end], test_df)
+            full_s = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            out = ml_incremental.train(current[["id", "subject", "body"]], current["label"])
+            inc_s = time.perf_counter() - t0
+            inc_acc = float(np.mean(out["y_pred"] == out["y_test"].to_numpy()))
+
+            row = {
+                "step": step,
+                "train_rows": int(end),
+                "new_rows": int(out["info"]["rows_used"]),
+                "full_seconds": round(full_s, 3),
+                "full_accuracy": round(full_acc, 4),
+                "incremental_seconds": round(inc_s, 3),
+                "incremental_accuracy": round(inc_acc, 4),
+                "incremental_rebuild": out["info"]["full_rebuild"],
+            }
+            results.append(row)
+            print(
+                f"step {step:>2} rows={row['train_rows']:>6} new={row['new_rows']:>6} | "
+                f"full {row['full_seconds']:>7.2f}s acc={row['full_accuracy']:.3f} | "
+                f"incremental {row['incremental_seconds']:>7.2f}s acc={row['incremental_accuracy']:.3f}"
+            )
+
+    updates = [r for r in results if not r["incremental_rebuild"]]
+    if updates:
+        full_t = sum(r["full_seconds"] for r in updates)
+        inc_t = sum(r["incremental_seconds"] for r in updates)
+        print(
+            f"[OK] Over {len(updates)} update steps: full {full_t:.2f}s vs incremental "
+            f"{inc_t:.2f}s ({full_t / max(inc_t, 1e-9):.1f}x); final accuracy "
+            f"{results[-1]['full_accuracy']:.3f} vs {results[-1]['incremental_accuracy']:.3f}"
+        )
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"[OK] Wrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
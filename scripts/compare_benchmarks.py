@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+"""
+Compare pytest-benchmark JSON results against a baseline and flag regressions.
+
+Reads two --benchmark-json files (as written by `make bench`), matches
+benchmarks by name and reports the change in --stat (median by default).
+A benchmark regresses when it is more than --threshold percent slower than
+the baseline, or when its recorded query count (extra_info["queries"], set by
+the view benchmarks) went up. Benchmarks present in only one file are listed
+but never fail the comparison.
+
+Exit status is 1 when anything regressed, so `make bench-compare` can gate CI,
+and 2 when either file is missing. No baseline ships with the repo: timings
+depend on the machine, so record one there with `make bench-baseline`.
+
+Usage:
+    python scripts/compare_benchmarks.py benchmarks/results/baseline.json benchmarks/results/latest.json
+    python scripts/compare_benchmarks.py base.json new.json --threshold 5 --stat min --json review_reports/bench_compare.json
+"""
+
+import argparse
+import json
+import sys
+
+STATS = ["min", "max", "mean", "median", "stddev"]
+
+
+def load(path):
+    """{benchmark fullname: entry} from a pytest-benchmark JSON file."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return {b["fullname"]: b for b in data.get("benchmarks", [])}
+
+
+def compare(baseline, current, stat="median", threshold=10.0):
+    """Rows for every benchmark in either file; `regressed` marks failures."""
+    rows = []
+    for name in sorted(set(baseline) | set(current)):
+        base, new = baseline.get(name), current.get(name)
+        row = {"name": name, "baseline": None, "current": None, "change_pct": None, "regressed": False, "reasons": []}
+        if base:
+            row["baseline"] = base["stats"][stat]
+        if new:
+            row["current"] = new["stats"][stat]
+        if base and new:
+            if row["baseline"]:
+                row["change_pct"] = round((row["current"] - row["baseline"]) / row["baseline"] * 100, 1)
+                if row["change_pct"] > threshold:
+                    row["reasons"].append(f"{stat} +{row['change_pct']}%")
+            base_queries = (base.get("extra_info") or {}).get("queries")
+            new_queries = (new.get("extra_info") or {}).get("queries")
+            if base_queries is not None and new_queries is not None and new_queries > base_queries:
+                row["reasons"].append(f"queries {base_queries} -> {new_queries}")
+            row["regressed"] = bool(row["reasons"])
+        rows.append(row)
+    return rows
+
+
+def _fmt(seconds):
+    if seconds is None:
+        return "-"
+    return f"{seconds * 1000:.2f}ms" if seconds < 1 else f"{seconds:.2f}s"
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("baseline", help="Baseline pytest-benchmark JSON")
+    ap.add_argument("current", help="Current pytest-benchmark JSON")
+    ap.add_argument("--threshold", type=float, default=10.0, help="Allowed slowdown in percent (default: 10)")
+    ap.add_argument("--stat", choices=STATS, default="median", help="Statistic to compare (default: median)")
+    ap.add_argument("--json", help="Also write the comparison to this JSON file")
+    args = ap.parse_args()
+
+    try:
+        baseline = load(args.baseline)
+    except FileNotFoundError:
+        print(f"[Info] No baseline at {args.baseline}. Record one first: `make bench && make bench-baseline`.")
+        return 2
+    try:
+        current = load(args.current)
+    except FileNotFoundError:
+        print(f"[Info] No results at {args.current}. Run `make bench` first.")
+        return 2
+    rows = compare(baseline, current, stat=args.stat, threshold=args.threshold)
+
+    width = max((len(r["name"]) for r in rows), default=10)
+    print(f"{'benchmark':<{width}}  {'baseline':>10}  {'current':>10}  {'change':>8}")
+    for r in rows:
+        change = "-" if r["change_pct"] is None else f"{r['change_pct']:+.1f}%"
+        flag = "  REGRESSION: " + ", ".join(r["reasons"]) if r["regressed"] else ""
+        if r["baseline"] is None:
+            flag = "  (new)"
+        elif r["current"] is None:
+            flag = "  (missing)"
+        print(f"{r['name']:<{width}}  {_fmt(r['baseline']):>10}  {_fmt(r['current']):>10}  {change:>8}{flag}")
+
+    regressed = [r for r in rows if r["regressed"]]
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"stat": args.stat, "threshold": args.threshold, "rows": rows}, f, indent=2)
+        print(f"[OK] Wrote {args.json}")
+    if regressed:
+        print(f"[Info] {len(regressed)} of {len(rows)} benchmarks regressed beyond {args.threshold:g}% ({args.stat})")
+        return 1
+    print(f"[OK] No regressions beyond {args.threshold:g}% ({args.stat}) across {len(rows)} benchmarks")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
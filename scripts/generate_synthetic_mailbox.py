@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+"""
+Generate a synthetic job-search mailbox for scale testing.
+
+Writes --messages messages from synthetic_mailbox.py (ATS and company mail,
+headhunters, job-board alerts, newsletters, threads, HTML bodies of varying
+size and near-duplicates) in one or more formats under --out:
+
+- gmail: Gmail API JSON as a fake_gmail fixture directory (gmail/), readable
+         by GMAIL_FAKE_DIR and scripts/benchmark_ingest.py --fixtures
+- eml:   one .eml file per message (eml/)
+- mbox:  a single mailbox file (mailbox.mbox)
+
+The same seed always gives the same mailbox, apart from dates when --end is
+not given (messages end at the current time). To fill the database instead,
+use: python manage.py load_synthetic_mailbox --messages 100000
+
+Usage:
+    python scripts/generate_synthetic_mailbox.py --messages 10000 --out synthetic/10k
+    python scripts/generate_synthetic_mailbox.py --messages 1000 --format eml mbox --seed 7 --out synthetic/1k
+"""
+
+import argparse
+import collections
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import synthetic_mailbox  # noqa: E402
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--messages", type=int, default=10000, help="Messages to generate (default: 10000)")
+    ap.add_argument("--out", required=True, help="Output directory")
+    ap.add_argument("--format", nargs="+", choices=["gmail", "eml", "mbox"], default=["gmail"], help="Output formats (default: gmail)")
+    ap.add_argument("--seed", type=int, default=0, help="Generator seed (default: 0)")
+    ap.add_argument("--days", type=int, default=365, help="Spread messages over this many days (default: 365)")
+    ap.add_argument("--end", help="Date of the newest possible message, YYYY-MM-DD (default: now)")
+    ap.add_argument("--companies", type=int, help="Company pool size (default: json/companies.json)")
+    ap.add_argument("--near-duplicates", type=float, default=0.03, help="Near-duplicate rate (default: 0.03)")
+    args = ap.parse_args()
+
+    end = datetime.strptime(args.end, "%Y-%m-%d").replace(tzinfo=timezone.utc) if args.end else None
+    started = time.perf_counter()
+    # Generate once and write every format from the same messages
+    messages = list(
+        synthetic_mailbox.generate(
+            args.messages,
+            seed=args.seed,
+            days=args.days,
+            end=end,
+            companies=args.companies,
+            near_duplicate_rate=args.near_duplicates,
+        )
+    )
+    kinds = collections.Counter(m.kind for m in messages)
+    print(f"[Info] Generated {len(messages)} messages in {len(set(m.thread_id for m in messages))} threads: "
+          + ", ".join(f"{k}={n}" for k, n in kinds.most_common()))
+
+    if "gmail" in args.format:
+        count = synthetic_mailbox.write_gmail_dir(os.path.join(args.out, "gmail"), messages)
+        print(f"[OK] Wrote {count} Gmail API messages to {os.path.join(args.out, 'gmail')}")
+    if "eml" in args.format:
+        count = synthetic_mailbox.write_eml_dir(os.path.join(args.out, "eml"), messages)
+        print(f"[OK] Wrote {count} .eml files to {os.path.join(args.out, 'eml')}")
+    if "mbox" in args.format:
+        count = synthetic_mailbox.write_mbox(os.path.join(args.out, "mailbox.mbox"), messages)
+        print(f"[OK] Wrote {count} messages to {os.path.join(args.out, 'mailbox.mbox')}")
+    print(f"[OK] Done in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,7 +10,8 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "dashboard.settings")
 django.setup()
 
-from tracker.models import Company, Message, ThreadTracking
+from tracker.models import Company
+from tracker.utils.company_merge import merge_companies
 
 # Find both companies
 canonical = Company.objects.filter(name="Network Designs, Inc.").first()
@@ -20,16 +21,10 @@ if canonical and dup:
     print(f"Canonical: {canonical.name} (ID={canonical.id})")
     print(f"Duplicate: {dup.name} (ID={dup.id})")
     
-    # Move all messages to canonical
-    msg_count = Message.objects.filter(company=dup).update(company=canonical)
-    print(f"Moved {msg_count} messages to canonical company")
-    
-    # Move all thread tracking to canonical
-    tt_count = ThreadTracking.objects.filter(company=dup).update(company=canonical)
-    print(f"Moved {tt_count} thread trackings to canonical company")
-    
-    # Delete duplicate
-    dup.delete()
+    # Move messages, thread tracking and documents, then delete the duplicate
+    report = merge_companies({canonical.id: [dup.id]}, dry_run=False)
+    print(f"Moved {report.total('messages')} messages to canonical company")
+    print(f"Moved {report.total('applications')} thread trackings to canonical company")
     print("Deleted duplicate company")
 elif canonical:
     print(f"Only canonical exists: {canonical.name} (ID={canonical.id})")
@@ -9,8 +9,12 @@ Behavior:
   1. A name that exactly matches an entry in `json/companies.json` 'known' list (case-sensitive), if present.
   2. The Company with the most related Messages + ThreadTracking rows.
   3. The first Company in the DB for that name.
-- Reassigns `Message.company` and `ThreadTracking.company` to the canonical company and deletes the duplicates.
-- Always writes a JSON backup/report under `scripts/normalize_companies_report_<timestamp>.json`.
+- Merges every group in one transaction (tracker.utils.company_merge): reassigns
+  `Message`, `ThreadTracking` and `CompanyDocument` rows, recomputes first/last
+  contact, rewrites DomainToCompany/CompanyAlias names, deletes the duplicates and
+  rewrites `json/companies.json` once.
+- Always writes a JSON backup/report under `scripts/normalize_companies_report_<timestamp>.json`,
+  including the merge engine's report ("merge") for dry runs and applied runs alike.
 
 Usage:
     python scripts/normalize_companies.py --dry-run
@@ -34,7 +38,10 @@ import django
 django.setup()
 
 import argparse
+from django.db.models import Count
+
 from tracker.models import Company, Message, ThreadTracking
+from tracker.utils.company_merge import merge_companies
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 COMPANIES_JSON = os.path.join(ROOT, "json", "companies.json")
@@ -51,36 +58,43 @@ def load_known_companies():
 
 def find_duplicate_groups():
     groups = {}
-    for c in Company.objects.all():
+    for c in Company.objects.order_by("id"):
         key = c.name.strip().lower()
         groups.setdefault(key, []).append(c)
     # only keep groups with >1 entry
     return {k: v for k, v in groups.items() if len(v) > 1}
 
 
-def choose_canonical(group, known_set):
+def related_counts(company_ids):
+    """{company_id: (messages, threadtracking)} with one grouped query per table."""
+    def grouped(model):
+        rows = model.objects.filter(company_id__in=company_ids).values("company_id").annotate(n=Count("id")).order_by()
+        return {r["company_id"]: r["n"] for r in rows}
+
+    msgs, tts = grouped(Message), grouped(ThreadTracking)
+    return {cid: (msgs.get(cid, 0), tts.get(cid, 0)) for cid in company_ids}
+
+
+def choose_canonical(group, known_set, counts):
     # group: list of Company objs
     # 1) exact match to known_set
     for c in group:
         if c.name in known_set:
             return c
     # 2) pick company with most related messages + threadtracking
-    scores = []
-    for c in group:
-        msg_count = Message.objects.filter(company=c).count()
-        tt_count = ThreadTracking.objects.filter(company=c).count()
-        scores.append((msg_count + tt_count, msg_count, tt_count, c))
-    scores.sort(reverse=True, key=lambda t: (t[0], t[1], t[2]))
-    return scores[0][3]
+    #    (ties: first in the DB)
+    return max(group, key=lambda c: (sum(counts[c.id]), counts[c.id][0], counts[c.id][1], -c.id))
 
 
 def plan_and_apply(apply=False, preserve_ids=None):
     known = load_known_companies()
     groups = find_duplicate_groups()
+    counts = related_counts([c.id for group in groups.values() for c in group])
     report = {"timestamp": datetime.utcnow().isoformat() + "Z", "groups": []}
+    merge_groups = {}
 
     for key, group in groups.items():
-        canonical = choose_canonical(group, known)
+        canonical = choose_canonical(group, known, counts)
         others = [c for c in group if c.id != canonical.id]
         group_report = {
             "key": key,
@@ -90,8 +104,7 @@ def plan_and_apply(apply=False, preserve_ids=None):
 
         for other in others:
             preserve = str(other.id) in preserve_ids
-            msg_count = Message.objects.filter(company=other).count()
-            tt_count = ThreadTracking.objects.filter(company=other).count()
+            msg_count, tt_count = counts[other.id]
             group_report["others"].append(
                 {
                     "id": other.id,
@@ -101,23 +114,22 @@ def plan_and_apply(apply=False, preserve_ids=None):
                     "preserve": preserve,
                 }
             )
+            if preserve:
+                print(f"Preserving Company id={other.id} name='{other.name}'")
+            else:
+                merge_groups.setdefault(canonical.id, []).append(other.id)
 
         report["groups"].append(group_report)
 
-        # Apply changes unless all others are preserved
-        if apply:
-            for other in others:
-                if preserve_ids and str(other.id) in preserve_ids:
-                    print(f"Preserving Company id={other.id} name='{other.name}'")
-                    continue
-                # Reassign Messages and ThreadTracking
-                print(
-                    f"Reassigning Company id={other.id} -> canonical id={canonical.id}"
-                )
-                Message.objects.filter(company=other).update(company=canonical)
-                ThreadTracking.objects.filter(company=other).update(company=canonical)
-                # Delete the other company
-                other.delete()
+    # One transaction for all groups; dry runs only plan
+    merge = merge_companies(merge_groups, dry_run=not apply)
+    report["merge"] = merge.as_dict()
+    if apply:
+        print(
+            f"Merged {sum(len(g.duplicates) for g in merge.groups)} duplicate(s) into "
+            f"{len(merge.groups)} canonical companies: moved {merge.total('messages')} messages, "
+            f"{merge.total('applications')} applications, {merge.total('documents')} documents"
+        )
 
     # write report
     ts = datetime.utcnow().strftime("%Y%m%d-%H%M%S")
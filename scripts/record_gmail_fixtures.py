@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+"""
+Record real Gmail messages as a fake_gmail fixture directory.
+
+Lists message ids with a Gmail query and/or labels, fetches each message in
+format=full (and optionally raw) through batch requests, and writes them with
+the account's labels as the directory layout fake_gmail.FakeGmailService reads
+(messages/<id>.json, index.json, labels.json). Point GMAIL_FAKE_DIR at the
+result, or pass it to scripts/benchmark_ingest.py --fixtures, to replay the
+mailbox offline.
+
+Recorded messages contain real mail: keep the directory private.
+
+Usage:
+    python scripts/record_gmail_fixtures.py --query "newer_than:30d" --out fixtures/gmail_30d
+    python scripts/record_gmail_fixtures.py --label-ids INBOX --limit 500 --raw --out fixtures/inbox_500
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fake_gmail  # noqa: E402
+import gmail_metadata  # noqa: E402
+from gmail_auth import get_gmail_service  # noqa: E402
+
+
+def fetch_full(service, ids, batch_size, raw=False):
+    """Message resources for `ids`, fetched in batches; failures are skipped."""
+    resources = {}
+    failed = []
+
+    def callback(request_id, response, exception):
+        if exception is not None:
+            failed.append(request_id)
+        elif request_id.startswith("raw:"):
+            resources[request_id[4:]]["raw"] = response.get("raw")
+        else:
+            resources[request_id] = response
+
+    messages = service.users().messages()
+    for fmt in ("full", "raw") if raw else ("full",):
+        todo = ids if fmt == "full" else [mid for mid in ids if mid in resources]
+        for i in range(0, len(todo), batch_size):
+            batch = service.new_batch_http_request(callback=callback)
+            for mid in todo[i : i + batch_size]:
+                batch.add(messages.get(userId="me", id=mid, format=fmt), request_id=mid if fmt == "full" else f"raw:{mid}")
+            batch.execute()
+            print(f"[Info] {fmt}: {min(i + batch_size, len(todo))}/{len(todo)}")
+    return resources, failed
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--out", required=True, help="Fixture directory to write")
+    ap.add_argument("--query", help="Gmail search query")
+    ap.add_argument("--label-ids", help="Comma-separated Gmail label ids (messages must carry all of them)")
+    ap.add_argument("--limit", type=int, help="Record at most this many messages")
+    ap.add_argument("--raw", action="store_true", help="Also record format=raw (needed only by raw readers)")
+    ap.add_argument("--batch-size", type=int, default=gmail_metadata.BATCH_SIZE, help="Gets per batch request")
+    args = ap.parse_args()
+
+    if not args.query and not args.label_ids:
+        ap.error("Specify --query and/or --label-ids")
+    service = get_gmail_service()
+    if service is None:
+        print("[Info] Failed to initialize Gmail service. Check credentials in json/ and token.")
+        return 1
+
+    label_ids = [x.strip() for x in args.label_ids.split(",") if x.strip()] if args.label_ids else None
+    ids = sorted(gmail_metadata.list_message_ids(lambda: service, label_ids=label_ids, query=args.query, limit=args.limit))
+    print(f"[Info] {len(ids)} messages to record")
+    resources, failed = fetch_full(service, ids, max(1, min(args.batch_size, 100)), raw=args.raw)
+    labels = service.users().labels().list(userId="me").execute().get("labels", [])
+    count = fake_gmail.write_fixture_dir(args.out, resources.values(), labels)
+    print(f"[OK] Wrote {count} messages to {args.out}" + (f" ({len(failed)} failed)" if failed else ""))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -22,6 +22,7 @@ os.environ.setdefault("DJANGO_SETTINGS_MODULE", "dashboard.settings")
 django.setup()
 
 from tracker.models import Message
+from tracker.services.message_service import MessageService
 from django.db.models import Count, Q
 
 
@@ -68,6 +69,7 @@ def remove_duplicates(dry_run=True):
     print(f"Found {len(duplicate_groups)} groups of duplicate messages:\n")
 
     total_removed = 0
+    delete_ids = []
     for group in duplicate_groups:
         # Sort by body length (descending) to keep the most complete message
         group.sort(key=lambda m: len(m.body or ""), reverse=True)
@@ -86,11 +88,14 @@ def remove_duplicates(dry_run=True):
                 f"   🗑️  Deleting: msg_id={dup.msg_id} (body length: {len(dup.body or '')})"
             )
             if not dry_run:
-                dup.delete()
-                total_removed += 1
+                delete_ids.append(dup.pk)
 
         print()
 
+    if delete_ids:
+        # One delete; affected threads are recomputed once at the end
+        total_removed, _, _ = MessageService.bulk_delete_messages(delete_ids)
+
     if dry_run:
         print(
             f"🔍 DRY RUN: Would remove {sum(len(g)-1 for g in duplicate_groups)} duplicate messages"
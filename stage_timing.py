@@ -0,0 +1,162 @@
+"""Per-stage wall-clock timing for the ingest pipeline.
+
+`ingest_message` runs the Gmail fetch, HTML parsing, rules, ML, spaCy, company
+resolution, dedup queries and ORM writes in one long call. This module records
+how long each of those stages takes so a slow run can be pinned on one of them:
+
+    with stage_timing.span("db_write.message"):
+        Message.objects.create(...)
+
+    @stage_timing.timed("parse_subject")
+    def parse_subject(...): ...
+
+Long straight-line code (most of `ingest_message`) uses a Stopwatch instead of
+re-indenting whole sections under a `with` block; each `lap()` records the
+time since the previous one:
+
+    watch = stage_timing.Stopwatch()
+    ...company resolution...
+    watch.lap("company_resolution")
+
+Durations are collected in the module-level `timer`. Ingest commands reset it
+at the start of a run and print/persist `timer.summary()` (count, total, p50,
+p95 and max in milliseconds per stage) at the end. Spans nest, so a stage's
+time includes any stages called inside it.
+
+Set INGEST_TIMING=0 to disable: `span()` then returns a shared no-op object
+and `timed` functions call straight through after a single flag check.
+"""
+
+# stage_timing.py
+
+import functools
+import os
+import threading
+import time
+
+from classification_window import percentile
+
+ENABLED = os.environ.get("INGEST_TIMING", "1") == "1"
+
+
+def set_enabled(enabled: bool):
+    """Turn timing on or off at runtime (e.g. for benchmarks)."""
+    global ENABLED
+    ENABLED = bool(enabled)
+
+
+class StageTimer:
+    """Durations per stage name, with p50/p95/max summaries."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._durations = {}
+
+    def reset(self):
+        with self._lock:
+            self._durations = {}
+
+    def record(self, stage: str, seconds: float):
+        with self._lock:
+            self._durations.setdefault(stage, []).append(seconds)
+
+    def summary(self) -> dict:
+        """{stage: {count, total_ms, p50_ms, p95_ms, max_ms}}, slowest total first."""
+        with self._lock:
+            durations = {stage: list(values) for stage, values in self._durations.items()}
+        result = {}
+        for stage, values in sorted(durations.items(), key=lambda item: -sum(item[1])):
+            result[stage] = {
+                "count": len(values),
+                "total_ms": round(sum(values) * 1000, 1),
+                "p50_ms": round(percentile(values, 50) * 1000, 2),
+                "p95_ms": round(percentile(values, 95) * 1000, 2),
+                "max_ms": round(max(values) * 1000, 2),
+            }
+        return result
+
+    def lines(self) -> list:
+        """Summary as aligned text lines for console/log output."""
+        summary = self.summary()
+        if not summary:
+            return []
+        width = max(len(stage) for stage in summary)
+        out = [f"{'stage':<{width}} {'count':>7} {'total ms':>10} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}"]
+        for stage, s in summary.items():
+            out.append(
+                f"{stage:<{width}} {s['count']:>7} {s['total_ms']:>10.1f} "
+                f"{s['p50_ms']:>9.2f} {s['p95_ms']:>9.2f} {s['max_ms']:>9.2f}"
+            )
+        return out
+
+
+timer = StageTimer()
+
+
+class _Span:
+    __slots__ = ("stage", "started")
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        timer.record(self.stage, time.perf_counter() - self.started)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(stage: str):
+    """Context manager timing its block under `stage`."""
+    return _Span(stage) if ENABLED else _NULL_SPAN
+
+
+class Stopwatch:
+    """Consecutive laps: `lap(stage)` records the time since the last lap."""
+
+    __slots__ = ("last",)
+
+    def __init__(self):
+        self.last = time.perf_counter()
+
+    def lap(self, stage: str):
+        now = time.perf_counter()
+        if ENABLED:
+            timer.record(stage, now - self.last)
+        self.last = now
+
+
+def timed(stage: str | None = None):
+    """Decorator timing every call under `stage` (default: the function name)."""
+
+    def decorator(func):
+        name = stage or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return func(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                timer.record(name, time.perf_counter() - started)
+
+        return wrapper
+
+    return decorator
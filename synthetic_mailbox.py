@@ -0,0 +1,505 @@
+"""Synthetic job-search mailboxes for scale testing.
+
+The only real test mail in the repo is a handful of .eml files, so parsing,
+ingestion and view performance could not be checked at realistic sizes.
+`generate()` streams a deterministic (seeded) mailbox of any size:
+
+- application confirmations, rejections, interview invitations, offers and
+  prescreens from company domains and ATS senders (Workday, Greenhouse,
+  iCIMS, ... from json/companies.json ``ats_domains``), naming companies from
+  ``domain_to_company`` / ``known`` plus generated names once those run out
+- headhunter outreach from ``headhunter_domains``
+- job-board alerts (``job_boards``) and newsletters with bulk-mail headers
+- threads: follow-ups land in the application's thread as "Re:" replies
+- HTML bodies in three size classes: short notices (~2 KB), styled ATS
+  templates and alerts (15-30 KB) and digest-style newsletters (100-300 KB,
+  a quarter of newsletters and a few alerts)
+- near-duplicates: resends of an earlier message with a new id and a changed
+  tracking token, at ``near_duplicate_rate``
+
+Each SyntheticMessage can be written as a Gmail API resource (`write_gmail_dir`,
+read by fake_gmail.FakeGmailService), as .eml files (`write_eml_dir`) or as an
+mbox (`write_mbox`). tracker/utils/synthetic_load.py bulk-loads the same
+stream into Message / ThreadTracking / Company for view and query benchmarks.
+
+    for msg in synthetic_mailbox.generate(10_000, seed=1):
+        ...
+"""
+
+# synthetic_mailbox.py
+
+import json
+import mailbox
+import random
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from email.message import Message
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from email.utils import format_datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import fake_gmail
+
+COMPANIES_JSON = Path("json/companies.json")
+PREFIX = "syn"  # msg_id / thread_id prefix of generated messages
+ADDRESS = fake_gmail.ADDRESS
+
+# Share of first messages per kind; follow-ups are added to application threads
+KIND_WEIGHTS = {
+    "application": 30,
+    "rejection": 8,
+    "headhunter": 12,
+    "job_board": 22,
+    "newsletter": 28,
+}
+ML_LABELS = {
+    "application": "job_application",
+    "rejection": "rejected",
+    "interview": "interview_invite",
+    "prescreen": "prescreen",
+    "offer": "offer",
+    "headhunter": "head_hunter",
+    "job_board": "noise",
+    "newsletter": "noise",
+}
+# Thread status after a message of this kind (ThreadTracking.status)
+THREAD_STATUS = {
+    "application": "application",
+    "prescreen": "application",
+    "interview": "interview",
+    "rejection": "rejected",
+    "offer": "offer",
+}
+# What can follow in an application thread: (kind, weight); None ends the thread
+FOLLOW_UPS = {
+    "application": [(None, 45), ("rejection", 30), ("prescreen", 10), ("interview", 15)],
+    "prescreen": [(None, 30), ("interview", 45), ("rejection", 25)],
+    "interview": [(None, 30), ("interview", 15), ("rejection", 35), ("offer", 20)],
+}
+
+TITLES = [
+    "Software Engineer", "Senior Software Engineer", "Data Scientist", "Security Analyst", "Cyber Security Engineer",
+    "Platform Engineer", "DevOps Engineer", "Product Manager", "Systems Administrator", "Network Engineer",
+    "Machine Learning Engineer", "Cloud Architect", "Site Reliability Engineer", "Threat Intelligence Analyst",
+]
+FIRST_NAMES = ["Alex", "Jordan", "Taylor", "Morgan", "Casey", "Riley", "Jamie", "Avery", "Quinn", "Drew", "Sam", "Robin"]
+LAST_NAMES = ["Smith", "Garcia", "Chen", "Patel", "Johnson", "Nguyen", "Brown", "Kim", "Lopez", "Walker", "Khan", "Reed"]
+NAME_PARTS = ["North", "Blue", "Apex", "Vector", "Summit", "Iron", "Cedar", "Quantum", "Signal", "Harbor", "Atlas", "Nova"]
+NAME_TAILS = ["Systems", "Technologies", "Labs", "Solutions", "Analytics", "Dynamics", "Networks", "Group"]
+NEWSLETTERS = [
+    ("Tech Digest", "newsletter@techdigest.news"), ("Cleared Careers Weekly", "news@clearedcareers.example"),
+    ("Remote Work Report", "hello@remotework.example"), ("Salary Insights", "digest@salaryinsights.example"),
+]
+FILLER = [
+    "We appreciate the time you took to share your background with us.",
+    "Our recruiting team reviews every application carefully.",
+    "Please do not reply to this message; this mailbox is not monitored.",
+    "You can check the status of your application at any time in our candidate portal.",
+    "We are an equal opportunity employer and value diversity at our company.",
+    "If you have questions, visit our careers site for answers to common questions.",
+]
+
+FALLBACK_DATA = {
+    "domain_to_company": {"acme.example": "Acme Robotics", "globex.example": "Globex", "initech.example": "Initech"},
+    "known": ["Acme Robotics", "Globex", "Initech"],
+    "ats_domains": ["myworkday.com", "greenhouse-mail.io", "icims.com", "hire.lever.co"],
+    "headhunter_domains": ["talentbridge.example", "staffingpros.example"],
+    "job_boards": ["https://linkedin.com", "https://indeed.com", "https://dice.com"],
+}
+
+
+@dataclass
+class SyntheticMessage:
+    msg_id: str
+    thread_id: str
+    kind: str  # application, rejection, interview, prescreen, offer, headhunter, job_board, newsletter
+    sender: str
+    subject: str
+    date: datetime
+    text: str
+    html: str
+    company: str = ""  # company the message is about; "" for newsletters and job boards
+    company_domain: str = ""
+    job_title: str = ""
+    job_id: str = ""
+    headers: Dict[str, str] = field(default_factory=dict)
+    label_ids: List[str] = field(default_factory=list)
+    near_duplicate_of: Optional[str] = None
+
+    @property
+    def ml_label(self) -> str:
+        return ML_LABELS[self.kind]
+
+    @property
+    def sender_domain(self) -> str:
+        match = re.search(r"@([A-Za-z0-9.-]+)", self.sender)
+        return match.group(1).lower() if match else ""
+
+    def to_gmail(self) -> Dict:
+        """Gmail API message resource (format=full)."""
+        return fake_gmail.build_message(
+            self.msg_id,
+            self.thread_id,
+            self.sender,
+            self.subject,
+            self.date,
+            text=self.text,
+            html=self.html,
+            label_ids=self.label_ids,
+            headers=self.headers,
+        )
+
+    def to_email(self) -> Message:
+        """RFC 5322 message with text and HTML alternatives.
+
+        Built with the compat32 MIME classes: the header registry of the
+        default policy makes EmailMessage several times slower to build.
+        """
+        msg = MIMEMultipart("alternative") if self.html else MIMEText(self.text, "plain", "utf-8")
+        msg["From"] = self.sender
+        msg["To"] = ADDRESS
+        msg["Subject"] = self.subject
+        msg["Date"] = format_datetime(self.date)
+        msg["Message-ID"] = f"<{self.msg_id}@synthetic.mailbox>"
+        for name, value in self.headers.items():
+            msg[name] = value
+        if self.html:
+            msg.attach(MIMEText(self.text, "plain", "utf-8"))
+            msg.attach(MIMEText(self.html, "html", "utf-8"))
+        return msg
+
+
+def load_company_data(path=COMPANIES_JSON) -> Dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return dict(FALLBACK_DATA)
+    return {key: data.get(key) or FALLBACK_DATA[key] for key in FALLBACK_DATA}
+
+
+def _slug(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "", name.lower()) or "company"
+
+
+def _board_domain(url: str) -> str:
+    host = re.sub(r"^https?://", "", url).split("/")[0]
+    return host[4:] if host.startswith("www.") else host
+
+
+class MailboxGenerator:
+    """Deterministic message stream; see the module docstring."""
+
+    def __init__(
+        self,
+        seed: int = 0,
+        days: int = 365,
+        end: Optional[datetime] = None,
+        companies: Optional[int] = None,
+        near_duplicate_rate: float = 0.03,
+        company_data: Optional[Dict] = None,
+    ):
+        self.rng = random.Random(seed)
+        self.days = days
+        self.end = end or datetime.now(timezone.utc).replace(microsecond=0)
+        self.near_duplicate_rate = near_duplicate_rate
+        data = company_data or load_company_data()
+        self.ats_domains = [d for d in data["ats_domains"] if "." in d]
+        self.headhunter_domains = list(data["headhunter_domains"])
+        self.job_boards = sorted({_board_domain(u) for u in data["job_boards"]})
+        # (name, domain): companies.json first, then generated names up to `companies`
+        pool = {}
+        for domain, name in data["domain_to_company"].items():
+            pool.setdefault(name, domain)
+        for name in data["known"]:
+            pool.setdefault(name, f"{_slug(name)}.com")
+        self.companies = sorted(pool.items())
+        if companies:
+            self.companies = self.companies[:companies]
+            seen = {name for name, _ in self.companies}
+            while len(self.companies) < companies:
+                name = f"{self.rng.choice(NAME_PARTS)} {self.rng.choice(NAME_PARTS)} {self.rng.choice(NAME_TAILS)}"
+                if name in seen:
+                    name = f"{name} {len(self.companies)}"
+                seen.add(name)
+                self.companies.append((name, f"{_slug(name)}.example"))
+        self._count = 0
+        self._threads = 0
+        self._recent: List[SyntheticMessage] = []
+        self._cards = [self._job_card() for _ in range(256)]
+
+    # --- ids and dates ---
+
+    def _msg_id(self) -> str:
+        self._count += 1
+        return f"{PREFIX}{self._count:013x}"
+
+    def _thread_id(self) -> str:
+        self._threads += 1
+        return f"{PREFIX}t{self._threads:012x}"
+
+    def _date(self) -> datetime:
+        return self.end - timedelta(seconds=self.rng.randrange(self.days * 86400))
+
+    # --- bodies ---
+
+    def _paragraphs(self, first: List[str], n_filler: int) -> List[str]:
+        return first + self.rng.sample(FILLER, min(n_filler, len(FILLER)))
+
+    def _html(self, paragraphs: List[str], size_class: str, company: str, token: str) -> str:
+        rng = self.rng
+        body = "".join(f"<p style=\"margin:0 0 12px 0\">{p}</p>" for p in paragraphs)
+        pixel = f'<img src="https://track.example/open/{token}.gif" width="1" height="1" alt="">'
+        if size_class == "small":
+            return f"<html><body>{body}{pixel}</body></html>"
+        style = "<style>" + "".join(
+            f".c{i}{{font-family:Arial,Helvetica,sans-serif;color:#{rng.randrange(0x1000000):06x};padding:{i}px}}" for i in range(40)
+        ) + "</style>"
+        header = f'<table width="100%" class="c1"><tr><td><img src="https://cdn.example/{_slug(company or "brand")}/logo.png" alt="{company}"></td></tr></table>'
+        footer = (
+            '<table width="100%" class="c2"><tr><td>'
+            + " | ".join(f'<a href="https://{_slug(company or "site")}.example/{w}">{w.title()}</a>' for w in ("careers", "privacy", "terms", "unsubscribe"))
+            + "</td></tr></table>"
+        )
+        target = rng.randint(15_000, 30_000) if size_class == "medium" else rng.randint(100_000, 300_000)
+        cards = []
+        size = len(style) + len(header) + len(body) + len(footer)
+        while size < target:
+            card = rng.choice(self._cards)
+            cards.append(card)
+            size += len(card)
+        return f"<html><head>{style}</head><body>{header}{body}{''.join(cards)}{footer}{pixel}</body></html>"
+
+    def _job_card(self) -> str:
+        rng = self.rng
+        title, (name, _) = rng.choice(TITLES), rng.choice(self.companies)
+        return (
+            f'<table class="c{rng.randrange(40)}" width="100%"><tr><td><a href="https://jobs.example/{rng.randrange(10**8)}">'
+            f"<b>{title}</b></a><br>{name} &middot; {rng.choice(['Remote', 'Reston, VA', 'Austin, TX', 'Hybrid'])}"
+            f"<br><span>{rng.choice(FILLER)}</span></td></tr></table>"
+        )
+
+    # --- message kinds ---
+
+    def _company_message(self, kind, company, domain, title, job_id, date, thread_id, subject=None):
+        rng = self.rng
+        via_ats = rng.random() < 0.55 and self.ats_domains
+        ats = rng.choice(self.ats_domains) if via_ats else ""
+        if kind in ("application", "rejection"):
+            sender = f"{company} Careers <{'no-reply' if via_ats else 'careers'}@{ats or domain}>"
+        else:
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            sender = f"{first} {last} <{first.lower()}.{last.lower()}@{domain}>"
+        lines = {
+            "application": [
+                f"Thank you for applying to the {title} position ({job_id}) at {company}.",
+                "We have received your application and our team will review it shortly.",
+            ],
+            "rejection": [
+                f"Thank you for your interest in the {title} role at {company}.",
+                "After careful consideration, we have decided to move forward with other candidates whose experience more closely matches our needs.",
+            ],
+            "prescreen": [
+                f"I'm a recruiter at {company} and would like to set up a brief phone screen about the {title} role.",
+                "Would 15 minutes tomorrow or Thursday work for you?",
+            ],
+            "interview": [
+                f"We would like to invite you to interview for the {title} position at {company}.",
+                "Please share your availability for a 45 minute video interview next week.",
+            ],
+            "offer": [
+                f"We are delighted to extend you an offer for the {title} position at {company}.",
+                "Please find the offer letter attached and let us know if you have any questions.",
+            ],
+        }[kind]
+        subjects = {
+            "application": f"Thank you for applying to {company} - {title}",
+            "rejection": f"Update on your application to {company}",
+            "prescreen": f"{title} phone screen",
+            "interview": f"Interview invitation: {title} at {company}",
+            "offer": f"Offer of employment - {title}",
+        }
+        token = f"{rng.randrange(16**12):012x}"
+        paragraphs = self._paragraphs(lines, rng.randint(1, 4))
+        text = "\n\n".join(paragraphs + [f"Reference: {token}"])
+        html = self._html(paragraphs, "medium" if via_ats or rng.random() < 0.3 else "small", company, token)
+        headers = {"Reply-To": f"noreply@{ats}"} if via_ats else {}
+        return SyntheticMessage(
+            msg_id=self._msg_id(),
+            thread_id=thread_id,
+            kind=kind,
+            sender=sender,
+            subject=subject or subjects[kind],
+            date=date,
+            text=text,
+            html=html,
+            company=company,
+            company_domain=domain,
+            job_title=title,
+            job_id=job_id,
+            headers=headers,
+            label_ids=["INBOX", "UNREAD", "CATEGORY_UPDATES"] if rng.random() < 0.3 else ["INBOX", "CATEGORY_UPDATES"],
+        )
+
+    def _thread(self) -> List[SyntheticMessage]:
+        """An application thread: the confirmation (or a direct rejection) and its follow-ups."""
+        rng = self.rng
+        company, domain = rng.choice(self.companies)
+        title = rng.choice(TITLES)
+        job_id = f"{rng.choice(['R', 'JR', 'REQ'])}-{rng.randrange(10**4, 10**6)}"
+        thread_id = self._thread_id()
+        date = self._date()
+        first = rng.choices(["application", "rejection"], weights=[KIND_WEIGHTS["application"], KIND_WEIGHTS["rejection"]])[0]
+        messages = [self._company_message(first, company, domain, title, job_id, date, thread_id)]
+        kind = first
+        while kind in FOLLOW_UPS:
+            options, weights = zip(*FOLLOW_UPS[kind])
+            kind = rng.choices(options, weights=weights)[0]
+            if kind is None:
+                break
+            date = date + timedelta(days=rng.uniform(1, 21))
+            if date > self.end:
+                break
+            messages.append(
+                self._company_message(kind, company, domain, title, job_id, date, thread_id, subject=f"Re: {messages[0].subject}")
+            )
+        return messages
+
+    def _headhunter(self) -> SyntheticMessage:
+        rng = self.rng
+        domain = rng.choice(self.headhunter_domains)
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        title = rng.choice(TITLES)
+        paragraphs = [
+            f"Hi, I came across your profile and have an exciting {title} opportunity with one of our clients.",
+            "The role is a 12-month contract-to-hire with a competitive rate. Are you open to a quick call this week?",
+            f"{first} {last} | Senior Technical Recruiter | {domain}",
+        ]
+        token = f"{rng.randrange(16**12):012x}"
+        return SyntheticMessage(
+            msg_id=self._msg_id(),
+            thread_id=self._thread_id(),
+            kind="headhunter",
+            sender=f"{first} {last} <{first.lower()}@{domain}>",
+            subject=f"{title} opportunity - {rng.choice(['Remote', 'Hybrid', 'On-site'])}",
+            date=self._date(),
+            text="\n\n".join(paragraphs),
+            html=self._html(paragraphs, "small", "", token),
+            job_title=title,
+            label_ids=["INBOX", "UNREAD"],
+        )
+
+    def _bulk(self, kind) -> SyntheticMessage:
+        rng = self.rng
+        token = f"{rng.randrange(16**12):012x}"
+        if kind == "job_board":
+            domain = rng.choice(self.job_boards)
+            title = rng.choice(TITLES)
+            sender = f"{domain.split('.')[0].title()} Job Alerts <jobalerts-noreply@{domain}>"
+            subject = f"{rng.randint(3, 40)} new {title} jobs for you"
+            jobs = [f"{rng.choice(TITLES)} at {rng.choice(self.companies)[0]}" for _ in range(rng.randint(5, 15))]
+            paragraphs = ["New jobs matching your saved search:"] + jobs
+        else:
+            name, address = rng.choice(NEWSLETTERS)
+            domain = address.split("@")[1]
+            sender = f"{name} <{address}>"
+            subject = rng.choice(["This week in tech hiring", "Salary trends for 2025", "Interview tips you can use", "Your weekly digest"])
+            paragraphs = self._paragraphs(["Here is what happened in the job market this week."], 3)
+        size_class = "large" if rng.random() < (0.25 if kind == "newsletter" else 0.05) else "medium"
+        return SyntheticMessage(
+            msg_id=self._msg_id(),
+            thread_id=self._thread_id(),
+            kind=kind,
+            sender=sender,
+            subject=subject,
+            date=self._date(),
+            text="\n".join(paragraphs),
+            html=self._html(paragraphs, size_class, "", token),
+            headers={
+                "List-Unsubscribe": f"<https://{domain}/unsubscribe/{token}>",
+                "List-Id": f"<{kind}.{domain}>",
+                "Precedence": "bulk",
+            },
+            label_ids=["INBOX", "CATEGORY_PROMOTIONS"],
+        )
+
+    def _near_duplicate(self, original: SyntheticMessage) -> SyntheticMessage:
+        """A resend: new id, new tracking token, sometimes a new thread."""
+        token = f"{self.rng.randrange(16**12):012x}"
+        old = re.search(r"open/([0-9a-f]{12})\.gif", original.html)
+        html = original.html.replace(old.group(1), token) if old else original.html
+        return SyntheticMessage(
+            **{
+                **original.__dict__,
+                "msg_id": self._msg_id(),
+                "thread_id": original.thread_id if self.rng.random() < 0.5 else self._thread_id(),
+                "date": min(original.date + timedelta(minutes=self.rng.uniform(1, 600)), self.end),
+                "text": re.sub(r"Reference: [0-9a-f]{12}", f"Reference: {token}", original.text),
+                "html": html,
+                "headers": dict(original.headers),
+                "label_ids": list(original.label_ids),
+                "near_duplicate_of": original.msg_id,
+            }
+        )
+
+    def messages(self, count: int) -> Iterator[SyntheticMessage]:
+        rng = self.rng
+        kinds = ["thread", "headhunter", "job_board", "newsletter"]
+        weights = [KIND_WEIGHTS["application"] + KIND_WEIGHTS["rejection"], KIND_WEIGHTS["headhunter"], KIND_WEIGHTS["job_board"], KIND_WEIGHTS["newsletter"]]
+        emitted = 0
+        while emitted < count:
+            kind = rng.choices(kinds, weights=weights)[0]
+            if kind == "thread":
+                batch = self._thread()
+            elif kind == "headhunter":
+                batch = [self._headhunter()]
+            else:
+                batch = [self._bulk(kind)]
+            if self._recent and rng.random() < self.near_duplicate_rate:
+                batch.append(self._near_duplicate(rng.choice(self._recent)))
+            for msg in batch[: count - emitted]:
+                emitted += 1
+                yield msg
+            self._recent = (self._recent + batch)[-50:]
+
+
+def generate(count: int, seed: int = 0, **kwargs) -> Iterator[SyntheticMessage]:
+    """`count` messages from a MailboxGenerator(seed, **kwargs)."""
+    return MailboxGenerator(seed=seed, **kwargs).messages(count)
+
+
+def write_gmail_dir(path, messages, labels: Optional[List[Dict]] = None) -> int:
+    """fake_gmail fixture directory (Gmail API JSON)."""
+    return fake_gmail.write_fixture_dir(path, (m.to_gmail() for m in messages), labels)
+
+
+def write_eml_dir(path, messages) -> int:
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    count = 0
+    for msg in messages:
+        (path / f"{msg.msg_id}.eml").write_bytes(msg.to_email().as_bytes())
+        count += 1
+    return count
+
+
+def write_mbox(path, messages) -> int:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    box = mailbox.mbox(str(path))
+    box.lock()
+    count = 0
+    try:
+        for msg in messages:
+            entry = mailbox.mboxMessage(msg.to_email())
+            entry.set_from(msg.sender_domain or "synthetic", msg.date.astimezone(timezone.utc).timetuple())
+            box.add(entry)
+            count += 1
+        box.flush()
+    finally:
+        box.unlock()
+        box.close()
+    return count
@@ -8,14 +8,18 @@ Outputs:
 - review_reports/disagreement_by_method.csv
 
 Also prints the top 20 label-pair disagreements to stdout.
+
+An alternative input CSV (e.g. review_reports/ml_disagreements.csv from
+ml_disagreements.py) can be passed as the first argument.
 """
 import csv
+import sys
 from collections import Counter, defaultdict
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parents[1]
 IN_DIR = ROOT / "review_reports"
-IN = IN_DIR / "reviewed_disagreements.csv"
+IN = Path(sys.argv[1]) if len(sys.argv) > 1 else IN_DIR / "reviewed_disagreements.csv"
 OUT_DIR = IN_DIR
 OUT_DIR.mkdir(exist_ok=True)
 
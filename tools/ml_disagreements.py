@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Produce ml_disagreements.csv: reviewed messages where the published ML model disagrees.
+
+Unlike make_disagreements.py (which runs the full rules-then-ML predictor one
+message at a time), this scores every reviewed message with the ML model alone,
+in one batch, assembling features from the feature cache (model/features.npz)
+so only messages that are new or changed since the last run are tokenized.
+
+Output columns match what disagreement_report.py reads, so:
+
+    python tools/ml_disagreements.py
+    python tools/disagreement_report.py review_reports/ml_disagreements.csv
+"""
+import csv
+import os
+import sys
+from pathlib import Path
+
+import django
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "dashboard.settings")
+django.setup()
+
+import joblib
+import numpy as np
+import pandas as pd
+from scipy.sparse import hstack
+
+import feature_store
+import model_store
+from tracker.models import Message
+
+OUT_DIR = ROOT / "review_reports"
+OUT_DIR.mkdir(exist_ok=True)
+OUT = OUT_DIR / "ml_disagreements.csv"
+
+fieldnames = [
+    "message_id",
+    "thread_id",
+    "timestamp",
+    "subject",
+    "old_label",
+    "new_label",
+    "ml_conf",
+    "method",
+]
+
+model_path = model_store.artifact_path("message_classifier.pkl")
+if not model_path.exists():
+    print(f"No published message classifier found ({model_path})")
+    raise SystemExit(1)
+clf = joblib.load(model_path)
+subject_vec = joblib.load(model_store.artifact_path("subject_vectorizer.pkl"))
+body_vec = joblib.load(model_store.artifact_path("body_vectorizer.pkl"))
+
+qs = (
+    Message.objects.filter(reviewed=True)
+    .exclude(ml_label__isnull=True)
+    .exclude(ml_label="")
+    .order_by("-timestamp")
+    .values("id", "msg_id", "thread_id", "timestamp", "subject", "body", "body_hash", "ml_label")
+)
+df = pd.DataFrame(list(qs))
+if df.empty:
+    print("No reviewed messages")
+    raise SystemExit(0)
+
+store = feature_store.FeatureStore.open()
+subject_counts, body_counts = store.rows(store.sync(df))
+X_subject = feature_store.transform_counts(subject_vec, subject_counts)
+X_body = feature_store.transform_counts(body_vec, body_counts)
+if X_subject is None or X_body is None:
+    # Legacy TfidfVectorizer artifacts: fall back to tokenizing the text
+    method = "ml_batch_text"
+    X_subject = subject_vec.transform(df["subject"].fillna(""))
+    X_body = body_vec.transform(df["body"].fillna(""))
+else:
+    method = "ml_batch_cached"
+print(f"Feature cache: {store.last_sync}")
+
+proba = clf.predict_proba(hstack([X_subject, X_body]).tocsr())
+best = np.argmax(proba, axis=1)
+predicted = np.asarray(clf.classes_)[best]
+confidence = proba[np.arange(len(best)), best]
+
+written = 0
+with OUT.open("w", encoding="utf-8", newline="") as outf:
+    writer = csv.DictWriter(outf, fieldnames=fieldnames)
+    writer.writeheader()
+    for row, new_label, conf in zip(df.itertuples(index=False), predicted, confidence):
+        if str(new_label) == row.ml_label:
+            continue
+        writer.writerow(
+            {
+                "message_id": row.msg_id,
+                "thread_id": row.thread_id,
+                "timestamp": row.timestamp,
+                "subject": row.subject,
+                "old_label": row.ml_label,
+                "new_label": new_label,
+                "ml_conf": f"{conf:.3f}",
+                "method": method,
+            }
+        )
+        written += 1
+
+print(f"Scored {len(df)} reviewed messages; {written} disagreements written to {OUT}")
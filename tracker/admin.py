@@ -11,6 +11,7 @@ from .models import (
     CompanyAlias,
     DomainToCompany,
     GmailFilterImportLog,
+    IngestionRun,
     KnownCompany,
     AuditEvent,
     Message,
@@ -65,6 +66,12 @@ class CustomAdminSite(admin.AdminSite):
     def each_context(self, request):
         context = super().each_context(request)
         context["message_count"] = Message.objects.count()
+        try:
+            from tracker.services.retrain_service import RetrainScheduler
+
+            context["retrain_status"] = RetrainScheduler.get_status()
+        except Exception:
+            context["retrain_status"] = None
         return context
 
 
@@ -279,6 +286,7 @@ custom_admin_site.register(UnresolvedCompany, UnresolvedCompanyAdmin)
 custom_admin_site.register(Ticket, TicketAdmin)
 custom_admin_site.register(ModelTrainingRun)
 custom_admin_site.register(ModelTrainingLabelMetric)
+custom_admin_site.register(IngestionRun)
 custom_admin_site.register(GmailFilterImportLog)
 
 
@@ -320,5 +328,6 @@ admin.site.register(CompanyAlias)
 admin.site.register(MessageLabel)
 admin.site.register(ModelTrainingRun)
 admin.site.register(ModelTrainingLabelMetric)
+admin.site.register(IngestionRun)
 admin.site.register(GmailFilterImportLog)
 admin.site.register(AppSetting)
@@ -6,9 +6,8 @@ class TrackerConfig(AppConfig):
     name = "tracker"
 
     def ready(self):
-        import tracker.signals  # 👈 This loads your signal handlers
-
-
-class TrackerConfig(AppConfig):
-    default_auto_field = "django.db.models.BigAutoField"
-    name = "tracker"
+        # Batched ThreadTracking recompute when messages are deleted.
+        # tracker.signals (companies.json export on registry edits) is not
+        # connected: it rewrites companies.json from the DB tables alone and
+        # would drop the keys maintained in the file.
+        import tracker.message_signals  # noqa: F401
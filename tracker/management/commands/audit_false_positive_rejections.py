@@ -3,9 +3,9 @@ import re
 from collections import Counter, defaultdict
 from pathlib import Path
 
-from bs4 import BeautifulSoup
 from django.core.management.base import BaseCommand
 
+import html_text
 from tracker.models import Message
 
 
@@ -31,7 +31,7 @@ def compile_patterns(patterns: dict) -> dict:
 
 def _html_to_text(html: str) -> str:
     try:
-        return BeautifulSoup(html or "", "html.parser").get_text(" ", strip=True)
+        return html_text.html_to_text(html or "")
     except Exception:
         return html or ""
 
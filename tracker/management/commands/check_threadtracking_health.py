@@ -8,6 +8,9 @@ Options:
 - --days N (default: 7)
 - --autofix (create missing ThreadTracking records)
 - --exit-nonzero-on-issues (return exit code 1 if any issues found)
+
+Missing rows are found with one query (tracker.utils.thread_reconciliation)
+and created with one bulk_create.
 """
 
 from __future__ import annotations
@@ -22,6 +25,7 @@ from django.db.models import Exists, OuterRef, Q
 from django.utils.timezone import now
 
 from tracker.models import Message, ThreadTracking
+from tracker.utils.thread_reconciliation import create_missing, messages_missing_threads
 
 
 class Command(BaseCommand):
@@ -73,13 +77,10 @@ class Command(BaseCommand):
         total_app_msgs = msg_qs.count()
         distinct_msg_companies = msg_qs.values("company_id").distinct().count()
 
-        # Find messages missing ThreadTracking
-        missing: List[Message] = []
-        for m in msg_qs.only(
-            "thread_id", "company_id", "subject", "timestamp", "ml_label", "confidence"
-        ):
-            if not ThreadTracking.objects.filter(thread_id=m.thread_id).exists():
-                missing.append(m)
+        # Find messages missing ThreadTracking (one query)
+        missing: List[Message] = list(
+            messages_missing_threads(msg_qs).select_related("company")
+        )
 
         # Build ThreadTracking-based distinct company count for comparison
         job_app_exists = Exists(
@@ -176,40 +177,34 @@ class Command(BaseCommand):
 
     @staticmethod
     def _autofix_create_tt(messages: List[Message]) -> int:
-        created = 0
-        for msg in messages:
-            try:
-                job_title = ""
-                subject = msg.subject or ""
-                if ":" in subject:
-                    parts = subject.split(":", 1)
-                    if len(parts) == 2:
-                        job_title = parts[1].strip()[:255]
-                if not job_title:
-                    job_title = subject[:255] if subject else "Unknown"
-
-                obj, was_created = ThreadTracking.objects.get_or_create(
-                    thread_id=msg.thread_id,
-                    defaults={
-                        "company": msg.company,
-                        "company_source": msg.company_source or "monitor",
-                        "job_title": job_title,
-                        "job_id": "",
-                        "status": "application",
-                        "sent_date": msg.timestamp.date(),
-                        "rejection_date": None,
-                        "interview_date": None,
-                        "ml_label": msg.ml_label,
-                        "ml_confidence": msg.confidence or 0.9,
-                        "reviewed": msg.reviewed,
-                    },
-                )
-                if was_created:
-                    created += 1
-            except Exception:
-                # best-effort; continue
-                continue
-        return created
+        created, _ = create_missing(messages, Command._build_tt)
+        return len(created)
+
+    @staticmethod
+    def _build_tt(msg: Message) -> ThreadTracking:
+        job_title = ""
+        subject = msg.subject or ""
+        if ":" in subject:
+            parts = subject.split(":", 1)
+            if len(parts) == 2:
+                job_title = parts[1].strip()[:255]
+        if not job_title:
+            job_title = subject[:255] if subject else "Unknown"
+
+        return ThreadTracking(
+            thread_id=msg.thread_id,
+            company=msg.company,
+            company_source=msg.company_source or "monitor",
+            job_title=job_title,
+            job_id="",
+            status="application",
+            sent_date=msg.timestamp.date(),
+            rejection_date=None,
+            interview_date=None,
+            ml_label=msg.ml_label,
+            ml_confidence=msg.confidence or 0.9,
+            reviewed=msg.reviewed,
+        )
 
     @staticmethod
     def _write_log(
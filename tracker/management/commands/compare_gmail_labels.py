@@ -5,7 +5,9 @@ from typing import Dict, List, Optional, Set, Tuple
 
 from django.core.management.base import BaseCommand, CommandError
 
+import gmail_metadata
 from gmail_auth import get_gmail_service
+from gmail_metadata import MetadataCache
 from tracker.models import Message
 
 
@@ -81,8 +83,43 @@ class Command(BaseCommand):
             action="store_true",
             help="Restrict app set to reviewed=True messages",
         )
+        parser.add_argument(
+            "--label-match",
+            choices=["all", "any"],
+            default="all",
+            help="Gmail set: messages with all given labels (default, Gmail semantics) or any of them",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=gmail_metadata.WORKERS,
+            help=f"Concurrent Gmail label listings / batch requests (default: {gmail_metadata.WORKERS})",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=gmail_metadata.BATCH_SIZE,
+            help=f"Metadata lookups per Gmail batch request, max 100 (default: {gmail_metadata.BATCH_SIZE})",
+        )
+        parser.add_argument(
+            "--metadata-cache",
+            type=str,
+            default=None,
+            help="SQLite file caching Gmail metadata by message id (default: <export-dir>/gmail_metadata.sqlite)",
+        )
+        parser.add_argument(
+            "--no-metadata-cache",
+            action="store_true",
+            help="Do not read or write the metadata cache",
+        )
+        parser.add_argument(
+            "--refresh-metadata",
+            action="store_true",
+            help="Refetch metadata for cached ids (cached Gmail labels are as of the last fetch)",
+        )
 
     def handle(self, *args, **options):
+        self._options = options
         export_dir = Path(options["export_dir"]).resolve()
         export_dir.mkdir(parents=True, exist_ok=True)
 
@@ -129,7 +166,7 @@ class Command(BaseCommand):
         # Fetch Gmail message ids under those labels and/or query
         gmail_ids = self._list_message_ids(
             service,
-            label_ids=list(label_ids) if label_ids else None,
+            label_ids=sorted(label_ids) if label_ids else None,
             query=gmail_query,
             limit=options.get("limit"),
         )
@@ -180,7 +217,17 @@ class Command(BaseCommand):
         app_only_path = export_dir / f"app_only_{timestamp}.csv"
 
         # Export gmail_only: include subject + labels from Gmail metadata
-        self._export_csv_gmail_only(gmail_only_path, gmail_only, id_to_name, service)
+        cache_path = options.get("metadata_cache") or export_dir / "gmail_metadata.sqlite"
+        cache = None if options.get("no_metadata_cache") else MetadataCache(cache_path)
+        try:
+            stats = self._export_csv_gmail_only(gmail_only_path, gmail_only, id_to_name, service, cache=cache)
+        finally:
+            if cache is not None:
+                cache.close()
+        self.stdout.write(
+            f"Gmail metadata: {stats.cached} cached, {stats.fetched} fetched in {stats.batches} batch request(s), "
+            f"{stats.failed} failed ({stats.seconds:.1f}s)"
+        )
         self.stdout.write(self.style.SUCCESS(f"Wrote {gmail_only_path}"))
 
         # Export app_only: include ml_label and subject from DB
@@ -232,6 +279,25 @@ class Command(BaseCommand):
         for lab_id, lab_name in sorted(id_to_name.items(), key=lambda x: x[1].lower()):
             self.stdout.write(f"  {lab_name}  (ID: {lab_id})")
 
+    def _make_service_factory(self, service):
+        """Service factory for one phase of worker threads.
+
+        The googleapiclient client is not thread-safe: the first worker gets
+        `service` (the main thread only waits while workers run) and every
+        other worker builds its own.
+        """
+        services = [service]
+
+        def factory():
+            if services:
+                return services.pop()
+            new = get_gmail_service()
+            if new is None:
+                raise CommandError("Failed to initialize Gmail service for a worker thread.")
+            return new
+
+        return factory
+
     def _list_message_ids(
         self,
         service,
@@ -239,72 +305,58 @@ class Command(BaseCommand):
         query: Optional[str] = None,
         limit: Optional[int] = None,
     ) -> Set[str]:
-        """List Gmail message IDs matching labelIds and/or query (Gmail semantics)."""
-        user = "me"
-        msg_ids: Set[str] = set()
-        page_token = None
-        fetched = 0
-        while True:
-            req = (
-                service.users()
-                .messages()
-                .list(
-                    userId=user,
-                    labelIds=label_ids,
-                    q=query,
-                    pageToken=page_token,
-                    maxResults=500,
-                )
-            )
-            resp = req.execute()
-            for m in resp.get("messages", []) or []:
-                msg_ids.add(m.get("id"))
-                fetched += 1
-                if limit and fetched >= limit:
-                    return msg_ids
-            page_token = resp.get("nextPageToken")
-            if not page_token:
-                break
-        return msg_ids
+        """List Gmail message IDs matching labelIds and/or query.
+
+        With --label-match any, each label is listed concurrently (--workers)
+        and the results are unioned; otherwise Gmail's all-labels semantics apply.
+        """
+        options = getattr(self, "_options", {})
+        return gmail_metadata.list_message_ids(
+            self._make_service_factory(service),
+            label_ids=label_ids,
+            query=query,
+            limit=limit,
+            match=options.get("label_match") or "all",
+            workers=options.get("workers") or gmail_metadata.WORKERS,
+        )
 
     def _export_csv_gmail_only(
-        self, path: Path, gmail_only_ids: Set[str], id_to_name: Dict[str, str], service
-    ) -> None:
+        self,
+        path: Path,
+        gmail_only_ids: Set[str],
+        id_to_name: Dict[str, str],
+        service,
+        cache: Optional[MetadataCache] = None,
+    ) -> gmail_metadata.FetchStats:
         """Write CSV for Gmail-only messages (present in Gmail or query set but missing from app set).
         Columns: msg_id, thread_id, subject, gmail_labels (names)
+
+        Metadata comes from `cache` where present, and otherwise from Gmail
+        batch requests (--batch-size, --workers). Ids whose lookup failed get
+        blank fields.
         """
+        options = getattr(self, "_options", {})
+        metas, stats = gmail_metadata.fetch_metadata(
+            self._make_service_factory(service),
+            sorted(gmail_only_ids),
+            cache=cache,
+            batch_size=options.get("batch_size") or gmail_metadata.BATCH_SIZE,
+            workers=options.get("workers") or gmail_metadata.WORKERS,
+            refresh=bool(options.get("refresh_metadata")),
+        )
         with open(path, "w", newline="", encoding="utf-8") as f:
             w = csv.writer(f)
             w.writerow(
                 ["msg_id", "thread_id", "subject", "gmail_labels"]
             )  # include subject for quick review
-            user = "me"
-            for mid in gmail_only_ids:
-                try:
-                    meta = (
-                        service.users()
-                        .messages()
-                        .get(
-                            userId=user,
-                            id=mid,
-                            format="metadata",
-                            metadataHeaders=["Subject"],
-                        )
-                        .execute()
-                    )
-                    thread_id = meta.get("threadId", "")
-                    labels = [
-                        id_to_name.get(lid, lid) for lid in meta.get("labelIds", [])
-                    ]
-                    # Extract Subject header if present
-                    subject = ""
-                    for h in meta.get("payload", {}).get("headers", []) or []:
-                        if h.get("name") == "Subject":
-                            subject = h.get("value", "")
-                            break
-                    w.writerow([mid, thread_id, subject, "; ".join(labels)])
-                except Exception:
+            for mid in sorted(gmail_only_ids):
+                meta = metas.get(mid)
+                if meta is None:
                     w.writerow([mid, "", "", ""])  # fallback
+                    continue
+                labels = [id_to_name.get(lid, lid) for lid in meta.label_ids]
+                w.writerow([mid, meta.thread_id, meta.subject, "; ".join(labels)])
+        return stats
 
     def _export_csv_app_only(self, path: Path, app_qs, app_only_ids: Set[str]) -> None:
         """Write CSV for App-only messages (classified by app but not labeled in Gmail).
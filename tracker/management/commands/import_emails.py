@@ -0,0 +1,122 @@
+"""Bulk-import raw email from .eml directories, .mbox files and Maildir trees.
+
+Runs everything in this process (the parser, spaCy and the model load once)
+instead of one `ingest_raw_eml` subprocess per file. Without --write it is a
+dry run that writes the same report as scripts/batch_parse_emls.py.
+
+Examples:
+    python manage.py import_emails tests/email
+    python manage.py import_emails ~/mail/export.mbox --workers 4
+    python manage.py import_emails ~/Maildir --write
+"""
+
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+import classification_window
+import eml_import
+
+
+class Command(BaseCommand):
+    help = "Bulk-import .eml/.mbox/Maildir messages in-process (dry-run report by default)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("paths", nargs="+", help=".eml files/directories, .mbox files or Maildir directories")
+        parser.add_argument(
+            "--write",
+            action="store_true",
+            help="Ingest into the database (default: dry-run classification report only)",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Worker processes for dry-run classification (DB writes always run in one process)",
+        )
+        parser.add_argument(
+            "--progress-file",
+            default=None,
+            help="Resume log of completed messages (default: logs/import_emails_<mode>.progress.jsonl)",
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Ignore the progress file and process everything again",
+        )
+        parser.add_argument("--limit", type=int, default=None, help="Stop after this many messages")
+        parser.add_argument(
+            "--report",
+            default="review_reports/batch_eml_parse_report.json",
+            help="Dry-run JSON report path (default: review_reports/batch_eml_parse_report.json)",
+        )
+        parser.add_argument(
+            "--report-every",
+            type=int,
+            default=500,
+            help="Print throughput every N messages (default: 500)",
+        )
+        parser.add_argument("--quiet", action="store_true", help="Do not print the per-message CSV table")
+
+    def handle(self, *args, **opts):
+        write = opts["write"]
+        workers = max(1, int(opts["workers"] or 1))
+        if write and workers > 1:
+            self.stdout.write("⚠️ --workers is ignored with --write (SQLite allows a single writer)")
+            workers = 1
+        progress_path = Path(
+            opts["progress_file"]
+            or f"logs/import_emails_{'write' if write else 'dryrun'}.progress.jsonl"
+        )
+
+        try:
+            rows, stats = eml_import.run_import(
+                opts["paths"],
+                write=write,
+                workers=workers,
+                progress_path=progress_path,
+                restart=opts["restart"],
+                limit=opts["limit"],
+                report_every=max(1, opts["report_every"]),
+                log=self.stdout.write,
+            )
+        except FileNotFoundError as e:
+            raise CommandError(str(e)) from e
+
+        for key, error in stats.errors[:20]:
+            self.stderr.write(f"❌ {key}: {error}")
+        if len(stats.errors) > 20:
+            self.stderr.write(f"... and {len(stats.errors) - 20} more errors")
+
+        if not write:
+            self._write_report(rows, opts)
+
+        summary = stats.summary()
+        if stats.skipped_done:
+            self.stdout.write(
+                f"Skipped {stats.skipped_done} messages already recorded in {progress_path} (use --restart to redo)"
+            )
+        self.stdout.write(self.style.SUCCESS(f"✅ {'Imported' if write else 'Classified'} {stats.line()}"))
+        if classification_window.stats.summary()["calls"]:
+            self.stdout.write(classification_window.stats.line())
+        self.stdout.write(json.dumps(summary, indent=2))
+
+    def _write_report(self, rows, opts):
+        if not opts["quiet"]:
+            self.stdout.write("file,ml_label,ml_conf,rule_label,final_label,body_len")
+            for r in rows:
+                self.stdout.write(
+                    f"{r['file']},{r['ml_label']},{r['ml_conf']:.2f},{r['rule_label']},{r['final_label']},{r['body_len']}"
+                )
+
+        counts = eml_import.summarize_rows(rows)
+        self.stdout.write("\nSUMMARY")
+        for k, v in counts.items():
+            self.stdout.write(f"{k}: {v}")
+
+        report = Path(opts["report"])
+        report.parent.mkdir(parents=True, exist_ok=True)
+        with open(report, "w", encoding="utf-8") as fh:
+            json.dump({"rows": rows, "summary": counts}, fh, indent=2, ensure_ascii=False)
+        self.stdout.write(f"\nWrote {report}")
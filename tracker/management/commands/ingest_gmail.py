@@ -6,14 +6,22 @@ from datetime import timedelta
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 
+import classification_window
+import ingest_run
+import stage_timing
 from gmail_auth import get_gmail_service  # adjust if needed
 from parser import ingest_message
 from tracker.models import IngestionStats, ProcessedMessage
+import tracker_logger
 from tracker_logger import log_console
 
 
-def fetch_all_messages(service, max_results=500, after_date=None, custom_query=None):
-    """Fetch all pages of messages from entire Gmail account, optionally filtered by date and/or custom query."""
+def fetch_all_messages(service, max_results=500, after_date=None, custom_query=None, on_page=None):
+    """Fetch all pages of messages from entire Gmail account, optionally filtered by date and/or custom query.
+
+    `on_page`, if given, is called after every page with the number of ids
+    listed so far (ingest_gmail uses it to keep the run heartbeat fresh).
+    """
     all_msgs = []
     next_token = None
 
@@ -33,6 +41,8 @@ def fetch_all_messages(service, max_results=500, after_date=None, custom_query=N
 
         resp = service.users().messages().list(**kwargs).execute()
         all_msgs.extend(resp.get("messages", []))
+        if on_page:
+            on_page(len(all_msgs))
         next_token = resp.get("nextPageToken")
         if not next_token:
             break
@@ -76,10 +86,12 @@ class Command(BaseCommand):
         import subprocess
         import sys
 
+        recorder = None
         try:
             # Print metrics before if requested
             if options.get("metrics_before"):
                 log_console("\n--- Parsing/ML Metrics BEFORE Ingestion ---\n")
+                tracker_logger.flush()  # keep queued lines ahead of the child's output
                 subprocess.run([sys.executable, "manage.py", "report_parsing_metrics"])
                 log_console("\n--- End BEFORE Metrics ---\n")
 
@@ -97,7 +109,7 @@ class Command(BaseCommand):
                     ProcessedMessage.objects.get_or_create(gmail_id=msg_id)
                     log_console(f"Successfully ingested {msg_id}")
                 except Exception as e:
-                    log_console(f"Failed: {e}")
+                    log_console(f"Failed: {e}", level="ERROR", msg_id=msg_id)
                 return
 
             # Calculate date range
@@ -105,13 +117,22 @@ class Command(BaseCommand):
             after_date = timezone.localtime(timezone.now()) - timedelta(days=days_back)
             custom_query = options.get("query")
 
+            # Run history (IngestionRun) also counts the listing API calls below
+            recorder = ingest_run.RunRecorder(source="gmail").start()
+            recorder.set_phase("listing")
+
             log_console(f"Fetching Gmail messages from last {days_back} days...")
             if custom_query:
                 log_console(f"Using custom query: {custom_query}")
 
             # Fetch all messages from entire Gmail account (no label filtering)
+            # Listing a large mailbox can take minutes: heartbeat per page so the
+            # run is not reported as stale before processing starts
             all_msgs = fetch_all_messages(
-                service, after_date=after_date, custom_query=custom_query
+                service,
+                after_date=after_date,
+                custom_query=custom_query,
+                on_page=lambda listed: recorder.heartbeat(),
             )
 
             all_msgs_by_id = {m["id"]: m for m in all_msgs}
@@ -140,27 +161,31 @@ class Command(BaseCommand):
 
             if not all_msgs_by_id:
                 log_console("No new Gmail messages found.")
+                recorder.finish()
                 return
 
             log_console(f"Processing {len(all_msgs_by_id)} messages...")
+            recorder.set_phase("processing", total=len(all_msgs_by_id))
+            classification_window.stats.reset()
 
-            fetched = inserted = ignored = 0
+            fetched = 0
 
             for msg in all_msgs_by_id.values():
                 msg_id = msg["id"]
                 try:
                     # Get basic metadata for logging
-                    msg_meta = (
-                        service.users()
-                        .messages()
-                        .get(
-                            userId="me",
-                            id=msg_id,
-                            format="metadata",
-                            metadataHeaders=["Subject", "From", "Date"],
+                    with stage_timing.span("gmail_fetch_headers"):
+                        msg_meta = (
+                            service.users()
+                            .messages()
+                            .get(
+                                userId="me",
+                                id=msg_id,
+                                format="metadata",
+                                metadataHeaders=["Subject", "From", "Date"],
+                            )
+                            .execute()
                         )
-                        .execute()
-                    )
                     headers = {
                         h["name"]: h["value"]
                         for h in msg_meta.get("payload", {}).get("headers", [])
@@ -169,7 +194,7 @@ class Command(BaseCommand):
                     date = headers.get("Date", "") or ""
 
                     # Log before processing
-                    log_console(f"Processing {date}: {subject}")
+                    log_console(f"Processing {date}: {subject}", msg_id=msg_id)
 
                     # Let ingest_message handle full classification with body
                     ret = ingest_message(service, msg_id)
@@ -183,23 +208,25 @@ class Command(BaseCommand):
                         status = ret.get("status", "unknown")
                         if status == "ignored":
                             reason = ret.get("reason", "unknown")
-                            log_console(f"  → Ignored: {reason}")
-                            ignored += 1
+                            log_console(
+                                f"  → Ignored: {reason}", msg_id=msg_id, outcome="ignored", reason=reason
+                            )
                         elif status == "inserted":
                             label = ret.get("label", "unknown")
                             confidence = ret.get("confidence", 0)
                             company = ret.get("company", "N/A")
                             source = ret.get("source", "unknown")
                             log_console(
-                                f"  → Inserted: label={label}, confidence={confidence:.2f}, company={company}, source={source}"
+                                f"  → Inserted: label={label}, confidence={confidence:.2f}, company={company}, source={source}",
+                                msg_id=msg_id,
+                                outcome="inserted",
+                                label=label,
                             )
-                            inserted += 1
                         else:
-                            log_console(f"  → {status}")
+                            log_console(f"  → {status}", msg_id=msg_id, outcome=status)
                     elif ret == "ignored":
                         # Legacy string return
-                        log_console(f"  → Ignored")
-                        ignored += 1
+                        log_console(f"  → Ignored", msg_id=msg_id, outcome="ignored")
                     else:
                         # Legacy return values
                         inserted_flag = False
@@ -211,28 +238,41 @@ class Command(BaseCommand):
                             inserted_flag = True if ret else False
 
                         if inserted_flag:
-                            log_console(f"  → Inserted")
-                            inserted += 1
+                            log_console(f"  → Inserted", msg_id=msg_id, outcome="inserted")
                         else:
-                            log_console(f"  → Skipped")
+                            log_console(f"  → Skipped", msg_id=msg_id, outcome="skipped")
+                    recorder.count(ret)
 
                 except Exception as e:
-                    log_console(f"Failed to ingest {msg_id}: {e}")
+                    recorder.error(msg_id, e)
+                    log_console(f"Failed to ingest {msg_id}: {e}", level="ERROR", msg_id=msg_id)
 
-            # Persist aggregated stats
-            stats.total_fetched += fetched
-            stats.total_inserted += inserted
-            stats.total_ignored += ignored
-            stats.save()
+            # Persist aggregated stats. ingest_message counts inserted/ignored/
+            # skipped itself (buffered); only the fetch count is added here.
+            ingest_run.stats_buffer.add(stats.date, "total_fetched", fetched)
+            run = recorder.finish()
+            stats.refresh_from_db()
+            stats.stage_timings = run.stage_timings
+            stats.save(update_fields=["stage_timings", "last_updated"])
 
             log_console(
                 f"Stats for {stats.date}: Fetched={stats.total_fetched}, Inserted={stats.total_inserted}, Ignored={stats.total_ignored}"
             )
+            log_console(recorder.line())
+            log_console(classification_window.stats.line())
+            if stats.stage_timings:
+                log_console("Stage timings (nested stages overlap):")
+                for line in stage_timing.timer.lines():
+                    log_console(f"  {line}")
 
             # Print metrics after if requested
             if options.get("metrics_after"):
                 log_console("\n--- Parsing/ML Metrics AFTER Ingestion ---\n")
+                tracker_logger.flush()  # keep queued lines ahead of the child's output
                 subprocess.run([sys.executable, "manage.py", "report_parsing_metrics"])
                 log_console("\n--- End AFTER Metrics ---\n")
         except Exception as e:
-            log_console(f"Ingestion failed: {e}")
+            if recorder and recorder.run and recorder.run.status == "running":
+                recorder.error("", e, count=False)
+                recorder.finish(status="failed")
+            log_console(f"Ingestion failed: {e}", level="ERROR")
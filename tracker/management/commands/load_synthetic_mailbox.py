@@ -0,0 +1,65 @@
+"""Bulk-load (or remove) a synthetic mailbox for view and query benchmarks.
+
+Generates --messages synthetic messages (synthetic_mailbox.py) and inserts
+them with their companies and ThreadTracking rows via
+tracker.utils.synthetic_load. Synthetic rows carry the "syn" id prefix and
+are removed again with --clear; real data is never modified.
+
+Examples:
+    python manage.py load_synthetic_mailbox --messages 100000
+    python manage.py load_synthetic_mailbox --clear
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tracker.utils import synthetic_load
+
+
+class Command(BaseCommand):
+    help = "Bulk-load a synthetic job-search mailbox into Message/ThreadTracking/Company (or --clear it)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--messages", type=int, default=100_000, help="Messages to generate (default: 100000)")
+        parser.add_argument("--seed", type=int, default=0, help="Generator seed (default: 0)")
+        parser.add_argument("--days", type=int, default=365, help="Spread messages over this many days (default: 365)")
+        parser.add_argument(
+            "--companies",
+            type=int,
+            default=None,
+            help="Company pool size; json/companies.json names first, then generated ones (default: companies.json)",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=synthetic_load.BATCH_SIZE, help="Rows per bulk insert"
+        )
+        parser.add_argument("--with-html", action="store_true", help="Also store HTML bodies (much larger database)")
+        parser.add_argument("--clear", action="store_true", help="Delete previously loaded synthetic rows and exit")
+
+    def handle(self, *args, **options):
+        if options["clear"]:
+            deleted = synthetic_load.clear_synthetic()
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"🗑️  Deleted {deleted['messages']} messages, {deleted['threads']} threads, "
+                    f"{deleted['companies']} companies"
+                )
+            )
+            return
+
+        self.stdout.write(f"Generating and loading {options['messages']} synthetic messages...")
+        try:
+            report = synthetic_load.load_mailbox(
+                options["messages"],
+                seed=options["seed"],
+                batch_size=options["batch_size"],
+                with_html=options["with_html"],
+                days=options["days"],
+                companies=options["companies"],
+            )
+        except ValueError as e:
+            raise CommandError(f"{e} Use --clear.")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ Loaded {report.messages} messages and {report.threads} threads in {report.seconds:.1f}s "
+                f"({report.companies_created} companies created, {report.companies_reused} reused)"
+            )
+        )
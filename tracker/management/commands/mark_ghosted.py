@@ -23,17 +23,26 @@ Configuration precedence for threshold days:
 2) AppSetting key 'GHOSTED_DAYS_THRESHOLD'
 3) Env var GHOSTED_DAYS_THRESHOLD
 4) Default: 30
+
+All rules are evaluated in SQL: rejections and company last activity are
+Exists/Subquery conditions on the candidate query, and the marking is one
+UPDATE for ThreadTracking and one for Company, whatever the number of open
+applications.
 """
 
 import os
 from datetime import timedelta
 
 from django.core.management.base import BaseCommand
-from django.db.models import Max, Q
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce, Greatest
 from django.utils.timezone import now
 
 from tracker.models import AppSetting, Company, Message, ThreadTracking
 
+REJECTION_LABELS = ["rejected", "rejection"]
+
 
 def _get_threshold_days(cli_days: int | None) -> int:
     if cli_days and cli_days > 0:
@@ -59,6 +68,61 @@ def _get_threshold_days(cli_days: int | None) -> int:
     return 30
 
 
+def ghosted_threads(cutoff_dt):
+    """ThreadTracking rows that should be ghosted at `cutoff_dt`.
+
+    Each row is annotated with `company_last_ts` (latest message timestamp for
+    the company, or None) and `fallback_date` (the later of sent_date and
+    interview_date, used when the company has no messages).
+    """
+    cutoff_date = cutoff_dt.date()
+    company_rejected_thread = ThreadTracking.objects.filter(
+        company_id=OuterRef("company_id"), rejection_date__isnull=False
+    )
+    company_rejection_msg = Message.objects.filter(
+        company_id=OuterRef("company_id"), ml_label__in=REJECTION_LABELS
+    )
+    thread_rejection_msg = Message.objects.filter(
+        thread_id=OuterRef("thread_id"), ml_label__in=REJECTION_LABELS
+    )
+    company_last_ts = (
+        Message.objects.filter(company_id=OuterRef("company_id"))
+        .order_by("-timestamp")
+        .values("timestamp")[:1]
+    )
+
+    # Candidate applications: no rejection yet, and either
+    # - sent_date <= cutoff, or
+    # - interview_date <= cutoff
+    return (
+        ThreadTracking.objects.filter(
+            Q(rejection_date__isnull=True)
+            & (
+                Q(sent_date__isnull=False, sent_date__lte=cutoff_date)
+                | Q(interview_date__isnull=False, interview_date__lte=cutoff_date)
+            )
+        )
+        # Headhunters and noise are never ghosted
+        .exclude(company__status="headhunter")
+        .exclude(ml_label="noise")
+        # Company-level guard: the company has sent a rejection (any thread)
+        .exclude(Exists(company_rejected_thread))
+        .exclude(Exists(company_rejection_msg))
+        # Thread-level defensive guard: a rejection message in this thread
+        .exclude(Exists(thread_rejection_msg))
+        .annotate(
+            company_last_ts=Subquery(company_last_ts),
+            fallback_date=Greatest("sent_date", Coalesce("interview_date", "sent_date")),
+        )
+        # No company activity within the threshold; without messages for the
+        # company, fall back to the application/interview dates
+        .filter(
+            Q(company_last_ts__isnull=False, company_last_ts__lte=cutoff_dt)
+            | Q(company_last_ts__isnull=True, fallback_date__lte=cutoff_date)
+        )
+    )
+
+
 class Command(BaseCommand):
     help = "Mark Applications/Messages as ghosted after inactivity"
 
@@ -80,107 +144,33 @@ class Command(BaseCommand):
         cutoff_dt = now() - timedelta(days=days)
         dry_run = bool(kwargs.get("dry_run"))
 
-        # Candidate applications: no rejection yet, and either
-        # - sent_date <= cutoff, or
-        # - interview_date <= cutoff
-        app_candidates = (
-            ThreadTracking.objects.filter(
-                Q(rejection_date__isnull=True)
-                & (
-                    Q(sent_date__isnull=False, sent_date__lte=cutoff_dt.date())
-                    | Q(
-                        interview_date__isnull=False,
-                        interview_date__lte=cutoff_dt.date(),
-                    )
-                )
+        ghosted = ghosted_threads(cutoff_dt)
+        rows = list(
+            ghosted.values_list(
+                "company__name", "job_title", "company_last_ts", "fallback_date", "status", "ml_label"
             )
-            .exclude(company__status="headhunter")
-            .exclude(ml_label="noise")
-            .select_related("company")
-        )
-
-        # Precompute companies that have sent rejections via Application or Message
-        rejecting_companies = set(
-            ThreadTracking.objects.filter(rejection_date__isnull=False)
-            .values_list("company_id", flat=True)
-            .distinct()
         )
-        msg_rejecting_companies = set(
-            Message.objects.filter(ml_label__in=["rejected", "rejection"])
-            .exclude(company=None)
-            .values_list("company_id", flat=True)
-            .distinct()
-        )
-        rejecting_companies.update(msg_rejecting_companies)
-
-        # We'll also consider message-based triggers in those threads
-        total_apps_marked = 0
-
-        # Precompute last activity per company (latest message timestamp across all threads)
-        last_activity_by_company = {
-            row["company_id"]: row["last_ts"]
-            for row in (
-                Message.objects.exclude(company=None)
-                .values("company_id")
-                .annotate(last_ts=Max("timestamp"))
-            )
-        }
-
-        for app in app_candidates:
-            # Company-level guard: if this company has sent any rejection, skip
-            if app.company_id in rejecting_companies:
-                continue
-            # Company-level guard: exclude headhunters entirely
-            if app.company and app.company.status == "headhunter":
-                continue
-            # Thread-level defensive guard: if any rejection exists in this thread, skip
-            if Message.objects.filter(
-                thread_id=app.thread_id, ml_label__in=["rejected", "rejection"]
-            ).exists():
-                continue
-
-            # Company-level last activity check
-            last_ts = last_activity_by_company.get(app.company_id)
-            if not last_ts:
-                # Fall back to application/interview dates if no messages exist for the company
-                last_date = None
-                if app.sent_date:
-                    last_date = app.sent_date
-                if app.interview_date and (
-                    not last_date or app.interview_date > last_date
-                ):
-                    last_date = app.interview_date
-                if not last_date:
-                    # No basis to evaluate inactivity
-                    continue
-                last_ts = now().__class__(
-                    last_date.year, last_date.month, last_date.day, tzinfo=now().tzinfo
-                )
-
-            # If the company has had activity within the threshold, don't ghost
-            if last_ts > cutoff_dt:
-                continue
-
-            # Mark the Application as ghosted
-            if app.status != "ghosted" or app.ml_label != "ghosted":
-                if not dry_run:
-                    app.status = "ghosted"
-                    app.ml_label = "ghosted"
-                    app.reviewed = True
-                    app.save(update_fields=["status", "ml_label", "reviewed"])
-                total_apps_marked += 1
-
-            # Also update the Company status to 'ghosted' (excluding headhunters)
-            if app.company and app.company.status not in ("headhunter", "ghosted"):
-                if not dry_run:
-                    Company.objects.filter(id=app.company_id).update(status="ghosted")
-
-            # Message labels are NOT changed to preserve original classifications
-            # (interview_invite, job_application, etc.). Ghosted status is tracked
-            # via ThreadTracking.status and ThreadTracking.ml_label fields instead.
-
+        total_apps_marked = sum(1 for *_, status, ml_label in rows if status != "ghosted" or ml_label != "ghosted")
+
+        if not dry_run:
+            with transaction.atomic():
+                # Mark the Applications as ghosted
+                ThreadTracking.objects.filter(pk__in=ghosted.values("pk")).exclude(
+                    status="ghosted", ml_label="ghosted"
+                ).update(status="ghosted", ml_label="ghosted", reviewed=True)
+                # Also update the Company status to 'ghosted' (excluding headhunters)
+                Company.objects.filter(pk__in=ghosted.values("company_id")).exclude(
+                    status__in=["headhunter", "ghosted"]
+                ).update(status="ghosted")
+
+        # Message labels are NOT changed to preserve original classifications
+        # (interview_invite, job_application, etc.). Ghosted status is tracked
+        # via ThreadTracking.status and ThreadTracking.ml_label fields instead.
+
+        for company_name, job_title, last_ts, fallback_date, _, _ in rows:
+            last_date = last_ts.date() if last_ts else fallback_date
             self.stdout.write(
-                f"👻 Ghosted: {app.company.name} – {app.job_title} (last activity {last_ts.date()}, {days}d)"
+                f"👻 Ghosted: {company_name} – {job_title} (last activity {last_date}, {days}d)"
             )
 
         self.stdout.write(
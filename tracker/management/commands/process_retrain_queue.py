@@ -0,0 +1,48 @@
+"""Run queued model retrains (debounced, one training process at a time).
+
+Started automatically by RetrainScheduler.request_retrain() when labeling
+actions queue a retrain; safe to run by hand or from cron. Exits when the
+queue is empty or immediately if another worker is already running.
+"""
+
+from django.core.management.base import BaseCommand
+
+from tracker.services.retrain_service import RetrainScheduler
+
+
+class Command(BaseCommand):
+    help = "Process queued model retrain requests after a quiet period (single-flight)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--quiet-seconds",
+            type=float,
+            default=None,
+            help="Seconds without new requests before training (default: RETRAIN_QUIET_SECONDS or 60)",
+        )
+        parser.add_argument(
+            "--now",
+            action="store_true",
+            help="Queue a request and train immediately, ignoring the quiet period",
+        )
+        parser.add_argument(
+            "--status",
+            action="store_true",
+            help="Print the current queue state and exit",
+        )
+
+    def handle(self, *args, **opts):
+        if opts.get("status"):
+            for key, value in RetrainScheduler.get_status().items():
+                self.stdout.write(f"{key}: {value}")
+            return
+
+        quiet = opts.get("quiet_seconds")
+        if opts.get("now"):
+            RetrainScheduler.request_retrain(reason="cli --now", spawn_worker=False)
+            quiet = 0
+
+        runs = RetrainScheduler.run_worker(
+            quiet_seconds=quiet, log=lambda line: self.stdout.write(line)
+        )
+        self.stdout.write(self.style.SUCCESS(f"✅ Retrain queue drained ({runs} training run(s))"))
@@ -3,6 +3,7 @@ from django.db.models import Avg, Count, Max, Min
 
 from ml_subject_classifier import predict_subject_type
 from tracker.models import Message
+from tracker.utils.label_propagation import ThreadStateAggregator
 
 
 class Command(BaseCommand):
@@ -62,6 +63,7 @@ class Command(BaseCommand):
         updated = 0
         changed = 0
 
+        batch = ThreadStateAggregator()
         for i, msg in enumerate(qs.iterator(), 1):
             result = predict_subject_type(
                 msg.subject, msg.body or "", sender=msg.sender
@@ -88,53 +90,23 @@ class Command(BaseCommand):
                 )
 
                 if not dry_run:
-                    try:
-                        from tracker.label_helpers import label_message_and_propagate
-                    except Exception:
-                        label_message_and_propagate = None
-
-                    # Preserve previous logic: if marking reviewed message as noise, clear company
-                    if new_label == "noise" and msg.reviewed:
-                        msg.company = None
-                        msg.company_source = ""
-                        if label_message_and_propagate:
-                            # Respect the CLI flag --overwrite-reviewed when applying labels
-                            label_message_and_propagate(
-                                msg,
-                                new_label,
-                                float(new_conf),
-                                overwrite_reviewed=overwrite_reviewed,
-                            )
-                        else:
-                            msg.ml_label = new_label
-                            msg.confidence = new_conf
-                            msg.save(
-                                update_fields=[
-                                    "ml_label",
-                                    "confidence",
-                                    "company",
-                                    "company_source",
-                                ]
-                            )
-                    else:
-                        if label_message_and_propagate:
-                            label_message_and_propagate(
-                                msg,
-                                new_label,
-                                float(new_conf),
-                                overwrite_reviewed=overwrite_reviewed,
-                            )
-                        else:
-                            msg.ml_label = new_label
-                            msg.confidence = new_conf
-                            msg.save(update_fields=["ml_label", "confidence"])
-
+                    # Saved and propagated to ThreadTracking in batches; a
+                    # reviewed message relabeled as noise loses its company
+                    # as Message.save() would do.
+                    batch.add(
+                        msg,
+                        new_label,
+                        float(new_conf),
+                        overwrite_reviewed=overwrite_reviewed,
+                    )
                     updated += 1
 
                 # Periodic progress output every 100 messages
                 if i % 100 == 0:
                     self.stdout.write(f"  Progress: {i}/{total}...")
 
+        batch.flush()
+
         if dry_run:
             self.stdout.write(
                 self.style.WARNING(f"[DRY RUN] Would update {changed}/{total} messages")
@@ -6,12 +6,18 @@ This fixes cases where:
 - But ThreadTracking has ml_label='ghosted' or other label
 - Causing applications to not appear in Application Details section
 
+Mismatches are counted per thread (a thread with several job_application
+messages is one mismatch) and fixed with a single UPDATE.
+
 Usage:
     python manage.py sync_message_threadtracking_labels [--dry-run]
 """
 
 from django.core.management.base import BaseCommand
+from django.utils.timezone import now
+
 from tracker.models import Message, ThreadTracking
+from tracker.utils.thread_reconciliation import label_mismatches, messages_missing_threads
 
 
 class Command(BaseCommand):
@@ -32,43 +38,36 @@ class Command(BaseCommand):
             self.stdout.write("")
 
         # Find all job_application messages
-        job_app_messages = Message.objects.filter(ml_label="job_application").select_related("company")
+        job_app_messages = Message.objects.filter(ml_label="job_application")
 
         self.stdout.write(f"Found {job_app_messages.count()} job_application messages")
         self.stdout.write("")
 
-        # Track statistics
-        mismatches = []
-        already_correct = 0
+        # Per-thread checks are set-based: one query for the threads whose
+        # ThreadTracking has another label, one for messages without a thread row
+        mismatches = [
+            {
+                "thread_id": tt.thread_id,
+                "company": tt.company.name if tt.company else "No company",
+                "old_label": tt.ml_label,
+                "new_label": "job_application",
+            }
+            for tt in label_mismatches("job_application")
+        ]
+        already_correct = ThreadTracking.objects.filter(
+            thread_id__in=job_app_messages.values("thread_id"), ml_label="job_application"
+        ).count()
+
+        missing = messages_missing_threads(job_app_messages).select_related("company")
         missing_tt = 0
-
-        # Check each message's ThreadTracking
-        for msg in job_app_messages:
-            tt = ThreadTracking.objects.filter(thread_id=msg.thread_id).first()
-
-            if not tt:
-                missing_tt += 1
-                self.stdout.write(
-                    self.style.ERROR(
-                        f"❌ No ThreadTracking for thread {msg.thread_id[:20]}... "
-                        f"({msg.company.name if msg.company else 'No company'})"
-                    )
-                )
-                continue
-
-            if tt.ml_label != "job_application":
-                company_name = msg.company.name if msg.company else "No company"
-                mismatches.append(
-                    {
-                        "thread_id": msg.thread_id,
-                        "company": company_name,
-                        "old_label": tt.ml_label,
-                        "new_label": "job_application",
-                        "tt_obj": tt,
-                    }
+        for msg in missing:
+            missing_tt += 1
+            self.stdout.write(
+                self.style.ERROR(
+                    f"❌ No ThreadTracking for thread {msg.thread_id[:20]}... "
+                    f"({msg.company.name if msg.company else 'No company'})"
                 )
-            else:
-                already_correct += 1
+            )
 
         # Report findings
         self.stdout.write("")
@@ -87,7 +86,7 @@ class Command(BaseCommand):
         self.stdout.write("Mismatches to fix:")
         for m in mismatches:
             self.stdout.write(
-                f"  {m['company']:35} | {m['old_label']:15} → job_application"
+                f"  {m['company']:35} | {str(m['old_label']):15} → job_application"
             )
         self.stdout.write("")
 
@@ -99,19 +98,15 @@ class Command(BaseCommand):
             )
             return
 
-        # Apply fixes
+        # Apply fixes (one UPDATE)
         self.stdout.write("Applying fixes...")
-        updated_count = 0
-
+        updated_count = label_mismatches("job_application").update(
+            ml_label="job_application", updated_at=now()
+        )
         for m in mismatches:
-            tt = m["tt_obj"]
-            old_label = tt.ml_label
-            tt.ml_label = "job_application"
-            tt.save(update_fields=["ml_label"])
-            updated_count += 1
             self.stdout.write(
                 self.style.SUCCESS(
-                    f"  ✅ Updated {m['company']:35} | {old_label} → job_application"
+                    f"  ✅ Updated {m['company']:35} | {m['old_label']} → job_application"
                 )
             )
 
@@ -3,10 +3,12 @@ Management command to create missing ThreadTracking records for existing Message
 
 This ensures all job_application and interview_invite messages have
 corresponding ThreadTracking records for the Application Details feature.
+Missing threads are found with one query and created with one bulk_create.
 """
 
 from django.core.management.base import BaseCommand
-from tracker.models import Message, ThreadTracking, Company
+from tracker.models import Message, ThreadTracking
+from tracker.utils.thread_reconciliation import create_missing, messages_missing_threads
 
 
 class Command(BaseCommand):
@@ -38,8 +40,7 @@ class Command(BaseCommand):
         if company_id:
             messages_qs = messages_qs.filter(company_id=company_id)
 
-        messages = messages_qs.order_by('timestamp')
-        total_messages = messages.count()
+        total_messages = messages_qs.count()
 
         if total_messages == 0:
             self.stdout.write(self.style.WARNING('No job_application messages found'))
@@ -47,47 +48,18 @@ class Command(BaseCommand):
 
         self.stdout.write(f'Found {total_messages} job application messages')
 
-        created_count = 0
-        skipped_count = 0
-        errors = []
-
-        for msg in messages:
-            # Check if ThreadTracking already exists
-            thread_exists = ThreadTracking.objects.filter(thread_id=msg.thread_id).exists()
-
-            if thread_exists:
-                skipped_count += 1
-                continue
-
-            # Create ThreadTracking record
-            if not dry_run:
-                try:
-                    ThreadTracking.objects.create(
-                        thread_id=msg.thread_id,
-                        company=msg.company,
-                        company_source=msg.company_source or '',
-                        job_title=msg.subject[:255] if msg.subject else '',
-                        job_id='',
-                        status=msg.ml_label,
-                        sent_date=msg.timestamp.date(),
-                        ml_label=msg.ml_label,
-                        ml_confidence=msg.confidence or 0.0,
-                        reviewed=msg.reviewed
-                    )
-                    created_count += 1
-                    self.stdout.write(
-                        self.style.SUCCESS(
-                            f'✓ Created ThreadTracking for {msg.company.name} - {msg.timestamp.date()} - {msg.subject[:50]}'
-                        )
-                    )
-                except Exception as e:
-                    errors.append(f'Error for thread {msg.thread_id}: {e}')
-                    self.stdout.write(self.style.ERROR(f'✗ Error: {e}'))
-            else:
-                created_count += 1
-                self.stdout.write(
-                    f'[DRY RUN] Would create ThreadTracking for {msg.company.name} - {msg.timestamp.date()} - {msg.subject[:50]}'
-                )
+        # One query for the messages whose thread has no ThreadTracking; the
+        # earliest message of each such thread backs the new record.
+        missing = messages_missing_threads(messages_qs).select_related('company').order_by('timestamp')
+        created, no_company = create_missing(missing, self._build, dry_run=dry_run)
+        created_count = len(created)
+        errors = [f'Error for thread {msg.thread_id}: message has no company' for msg in no_company]
+        skipped_count = total_messages - created_count - len(errors)
+
+        prefix = '[DRY RUN] Would create' if dry_run else '✓ Created'
+        for msg, _ in created:
+            line = f'{prefix} ThreadTracking for {msg.company.name} - {msg.timestamp.date()} - {msg.subject[:50]}'
+            self.stdout.write(line if dry_run else self.style.SUCCESS(line))
 
         # Summary
         self.stdout.write('\n' + '='*60)
@@ -105,3 +77,18 @@ class Command(BaseCommand):
             self.stdout.write(self.style.WARNING('Run without --dry-run to create records.'))
         else:
             self.stdout.write(self.style.SUCCESS('\n✅ Sync complete!'))
+
+    @staticmethod
+    def _build(msg):
+        return ThreadTracking(
+            thread_id=msg.thread_id,
+            company=msg.company,
+            company_source=msg.company_source or '',
+            job_title=msg.subject[:255] if msg.subject else '',
+            job_id='',
+            status=msg.ml_label,
+            sent_date=msg.timestamp.date(),
+            ml_label=msg.ml_label,
+            ml_confidence=msg.confidence or 0.0,
+            reviewed=msg.reviewed
+        )
@@ -0,0 +1,65 @@
+"""Deferred ThreadTracking recomputation for deleted messages.
+
+Deleting a Message used to recompute its ThreadTracking on the spot: a count,
+two ordered lookups, the latest message and a save, once per deleted row.
+Now the pre_delete hook only records the message's thread_id, and one
+grouped recompute (tracker.utils.thread_reconciliation.recompute_threads)
+runs when the surrounding transaction commits. A queryset delete runs inside
+a single transaction, so deleting 10k messages recomputes their threads with a
+handful of queries per 500 threads.
+
+Outside a transaction (autocommit) the recompute runs straight after each
+delete, as before. Thread ids recorded in a transaction that is rolled back
+are recomputed with the next flush; recomputing an unchanged thread is a
+no-op.
+"""
+
+import threading
+from typing import Set, Tuple
+
+from django.db import transaction
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
+
+from .models import Message
+
+_local = threading.local()
+
+
+def _pending() -> Set[str]:
+    if not hasattr(_local, "thread_ids"):
+        _local.thread_ids = set()
+    return _local.thread_ids
+
+
+def flush_pending() -> Tuple[int, int]:
+    """Recompute the threads recorded so far.
+
+    Returns:
+        (threads deleted, threads updated)
+    """
+    from tracker.utils.thread_reconciliation import recompute_threads
+
+    pending = _pending()
+    if not pending:
+        return 0, 0
+    thread_ids = set(pending)
+    pending.clear()
+    return recompute_threads(thread_ids)
+
+
+@receiver(pre_delete, sender=Message)
+def defer_thread_recompute_on_delete(sender, instance, using=None, **kwargs):
+    """Record the deleted message's thread and recompute it on commit.
+
+    Handles the same cases as before, in bulk:
+    1. Last message in the thread deleted -> ThreadTracking deleted
+    2. rejection_date / interview_date -> latest remaining rejection / interview
+    3. ml_label / ml_confidence -> latest remaining message
+    """
+    if not instance.thread_id:
+        return
+    _pending().add(instance.thread_id)
+    # Every delete registers the (cheap) callback: the first one to run does
+    # the work, the rest find nothing pending.
+    transaction.on_commit(flush_pending, using=using)
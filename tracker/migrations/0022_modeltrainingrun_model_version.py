@@ -0,0 +1,18 @@
+# Generated by Django 4.2.25 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tracker", "0021_add_cancelled_withdrew_fields"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="modeltrainingrun",
+            name="model_version",
+            field=models.CharField(blank=True, default="", max_length=64),
+        ),
+    ]
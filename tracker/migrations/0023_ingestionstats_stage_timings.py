@@ -0,0 +1,18 @@
+# Generated by Django 4.2.25 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tracker", "0022_modeltrainingrun_model_version"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ingestionstats",
+            name="stage_timings",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -296,9 +296,50 @@ class IngestionStats(models.Model):
     total_inserted = models.IntegerField(default=0)
     total_ignored = models.IntegerField(default=0)
     total_skipped = models.IntegerField(default=0)
+    # Per-stage timing summary of the day's latest ingest_gmail run (stage_timing.py)
+    stage_timings = models.JSONField(default=dict, blank=True)
     last_updated = models.DateTimeField(auto_now=True)
 
 
+class IngestionRun(models.Model):
+    """One ingest command run (see ingest_run.RunRecorder)."""
+
+    STATUS_CHOICES = [
+        ("running", "Running"),
+        ("completed", "Completed"),
+        ("failed", "Failed"),
+    ]
+
+    source = models.CharField(max_length=20, default="gmail")  # gmail, eml
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="running", db_index=True)
+    started_at = models.DateTimeField(default=now, db_index=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # Live progress while running (read by ingestion_status_api)
+    phase = models.CharField(max_length=20, blank=True, default="")  # listing, processing, done
+    pid = models.IntegerField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    total = models.IntegerField(default=0)  # messages to process, once listed
+    eta_seconds = models.FloatField(null=True, blank=True)
+    duration_seconds = models.FloatField(default=0)
+    processed = models.IntegerField(default=0)
+    messages_per_sec = models.FloatField(default=0)
+    api_calls = models.IntegerField(default=0)
+    bytes_fetched = models.BigIntegerField(default=0)
+    inserted = models.IntegerField(default=0)
+    ignored = models.IntegerField(default=0)
+    skipped = models.IntegerField(default=0)
+    failed = models.IntegerField(default=0)
+    outcome_counts = models.JSONField(default=dict, blank=True)  # per outcome and "outcome:reason"
+    stage_timings = models.JSONField(default=dict, blank=True)
+    errors = models.JSONField(default=list, blank=True)  # [{msg_id, error}], capped
+
+    class Meta:
+        ordering = ["-started_at"]
+
+    def __str__(self):
+        return f"IngestionRun {self.started_at.strftime('%Y-%m-%d %H:%M:%S')} ({self.source}, {self.processed} msgs)"
+
+
 class UnresolvedCompany(models.Model):
     msg_id = models.CharField(max_length=128, unique=True)
     subject = models.TextField()
@@ -396,6 +437,8 @@ class ModelTrainingRun(models.Model):
     weighted_f1 = models.FloatField(null=True, blank=True)
     label_distribution = models.TextField()  # JSON or pretty string
     classification_report = models.TextField()  # Full sklearn report
+    # model_store version published by this run (also recorded in its bundle manifest)
+    model_version = models.CharField(max_length=64, blank=True, default="")
 
     def __str__(self):
         return f"ModelTrainingRun {self.trained_at.strftime('%Y-%m-%d %H:%M:%S')} ({self.n_samples} samples)"
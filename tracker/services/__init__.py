@@ -4,10 +4,14 @@ This package contains business logic services:
 - message_service: Message-related business logic
 - company_service: Company-related business logic
 - stats_service: Statistics and analytics calculations
+- retrain_service: Debounced, single-flight model retraining
+- log_service: Tail-seek, paging and filtering for log files
 """
 
 from .company_service import CompanyService
+from .log_service import LogFilter, LogService
 from .message_service import MessageService
+from .retrain_service import RetrainScheduler
 from .stats_service import StatsService
 
-__all__ = ["MessageService", "CompanyService", "StatsService"]
+__all__ = ["MessageService", "CompanyService", "StatsService", "RetrainScheduler", "LogService", "LogFilter"]
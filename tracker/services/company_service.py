@@ -11,8 +11,6 @@ Extracted from views.py to enable better testability and code reuse.
 """
 
 import json
-import subprocess
-import sys
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
@@ -80,23 +78,13 @@ class CompanyService:
             "retrain_status": None,
         }
 
-        # Trigger model retraining if requested
+        # Queue a debounced background retrain if requested
         if retrain_model:
-            python_path = sys.executable
+            from tracker.services.retrain_service import RetrainScheduler
+
             try:
-                result = subprocess.run(
-                    [python_path, "train_model.py"],
-                    capture_output=True,
-                    text=True,
-                    timeout=60,
-                    check=False,
-                )
-                if result.returncode == 0:
-                    stats["retrain_status"] = "success"
-                else:
-                    stats["retrain_status"] = "warning"
-            except subprocess.TimeoutExpired:
-                stats["retrain_status"] = "timeout"
+                RetrainScheduler.request_retrain(reason=f"delete_company:{company_name}")
+                stats["retrain_status"] = "queued"
             except Exception as e:
                 stats["retrain_status"] = f"error: {str(e)}"
 
@@ -109,8 +97,9 @@ class CompanyService:
         """
         Merge multiple companies into one canonical company.
 
-        Reassigns all messages and applications to the canonical company,
-        updates timestamps, and deletes duplicate company records.
+        Reassigns all messages, applications and documents to the canonical
+        company, updates timestamps, and deletes duplicate company records.
+        Single-group form of ``merge_company_groups``.
 
         Args:
             company_ids: List of company IDs to merge
@@ -131,45 +120,49 @@ class CompanyService:
                 None,
             )
 
-        try:
-            canonical_company = Company.objects.get(id=canonical_id)
-            duplicate_ids = [cid for cid in company_ids if cid != canonical_id]
-            duplicates = Company.objects.filter(id__in=duplicate_ids)
+        if not Company.objects.filter(id=canonical_id).exists():
+            return (False, "Canonical company not found.", None)
 
-            # Reassign all messages and applications
-            messages_moved = Message.objects.filter(company__in=duplicates).update(
-                company=canonical_company
-            )
-            apps_moved = ThreadTracking.objects.filter(company__in=duplicates).update(
-                company=canonical_company
-            )
+        duplicate_ids = [cid for cid in company_ids if cid != canonical_id]
+        ok, error, report = CompanyService.merge_company_groups({canonical_id: duplicate_ids})
+        if not ok:
+            return (False, error, None)
 
-            # Update canonical company timestamps
-            all_messages = Message.objects.filter(company=canonical_company).order_by(
-                "timestamp"
-            )
-            if all_messages.exists():
-                canonical_company.first_contact = all_messages.first().timestamp
-                canonical_company.last_contact = all_messages.last().timestamp
-                canonical_company.save()
+        group = report.groups[0] if report.groups else None
+        stats = {
+            "canonical_name": group.canonical_name if group else "",
+            "duplicate_names": group.duplicate_names if group else [],
+            "messages_moved": report.total("messages"),
+            "applications_moved": report.total("applications"),
+        }
+        return (True, None, stats)
 
-            # Delete duplicate companies
-            duplicate_names = list(duplicates.values_list("name", flat=True))
-            duplicates.delete()
+    @staticmethod
+    def merge_company_groups(groups: Dict, dry_run: bool = False):
+        """
+        Merge many groups of duplicate companies in one transaction.
 
-            stats = {
-                "canonical_name": canonical_company.name,
-                "duplicate_names": duplicate_names,
-                "messages_moved": messages_moved,
-                "applications_moved": apps_moved,
-            }
+        See tracker.utils.company_merge: FKs are moved with one UPDATE per
+        table, first/last contact come from grouped MIN/MAX queries,
+        DomainToCompany/CompanyAlias/KnownCompany names are rewritten in bulk
+        and companies.json is rewritten once.
 
-            return (True, None, stats)
+        Args:
+            groups: {canonical_id: [duplicate ids]}
+            dry_run: Only report what would change
 
-        except Company.DoesNotExist:
-            return (False, "Canonical company not found.", None)
+        Returns:
+            Tuple of (success, error_message, MergeReport)
+        """
+        from tracker.utils.company_merge import merge_companies
+
+        try:
+            report = merge_companies(groups, dry_run=dry_run)
+        except ValueError as e:
+            return (False, str(e), None)
         except Exception as e:
             return (False, f"Merge failed: {str(e)}", None)
+        return (True, None, report)
 
     @staticmethod
     def get_alias_suggestions() -> List[Dict]:
@@ -0,0 +1,213 @@
+"""
+Log Service: Read large log files from the end without loading them whole.
+
+The log viewer used to read the entire daily log just to show its last 100 KB.
+This service:
+- seeks from the end of the file in fixed-size blocks and pages backwards by
+  byte offset (each page says where the previous one starts)
+- filters lines server-side while it scans (minimum level, msg_id, text).
+  tracker_logger writes JSON lines; older plain "[ts] message" lines are
+  matched on their text.
+- returns only the complete lines appended after a client-supplied offset,
+  for live tailing
+"""
+
+import json
+import logging
+import os
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+BLOCK_SIZE = 64 * 1024
+PAGE_BYTES = 100_000  # bytes of matching lines per page
+SCAN_LIMIT = 32 * 1024 * 1024  # bytes scanned per request when filtering
+TAIL_MAX_BYTES = 1024 * 1024  # bytes returned per live-tail poll
+
+
+@dataclass
+class LogFilter:
+    """Grep-style line filter; empty fields match everything."""
+
+    level: str = ""  # minimum level, e.g. "WARNING"
+    msg_id: str = ""
+    text: str = ""  # case-insensitive substring
+
+    def __post_init__(self):
+        self.level = (self.level or "").upper()
+        self.text = (self.text or "").lower()
+        self._min_level = logging.getLevelName(self.level) if self.level else 0
+        if not isinstance(self._min_level, int):
+            self._min_level = 0
+
+    @property
+    def active(self) -> bool:
+        return bool(self._min_level or self.msg_id or self.text)
+
+    def matches(self, line: str) -> bool:
+        if not self.active:
+            return True
+        if self.text and self.text not in line.lower():
+            return False
+        if not (self._min_level or self.msg_id):
+            return True
+        record = parse_line(line)
+        if self._min_level:
+            level = logging.getLevelName(record.get("level", "INFO"))
+            if not isinstance(level, int) or level < self._min_level:
+                return False
+        if self.msg_id:
+            if "msg_id" in record:
+                return str(record["msg_id"]) == self.msg_id
+            return self.msg_id in line
+        return True
+
+
+def parse_line(line: str) -> Dict:
+    """JSON record for a tracker_logger line; {"msg": line} for plain text."""
+    if line.startswith("{"):
+        try:
+            record = json.loads(line)
+            if isinstance(record, dict):
+                return record
+        except ValueError:
+            pass
+    return {"msg": line}
+
+
+def display_line(line: str) -> str:
+    """Readable form of a log line: "[ts] LEVEL msg key=value" for JSON records."""
+    record = parse_line(line)
+    if "ts" not in record:
+        return line
+    extras = " ".join(f"{k}={v}" for k, v in record.items() if k not in ("ts", "level", "logger", "msg", "exc"))
+    text = f"[{record['ts']}] {record.get('level', ''):<7} {record.get('msg', '')}"
+    if extras:
+        text += f"  ({extras})"
+    if record.get("exc"):
+        text += "\n" + record["exc"]
+    return text
+
+
+def iter_lines_backward(path, end: Optional[int] = None, block_size: int = BLOCK_SIZE) -> Iterator[Tuple[int, bytes]]:
+    """Yield (start_offset, line) from `end` (default: EOF) back to the start of the file.
+
+    Reads `block_size` bytes at a time from the end; lines are yielded without
+    their trailing newline, newest first.
+    """
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        pos = end = size if end is None else max(0, min(end, size))
+        head = b""  # start of the oldest line seen so far, which may begin in an earlier block
+        while pos > 0:
+            read = min(block_size, pos)
+            pos -= read
+            f.seek(pos)
+            buf = f.read(read) + head
+            parts = buf.split(b"\n")
+            head = parts[0]
+            offset = pos + len(buf)
+            for part in reversed(parts[1:]):
+                offset -= len(part)
+                yield offset, part
+                offset -= 1  # the newline before this line
+        if end:
+            yield 0, head
+
+
+def _decode(line: bytes) -> str:
+    return line.decode("utf-8", errors="replace").rstrip("\r")
+
+
+class LogService:
+    """Service layer for reading and filtering log files."""
+
+    @staticmethod
+    def read_page(
+        path,
+        before: Optional[int] = None,
+        log_filter: Optional[LogFilter] = None,
+        max_bytes: int = PAGE_BYTES,
+        scan_limit: int = SCAN_LIMIT,
+    ) -> Dict:
+        """
+        Return the matching lines that end before byte offset `before` (default: EOF).
+
+        Returns:
+            Dictionary with keys:
+            - lines: matching lines, oldest first
+            - start: offset to pass as `before` for the previous (older) page
+            - end: offset this page was read up to
+            - size: current file size
+            - has_more: True if older content remains
+            - scanned: bytes examined
+        """
+        log_filter = log_filter or LogFilter()
+        size = os.path.getsize(path)
+        end = size if before is None else max(0, min(before, size))
+        lines: List[str] = []
+        collected = 0
+        start = end
+        for offset, raw in iter_lines_backward(path, end):
+            if log_filter.active and end - offset > scan_limit:
+                break
+            start = offset
+            if not raw:
+                continue
+            text = _decode(raw)
+            if log_filter.matches(text):
+                lines.append(text)
+                collected += len(raw) + 1
+                if collected >= max_bytes:
+                    break
+        lines.reverse()
+        return {
+            "lines": lines,
+            "start": start,
+            "end": end,
+            "size": size,
+            "has_more": start > 0,
+            "scanned": end - start,
+        }
+
+    @staticmethod
+    def read_since(
+        path,
+        offset: int,
+        log_filter: Optional[LogFilter] = None,
+        max_bytes: int = TAIL_MAX_BYTES,
+    ) -> Dict:
+        """
+        Return complete lines appended after byte `offset` (for live tail).
+
+        If the file is now shorter than `offset` (rotated or truncated),
+        reading restarts at 0 and `reset` is True.
+
+        Returns:
+            Dictionary with keys: lines, offset (next offset to poll from), size, reset
+        """
+        log_filter = log_filter or LogFilter()
+        size = os.path.getsize(path)
+        reset = offset > size
+        if reset or offset < 0:
+            offset = 0
+        if offset == size:
+            return {"lines": [], "offset": offset, "size": size, "reset": reset}
+        with open(path, "rb") as f:
+            f.seek(offset)
+            data = f.read(min(max_bytes, size - offset))
+        # Hold back a trailing partial line until its newline has been written
+        cut = data.rfind(b"\n")
+        if cut != -1:
+            data = data[: cut + 1]
+            lines = [_decode(raw) for raw in data.split(b"\n")[:-1] if raw]
+        elif len(data) < max_bytes:
+            return {"lines": [], "offset": offset, "size": size, "reset": reset}
+        else:
+            lines = [_decode(data)]  # one line longer than max_bytes: return it in pieces
+        return {
+            "lines": [line for line in lines if log_filter.matches(line)],
+            "offset": offset + len(data),
+            "size": size,
+            "reset": reset,
+        }
@@ -12,6 +12,8 @@ from pathlib import Path
 from typing import List, Optional, Set, Tuple
 
 from django.db import transaction
+from django.db.models import Q
+from django.utils.timezone import now
 from tracker.models import Company, Message, ThreadTracking
 
 logger = logging.getLogger(__name__)
@@ -20,15 +22,35 @@ logger = logging.getLogger(__name__)
 class MessageService:
     """Service class for message-related business logic."""
 
+    @staticmethod
+    def _normalize_ids(message_ids: List) -> List[int]:
+        """Coerce posted ids to ints, dropping blanks/garbage while keeping order."""
+        ids = []
+        seen = set()
+        for raw in message_ids:
+            try:
+                pk = int(str(raw).strip())
+            except (TypeError, ValueError):
+                continue
+            if pk not in seen:
+                seen.add(pk)
+                ids.append(pk)
+        return ids
+
     @staticmethod
     def bulk_label_messages(
         message_ids: List[int],
         label: str,
         confidence: float = 1.0,
         overwrite_reviewed: bool = True,
-    ) -> Tuple[int, Set[str]]:
+    ) -> Tuple[int, int]:
         """Bulk update label for multiple messages.
 
+        Set-based equivalent of calling ``label_message_and_propagate`` per message
+        and then marking the touched ThreadTracking rows reviewed: one SELECT for the
+        messages, one ThreadStateAggregator flush (``bulk_update`` + batched thread
+        propagation) and one UPDATE for the threads, all in a single transaction.
+
         Args:
             message_ids: List of message IDs to update
             label: New label to apply
@@ -36,33 +58,85 @@ class MessageService:
             overwrite_reviewed: Whether to overwrite reviewed flags
 
         Returns:
-            Tuple of (updated_count, touched_thread_ids)
+            Tuple of (updated_count, threads_updated)
         """
-        from tracker.label_helpers import label_message_and_propagate
+        from tracker.utils.label_propagation import ThreadStateAggregator
+
+        ids = MessageService._normalize_ids(message_ids)
+        if not ids or not label:
+            return 0, 0
+
+        with transaction.atomic():
+            found = {m.pk: m for m in Message.objects.filter(pk__in=ids)}
+            missing = len(ids) - len(found)
+            if missing:
+                logger.warning(f"{missing} message(s) not found during bulk label")
+
+            # Keep submission order so thread propagation matches sequential labeling
+            batch = ThreadStateAggregator(batch_size=0)
+            msgs = []
+            for pk in ids:
+                if pk in found and batch.add(
+                    found[pk], label, confidence, overwrite_reviewed=overwrite_reviewed
+                ):
+                    msgs.append(found[pk])
+            batch.flush()
+
+            touched_threads = {m.thread_id for m in msgs if m.thread_id}
+            threads_updated = 0
+            if touched_threads:
+                threads_updated = ThreadTracking.objects.filter(
+                    thread_id__in=touched_threads
+                ).update(ml_label=label, reviewed=True, updated_at=now())
+
+        return len(msgs), threads_updated
 
-        updated_count = 0
-        touched_threads = set()
+    @staticmethod
+    def bulk_reassign_company(message_ids: List[int], company: Optional[Company]) -> int:
+        """Reassign many messages to ``company`` (or None) without touching labels.
 
-        for msg_id in message_ids:
-            try:
-                msg = Message.objects.get(pk=msg_id)
-                label_message_and_propagate(
-                    msg,
-                    label,
-                    confidence=confidence,
-                    overwrite_reviewed=overwrite_reviewed,
-                )
-                if msg.thread_id:
-                    touched_threads.add(msg.thread_id)
-                updated_count += 1
-            except Message.DoesNotExist:
-                logger.warning(f"Message {msg_id} not found during bulk label")
-                continue
-            except Exception as e:
-                logger.error(f"Error labeling message {msg_id}: {e}")
-                continue
+        Uses two UPDATE statements instead of a get+save per message. Reviewed noise
+        messages are still forced to no company, as ``Message.save`` would do.
 
-        return updated_count, touched_threads
+        Returns:
+            Number of messages updated
+        """
+        ids = MessageService._normalize_ids(message_ids)
+        if not ids:
+            return 0
+
+        with transaction.atomic():
+            qs = Message.objects.filter(pk__in=ids)
+            reviewed_noise = Q(ml_label="noise", reviewed=True)
+            updated = qs.exclude(reviewed_noise).update(company=company)
+            updated += qs.filter(reviewed_noise).update(company=None)
+        return updated
+
+    @staticmethod
+    def bulk_delete_messages(message_ids: List[int]) -> Tuple[int, int, int]:
+        """Delete many messages and recompute their threads once.
+
+        The Message delete hook (tracker.message_signals) only records thread
+        ids; they are recomputed together at the end of this transaction, so
+        the cost no longer grows with one recompute per deleted message.
+
+        Returns:
+            Tuple of (messages_deleted, threads_deleted, threads_updated)
+        """
+        from tracker.message_signals import flush_pending
+
+        ids = MessageService._normalize_ids(message_ids)
+        if not ids:
+            return 0, 0, 0
+
+        with transaction.atomic():
+            deleted = 0
+            for i in range(0, len(ids), 500):
+                deleted += Message.objects.filter(pk__in=ids[i : i + 500]).delete()[1].get(
+                    Message._meta.label, 0
+                )
+            threads_deleted, threads_updated = flush_pending()
+        return deleted, threads_deleted, threads_updated
 
     @staticmethod
     def update_company_registry(
@@ -222,6 +296,7 @@ class MessageService:
         """
         try:
             from parser import parse_subject
+            from tracker.utils.label_propagation import propagate_labels_to_threads
 
             msg = Message.objects.get(pk=message_id)
 
@@ -237,8 +312,6 @@ class MessageService:
             # Update company if extraction found a new one
             new_company_name = result.get("company")
             if new_company_name:
-                from django.utils.timezone import now
-
                 company, _ = Company.objects.get_or_create(
                     name=new_company_name,
                     defaults={
@@ -251,11 +324,8 @@ class MessageService:
 
             msg.save()
 
-            # Update related thread tracking if exists
-            if msg.thread_id:
-                threads = ThreadTracking.objects.filter(thread_id=msg.thread_id)
-                for thread in threads:
-                    thread.update_from_messages()
+            # Update related thread tracking (one lookup, shared with bulk labeling)
+            propagate_labels_to_threads([msg])
 
             return True, None
 
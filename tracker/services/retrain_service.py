@@ -0,0 +1,263 @@
+"""Retrain Service: debounced, single-flight model retraining.
+
+Labeling actions call `RetrainScheduler.request_retrain()` instead of spawning
+`train_model.py` directly. Requests are recorded in `model/retrain_queue.json`
+and a single background worker (`manage.py process_retrain_queue`) waits for a
+quiet period with no new requests before running one training process. Requests
+that arrive while training is running are coalesced into one follow-up run.
+
+`train_model.py` itself holds `model/.training.lock`, so manual runs from the
+metrics page or the CLI can never overlap with a scheduled run.
+"""
+
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from django.conf import settings
+
+import model_store
+
+logger = logging.getLogger(__name__)
+
+
+def _quiet_seconds() -> float:
+    try:
+        return max(0.0, float(os.getenv("RETRAIN_QUIET_SECONDS", "60")))
+    except ValueError:
+        return 60.0
+
+
+class RetrainScheduler:
+    """Coalesces retrain requests and runs at most one training process at a time."""
+
+    STATE_PATH = model_store.MODEL_DIR / "retrain_queue.json"
+    STATE_LOCK_PATH = model_store.MODEL_DIR / ".retrain_queue.lock"
+    WORKER_LOCK_PATH = model_store.MODEL_DIR / ".retrain_worker.lock"
+    LOG_PATH = Path("logs") / "retrain.log"
+
+    # --- state file helpers ---
+
+    @classmethod
+    def _read_state(cls) -> Dict:
+        try:
+            with open(cls.STATE_PATH, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (ValueError, OSError):
+            return {}
+
+    @classmethod
+    def _update_state(cls, **changes) -> Dict:
+        """Read-modify-write the queue state under a short-lived mutex.
+
+        Values may be callables taking the old value (used for counters).
+        Raises TimeoutError, without writing, if the mutex cannot be taken.
+        """
+        mutex = model_store.TrainingLock(cls.STATE_LOCK_PATH)
+        if not mutex.acquire(timeout=5.0, poll=0.05):
+            raise TimeoutError(f"Retrain queue state is locked ({cls.STATE_LOCK_PATH})")
+        try:
+            state = cls._read_state()
+            for key, value in changes.items():
+                state[key] = value(state.get(key)) if callable(value) else value
+            model_store.atomic_write_json(cls.STATE_PATH, state)
+            return state
+        finally:
+            mutex.release()
+
+    # --- public API ---
+
+    @classmethod
+    def request_retrain(cls, reason: str = "", spawn_worker: bool = True) -> Dict:
+        """Queue a retrain and make sure a worker is running to service it.
+
+        Returns the updated queue state. Cheap enough to call on every labeling action.
+        """
+        ts = time.time()
+        state = cls._update_state(
+            pending=True,
+            requests=lambda n: (n or 0) + 1,
+            first_requested_at=lambda v: v or datetime.now().isoformat(),
+            last_requested_ts=ts,
+            last_requested_at=datetime.now().isoformat(),
+            last_reason=reason,
+        )
+        if spawn_worker and not cls.worker_running():
+            cls._spawn_worker()
+        return state
+
+    @classmethod
+    def worker_running(cls) -> bool:
+        return model_store.TrainingLock(cls.WORKER_LOCK_PATH).is_locked()
+
+    @classmethod
+    def get_status(cls) -> Dict:
+        """Queue state for display: pending requests, due time, running training, last result."""
+        state = cls._read_state()
+        training = model_store.TrainingLock().owner()
+        quiet = _quiet_seconds()
+        status = {
+            "pending": bool(state.get("pending")),
+            "requests": int(state.get("requests") or 0),
+            "first_requested_at": state.get("first_requested_at"),
+            "last_requested_at": state.get("last_requested_at"),
+            "last_reason": state.get("last_reason"),
+            "quiet_seconds": int(quiet),
+            "due_in_seconds": None,
+            "worker_running": cls.worker_running(),
+            "training_running": training is not None,
+            "training_pid": (training or {}).get("pid"),
+            "training_started_at": state.get("started_at") if training else None,
+            "last_finished_at": state.get("last_finished_at"),
+            "last_returncode": state.get("last_returncode"),
+            "last_duration_seconds": state.get("last_duration_seconds"),
+            "runs_completed": int(state.get("runs_completed") or 0),
+            "model_version": model_store.current_version(),
+        }
+        if status["pending"] and state.get("last_requested_ts"):
+            status["due_in_seconds"] = max(
+                0, int(state["last_requested_ts"] + quiet - time.time())
+            )
+        return status
+
+    @classmethod
+    def run_worker(
+        cls,
+        quiet_seconds: Optional[float] = None,
+        poll_seconds: float = 2.0,
+        log: Callable[[str], None] = logger.info,
+    ) -> int:
+        """Service the queue until it is empty. Returns the number of training runs.
+
+        Exits immediately if another worker already holds the worker lock.
+        """
+        quiet = _quiet_seconds() if quiet_seconds is None else quiet_seconds
+        worker_lock = model_store.TrainingLock(cls.WORKER_LOCK_PATH)
+        runs = 0
+        while worker_lock.acquire():
+            try:
+                runs += cls._drain(quiet, poll_seconds, log)
+            finally:
+                worker_lock.release()
+            # A request may have landed after the last check but before the release,
+            # when request_retrain() still saw this worker alive. Go round again.
+            if not cls._read_state().get("pending"):
+                break
+        return runs
+
+    @classmethod
+    def _drain(cls, quiet: float, poll_seconds: float, log) -> int:
+        runs = 0
+        while True:
+            state = cls._read_state()
+            if not state.get("pending"):
+                return runs
+
+            wait = float(state.get("last_requested_ts") or 0) + quiet - time.time()
+            if wait > 0:
+                time.sleep(min(wait, poll_seconds))
+                continue
+            if model_store.TrainingLock().is_locked():
+                # A manual run is in progress; it will not include later labels, so wait.
+                time.sleep(poll_seconds)
+                continue
+
+            claimed = {}
+
+            def _claim(n, claimed=claimed):
+                claimed["requests"] = int(n or 0)
+                return 0
+
+            try:
+                cls._update_state(
+                    pending=False,
+                    requests=_claim,
+                    first_requested_at=None,
+                    started_at=datetime.now().isoformat(),
+                )
+            except TimeoutError as e:
+                # Nothing was claimed; look at the queue again on the next pass
+                log(f"[retrain] {e}; retrying")
+                time.sleep(poll_seconds)
+                continue
+            n_requests = claimed["requests"]
+            log(f"[retrain] Training for {n_requests} coalesced request(s)")
+
+            started = time.monotonic()
+            returncode = cls._run_training()
+            duration = round(time.monotonic() - started, 1)
+
+            retry = returncode == model_store.EXIT_LOCKED
+            # Must not be lost: on a lost race the claimed requests are only queued again here
+            while True:
+                try:
+                    cls._update_state(
+                        last_finished_at=datetime.now().isoformat(),
+                        last_returncode=returncode,
+                        last_duration_seconds=duration,
+                        runs_completed=lambda n: (n or 0) + (0 if retry else 1),
+                        # Lost the race to a manual run: put the claimed requests back
+                        pending=lambda p: bool(p) or retry,
+                        requests=lambda n: (n or 0) + (n_requests if retry else 0),
+                    )
+                    break
+                except TimeoutError as e:
+                    log(f"[retrain] {e}; retrying the result update")
+                    time.sleep(poll_seconds)
+            log(f"[retrain] Training finished rc={returncode} in {duration}s")
+            if not retry:
+                runs += 1
+
+    @classmethod
+    def _run_training(cls) -> int:
+        """Run train_model.py in a child process, appending its output to logs/retrain.log."""
+        base_dir = Path(settings.BASE_DIR)
+        log_path = base_dir / cls.LOG_PATH
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(log_path, "a", encoding="utf-8") as log_file:
+            log_file.write(f"\n=== Scheduled retrain {datetime.now().isoformat()} ===\n")
+            log_file.flush()
+            try:
+                result = subprocess.run(
+                    [sys.executable, "train_model.py"],
+                    cwd=base_dir,
+                    stdout=log_file,
+                    stderr=subprocess.STDOUT,
+                    check=False,
+                )
+                return result.returncode
+            except Exception as e:
+                logger.exception("Scheduled retrain failed to start")
+                log_file.write(f"Failed to start training: {e}\n")
+                return -1
+
+    @classmethod
+    def _spawn_worker(cls):
+        """Start `manage.py process_retrain_queue` detached from the web request."""
+        kwargs = {}
+        if os.name == "nt":
+            kwargs["creationflags"] = getattr(subprocess, "DETACHED_PROCESS", 0) | getattr(
+                subprocess, "CREATE_NEW_PROCESS_GROUP", 0
+            )
+        else:
+            kwargs["start_new_session"] = True
+        try:
+            # pylint: disable=consider-using-with
+            subprocess.Popen(
+                [sys.executable, "manage.py", "process_retrain_queue"],
+                cwd=Path(settings.BASE_DIR),
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                **kwargs,
+            )
+        except Exception:
+            logger.exception("Could not start retrain worker")
+            raise
@@ -1,6 +1,27 @@
+import itertools
+from datetime import timedelta
+
 import pytest
 
-from tracker.tests.test_helpers import FakeManager
+from tracker.tests.test_helpers import BASE, FakeManager
+
+
+@pytest.fixture(autouse=True)
+def scheduler_paths(tmp_path, monkeypatch):
+    """Keep retrain queue state and locks in tmp_path and never start a real worker.
+
+    Labeling views call RetrainScheduler.request_retrain(), which would otherwise
+    write model/retrain_queue.json and spawn process_retrain_queue.
+    """
+    import model_store
+    from tracker.services.retrain_service import RetrainScheduler
+
+    monkeypatch.setattr(RetrainScheduler, "STATE_PATH", tmp_path / "retrain_queue.json")
+    monkeypatch.setattr(RetrainScheduler, "STATE_LOCK_PATH", tmp_path / ".queue.lock")
+    monkeypatch.setattr(RetrainScheduler, "WORKER_LOCK_PATH", tmp_path / ".worker.lock")
+    monkeypatch.setattr(RetrainScheduler, "_spawn_worker", classmethod(lambda cls: None))
+    monkeypatch.setattr(model_store, "TRAINING_LOCK_PATH", tmp_path / ".training.lock")
+    return tmp_path
 
 
 @pytest.fixture
@@ -27,3 +48,49 @@ def fake_stats():
             pass
 
     return Stats()
+
+
+@pytest.fixture
+def company(db):
+    from tracker.models import Company
+
+    return Company.objects.create(name="Acme", domain="acme.com", first_contact=BASE, last_contact=BASE)
+
+
+@pytest.fixture
+def make_message(db):
+    """Create a Message: make_message(company, thread_id, day=0, ml_label=None, **fields).
+
+    The timestamp is BASE + `day` days unless given; msg_id defaults to a
+    unique "<thread_id>-<n>".
+    """
+    from tracker.models import Message
+
+    counter = itertools.count()
+
+    def make(company, thread_id, day=0, ml_label=None, **fields):
+        fields.setdefault("msg_id", f"{thread_id}-{next(counter)}")
+        fields.setdefault("timestamp", BASE + timedelta(days=day))
+        fields.setdefault("subject", "Update")
+        fields.setdefault("sender", f"jobs@{company.domain}" if company and company.domain else "jobs@example.com")
+        fields.setdefault("confidence", 0.5)
+        return Message.objects.create(thread_id=thread_id, company=company, ml_label=ml_label, **fields)
+
+    return make
+
+
+@pytest.fixture
+def make_thread(db):
+    """Create a ThreadTracking row: make_thread(company, thread_id, **fields).
+
+    Defaults to an "Engineer" application sent on BASE's date.
+    """
+    from tracker.models import ThreadTracking
+
+    def make(company, thread_id, **fields):
+        fields.setdefault("job_title", "Engineer")
+        fields.setdefault("status", "application")
+        fields.setdefault("sent_date", BASE.date())
+        return ThreadTracking.objects.create(thread_id=thread_id, company=company, **fields)
+
+    return make
@@ -0,0 +1,79 @@
+import random
+
+import pytest
+
+import alias_index
+from alias_index import AliasIndex, Match, MatchStore
+
+WORDS = ["acme", "global", "tech", "data", "systems", "labs", "north", "river", "blue", "cyber", "health", "group"]
+SUFFIXES = ["", " Inc", " LLC", ", Inc.", " Corp", " & the Bowhead Family of Companies"]
+
+
+def _names(rng, count):
+    names = set()
+    while len(names) < count:
+        name = " ".join(rng.sample(WORDS, rng.randint(1, 3))).title() + rng.choice(SUFFIXES)
+        if rng.random() < 0.3:  # drop a character: near-duplicate spelling
+            i = rng.randrange(len(name))
+            name = name[:i] + name[i + 1 :]
+        names.add(name)
+    return sorted(names)
+
+
+def _brute_force(name, canonical):
+    sim = overlap = None
+    for canon in canonical:
+        ratio = alias_index.similarity(name, canon)
+        if ratio >= alias_index.SIMILARITY_THRESHOLD and alias_index._better(sim, canon, ratio):
+            sim = (canon, ratio)
+        jaccard = alias_index.token_overlap(name, canon)
+        if jaccard >= alias_index.OVERLAP_THRESHOLD and alias_index._better(overlap, canon, jaccard):
+            overlap = (canon, jaccard)
+    return Match(sim=sim, overlap=overlap)
+
+
+@pytest.fixture
+def corpus():
+    names = _names(random.Random(7), 360)
+    return names[:120], names[120:]
+
+
+def test_index_matches_all_pairs_scan(corpus):
+    canonical, queries = corpus
+    index = AliasIndex(canonical)
+    for name in queries:
+        assert index.match(name) == _brute_force(name, canonical), name
+
+
+def test_candidate_equal_to_canonical_matches_itself():
+    index = AliasIndex(["Acme Robotics", "Acme Robotic"])
+    assert index.match("Acme Robotics").best == ("Acme Robotics", 1.0)
+
+
+def test_store_only_compares_new_names_and_canonicals(tmp_path, corpus):
+    canonical, queries = corpus
+    path = tmp_path / "state.json"
+
+    store = MatchStore(path)
+    store.update(queries[:180], canonical[:90])
+    store.save()
+    assert store.stats["compared_full"] == 180
+
+    store = MatchStore(path).load()
+    result = store.update(queries, canonical)
+    assert store.stats == {"names": 240, "compared_full": 60, "compared_new_canonicals": 180, "reused": 0}
+    full = AliasIndex(canonical)
+    assert result == {name: full.match(name) for name in queries}
+
+    store.save()
+    store = MatchStore(path).load()
+    store.update(queries, canonical)
+    assert store.stats["reused"] == 240
+
+
+def test_store_recompares_names_matched_to_removed_canonical(tmp_path):
+    store = MatchStore(tmp_path / "state.json")
+    store.update(["Acme Robotics Inc", "Globex"], ["Acme Robotics", "Initech"])
+    result = store.update(["Acme Robotics Inc", "Globex"], ["Acme Robotic", "Initech"])
+    assert store.stats["compared_full"] == 1
+    assert result["Acme Robotics Inc"].best[0] == "Acme Robotic"
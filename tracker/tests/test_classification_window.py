@@ -0,0 +1,52 @@
+import classification_window as cw
+
+
+def test_window_drops_quoted_reply_and_signature():
+    text = (
+        "Hi,\nWe'd like to schedule an interview next week.\n\n"
+        "-- \nJane Recruiter\nAcme Corp\n\n"
+        "On Mon, Jan 5, 2026 at 9:00 AM Me <me@example.com> wrote:\n"
+        "> Unfortunately I can't make Friday\n"
+    )
+    result = cw.window(text)
+    assert "schedule an interview" in result
+    assert "Jane Recruiter" not in result
+    assert "Unfortunately" not in result
+
+    # Outlook-style reply header and inline (HTML-derived) "On ... wrote:"
+    assert cw.window("Thanks!\nFrom: Bob <b@x.com>\nSent: Monday\nTo: me\nold text") == "Thanks!\n"
+    assert cw.window("Great news  On Tue, Jan 6, 2026, Acme <a@b.com> wrote: old") == "Great news  "
+    # Never strip the whole message
+    assert cw.window("On Monday you wrote: hello") == "On Monday you wrote: hello"
+
+
+def test_window_keeps_wrote_inside_a_sentence():
+    text = (
+        "Thanks for applying. We followed up on your request and the recruiter wrote: "
+        "please schedule an interview for Tuesday."
+    )
+    assert cw.window(text) == text
+    assert cw.window("Hi\non Monday the team wrote:\nwe will call you") == "Hi\non Monday the team wrote:\nwe will call you"
+
+
+def test_window_keeps_head_and_tail_of_long_text():
+    text = "List-Id: <news.example.com>\n\n" + "promo " * 10000 + "click to unsubscribe"
+    result = cw.window(text, max_chars=1000, tail_chars=100)
+    assert result.startswith("List-Id:")
+    assert result.endswith("unsubscribe")
+    assert len(result) < 1200
+    assert cw.window("short text", max_chars=1000) == "short text"
+    assert cw.window(text, max_chars=0) == text
+
+
+def test_stats_percentiles():
+    stats = cw.WindowStats()
+    for i in range(1, 101):
+        stats.record(i * 10, i, i / 1000)
+    summary = stats.summary()
+    assert summary["calls"] == 100
+    assert summary["cut"] == 100
+    assert summary["window_chars_p50"] in (50, 51)
+    assert summary["window_chars_p99"] == 99
+    assert summary["classify_ms_max"] == 100.0
+    assert "p99" in stats.line()
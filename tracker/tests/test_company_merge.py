@@ -0,0 +1,136 @@
+import json
+from datetime import timedelta
+
+import pytest
+
+from tracker.models import (
+    Company,
+    CompanyAlias,
+    CompanyDocument,
+    DomainToCompany,
+    KnownCompany,
+    Message,
+    ThreadTracking,
+)
+from tracker.services import CompanyService
+from tracker.tests.test_helpers import BASE
+from tracker.utils.company_merge import merge_companies
+
+
+@pytest.fixture
+def companies_json(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    path = tmp_path / "json" / "companies.json"
+    path.parent.mkdir()
+    path.write_text(
+        json.dumps(
+            {
+                "known": ["Acme", "Acme Inc", "Globex Corp"],
+                "domain_to_company": {"acme.com": "Acme Inc", "globex.com": "Globex"},
+                "aliases": {"ACME Robotics": "Acme Inc"},
+                "JobSites": {"Globex": "https://globex.example/jobs"},
+                "ats_domains": ["lever.co"],
+            }
+        ),
+        encoding="utf-8",
+    )
+    return path
+
+
+def _company(name, day):
+    return Company.objects.create(name=name, first_contact=BASE, last_contact=BASE + timedelta(days=day))
+
+
+@pytest.fixture
+def groups(db, make_message, make_thread):
+    acme, acme_inc, acme_llc = _company("Acme", 0), _company("Acme Inc", 0), _company("Acme LLC", 0)
+    globex_corp, globex = _company("Globex Corp", 0), _company("Globex", 0)
+    make_message(acme, "t1", 5)
+    make_message(acme_inc, "t2", 2)
+    make_message(acme_llc, "t3", 20)
+    make_message(globex, "t4", 9)
+    make_thread(acme_llc, "tt1")
+    CompanyDocument.objects.create(company=globex, file="company_docs/offer.pdf", description="Offer")
+    DomainToCompany.objects.create(domain="acme.com", company="Acme Inc")
+    CompanyAlias.objects.create(alias="ACME Robotics", company="Acme Inc")
+    KnownCompany.objects.create(name="Acme Inc")
+    KnownCompany.objects.create(name="Globex")
+    return {"acme": acme, "acme_inc": acme_inc, "acme_llc": acme_llc, "globex_corp": globex_corp, "globex": globex}
+
+
+def test_merges_many_groups_in_one_transaction(groups, companies_json, django_capture_on_commit_callbacks):
+    c = groups
+    with django_capture_on_commit_callbacks(execute=True):
+        report = merge_companies(
+            {c["acme"].pk: [c["acme_inc"].pk, c["acme_llc"].pk], c["globex_corp"].pk: [c["globex"].pk]},
+            dry_run=False,
+        )
+
+    assert report.applied
+    assert (report.total("messages"), report.total("applications"), report.total("documents")) == (3, 1, 1)
+    assert set(Company.objects.values_list("name", flat=True)) == {"Acme", "Globex Corp"}
+    assert Message.objects.filter(company=c["acme"]).count() == 3
+    assert ThreadTracking.objects.get(thread_id="tt1").company_id == c["acme"].pk
+    assert CompanyDocument.objects.get().company_id == c["globex_corp"].pk
+
+    acme = Company.objects.get(pk=c["acme"].pk)
+    assert acme.first_contact == BASE + timedelta(days=2)
+    assert acme.last_contact == BASE + timedelta(days=20)
+
+    assert DomainToCompany.objects.get(domain="acme.com").company == "Acme"
+    assert CompanyAlias.objects.get(alias="ACME Robotics").company == "Acme"
+    assert set(CompanyAlias.objects.filter(company="Acme").values_list("alias", flat=True)) == {
+        "ACME Robotics",
+        "Acme Inc",
+        "Acme LLC",
+    }
+    assert set(KnownCompany.objects.values_list("name", flat=True)) == {"Acme", "Globex Corp"}
+
+    data = json.loads(companies_json.read_text(encoding="utf-8"))
+    assert data["known"] == ["Acme", "Globex Corp"]
+    assert data["domain_to_company"] == {"acme.com": "Acme", "globex.com": "Globex Corp"}
+    assert data["aliases"]["ACME Robotics"] == "Acme"
+    assert data["aliases"]["Globex"] == "Globex Corp"
+    assert data["JobSites"] == {"Globex Corp": "https://globex.example/jobs"}
+    assert data["ats_domains"] == ["lever.co"]
+
+
+def test_dry_run_reports_without_writing(groups, companies_json, django_assert_max_num_queries):
+    c = groups
+    before = companies_json.read_text(encoding="utf-8")
+    with django_assert_max_num_queries(8):
+        report = merge_companies({c["acme"].pk: [c["acme_inc"].pk, c["acme_llc"].pk]})
+
+    assert not report.applied
+    group = report.groups[0]
+    assert group.duplicate_names == ["Acme Inc", "Acme LLC"]
+    assert (group.messages, group.applications) == (2, 1)
+    assert (report.domain_mappings, report.alias_rows, report.known_rows) == (1, 1, 1)
+    assert "domain_to_company: acme.com → Acme" in report.json_changes
+    assert Company.objects.count() == 5
+    assert companies_json.read_text(encoding="utf-8") == before
+
+
+def test_rejects_overlapping_groups(groups):
+    c = groups
+    with pytest.raises(ValueError):
+        merge_companies({c["acme"].pk: [c["acme_inc"].pk], c["globex"].pk: [c["acme_inc"].pk]})
+    with pytest.raises(ValueError):
+        merge_companies({c["acme"].pk: [c["acme_inc"].pk], c["acme_inc"].pk: [c["acme_llc"].pk]})
+
+
+def test_service_merge_keeps_its_contract(groups, companies_json):
+    c = groups
+    ok, error, stats = CompanyService.merge_companies([str(c["acme"].pk), str(c["acme_llc"].pk)], str(c["acme"].pk))
+    assert ok and error is None
+    assert stats == {
+        "canonical_name": "Acme",
+        "duplicate_names": ["Acme LLC"],
+        "messages_moved": 1,
+        "applications_moved": 1,
+    }
+    assert CompanyService.merge_companies(["999998", "999999"], "999999") == (
+        False,
+        "Canonical company not found.",
+        None,
+    )
@@ -0,0 +1,76 @@
+import mailbox
+from email.message import EmailMessage
+
+import pytest
+
+import eml_import
+
+
+def _message(n):
+    msg = EmailMessage()
+    msg["From"] = f"jobs{n}@example.com"
+    msg["Subject"] = f"Application {n}"
+    msg.set_content(f"Thank you for applying, message {n}")
+    return msg
+
+
+@pytest.fixture
+def mail_tree(tmp_path):
+    eml_dir = tmp_path / "emls"
+    eml_dir.mkdir()
+    for n in range(2):
+        (eml_dir / f"m{n}.eml").write_bytes(bytes(_message(n)))
+    box = mailbox.mbox(str(tmp_path / "export.mbox"))
+    for n in range(2, 5):
+        box.add(_message(n))
+    box.flush()
+    maildir = mailbox.Maildir(str(tmp_path / "Maildir"))
+    maildir.add(_message(5))
+    maildir.flush()
+    return tmp_path
+
+
+def test_iter_sources_streams_eml_mbox_and_maildir(mail_tree):
+    sources = list(eml_import.iter_sources([mail_tree]))
+    assert len(sources) == 6
+    subjects = sorted(loader().split("Subject: ")[1].splitlines()[0] for _, loader in sources)
+    assert subjects == [f"Application {n}" for n in range(6)]
+    assert any("export.mbox#" in key for key, _ in sources)
+
+
+def test_run_import_resumes_from_progress_file(mail_tree, monkeypatch):
+    calls = []
+
+    def fake_classify(key, raw):
+        calls.append(key)
+        if "m1.eml" in key:
+            raise ValueError("bad message")
+        return {
+            "file": key,
+            "subject": "s",
+            "sender_domain": "example.com",
+            "ml_label": "job_application",
+            "ml_conf": 0.9,
+            "rule_label": None,
+            "final_label": "job_application",
+            "body_len": 10,
+            "body_preview": "x",
+            "header_hints": {},
+        }
+
+    monkeypatch.setattr(eml_import, "init_worker", lambda: None)
+    monkeypatch.setattr(eml_import, "classify_raw", fake_classify)
+    progress = mail_tree / "progress.jsonl"
+
+    rows, stats = eml_import.run_import([mail_tree], progress_path=progress, limit=4, log=lambda _: None)
+    assert stats.messages == 4
+    assert len(stats.errors) == 1
+    assert len(rows) == 3
+
+    calls.clear()
+    rows, stats = eml_import.run_import([mail_tree], progress_path=progress, log=lambda _: None)
+    # 3 done earlier are skipped; the failed one is retried with the 2 never tried
+    assert stats.skipped_done == 3
+    assert len(calls) == 3
+    assert len(rows) == 5  # earlier rows are kept in the report
+    assert eml_import.summarize_rows(rows)["total"] == 5
@@ -0,0 +1,93 @@
+import base64
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from googleapiclient.errors import BatchError, HttpError
+
+import fake_gmail
+import gmail_auth
+import gmail_metadata
+from fake_gmail import FakeGmailConfig, FakeGmailService, build_message
+
+NOW = datetime.now(timezone.utc)
+
+
+@pytest.fixture
+def messages():
+    return [
+        build_message(
+            f"m{i}",
+            f"t{i // 2}",
+            f"Recruiting <jobs@acme{i % 3}.com>",
+            "Interview invitation" if i % 4 == 0 else f"Application {i}",
+            NOW - timedelta(days=i),
+            text=f"Thanks for applying ({i})",
+            html=f"<p>Thanks for applying ({i})</p>",
+            label_ids=["INBOX", "Label_1"] if i % 2 else ["INBOX"],
+        )
+        for i in range(12)
+    ] + [build_message("spam1", "ts", "x@spam.example", "Win", NOW - timedelta(hours=1), text="spam", label_ids=["SPAM"])]
+
+
+def test_list_pages_queries_and_fixture_dir(messages, tmp_path):
+    fake_gmail.write_fixture_dir(tmp_path, messages, [{"id": "Label_1", "name": "Job Hunt", "type": "user"}])
+    service = FakeGmailService.from_dir(tmp_path)
+    msgs = service.users().messages()
+
+    page = msgs.list(userId="me", maxResults=5).execute()
+    assert [m["id"] for m in page["messages"]] == ["m0", "m1", "m2", "m3", "m4"]  # newest first, no spam
+    rest = msgs.list(userId="me", maxResults=5, pageToken=page["nextPageToken"]).execute()
+    assert rest["messages"][0]["id"] == "m5"
+
+    after = (NOW - timedelta(days=6)).strftime("%Y/%m/%d")
+    found = msgs.list(userId="me", q=f"after:{after} label:job-hunt -subject:interview").execute()
+    assert {m["id"] for m in found["messages"]} == {"m1", "m3", "m5"}
+    assert len(msgs.list(userId="me", labelIds=["INBOX", "Label_1"]).execute()["messages"]) == 6
+    assert msgs.list(userId="me", q="in:spam").execute()["messages"] == [{"id": "spam1", "threadId": "ts"}]
+
+    meta = msgs.get(userId="me", id="m0", format="metadata", metadataHeaders=["Subject"]).execute()
+    assert meta["payload"]["headers"] == [{"name": "Subject", "value": "Interview invitation"}]
+    full = msgs.get(userId="me", id="m0", format="full").execute()
+    html = [p for p in full["payload"]["parts"] if p["mimeType"] == "text/html"][0]
+    assert base64.urlsafe_b64decode(html["body"]["data"]).decode() == "<p>Thanks for applying (0)</p>"
+    assert "Job Hunt" in {lab["name"] for lab in service.users().labels().list(userId="me").execute()["labels"]}
+
+
+def test_batch_history_and_quotas(messages):
+    service = FakeGmailService(messages, config=FakeGmailConfig(units_total=30))
+    seen = {}
+    batch = service.new_batch_http_request(callback=lambda rid, resp, exc: seen.__setitem__(rid, exc or resp["id"]))
+    for i in range(7):
+        batch.add(service.users().messages().get(userId="me", id=f"m{i}", format="minimal"), request_id=f"r{i}")
+    batch.execute()
+    assert service.http_requests == 1
+    assert [seen[f"r{i}"] for i in range(6)] == [f"m{i}" for i in range(6)]
+    assert isinstance(seen["r6"], HttpError) and seen["r6"].resp.status == 403  # 7 x 5 units > 30
+
+    with pytest.raises(BatchError):
+        big = service.new_batch_http_request()
+        for i in range(fake_gmail.MAX_BATCH + 1):
+            big.add(service.users().messages().get(userId="me", id="m0"))
+
+    unlimited = FakeGmailService(messages)
+    latest = int(unlimited.users().getProfile(userId="me").execute()["historyId"])
+    history = unlimited.users().history().list(userId="me", startHistoryId=str(latest - 3), labelId="INBOX").execute()
+    assert [h["messages"][0]["id"] for h in history["history"]] == ["m1", "m0"]  # spam1 is not in INBOX
+    assert history["historyId"] == str(latest)
+
+
+def test_injected_errors_are_retried_by_callers(messages):
+    service = FakeGmailService(messages, config=FakeGmailConfig(error_rate=0.3, seed=3))
+    metas, stats = gmail_metadata.fetch_metadata(lambda: service, [m["id"] for m in messages], sleep=lambda s: None)
+    assert stats.retries > 0 and stats.failed == 0
+    assert len(metas) == len(messages)
+
+
+def test_get_gmail_service_uses_fixture_dir(messages, tmp_path, monkeypatch):
+    fake_gmail.write_fixture_dir(tmp_path, messages)
+    monkeypatch.setenv("GMAIL_FAKE_DIR", str(tmp_path))
+    monkeypatch.setenv("GMAIL_FAKE_LATENCY_MS", "1")
+    service = gmail_auth.get_gmail_service()
+    assert isinstance(service, FakeGmailService)
+    assert service.config.latency == 0.001
+    assert service.users().messages().get(userId="me", id="m3").execute()["threadId"] == "t1"
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+import feature_store
+from feature_store import FeatureStore
+
+BODIES = [
+    "thank you for applying to the data engineer role",
+    "unfortunately we will not move forward with your application",
+    "please share your availability for an interview next week",
+    "thank you for your application to the security analyst role",
+    "we would like to schedule an interview for the analyst role",
+    "your application has been received thank you for applying",
+]
+
+
+def _frame(ids, bodies, hashes=None):
+    return pd.DataFrame(
+        {
+            "id": ids,
+            "subject": [f"subject {i}" for i in ids],
+            "body": bodies,
+            "body_hash": hashes or [f"h{i}" for i in ids],
+        }
+    )
+
+
+@pytest.fixture
+def store_path(tmp_path, monkeypatch):
+    path = tmp_path / "features.npz"
+    monkeypatch.setattr(feature_store, "STORE_PATH", path)
+    return path
+
+
+def test_sync_vectorizes_only_new_or_changed_rows(store_path):
+    df = _frame([1, 2, 3], BODIES[:3])
+    store = FeatureStore.open()
+    first = store.sync(df)
+    assert store.last_sync == {"cached": 0, "vectorized": 3}
+
+    reopened = FeatureStore.open()
+    df2 = _frame([1, 2, 3, 4], BODIES[:3] + [BODIES[3]], hashes=["h1", "changed", "h3", "h4"])
+    positions = reopened.sync(df2)
+    assert reopened.last_sync == {"cached": 2, "vectorized": 2}
+    assert positions[0] == first[0]
+
+    subject_counts, body_counts = reopened.rows(positions)
+    expected = feature_store.hasher(feature_store.BODY_FEATURES).transform(df2["body"])
+    assert (body_counts != expected).nnz == 0
+    assert subject_counts.shape == (4, feature_store.SUBJECT_FEATURES)
+
+
+def test_compaction_drops_superseded_rows(store_path):
+    store = FeatureStore.open()
+    store.sync(_frame([1, 2], BODIES[:2]))
+    positions = store.sync(_frame([1, 2], BODIES[2:4], hashes=["x1", "x2"]))
+    assert store.stale_rows() == 0
+    assert store.subject.shape[0] == 2
+    _, body_counts = store.rows(positions)
+    expected = feature_store.hasher(feature_store.BODY_FEATURES).transform(BODIES[2:4])
+    assert (body_counts != expected).nnz == 0
+
+
+def test_fit_vectorizer_matches_tfidf_vectorizer():
+    n_features = feature_store.BODY_FEATURES
+    counts = feature_store.hasher(n_features).transform(BODIES)
+    cached = feature_store.fit_vectorizer(counts, n_features, min_df=2, max_df=0.9)
+    reference = TfidfVectorizer(lowercase=True, ngram_range=(1, 2), min_df=2, max_df=0.9)
+    ref_matrix = reference.fit_transform(BODIES).toarray()
+
+    # Same pruned vocabulary (columns are hash-ordered rather than alphabetical)
+    terms = reference.get_feature_names_out()
+    columns = cached.named_steps["select"].columns
+    assert set(feature_store.feature_names_sample(BODIES, n_features, columns)) == set(terms)
+
+    ours = feature_store.transform_counts(cached, counts).toarray()
+    assert ours.shape == ref_matrix.shape
+    assert np.allclose(np.sort(ours, axis=1), np.sort(ref_matrix, axis=1))
+    assert np.allclose(cached.transform(BODIES).toarray(), ours)
+
+    limited = feature_store.select_columns(counts, min_df=2, max_df=0.9, max_features=5)
+    assert len(limited) == 5 and set(limited) <= set(columns)
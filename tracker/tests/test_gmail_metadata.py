@@ -0,0 +1,168 @@
+import csv
+import io
+import threading
+
+import httplib2
+import pytest
+from django.core.management import call_command
+from googleapiclient.errors import HttpError
+
+import gmail_metadata
+from gmail_metadata import MetadataCache, fetch_metadata, list_message_ids
+from tracker.management.commands import compare_gmail_labels
+from tracker.models import Message
+
+
+class FakeRequest:
+    def __init__(self, fn):
+        self.fn = fn
+
+    def execute(self):
+        return self.fn()
+
+
+class FakeBatch:
+    def __init__(self, gmail, callback):
+        self.gmail, self.callback, self.requests = gmail, callback, []
+
+    def add(self, request, request_id):
+        self.requests.append((request_id, request))
+
+    def execute(self):
+        with self.gmail.lock:
+            self.gmail.batches.append(len(self.requests))
+        for request_id, request in self.requests:
+            try:
+                self.callback(request_id, request.execute(), None)
+            except HttpError as exc:
+                self.callback(request_id, None, exc)
+
+
+class FakeGmail:
+    """Just enough of the Gmail service: labels.list, messages.list/get and batches."""
+
+    def __init__(self, messages, page_size=2, rate_limited=()):
+        self.messages_by_id = messages  # id -> (thread_id, subject, label_ids)
+        self.page_size = page_size
+        self.rate_limited = set(rate_limited)  # ids failing with 429 once
+        self.lock = threading.Lock()
+        self.gets, self.batches, self.lists = [], [], []
+
+    def users(self):
+        return self
+
+    def labels(self):
+        return self
+
+    def messages(self):
+        return self
+
+    def new_batch_http_request(self, callback):
+        return FakeBatch(self, callback)
+
+    def list(self, userId, labelIds=None, q=None, pageToken=None, maxResults=None, fields=None):
+        if labelIds is None and q is None:  # labels.list
+            return FakeRequest(lambda: {"labels": [{"id": "L1", "name": "Jobs"}, {"id": "L2", "name": "Offers"}]})
+
+        def run():
+            with self.lock:
+                self.lists.append(tuple(labelIds or ()))
+            ids = sorted(m for m, (_, _, labels) in self.messages_by_id.items() if set(labelIds or ()) <= set(labels))
+            start = int(pageToken or 0)
+            resp = {"messages": [{"id": m} for m in ids[start : start + self.page_size]]}
+            if start + self.page_size < len(ids):
+                resp["nextPageToken"] = str(start + self.page_size)
+            return resp
+
+        return FakeRequest(run)
+
+    def get(self, userId, id, format, metadataHeaders, fields=None):
+        def run():
+            with self.lock:
+                self.gets.append(id)
+                if id in self.rate_limited:
+                    self.rate_limited.discard(id)
+                    raise HttpError(httplib2.Response({"status": 429}), b"rateLimitExceeded")
+            if id not in self.messages_by_id:
+                raise HttpError(httplib2.Response({"status": 404}), b"Not Found")
+            thread_id, subject, labels = self.messages_by_id[id]
+            headers = [{"name": "Subject", "value": subject}]
+            return {"id": id, "threadId": thread_id, "labelIds": labels, "payload": {"headers": headers}}
+
+        return FakeRequest(run)
+
+
+@pytest.fixture
+def gmail():
+    return FakeGmail(
+        {
+            "m1": ("t1", "Application received", ["L1"]),
+            "m2": ("t2", "Interview", ["L1", "L2"]),
+            "m3": ("t3", "Offer", ["L2"]),
+            "m4": ("t4", "Next steps", ["L1"]),
+            "m5": ("t5", "Newsletter", []),
+        }
+    )
+
+
+def test_list_message_ids_all_vs_any(gmail):
+    assert list_message_ids(lambda: gmail, ["L1", "L2"]) == {"m2"}
+    assert list_message_ids(lambda: gmail, ["L1", "L2"], match="any", workers=2) == {"m1", "m2", "m3", "m4"}
+    assert sorted(gmail.lists) == [("L1",), ("L1",), ("L1", "L2"), ("L2",)]  # L1 takes two pages
+    assert len(list_message_ids(lambda: gmail, ["L1"], limit=2)) == 2
+
+
+def test_fetch_metadata_batches_retries_and_caches(gmail, tmp_path):
+    gmail.rate_limited = {"m3"}
+    sleeps = []
+    with MetadataCache(tmp_path / "meta.sqlite") as cache:
+        metas, stats = fetch_metadata(
+            lambda: gmail, ["m1", "m2", "m3", "m4", "missing"], cache=cache, batch_size=2, sleep=sleeps.append
+        )
+        assert metas["m3"] == gmail_metadata.MessageMeta("m3", "t3", "Offer", ["L2"])
+        assert (stats.fetched, stats.failed, stats.retries, stats.cached) == (4, 1, 1, 0)
+        assert gmail.batches == [2, 2, 1, 1] and sleeps == [1.0]
+        assert len(cache) == 4
+
+    gmail.gets.clear()
+    with MetadataCache(tmp_path / "meta.sqlite") as cache:
+        metas, stats = fetch_metadata(lambda: gmail, ["m1", "m2", "m3", "m4", "m5"], cache=cache)
+    assert (stats.cached, stats.fetched) == (4, 1)
+    assert gmail.gets == ["m5"]
+    assert metas["m2"].label_ids == ["L1", "L2"]
+
+
+@pytest.mark.django_db
+def test_command_exports_gmail_only_from_cache(gmail, tmp_path, monkeypatch):
+    monkeypatch.setattr(compare_gmail_labels, "get_gmail_service", lambda: gmail)
+    Message.objects.create(
+        msg_id="m1",
+        thread_id="t1",
+        subject="Application received",
+        sender="jobs@example.com",
+        body="",
+        timestamp="2025-01-01T00:00Z",
+        ml_label="job_application",
+    )
+    for _ in range(2):
+        out = io.StringIO()
+        call_command(
+            "compare_gmail_labels",
+            gmail_label_names="Jobs,Offers",
+            label_match="any",
+            export_dir=str(tmp_path),
+            stdout=out,
+        )
+    assert "Gmail only (missed by app): 3" in out.getvalue()
+    assert "3 cached, 0 fetched" in out.getvalue()
+    assert sorted(gmail.gets) == ["m2", "m3", "m4"]  # second run read the cache
+
+    latest = sorted(tmp_path.glob("gmail_only_*.csv"))[-1]
+    with open(latest, newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ["msg_id", "thread_id", "subject", "gmail_labels"]
+    assert rows[1:] == [
+        ["m2", "t2", "Interview", "Jobs; Offers"],
+        ["m3", "t3", "Offer", "Offers"],
+        ["m4", "t4", "Next steps", "Jobs"],
+    ]
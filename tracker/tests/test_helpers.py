@@ -1,3 +1,11 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
+# Reference time for rows built by the make_message/make_thread fixtures (conftest.py)
+BASE = timezone.now() - timedelta(days=30)
+
+
 class FakeMessageRecord:
     def __init__(self, data):
         self.__dict__.update(data)
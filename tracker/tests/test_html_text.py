@@ -0,0 +1,72 @@
+import random
+
+import pytest
+
+import html_text
+
+SAMPLES = [
+    # ATS confirmation with head styles/scripts and table layout
+    "<html><head><style>td {font: 12px Arial}</style><script>track('open');</script></head>"
+    "<body><table><tr><td>Thank you for applying to <b>Acme&nbsp;Robotics</b>!</td></tr>"
+    '<tr><td><a href="https://jobs.acme.example/status?id=1&amp;utm=mail">Check status</a></td></tr>'
+    "</table><noscript><img src='pixel.gif'>Enable images</noscript></body></html>",
+    # Entities, numeric references and a Windows-1252 style &#147;
+    "<p>Caf&eacute; &amp; Co &#147;quoted&#148; &#x2014; &copy 2025 &unknown; &lt;tag&gt;</p>",
+    # Comments, doctype, CDATA and template/ruby content bs4 hides
+    "<!DOCTYPE html><div>before<!-- hidden -->after<![CDATA[raw]]>"
+    "<template><p>not shown</p></template><ruby>漢<rp>(</rp><rt>kan</rt><rp>)</rp></ruby></div>",
+    # Sloppy markup: unclosed tags, stray end tags, void elements closed twice
+    "<div><p>one<p>two</span><br>three</br>four<br/>five<img></img>six</div></template>seven",
+    # Plain text that merely contains angle brackets
+    "a < b and c<d, x > y",
+]
+
+TAGS = ["p", "div", "a", "b", "br", "img", "script", "style", "template", "noscript", "rt", "td", "table", "svg"]
+TEXT = ["hello", " x ", "&amp;", "&nbsp;", "&foo;", "&#147;", "&#0;", "&copy", "<", "&", "\n", "é", "</br>", "<br/>"]
+
+
+def _random_markup(rng):
+    out = []
+    for _ in range(rng.randint(1, 30)):
+        roll = rng.random()
+        tag = rng.choice(TAGS)
+        if roll < 0.3:
+            out.append(f'<a href="https://e.example/{rng.randint(0, 9)}">' if tag == "a" else f"<{tag}>")
+        elif roll < 0.5:
+            out.append(f"</{tag}>")
+        elif roll < 0.55:
+            out.append(f"<!-- {rng.choice(TEXT)} -->")
+        elif roll < 0.58:
+            out.append(f"<![CDATA[{rng.choice(TEXT)}]]>")
+        else:
+            out.append(rng.choice(TEXT))
+    return "".join(out)
+
+
+@pytest.mark.parametrize("separator,skip", [(" ", ()), ("\n", ("noscript",))])
+def test_stream_backend_matches_beautifulsoup(separator, skip):
+    rng = random.Random(42)
+    docs = SAMPLES + [_random_markup(rng) for _ in range(2000)]
+    for doc in docs:
+        expected = html_text.extract(doc, separator, skip, backend="bs4")
+        assert html_text.extract(doc, separator, skip, backend="stream") == expected, doc
+
+
+def test_default_extract_matches_plain_get_text():
+    # Message bodies used to be BeautifulSoup(...).get_text(" ", strip=True) without
+    # decompose(); dropping script/style explicitly must not change that output
+    from bs4 import BeautifulSoup
+
+    rng = random.Random(7)
+    for doc in SAMPLES + [_random_markup(rng) for _ in range(2000)]:
+        expected = BeautifulSoup(doc, "html.parser").get_text(separator=" ", strip=True)
+        assert html_text.html_to_text(doc, backend="stream") == expected, doc
+        assert html_text.html_to_text(doc, backend="bs4") == expected, doc
+
+
+def test_extract_text_and_links():
+    result = html_text.extract(SAMPLES[0], backend="stream")
+    assert result.text == "Thank you for applying to Acme\xa0Robotics ! Check status Enable images"
+    assert result.links == ["https://jobs.acme.example/status?id=1&utm=mail"]
+    assert "Enable images" not in html_text.html_to_text(SAMPLES[0], skip=("noscript",))
+    assert html_text.extract("") == ("", [])
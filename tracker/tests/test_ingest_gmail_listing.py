@@ -0,0 +1,43 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from django.test import RequestFactory
+from django.utils import timezone as dj_timezone
+
+import ingest_run
+from fake_gmail import FakeGmailService, build_message
+from tracker.management.commands.ingest_gmail import fetch_all_messages
+from tracker.models import IngestionRun
+from tracker.views.api import STALE_AFTER, ingestion_status_api
+
+NOW = datetime.now(timezone.utc)
+
+
+def _service(count):
+    return FakeGmailService(
+        build_message(f"m{i}", f"t{i}", "jobs@acme.example", f"Application {i}", NOW - timedelta(hours=i), text="hi")
+        for i in range(count)
+    )
+
+
+def test_on_page_called_after_every_page():
+    pages = []
+    msgs = fetch_all_messages(_service(25), max_results=10, on_page=pages.append)
+    assert len(msgs) == 25
+    assert pages == [10, 20, 25]
+
+
+@pytest.mark.django_db
+def test_listing_keeps_run_heartbeat_fresh():
+    recorder = ingest_run.RunRecorder(source="gmail").start()
+    recorder.set_phase("listing")
+    stale = dj_timezone.now() - STALE_AFTER - timedelta(minutes=1)
+    IngestionRun.objects.filter(pk=recorder.run.pk).update(heartbeat_at=stale)
+
+    fetch_all_messages(_service(5), max_results=2, on_page=lambda listed: recorder.heartbeat())
+
+    data = json.loads(ingestion_status_api(RequestFactory().get("/api/ingestion_status/")).content)
+    assert data["is_running"] and not data["stale"]
+    assert data["run"]["phase"] == "listing"
+    recorder.finish()
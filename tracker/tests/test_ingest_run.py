@@ -0,0 +1,45 @@
+import datetime
+
+import pytest
+
+import ingest_run
+from tracker.models import IngestionRun, IngestionStats
+
+
+@pytest.mark.django_db
+def test_stats_buffer_batches_updates_until_flush(django_assert_num_queries):
+    day = datetime.date(2025, 9, 29)
+    IngestionStats.objects.create(date=day)
+    buffer = ingest_run.StatsBuffer(flush_every=100)
+    buffer.begin()
+    with django_assert_num_queries(0):
+        for _ in range(5):
+            buffer.add(day, "total_ignored")
+        buffer.add(day, "total_skipped", 2)
+    with django_assert_num_queries(1):
+        buffer.end()
+    stats = IngestionStats.objects.get(date=day)
+    assert (stats.total_ignored, stats.total_skipped) == (5, 2)
+
+    # Outside a run every increment is written straight away
+    buffer.add(day, "total_inserted")
+    assert IngestionStats.objects.get(date=day).total_inserted == 1
+
+
+@pytest.mark.django_db
+def test_run_recorder_saves_outcomes_api_usage_and_errors():
+    recorder = ingest_run.RunRecorder(source="gmail").start()
+    for ret in ({"status": "inserted"}, {"status": "ignored", "reason": "newsletter_headers"}, "skipped", "ignored"):
+        recorder.count(ret)
+    recorder.error("m5", ValueError("boom"))
+    ingest_run.api_usage.record(1500)
+    run = recorder.finish()
+
+    run = IngestionRun.objects.get(pk=run.pk)
+    assert run.status == "completed"
+    assert (run.processed, run.inserted, run.ignored, run.skipped, run.failed) == (5, 1, 2, 1, 1)
+    assert run.outcome_counts["ignored:newsletter_headers"] == 1
+    assert (run.api_calls, run.bytes_fetched) == (1, 1500)
+    assert run.errors == [{"msg_id": "m5", "error": "ValueError: boom"}]
+    assert run.finished_at is not None and run.messages_per_sec > 0
+    assert not ingest_run.stats_buffer.buffering
@@ -0,0 +1,40 @@
+import json
+from datetime import timedelta
+
+import pytest
+from django.test import RequestFactory
+from django.utils import timezone
+
+import ingest_run
+from tracker.models import IngestionRun
+from tracker.views.api import ingestion_status_api
+
+
+def _status():
+    return json.loads(ingestion_status_api(RequestFactory().get("/api/ingestion_status/")).content)
+
+
+@pytest.mark.django_db
+def test_status_reports_live_progress_from_run_registry(django_assert_num_queries):
+    recorder = ingest_run.RunRecorder(source="gmail").start()
+    recorder.set_phase("processing", total=40)
+    for _ in range(ingest_run.PROGRESS_EVERY):
+        recorder.count("inserted")
+
+    with django_assert_num_queries(1):
+        data = _status()
+    assert data["is_running"] and not data["stale"]
+    run = data["run"]
+    assert (run["id"], run["phase"], run["processed"], run["total"]) == (recorder.run.pk, "processing", 10, 40)
+    assert run["eta_seconds"] is not None and run["heartbeat_at"]
+
+    recorder.finish()
+    data = _status()
+    assert not data["is_running"] and data["run"] is None
+
+
+@pytest.mark.django_db
+def test_status_ignores_run_with_stale_heartbeat():
+    IngestionRun.objects.create(source="gmail", heartbeat_at=timezone.now() - timedelta(minutes=10))
+    data = _status()
+    assert not data["is_running"] and data["stale"]
@@ -95,3 +95,72 @@ class LabelPropagationTests(TestCase):
         tt = ThreadTracking.objects.filter(thread_id="T-BULK-1").first()
         self.assertIsNotNone(tt, "ThreadTracking should be created by bulk label view")
         self.assertEqual(tt.ml_label, "job_application")
+
+    def test_bulk_label_service_is_set_based(self):
+        from tracker.services import MessageService
+
+        ts = timezone.now()
+        ids = [
+            Message.objects.create(
+                subject=f"Bulk {i}",
+                sender="bulk@testco.com",
+                msg_id=f"bulk-svc-{i}",
+                thread_id=f"TBULKSVC{i % 3}",
+                company=self.company,
+                timestamp=ts,
+            ).id
+            for i in range(30)
+        ]
+        noise = Message.objects.create(
+            subject="Reviewed noise",
+            sender="bulk@testco.com",
+            msg_id="bulk-svc-noise",
+            thread_id="TBULKNOISE",
+            company=self.company,
+            timestamp=ts,
+            reviewed=True,
+        )
+
+        # Query count must not grow with the number of selected messages
+        with self.assertNumQueries(9):
+            updated, threads = MessageService.bulk_label_messages(
+                ids + ["bogus", str(ids[0])], "job_application"
+            )
+        self.assertEqual(updated, 30)
+        self.assertEqual(threads, 3)
+        tts = ThreadTracking.objects.filter(thread_id__startswith="TBULKSVC")
+        self.assertEqual(tts.count(), 3)
+        self.assertTrue(all(tt.reviewed and tt.ml_label == "job_application" for tt in tts))
+        self.assertEqual(
+            Message.objects.filter(pk__in=ids, confidence=1.0).count(), 30
+        )
+
+        MessageService.bulk_label_messages([noise.id], "noise")
+        noise.refresh_from_db()
+        self.assertIsNone(noise.company)
+        self.assertEqual(noise.company_source, "")
+
+    def test_bulk_reassign_company_service(self):
+        from tracker.services import MessageService
+
+        ts = timezone.now()
+        other = Company.objects.create(
+            name="OtherCo", domain="otherco.com", first_contact=ts, last_contact=ts
+        )
+        msg = Message.objects.create(
+            subject="Reassign", sender="a@testco.com", msg_id="reassign-1",
+            thread_id="TREASSIGN1", company=self.company, timestamp=ts,
+            ml_label="job_application",
+        )
+        noise = Message.objects.create(
+            subject="Noise", sender="a@testco.com", msg_id="reassign-2",
+            thread_id="TREASSIGN2", company=self.company, timestamp=ts,
+            ml_label="noise", reviewed=True,
+        )
+
+        self.assertEqual(MessageService.bulk_reassign_company([msg.id, noise.id], other), 2)
+        msg.refresh_from_db()
+        noise.refresh_from_db()
+        self.assertEqual(msg.company, other)
+        self.assertEqual(msg.ml_label, "job_application")
+        self.assertIsNone(noise.company)
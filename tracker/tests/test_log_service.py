@@ -0,0 +1,46 @@
+import json
+
+from tracker.services.log_service import LogFilter, LogService, display_line, iter_lines_backward
+
+
+def _write_log(path, n=500):
+    lines = []
+    for i in range(n):
+        level = "ERROR" if i % 50 == 0 else "INFO"
+        lines.append(json.dumps({"ts": "2025-10-18 09:00:00", "level": level, "msg": f"Processing {i}", "msg_id": f"m{i}"}))
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return lines
+
+
+def test_backward_pages_cover_file_in_order(tmp_path):
+    log = tmp_path / "tracker.log"
+    lines = _write_log(log)
+    assert [line for _, line in iter_lines_backward(log, block_size=7)][1:4] == [l.encode() for l in lines[::-1][:3]]
+
+    collected, before, pages = [], None, 0
+    while True:
+        page = LogService.read_page(log, before, max_bytes=2000)
+        collected = page["lines"] + collected
+        pages += 1
+        if not page["has_more"]:
+            break
+        before = page["start"]
+    assert collected == lines
+    assert pages > 1
+
+
+def test_filters_and_live_tail(tmp_path):
+    log = tmp_path / "tracker.log"
+    _write_log(log)
+    errors = LogService.read_page(log, log_filter=LogFilter(level="warning"))["lines"]
+    assert len(errors) == 10 and all('"ERROR"' in line for line in errors)
+    assert LogService.read_page(log, log_filter=LogFilter(msg_id="m42"))["lines"][0].endswith('"m42"}')
+    assert len(LogService.read_page(log, log_filter=LogFilter(text="processing 49"))["lines"]) == 11
+
+    size = log.stat().st_size
+    with open(log, "a", encoding="utf-8") as f:
+        f.write('{"ts": "2025-10-18 09:01:00", "level": "INFO", "msg": "new"}\n{"partial')
+    tail = LogService.read_since(log, size)
+    assert [display_line(line) for line in tail["lines"]] == ["[2025-10-18 09:01:00] INFO    new"]
+    assert LogService.read_since(log, tail["offset"])["lines"] == []
+    assert LogService.read_since(log, 10**9)["reset"] is True
@@ -0,0 +1,72 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from tracker.models import Company, ThreadTracking
+
+SENT = (timezone.now() - timedelta(days=60)).date()
+
+
+def _company(name, status="application"):
+    moment = timezone.now()
+    return Company.objects.create(name=name, domain=f"{name.lower()}.com", status=status, first_contact=moment, last_contact=moment)
+
+
+def _ago(days):
+    return timezone.now() - timedelta(days=days)
+
+
+@pytest.fixture
+def mailbox(db, make_message, make_thread):
+    stale, active, rejecting, thread_rejected, hunter, quiet = (
+        _company(n) for n in ("Stale", "Active", "Rejecting", "ThreadRejected", "Hunter", "Quiet")
+    )
+    hunter.status = "headhunter"
+    hunter.save()
+    threads = {
+        "stale": make_thread(stale, "t-stale", sent_date=SENT),
+        "noise": make_thread(stale, "t-noise", sent_date=SENT, ml_label="noise"),
+        "active": make_thread(active, "t-active", sent_date=SENT),
+        "rejecting": make_thread(rejecting, "t-rejecting", sent_date=SENT),
+        "thread_rejected": make_thread(thread_rejected, "t-thread-rejected", sent_date=SENT),
+        "hunter": make_thread(hunter, "t-hunter", sent_date=SENT),
+        # No messages for the company: fall back to sent/interview dates
+        "quiet": make_thread(quiet, "t-quiet", sent_date=SENT),
+        "quiet_interview": make_thread(quiet, "t-quiet-2", sent_date=SENT, interview_date=timezone.now().date()),
+    }
+    make_message(stale, "t-stale", timestamp=_ago(45))
+    make_message(active, "t-active", timestamp=_ago(45))
+    make_message(active, "t-other", timestamp=_ago(3))
+    make_message(rejecting, "t-rejecting", timestamp=_ago(45))
+    make_message(rejecting, "t-other-2", timestamp=_ago(40), ml_label="rejection")
+    make_message(thread_rejected, "t-thread-rejected", timestamp=_ago(45), ml_label="rejected")
+    return threads
+
+
+def test_mark_ghosted_applies_company_and_thread_rules(mailbox, django_assert_max_num_queries):
+    out = StringIO()
+    with django_assert_max_num_queries(6):
+        call_command("mark_ghosted", "--days", "30", stdout=out)
+
+    ghosted = set(ThreadTracking.objects.filter(status="ghosted").values_list("thread_id", flat=True))
+    assert ghosted == {"t-stale", "t-quiet"}
+    assert ThreadTracking.objects.get(thread_id="t-stale").reviewed
+    assert set(Company.objects.filter(status="ghosted").values_list("name", flat=True)) == {"Stale", "Quiet"}
+    assert "applications=2" in out.getvalue()
+    assert "Stale – Engineer (last activity" in out.getvalue()
+
+    # Already ghosted rows are reported again but not counted
+    out = StringIO()
+    call_command("mark_ghosted", "--days", "30", stdout=out)
+    assert "applications=0" in out.getvalue() and out.getvalue().count("👻") == 2
+
+
+def test_mark_ghosted_dry_run_reports_without_writing(mailbox):
+    out = StringIO()
+    call_command("mark_ghosted", "--days", "30", "--dry-run", stdout=out)
+    assert "applications=2" in out.getvalue() and "dry_run=True" in out.getvalue()
+    assert not ThreadTracking.objects.filter(status="ghosted").exists()
+    assert not Company.objects.filter(status="ghosted").exists()
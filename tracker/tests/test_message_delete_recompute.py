@@ -0,0 +1,44 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tracker.models import Message, ThreadTracking
+from tracker.services import MessageService
+from tracker.tests.test_helpers import BASE
+
+
+def test_delete_recomputes_threads_once_on_commit(company, make_message, make_thread, django_capture_on_commit_callbacks):
+    make_message(company, "t1", 0, "job_application")
+    rejection = make_message(company, "t1", 3, "rejection")
+    make_thread(company, "t1", ml_label="rejection", rejection_date=rejection.timestamp.date())
+    only = make_message(company, "t2", 0, "job_application")
+    make_thread(company, "t2", ml_label="job_application")
+
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        Message.objects.filter(pk__in=[rejection.pk, only.pk]).delete()
+        # Nothing is recomputed until the transaction commits
+        assert ThreadTracking.objects.filter(thread_id="t2").exists()
+    assert callbacks
+
+    t1 = ThreadTracking.objects.get(thread_id="t1")
+    assert (t1.ml_label, t1.rejection_date) == ("job_application", None)
+    assert not ThreadTracking.objects.filter(thread_id="t2").exists()
+
+
+def test_bulk_delete_messages_query_count_does_not_grow_per_message(company, make_message, make_thread):
+    ids = []
+    for n in range(200):
+        thread_id = f"t{n % 100}"
+        ids.append(make_message(company, thread_id, n // 100, "job_application" if n < 100 else "rejection").pk)
+        if n < 100:
+            make_thread(company, thread_id, ml_label="rejection", rejection_date=BASE.date())
+
+    rejections = ids[100:150]  # second message of t0..t49
+    with CaptureQueriesContext(connection) as queries:
+        deleted, threads_deleted, threads_updated = MessageService.bulk_delete_messages(rejections)
+    assert (deleted, threads_deleted, threads_updated) == (50, 0, 50)
+    assert len(queries) <= 12
+    assert ThreadTracking.objects.get(thread_id="t0").rejection_date is None
+    assert ThreadTracking.objects.get(thread_id="t60").ml_label == "rejection"
+
+    deleted, threads_deleted, _ = MessageService.bulk_delete_messages(ids[:50])
+    assert (deleted, threads_deleted) == (50, 50)
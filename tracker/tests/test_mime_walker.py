@@ -0,0 +1,69 @@
+# test_mime_walker.py
+import base64
+from email import message_from_string
+from email.message import EmailMessage
+from parser import EmailBodyParser
+
+
+def _b64(text):
+    return base64.urlsafe_b64encode(text.encode("utf-8")).decode("ascii")
+
+
+def test_gmail_payload_nested_parts_and_attachments():
+    payload = {
+        "mimeType": "multipart/mixed",
+        "parts": [
+            {"mimeType": "application/pdf", "filename": "resume.pdf", "body": {"attachmentId": "a1"}},
+            {
+                "mimeType": "multipart/alternative",
+                "parts": [
+                    {"mimeType": "text/plain", "body": {"data": _b64("Thanks for applying")}},
+                    {"mimeType": "text/html", "body": {"data": _b64("<p>Thanks for applying</p>")}},
+                ],
+            },
+            {"mimeType": "text/plain", "body": {"data": _b64("never reached")}},
+        ],
+    }
+    mime = EmailBodyParser.collect_bodies(EmailBodyParser.iter_gmail_parts(payload))
+    assert mime.text == "Thanks for applying"
+    assert mime.html == "<p>Thanks for applying</p>"
+    assert mime.stats["attachments_skipped"] == 1
+    assert mime.stats["decoded"] == 2
+    assert mime.stats["stopped_early"] is True
+
+
+def test_email_message_parts_are_bounded():
+    msg = EmailMessage()
+    msg.set_content("plain body")
+    msg.add_alternative("<p>newsletter</p>" * 5000, subtype="html", cte="base64")
+    parsed = message_from_string(msg.as_string())
+
+    mime = EmailBodyParser.collect_bodies(EmailBodyParser.iter_email_parts(parsed), max_part_bytes=300)
+    assert mime.text.strip() == "plain body"
+    assert mime.html.startswith("<p>newsletter</p>")
+    assert len(mime.html) <= 300
+    assert mime.stats["truncated"] == 1
+
+
+def test_single_part_message_body_is_text():
+    parsed = message_from_string("Content-Type: text/calendar\n\nBEGIN:VCALENDAR\n")
+    mime = EmailBodyParser.collect_bodies(EmailBodyParser.iter_email_parts(parsed))
+    assert mime.text == "BEGIN:VCALENDAR\n"
+    assert mime.html is None
+
+
+def test_undecodable_single_part_body_falls_back_to_raw_text(monkeypatch):
+    raw = "From: jobs@acme.com\nSubject: Hi\nContent-Type: text/plain\n\nThanks for applying\n"
+    parsed = message_from_string(raw)
+
+    def broken_payload(*args, decode=False, **kwargs):
+        if decode:
+            raise ValueError("bad payload")
+        return "Thanks for applying\n"
+
+    parsed.get_payload = broken_payload
+    monkeypatch.setattr("parser.eml_from_string", lambda text: parsed)
+
+    mime = EmailBodyParser.collect_bodies(EmailBodyParser.iter_email_parts(parsed))
+    assert mime.text is None and mime.stats["failed"] == 1
+    assert EmailBodyParser.parse_raw_eml(raw)["body"] == raw.strip()
@@ -0,0 +1,67 @@
+import pandas as pd
+import pytest
+from scipy.sparse import hstack
+
+import feature_store
+import ml_incremental
+
+WORDS = {
+    "rejection": "unfortunately decided not to move forward with other candidates",
+    "interview_invite": "schedule an interview please share your availability for a call",
+    "job_application": "thank you for applying we received your application",
+}
+
+
+def _corpus(n):
+    labels = list(WORDS)
+    rows = []
+    for i in range(1, n + 1):
+        label = labels[i % len(labels)]
+        rows.append(
+            {"id": i, "subject": f"{label} update {i}", "body": WORDS[label], "body_hash": f"h{i}", "label": label}
+        )
+    df = pd.DataFrame(rows)
+    return df.drop(columns=["label"]), df["label"].copy()
+
+
+@pytest.fixture
+def state_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(ml_incremental, "STATE_PATH", tmp_path / "incremental_state.joblib")
+    monkeypatch.setattr(ml_incremental, "FULL_EVERY", 3)
+    monkeypatch.setattr(feature_store, "STORE_PATH", tmp_path / "features.npz")
+    return tmp_path
+
+
+def test_incremental_updates_only_new_or_changed_rows(state_path):
+    df, y = _corpus(60)
+    first = ml_incremental.train(df, y)
+    assert first["info"]["full_rebuild"]
+    assert (first["y_pred"] == first["y_test"].to_numpy()).mean() == 1.0
+
+    df2, y2 = _corpus(70)
+    y2.iloc[0] = "rejection" if y2.iloc[0] != "rejection" else "job_application"  # relabel id 1
+    second = ml_incremental.train(df2, y2)
+    assert not second["info"]["full_rebuild"]
+    # ids 61..70 minus holdout (65, 70) plus the relabeled id 1
+    assert second["info"]["rows_used"] == 9
+    # Relabels reuse cached features; only the 10 new bodies are tokenized
+    assert second["info"]["feature_cache"] == {"cached": 60, "vectorized": 10}
+
+    assert ml_incremental.train(df2, y2)["info"]["rows_used"] == 0
+
+    # Published vectorizers are servable and line up with the classifier
+    X = hstack([second["subject_vec"].transform(["interview"]), second["body_vec"].transform(["schedule an interview"])])
+    assert second["clf"].predict_proba(X).shape == (1, 3)
+
+
+def test_periodic_full_rebuild_reports_consistency(state_path):
+    df, y = _corpus(60)
+    ml_incremental.train(df, y)
+    for n in (63, 66, 69):
+        info = ml_incremental.train(*_corpus(n))["info"]
+    assert not info["full_rebuild"]
+
+    info = ml_incremental.train(*_corpus(72))["info"]
+    assert info["full_rebuild"]
+    assert info["rebuild_reason"].startswith("periodic")
+    assert 0.0 <= info["consistency"]["agreement"] <= 1.0
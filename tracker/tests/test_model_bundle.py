@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+from scipy.sparse import hstack
+from sklearn.calibration import CalibratedClassifierCV
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+
+import feature_store
+import model_bundle
+
+TEXTS = {
+    "rejection": "unfortunately we decided not to move forward with other candidates",
+    "interview_invite": "schedule an interview please share your availability for a call",
+    "job_application": "thank you for applying we received your application",
+}
+
+
+def _corpus(labels):
+    subjects, bodies, y = [], [], []
+    for i in range(60):
+        label = labels[i % len(labels)]
+        words = TEXTS[label].split()
+        subjects.append(" ".join(words[i % 4 : i % 4 + 3]))
+        bodies.append(" ".join(words[i % 3 :] + ["role", str(i % 7)]))
+        y.append(label)
+    return subjects, bodies, np.array(y)
+
+
+def _assert_same_proba(tmp_path, clf, subject_vec, body_vec, subjects, bodies):
+    model_bundle.export_bundle(clf, subject_vec, body_vec, tmp_path, manifest={"training_run_id": 7})
+    bundle = model_bundle.load_bundle(tmp_path)
+    assert bundle.manifest["training_run_id"] == 7
+
+    probe_subjects = subjects[:5] + ["completely unseen words"]
+    probe_bodies = bodies[:5] + [""]
+    expected = clf.predict_proba(
+        hstack([subject_vec.transform(probe_subjects), body_vec.transform(probe_bodies)])
+    )
+    actual = bundle.classifier.predict_proba(
+        hstack(
+            [
+                bundle.subject_vectorizer.transform(probe_subjects),
+                bundle.body_vectorizer.transform(probe_bodies),
+            ]
+        )
+    )
+    assert np.allclose(actual, expected)
+    assert list(bundle.classifier.classes_) == [str(c) for c in clf.classes_]
+
+
+@pytest.mark.parametrize("labels", [list(TEXTS), ["rejection", "job_application"]])
+def test_calibrated_tfidf_model_round_trips(tmp_path, labels):
+    subjects, bodies, y = _corpus(labels)
+    subject_vec = TfidfVectorizer(ngram_range=(1, 2), min_df=2)
+    body_vec = TfidfVectorizer(ngram_range=(1, 2), min_df=2)
+    X = hstack([subject_vec.fit_transform(subjects), body_vec.fit_transform(bodies)])
+    clf = CalibratedClassifierCV(LogisticRegression(max_iter=500), method="isotonic", cv=3).fit(X, y)
+    _assert_same_proba(tmp_path, clf, subject_vec, body_vec, subjects, bodies)
+
+
+def test_hashed_sgd_model_round_trips(tmp_path):
+    subjects, bodies, y = _corpus(list(TEXTS))
+    subject_counts = feature_store.hasher(feature_store.SUBJECT_FEATURES).transform(subjects)
+    body_counts = feature_store.hasher(feature_store.BODY_FEATURES).transform(bodies)
+    subject_vec = feature_store.fit_vectorizer(subject_counts, feature_store.SUBJECT_FEATURES, min_df=2)
+    body_vec = feature_store.fit_vectorizer(body_counts, feature_store.BODY_FEATURES, min_df=2)
+    X = hstack([subject_vec.transform(subjects), body_vec.transform(bodies)])
+    clf = SGDClassifier(loss="log_loss", random_state=0).fit(X, y)
+    _assert_same_proba(tmp_path, clf, subject_vec, body_vec, subjects, bodies)
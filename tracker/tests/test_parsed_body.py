@@ -0,0 +1,65 @@
+# test_parsed_body.py
+from parser import EmailBodyParser, ParsedBody, _company_resolver, parse_subject
+
+from bs4 import BeautifulSoup
+
+HTML_BODY = (
+    "<html><head><style>p {color: red}</style><script>var x = 1;</script></head>"
+    "<body><p>The following items were sent to Acme Robotics. Good luck!</p>"
+    '<a href="https://example.com/job/1">View job</a></body></html>'
+)
+
+
+def test_parsed_body_matches_previous_soup_text():
+    soup = BeautifulSoup(HTML_BODY, "html.parser")
+    for tag in soup(["style", "script"]):
+        tag.decompose()
+    expected = soup.get_text(separator=" ", strip=True)
+
+    pb = ParsedBody(HTML_BODY)
+    assert pb.looks_like_html
+    assert pb.plain == expected
+    assert pb.lower == expected.lower()
+    assert pb.links == ["https://example.com/job/1"]
+    assert EmailBodyParser.html_to_text(HTML_BODY) == expected
+
+
+def test_message_body_text_matches_baseline_get_text():
+    """extract_metadata/ingest_message_from_eml store ParsedBody(html).text as Message.body.
+
+    It must equal the plain get_text() they used before, which also leaves
+    <script>/<style> strings out, so stored bodies and training text are unchanged.
+    """
+    for html in (HTML_BODY, "<div>Apply<script>if (a < b) { x(); }</script> now<style>.p{}</style></div>"):
+        expected = BeautifulSoup(html, "html.parser").get_text(separator=" ", strip=True)
+        assert ParsedBody(html).text == expected
+        assert "var x" not in expected and "color" not in expected
+
+
+def test_plain_body_is_never_parsed():
+    before = ParsedBody.parse_count
+    pb = ParsedBody("Thanks for applying, see https://example.com/status")
+    assert pb.plain == pb.raw
+    assert pb.links == ["https://example.com/status"]
+    assert pb.parses == 0
+    assert ParsedBody.parse_count == before
+
+
+def test_shared_body_is_parsed_once_across_extractors():
+    pb = ParsedBody(HTML_BODY)
+    before = ParsedBody.parse_count
+
+    subject = "Indeed Application: Robotics Engineer"
+    parse_subject(
+        subject,
+        HTML_BODY,
+        sender="Indeed <indeedapply@indeed.com>",
+        sender_domain="indeed.com",
+        parsed_body=pb,
+    )
+    _company_resolver.extract_from_job_board_body(pb, subject, "indeedapply@indeed.com", "indeed.com")
+    EmailBodyParser.html_to_text(pb)
+    pb.links
+
+    assert pb.parses == 1
+    assert ParsedBody.parse_count == before + 1
@@ -0,0 +1,64 @@
+import model_store
+from tracker.services.retrain_service import RetrainScheduler
+
+
+def test_requests_are_coalesced_into_one_run(scheduler_paths, monkeypatch):
+    runs = []
+    monkeypatch.setattr(RetrainScheduler, "_run_training", classmethod(lambda cls: runs.append(1) or 0))
+
+    for _ in range(5):
+        RetrainScheduler.request_retrain(reason="test", spawn_worker=False)
+    assert RetrainScheduler.get_status()["requests"] == 5
+
+    assert RetrainScheduler.run_worker(quiet_seconds=0, poll_seconds=0.01) == 1
+    assert runs == [1]
+    status = RetrainScheduler.get_status()
+    assert not status["pending"]
+    assert status["requests"] == 0
+    assert status["last_returncode"] == 0
+
+
+def test_locked_training_requeues_requests(scheduler_paths, monkeypatch):
+    results = iter([model_store.EXIT_LOCKED, 0])
+    monkeypatch.setattr(RetrainScheduler, "_run_training", classmethod(lambda cls: next(results)))
+
+    RetrainScheduler.request_retrain(spawn_worker=False)
+    RetrainScheduler.request_retrain(spawn_worker=False)
+
+    # First attempt loses to a concurrent run and must be retried, not dropped
+    assert RetrainScheduler.run_worker(quiet_seconds=0, poll_seconds=0.01) == 1
+    assert RetrainScheduler.get_status()["runs_completed"] == 1
+
+
+def test_single_worker(scheduler_paths):
+    held = model_store.TrainingLock(RetrainScheduler.WORKER_LOCK_PATH)
+    assert held.acquire()
+    try:
+        RetrainScheduler.request_retrain(spawn_worker=False)
+        assert RetrainScheduler.worker_running()
+        assert RetrainScheduler.run_worker(quiet_seconds=0) == 0
+        assert RetrainScheduler.get_status()["pending"]
+    finally:
+        held.release()
+
+
+def test_busy_state_mutex_does_not_kill_the_worker(scheduler_paths, monkeypatch):
+    runs = []
+    monkeypatch.setattr(RetrainScheduler, "_run_training", classmethod(lambda cls: runs.append(1) or 0))
+    RetrainScheduler.request_retrain(spawn_worker=False)
+
+    real_update = RetrainScheduler._update_state.__func__
+    busy = iter([True, False, True, True, False])  # claim busy once, result update busy twice
+
+    def flaky_update(cls, **changes):
+        if next(busy, False):
+            raise TimeoutError("Retrain queue state is locked")
+        return real_update(cls, **changes)
+
+    monkeypatch.setattr(RetrainScheduler, "_update_state", classmethod(flaky_update))
+    assert RetrainScheduler.run_worker(quiet_seconds=0, poll_seconds=0.01) == 1
+    assert runs == [1]
+    status = RetrainScheduler.get_status()
+    assert not status["pending"]
+    assert status["requests"] == 0
+    assert status["runs_completed"] == 1
@@ -0,0 +1,47 @@
+import stage_timing
+
+
+def test_span_decorator_and_stopwatch_record_stages():
+    stage_timing.timer.reset()
+
+    @stage_timing.timed("work")
+    def work(x):
+        return x * 2
+
+    assert work(2) == 4
+    assert work.__name__ == "work"
+    with stage_timing.span("db_write.message"):
+        pass
+    watch = stage_timing.Stopwatch()
+    watch.lap("company_resolution")
+    watch.lap("db_dedup")
+
+    summary = stage_timing.timer.summary()
+    assert summary["work"]["count"] == 1
+    assert set(summary) == {"work", "db_write.message", "company_resolution", "db_dedup"}
+    for stats in summary.values():
+        assert stats["p50_ms"] <= stats["p95_ms"] <= stats["max_ms"]
+    assert stage_timing.timer.lines()[0].startswith("stage")
+
+
+def test_span_records_even_when_block_raises():
+    stage_timing.timer.reset()
+    try:
+        with stage_timing.span("fails"):
+            raise ValueError
+    except ValueError:
+        pass
+    assert stage_timing.timer.summary()["fails"]["count"] == 1
+
+
+def test_disabled_timing_records_nothing():
+    stage_timing.timer.reset()
+    stage_timing.set_enabled(False)
+    try:
+        stage_timing.timed("off")(lambda: None)()
+        with stage_timing.span("off"):
+            pass
+        stage_timing.Stopwatch().lap("off")
+        assert stage_timing.timer.summary() == {}
+    finally:
+        stage_timing.set_enabled(True)
@@ -0,0 +1,90 @@
+import collections
+import email
+import email.policy
+import mailbox
+from datetime import datetime, timezone
+
+import pytest
+
+import synthetic_mailbox
+from fake_gmail import FakeGmailService
+from tracker.models import Company, Message, ThreadTracking
+from tracker.utils import synthetic_load
+
+END = datetime(2025, 6, 1, tzinfo=timezone.utc)
+
+
+def _mailbox(count=400, **kw):
+    return list(synthetic_mailbox.generate(count, seed=3, end=END, **kw))
+
+
+def test_generator_is_deterministic_and_covers_all_kinds():
+    messages = _mailbox()
+    assert [(m.msg_id, m.subject, m.date, m.html) for m in messages] == [
+        (m.msg_id, m.subject, m.date, m.html) for m in _mailbox()
+    ]
+    assert len(messages) == 400
+    assert len({m.msg_id for m in messages}) == 400
+    assert set(m.kind for m in messages) == set(synthetic_mailbox.ML_LABELS)
+    assert all(m.msg_id.startswith(synthetic_mailbox.PREFIX) and m.msg_id.isalnum() for m in messages)
+    assert all(m.thread_id.isalnum() and m.date <= END for m in messages)
+
+    threads = collections.Counter(m.thread_id for m in messages)
+    assert max(threads.values()) > 1  # multi-message threads
+    sizes = [len(m.html) for m in messages if m.html]
+    assert max(sizes) > 10 * min(sizes)  # small and large HTML bodies
+
+
+def test_near_duplicates_reference_earlier_messages():
+    messages = _mailbox(near_duplicate_rate=0.2)
+    by_id = {m.msg_id: m for m in messages}
+    dupes = [m for m in messages if m.near_duplicate_of]
+    assert dupes
+    for dupe in dupes:
+        original = by_id[dupe.near_duplicate_of]
+        assert dupe.msg_id != original.msg_id
+        assert dupe.kind == original.kind and dupe.sender == original.sender
+        assert dupe.html != original.html  # fresh tracking token
+
+
+def test_gmail_eml_and_mbox_output(tmp_path):
+    messages = _mailbox(60)
+    assert synthetic_mailbox.write_gmail_dir(tmp_path / "gmail", messages) == 60
+    service = FakeGmailService.from_dir(tmp_path / "gmail")
+    listed = service.users().messages().list(userId="me", maxResults=500).execute()["messages"]
+    assert {m["id"] for m in listed} == {m.msg_id for m in messages}
+
+    assert synthetic_mailbox.write_eml_dir(tmp_path / "eml", messages) == 60
+    sample = next(m for m in messages if m.html)
+    parsed = email.message_from_bytes((tmp_path / "eml" / f"{sample.msg_id}.eml").read_bytes(), policy=email.policy.default)
+    assert parsed["Subject"] == sample.subject
+    assert parsed.get_body(("html",)).get_content() == sample.html
+
+    assert synthetic_mailbox.write_mbox(tmp_path / "mailbox.mbox", messages) == 60
+    box = mailbox.mbox(str(tmp_path / "mailbox.mbox"))
+    try:
+        assert sorted(entry["Subject"] for entry in box) == sorted(m.subject for m in messages)
+    finally:
+        box.close()
+
+
+@pytest.mark.django_db
+def test_load_mailbox_and_clear():
+    existing = Company.objects.create(name="Pre-existing", first_contact=END, last_contact=END)
+    report = synthetic_load.load_mailbox(300, seed=1, end=END, companies=40)
+
+    assert report.messages == Message.objects.count() == 300
+    assert report.threads == ThreadTracking.objects.count() > 0
+    assert report.companies_created == Company.objects.filter(notes=synthetic_load.SYNTHETIC_NOTE).count()
+    assert Message.objects.filter(body_html__isnull=False).count() == 0
+    thread = ThreadTracking.objects.select_related("company").first()
+    assert thread.company.first_contact <= thread.company.last_contact <= END
+    assert Message.objects.filter(thread_id=thread.thread_id).exists()
+
+    with pytest.raises(ValueError):
+        synthetic_load.load_mailbox(10, seed=1, end=END)
+
+    deleted = synthetic_load.clear_synthetic()
+    assert deleted["messages"] == 300 and deleted["threads"] == report.threads
+    assert not Message.objects.exists() and not ThreadTracking.objects.exists()
+    assert list(Company.objects.all()) == [existing]
@@ -0,0 +1,128 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tracker.models import Message, ThreadTracking
+from tracker.tests.test_helpers import BASE
+from tracker.utils import thread_reconciliation as tr
+
+
+def test_reconcile_fixes_dates_labels_and_orphans_in_bulk(company, make_message, make_thread, django_assert_max_num_queries):
+    make_message(company, "t1", 0, "job_application")
+    make_message(company, "t1", 5, "interview_invite")
+    make_message(company, "t1", 9, "rejection", confidence=0.9)
+    make_message(company, "t2", 0, "job_application")
+    t1 = make_thread(company, "t1", ml_label="job_application", interview_date=(BASE + timedelta(days=1)).date())
+    t2 = make_thread(company, "t2", ml_label="job_application", rejection_date=BASE.date(), prescreen_date=BASE.date())
+    make_thread(company, "orphan", ml_label="job_application")
+
+    states = tr.expected_states()
+    assert states["t1"].latest_label == "rejection" and states["t1"].message_count == 3
+    assert states["t1"].dates["interview_date"] == (BASE + timedelta(days=5)).date()
+    assert states["t1"].label_counts["job_application"] == 1
+
+    with django_assert_max_num_queries(3):
+        report = tr.diff_threads()
+    assert [tt.thread_id for tt in report.orphans] == ["orphan"]
+    assert {(c.thread.thread_id, c.field) for c in report.changes} == {
+        ("t1", "interview_date"),
+        ("t1", "rejection_date"),
+        ("t1", "ml_label"),
+        ("t2", "rejection_date"),
+        ("t2", "prescreen_date"),
+    }
+    # Dry run writes nothing
+    assert ThreadTracking.objects.get(pk=t1.pk).ml_label == "job_application"
+
+    tr.apply_report(report)
+    t1.refresh_from_db()
+    t2.refresh_from_db()
+    assert (t1.ml_label, t1.ml_confidence) == ("rejection", 0.9)
+    assert t1.rejection_date == (BASE + timedelta(days=9)).date()
+    assert t1.interview_date == (BASE + timedelta(days=5)).date()
+    assert t2.rejection_date is None and t2.prescreen_date is None
+    assert not ThreadTracking.objects.filter(thread_id="orphan").exists()
+    assert not tr.diff_threads().changes
+
+
+def test_create_missing_builds_one_row_per_thread(company, make_message, make_thread):
+    make_message(company, "t1", 0, "job_application")
+    make_message(company, "t1", 3, "job_application")
+    make_message(None, "t2", 0, "job_application")
+    make_thread(company, "t3", ml_label="job_application")
+    make_message(company, "t3", 0, "job_application")
+
+    missing = tr.messages_missing_threads(Message.objects.filter(ml_label="job_application")).order_by("timestamp")
+    assert missing.count() == 3
+    created, no_company = tr.create_missing(
+        missing, lambda m: ThreadTracking(thread_id=m.thread_id, company_id=m.company_id, status="application", sent_date=m.timestamp.date())
+    )
+    assert [tt.thread_id for _, tt in created] == ["t1"]
+    assert [m.thread_id for m in no_company] == ["t2"]
+    assert ThreadTracking.objects.filter(thread_id="t1").count() == 1
+
+
+def test_create_missing_skips_threads_created_meanwhile(company, make_message, make_thread):
+    make_message(company, "t1", 0, "job_application")
+    make_message(company, "t2", 0, "job_application")
+    missing = list(tr.messages_missing_threads(Message.objects.all()).order_by("timestamp"))
+    make_thread(company, "t2", ml_label="job_application")  # e.g. by a concurrent ingest
+
+    created, _ = tr.create_missing(
+        missing, lambda m: ThreadTracking(thread_id=m.thread_id, company_id=m.company_id, status="application", sent_date=m.timestamp.date())
+    )
+    assert [tt.thread_id for _, tt in created] == ["t1"]
+    assert ThreadTracking.objects.filter(thread_id__in=["t1", "t2"]).count() == 2
+
+
+def test_cleanup_and_sync_commands_use_engine(company, make_message, make_thread):
+    make_message(company, "t1", 0, "job_application")
+    make_message(company, "t1", 2, "rejection")
+    make_thread(company, "t1", ml_label="job_application")
+    make_message(company, "t2", 0, "job_application", subject="Role: Engineer t2")
+    make_thread(company, "t4", ml_label="ghosted")
+    make_message(company, "t4", 0, "job_application")
+
+    out = StringIO()
+    call_command("sync_threadtracking", stdout=out)
+    assert "ThreadTracking created: 1" in out.getvalue()
+    assert ThreadTracking.objects.get(thread_id="t2").job_title == "Role: Engineer t2"
+
+    out = StringIO()
+    call_command("sync_message_threadtracking_labels", stdout=out)
+    assert "Mismatches found: 1" in out.getvalue()
+    assert ThreadTracking.objects.get(thread_id="t4").ml_label == "job_application"
+
+    out = StringIO()
+    call_command("cleanup_threads", "--dry-run", stdout=out)
+    assert "Rejection dates (would be) fixed: 1" in out.getvalue()
+    assert "ML labels (would be) fixed: 1" in out.getvalue()
+    call_command("cleanup_threads", stdout=StringIO())
+    assert ThreadTracking.objects.get(thread_id="t1").ml_label == "rejection"
+
+
+def test_health_check_autofix_creates_missing_rows(company, make_message, make_thread):
+    make_message(company, "t1", 0, "job_application", subject="Role: Engineer t1")
+    make_message(company, "t1", 1, "job_application", subject="Role: Engineer t1")
+
+    out = StringIO()
+    call_command("check_threadtracking_health", "--days", "60", "--autofix", stdout=out)
+    assert "Missing ThreadTracking for 2 application message(s)" in out.getvalue()
+    assert "Autofix: created 1 ThreadTracking record(s)" in out.getvalue()
+    assert ThreadTracking.objects.get(thread_id="t1").job_title == "Engineer t1"
+
+
+def test_sync_report_does_not_query_per_row(company, make_message):
+    def run():
+        with CaptureQueriesContext(connection) as ctx:
+            call_command("sync_threadtracking", stdout=StringIO())
+        return len(ctx.captured_queries)
+
+    make_message(company, "t1", 0, "job_application")
+    one = run()
+    for n in range(2, 6):
+        make_message(company, f"t{n}", n, "job_application")
+    assert run() == one
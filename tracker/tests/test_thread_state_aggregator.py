@@ -0,0 +1,64 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tracker.models import Message, ThreadTracking
+from tracker.tests.test_helpers import BASE
+from tracker.utils.label_propagation import ThreadStateAggregator, propagate_labels_to_threads, propagate_or_defer
+
+
+def test_aggregator_resolves_threads_and_company_fallback_in_one_query(
+    company, make_message, make_thread, django_assert_num_queries
+):
+    make_thread(company, "T1")
+    applied = make_message(company, "T1", 1)
+    new_app = make_message(company, "T2", 2)
+    interview = make_message(company, "T3", 3)  # no own thread row: falls back to T1
+    reviewed = make_message(company, "T4", 4, ml_label="noise", reviewed=True)
+
+    batch = ThreadStateAggregator()
+    batch.add(applied, "rejection", 0.9)
+    batch.add(new_app, "job_application", 0.8)
+    batch.add(interview, "interview_invite", 0.7)
+    assert not batch.add(reviewed, "job_application")
+
+    # bulk_update messages, one ThreadTracking lookup, bulk_create, bulk_update
+    with django_assert_num_queries(6):
+        touched = batch.flush()
+
+    assert set(touched) == {"T1", "T2"}
+    t1 = ThreadTracking.objects.get(thread_id="T1")
+    assert (t1.ml_label, t1.ml_confidence) == ("rejection", 0.9)
+    assert t1.interview_date == interview.timestamp.date()
+    assert ThreadTracking.objects.get(thread_id="T2").ml_label == "job_application"
+    assert not ThreadTracking.objects.filter(thread_id__in=["T3", "T4"]).exists()
+    assert Message.objects.get(pk=interview.pk).ml_label == "interview_invite"
+    assert Message.objects.get(pk=reviewed.pk).ml_label == "noise"
+
+
+def test_propagate_or_defer_queues_on_open_aggregator(company, make_message):
+    msg = make_message(company, "T9", 0, ml_label="job_application")
+    with ThreadStateAggregator(save_messages=False) as batch:
+        assert propagate_or_defer(msg) is None
+        assert len(batch) == 1
+        assert not ThreadTracking.objects.filter(thread_id="T9").exists()
+    assert ThreadTracking.objects.get(thread_id="T9").ml_label == "job_application"
+
+    # Without an open aggregator it propagates immediately
+    other = make_message(company, "T10", 0, ml_label="job_application")
+    assert propagate_or_defer(other).thread_id == "T10"
+
+
+def test_company_fallback_reads_only_first_thread_per_company(company, make_message, make_thread):
+    later = [make_thread(company, f"L{n}", sent_date=(BASE + timedelta(days=n + 1)).date()) for n in range(5)]
+    first = make_thread(company, "F1")
+    interview = make_message(company, "X1", 3, ml_label="interview_invite")
+
+    with CaptureQueriesContext(connection) as ctx:
+        touched = propagate_labels_to_threads([interview])
+    assert list(touched) == ["F1"]
+    assert ThreadTracking.objects.get(pk=first.pk).interview_date == interview.timestamp.date()
+    assert not ThreadTracking.objects.filter(pk__in=[t.pk for t in later], interview_date__isnull=False).exists()
+    lookup = next(q["sql"] for q in ctx.captured_queries if "ROW_NUMBER" in q["sql"].upper())
+    assert "tracker_application" in lookup
@@ -0,0 +1,31 @@
+import json
+import logging
+
+import tracker_logger
+
+
+def test_log_console_writes_json_lines_and_console(tmp_path, monkeypatch, capsys):
+    tracker_logger.stop()
+    monkeypatch.setattr(tracker_logger, "LOG_FILE", str(tmp_path / "tracker.log"))
+    try:
+        tracker_logger.log_console("Processing message", msg_id="m1", outcome="inserted")
+        tracker_logger.log_console("hidden", level="DEBUG")
+        tracker_logger.log_console("Failed to ingest m2", level=logging.ERROR, msg_id="m2")
+        tracker_logger.flush()
+    finally:
+        tracker_logger.stop()
+
+    records = [json.loads(line) for line in (tmp_path / "tracker.log").read_text(encoding="utf-8").splitlines()]
+    assert [r["msg"] for r in records] == ["Processing message", "Failed to ingest m2"]
+    assert records[0]["msg_id"] == "m1" and records[0]["outcome"] == "inserted"
+    assert records[1]["level"] == "ERROR"
+    assert "] Processing message" in capsys.readouterr().out
+
+
+def test_level_flag_follows_runtime_level():
+    flag = tracker_logger.LevelFlag("tracker.test_flag")
+    tracker_logger.set_level("tracker.test_flag", "INFO")
+    assert not flag
+    tracker_logger.set_level("tracker.test_flag", "DEBUG")
+    assert flag
+    assert tracker_logger._rotated_name("logs/tracker.log.2025-10-18") == "logs/tracker-2025-10-18.log"
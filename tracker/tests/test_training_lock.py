@@ -0,0 +1,108 @@
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+
+import model_store
+from model_store import TrainingLock
+
+WORKERS = 6
+ROUNDS = 15
+
+
+def _contend(lock_path, marker_path, rounds):
+    """Take the lock `rounds` times; count times another holder was inside too."""
+    overlaps = 0
+    lock = TrainingLock(lock_path)
+    for _ in range(rounds):
+        assert lock.acquire(timeout=30, poll=0.001)
+        try:
+            fd = os.open(marker_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            overlaps += 1
+        else:
+            os.close(fd)
+            time.sleep(0.001)
+            os.unlink(marker_path)
+        finally:
+            lock.release()
+    return overlaps
+
+
+def _take_stale(lock_path):
+    return TrainingLock(lock_path).acquire(timeout=0)
+
+
+def _count(state_path, lock_path, rounds):
+    import django
+
+    django.setup()
+    from tracker.services.retrain_service import RetrainScheduler
+
+    RetrainScheduler.STATE_PATH = state_path
+    RetrainScheduler.STATE_LOCK_PATH = lock_path
+    for _ in range(rounds):
+        RetrainScheduler._update_state(requests=lambda n: (n or 0) + 1)
+
+
+def _dead_pid():
+    proc = subprocess.Popen([sys.executable, "-c", "pass"])
+    proc.wait()
+    return proc.pid
+
+
+def test_concurrent_acquirers_never_overlap(tmp_path):
+    args = (str(tmp_path / "x.lock"), str(tmp_path / "inside"), ROUNDS)
+    with multiprocessing.get_context("spawn").Pool(WORKERS) as pool:
+        overlaps = pool.starmap(_contend, [args] * WORKERS)
+    assert overlaps == [0] * WORKERS
+    assert not (tmp_path / "x.lock").exists()
+
+
+def test_stale_lock_is_taken_over_by_exactly_one_waiter(tmp_path):
+    lock_path = tmp_path / "x.lock"
+    lock_path.write_text(json.dumps({"pid": _dead_pid(), "acquired_at": "2025-01-01T00:00:00"}), encoding="utf-8")
+    assert not TrainingLock(lock_path).is_locked()
+
+    with multiprocessing.get_context("spawn").Pool(WORKERS) as pool:
+        # A winner keeps its lock file (the pool process stays alive), so only one can win
+        won = pool.map(_take_stale, [str(lock_path)] * WORKERS)
+    assert won.count(True) == 1
+
+
+def test_unreadable_lock_is_held_until_grace_period(tmp_path):
+    lock_path = tmp_path / "x.lock"
+    lock_path.write_text("", encoding="utf-8")
+    lock = TrainingLock(lock_path)
+    assert lock.is_locked()
+    assert not lock.acquire(timeout=0)
+
+    old = time.time() - TrainingLock.LOCK_GRACE_SECONDS - 5
+    os.utime(lock_path, (old, old))
+    assert lock.acquire(timeout=0)
+    assert json.loads(lock_path.read_text(encoding="utf-8"))["pid"] == os.getpid()
+    lock.release()
+    assert not lock_path.exists()
+
+
+def test_release_leaves_other_holders_lock(tmp_path):
+    lock_path = tmp_path / "x.lock"
+    first = TrainingLock(lock_path)
+    assert first.acquire()
+    lock_path.unlink()  # e.g. removed by hand while held
+    second = TrainingLock(lock_path)
+    assert second.acquire()
+    first.release()
+    assert second.is_locked()
+    second.release()
+
+
+def test_queue_counter_updates_are_not_lost(tmp_path):
+    state_path, lock_path = tmp_path / "queue.json", tmp_path / ".queue.lock"
+    with multiprocessing.get_context("spawn").Pool(WORKERS) as pool:
+        pool.starmap(_count, [(state_path, lock_path, ROUNDS)] * WORKERS)
+    state = json.loads(state_path.read_text(encoding="utf-8"))
+    assert state["requests"] == WORKERS * ROUNDS
+    assert model_store.TrainingLock(lock_path).owner() is None
@@ -6,6 +6,7 @@ from . import views
 
 urlpatterns = [
     path("logs/", views.log_viewer, name="log_viewer"),
+    path("logs/tail/", views.log_tail, name="log_tail"),
     path("reingest_admin/", views.reingest_admin, name="reingest_admin"),
     path("reingest_admin/stream", views.reingest_stream, name="reingest_stream"),
     path("", views.dashboard, name="dashboard"),
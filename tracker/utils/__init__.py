@@ -7,6 +7,8 @@ Modules:
     email_parsing: Email/MIME parsing and decoding utilities
     helpers: General helper functions for pattern matching and logging
     label_propagation: Label propagation utilities for ThreadTracking
+    thread_reconciliation: Bulk diff/repair of ThreadTracking against its messages
+    company_merge: Transactional bulk merges of duplicate companies
 
 Note: These utilities are thin wrappers that delegate to class methods from parser.py
 (CompanyValidator, EmailBodyParser, etc.) to avoid circular imports while providing
@@ -14,15 +16,20 @@ a clean, organized API for utility functions.
 """
 
 # Import modules for users who want to use them directly
-from . import validation, email_parsing, helpers, label_propagation
+from . import validation, email_parsing, helpers, label_propagation, thread_reconciliation, company_merge
 
 # Import commonly used functions for convenience
-from .label_propagation import propagate_message_label_to_thread
+from .label_propagation import propagate_labels_to_threads, propagate_message_label_to_thread
+from .thread_reconciliation import reconcile
 
 __all__ = [
     "validation",
     "email_parsing",
     "helpers",
     "label_propagation",
+    "thread_reconciliation",
+    "company_merge",
     "propagate_message_label_to_thread",
+    "propagate_labels_to_threads",
+    "reconcile",
 ]
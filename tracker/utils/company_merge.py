@@ -0,0 +1,282 @@
+"""Bulk company merges.
+
+Merging a duplicate Company used to take, per duplicate: two UPDATEs, two
+ordered Message queries for first/last contact, a save and a delete, with
+callers (normalize_companies, the merge view, one-off merge scripts) looping
+over pairs. This module merges any number of groups at once:
+
+- ``plan_merges`` validates the groups and builds a MergeReport with a handful
+  of grouped queries: the companies, per-company Message / ThreadTracking /
+  CompanyDocument counts and per-company MIN/MAX(Message.timestamp).
+- ``apply_merges`` writes it in one transaction. It rewrites Message,
+  ThreadTracking and CompanyDocument FKs with one CASE UPDATE per table
+  (per BATCH_SIZE duplicates) and first/last contact with one bulk_update.
+  It rewrites DomainToCompany / CompanyAlias / KnownCompany name references
+  and deletes the duplicates with one DELETE, which has nothing left to
+  cascade.
+- json/companies.json is rewritten once, on commit, keeping every
+  section. Names change in known, domain_to_company, aliases and JobSites, and
+  each duplicate name is recorded as an alias of its canonical.
+
+``merge_companies(groups, dry_run=True)`` does both; a dry run only returns
+the report.
+"""
+
+import json
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from django.db import models, transaction
+from django.db.models import Case, Count, Max, Min, Value, When
+
+from tracker.models import Company, CompanyAlias, CompanyDocument, DomainToCompany, KnownCompany, Message, ThreadTracking
+
+COMPANIES_JSON = Path("json/companies.json")
+# Duplicates per CASE UPDATE; keeps bound parameters under SQLite's limit
+BATCH_SIZE = 300
+
+# Models whose company FK is moved to the canonical company
+FK_MODELS = {"messages": Message, "applications": ThreadTracking, "documents": CompanyDocument}
+
+
+@dataclass
+class GroupPlan:
+    """One canonical company and the duplicates merged into it."""
+
+    canonical_id: int
+    canonical_name: str
+    duplicates: List[Tuple[int, str]]
+    messages: int = 0  # rows moved, per FK_MODELS key
+    applications: int = 0
+    documents: int = 0
+    first_contact: Optional[datetime] = None
+    last_contact: Optional[datetime] = None
+
+    @property
+    def duplicate_ids(self) -> List[int]:
+        return [pk for pk, _ in self.duplicates]
+
+    @property
+    def duplicate_names(self) -> List[str]:
+        return [name for _, name in self.duplicates]
+
+
+@dataclass
+class MergeReport:
+    groups: List[GroupPlan] = field(default_factory=list)
+    domain_mappings: int = 0  # DomainToCompany rows pointing at a duplicate name
+    alias_rows: int = 0  # CompanyAlias rows pointing at a duplicate name
+    known_rows: int = 0  # KnownCompany rows naming a duplicate
+    json_changes: List[str] = field(default_factory=list)
+    applied: bool = False
+
+    @property
+    def renames(self) -> Dict[str, str]:
+        """Duplicate name -> canonical name."""
+        return {dup: g.canonical_name for g in self.groups for dup in g.duplicate_names if dup != g.canonical_name}
+
+    def total(self, attr: str) -> int:
+        return sum(getattr(g, attr) for g in self.groups)
+
+    def as_dict(self) -> Dict:
+        data = asdict(self)
+        for group in data["groups"]:
+            for key in ("first_contact", "last_contact"):
+                if group[key] is not None:
+                    group[key] = group[key].isoformat()
+        return data
+
+
+def _normalize_groups(groups: Mapping) -> Dict[int, List[int]]:
+    """{canonical_id: [duplicate ids]} as ints, validated.
+
+    Raises:
+        ValueError: a company is in two groups, or is both canonical and
+            duplicate (chains like A->B, B->C must be flattened by the caller)
+    """
+    canonicals = {int(c): [int(d) for d in dups] for c, dups in groups.items()}
+    result: Dict[int, List[int]] = {}
+    seen = set()
+    for canonical, duplicates in canonicals.items():
+        dups = []
+        for dup in duplicates:
+            if dup == canonical or dup in dups:
+                continue
+            if dup in canonicals:
+                raise ValueError(f"Company {dup} is both a canonical company and a duplicate")
+            if dup in seen:
+                raise ValueError(f"Company {dup} appears in more than one merge group")
+            seen.add(dup)
+            dups.append(dup)
+        if dups:
+            result[canonical] = dups
+    return result
+
+
+def _counts(model, ids: List[int]) -> Dict[int, int]:
+    rows = model.objects.filter(company_id__in=ids).values("company_id").annotate(n=Count("id")).order_by()
+    return {row["company_id"]: row["n"] for row in rows}
+
+
+def plan_merges(groups: Mapping) -> MergeReport:
+    """Validate `groups` ({canonical_id: [duplicate ids]}) and describe the merge.
+
+    Raises:
+        ValueError: invalid groups (see _normalize_groups) or unknown company ids
+    """
+    groups = _normalize_groups(groups)
+    all_ids = list(groups) + [dup for dups in groups.values() for dup in dups]
+    names = dict(Company.objects.filter(pk__in=all_ids).values_list("pk", "name"))
+    missing = sorted(set(all_ids) - set(names))
+    if missing:
+        raise ValueError(f"Company id(s) not found: {', '.join(map(str, missing))}")
+
+    counts = {key: _counts(model, all_ids) for key, model in FK_MODELS.items()}
+    spans = {
+        row["company_id"]: (row["first"], row["last"])
+        for row in Message.objects.filter(company_id__in=all_ids)
+        .values("company_id")
+        .annotate(first=Min("timestamp"), last=Max("timestamp"))
+        .order_by()
+    }
+
+    report = MergeReport()
+    for canonical, dups in groups.items():
+        plan = GroupPlan(canonical, names[canonical], [(dup, names[dup]) for dup in dups])
+        for key in FK_MODELS:
+            setattr(plan, key, sum(counts[key].get(dup, 0) for dup in dups))
+        members = [spans[pk] for pk in [canonical] + dups if pk in spans]
+        if members:
+            plan.first_contact = min(first for first, _ in members)
+            plan.last_contact = max(last for _, last in members)
+        report.groups.append(plan)
+
+    renamed = list(report.renames)
+    report.domain_mappings = DomainToCompany.objects.filter(company__in=renamed).count()
+    report.alias_rows = CompanyAlias.objects.filter(company__in=renamed).count()
+    report.known_rows = KnownCompany.objects.filter(name__in=renamed).count()
+    report.json_changes = rewrite_companies_json(report.renames, dry_run=True)
+    return report
+
+
+def _remap(queryset, field_name: str, mapping: Dict, output_field) -> int:
+    """UPDATE field_name from old to new value per `mapping`, one CASE per batch."""
+    items = list(mapping.items())
+    updated = 0
+    for i in range(0, len(items), BATCH_SIZE):
+        chunk = items[i : i + BATCH_SIZE]
+        whens = [When(**{field_name: old}, then=Value(new)) for old, new in chunk]
+        updated += queryset.filter(**{f"{field_name}__in": [old for old, _ in chunk]}).update(
+            **{field_name: Case(*whens, output_field=output_field)}
+        )
+    return updated
+
+
+def apply_merges(report: MergeReport, export: bool = True) -> MergeReport:
+    """Write a plan_merges report in one transaction; companies.json is rewritten once on commit."""
+    moves = {dup: g.canonical_id for g in report.groups for dup in g.duplicate_ids}
+    renames = report.renames
+    with transaction.atomic():
+        for model in FK_MODELS.values():
+            _remap(model.objects.all(), "company_id", moves, models.IntegerField())
+
+        canonicals = Company.objects.in_bulk([g.canonical_id for g in report.groups])
+        dated = []
+        for g in report.groups:
+            if g.first_contact is not None:
+                company = canonicals[g.canonical_id]
+                company.first_contact, company.last_contact = g.first_contact, g.last_contact
+                dated.append(company)
+        Company.objects.bulk_update(dated, ["first_contact", "last_contact"], batch_size=BATCH_SIZE)
+
+        if renames:
+            _remap(DomainToCompany.objects.all(), "company", renames, models.CharField())
+            _remap(CompanyAlias.objects.all(), "company", renames, models.CharField())
+            # KnownCompany.name is unique: rename one known duplicate per
+            # canonical that is not known yet, delete the others
+            names = set(KnownCompany.objects.filter(name__in=set(renames) | set(renames.values())).values_list("name", flat=True))
+            rename_known = {}
+            for dup, canonical in renames.items():
+                if dup in names and canonical not in names:
+                    rename_known[dup] = canonical
+                    names.add(canonical)
+            KnownCompany.objects.filter(name__in=[d for d in renames if d in names and d not in rename_known]).delete()
+            _remap(KnownCompany.objects.all(), "name", rename_known, models.CharField())
+            CompanyAlias.objects.bulk_create(
+                [CompanyAlias(alias=dup, company=canonical) for dup, canonical in renames.items() if dup.lower() != canonical.lower()],
+                ignore_conflicts=True,
+            )
+
+        Company.objects.filter(pk__in=list(moves)).delete()
+        if export:
+            transaction.on_commit(lambda: rewrite_companies_json(renames))
+    report.applied = True
+    return report
+
+
+def merge_companies(groups: Mapping, dry_run: bool = True, export: bool = True) -> MergeReport:
+    """plan_merges, then apply_merges unless `dry_run`."""
+    report = plan_merges(groups)
+    if not dry_run:
+        apply_merges(report, export=export)
+    return report
+
+
+def rewrite_companies_json(renames: Dict[str, str], path: Path = COMPANIES_JSON, dry_run: bool = False) -> List[str]:
+    """Point companies.json at the canonical names; returns the changes made.
+
+    Every section is kept. Duplicate names are replaced in ``known``,
+    ``domain_to_company`` values, ``aliases`` values and ``JobSites`` keys,
+    and added to ``aliases`` unless they only differ in case (alias lookups
+    are case-insensitive).
+    """
+    if not renames:
+        return []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return []
+
+    changes = []
+    known = data.get("known")
+    if isinstance(known, list):
+        new_known = list(dict.fromkeys(renames.get(name, name) for name in known))
+        for name in known:
+            if name in renames:
+                changes.append(f"known: {name} → {renames[name]}")
+        data["known"] = new_known
+
+    for section in ("domain_to_company", "aliases"):
+        mapping = data.get(section)
+        if not isinstance(mapping, dict):
+            continue
+        for key, value in list(mapping.items()):
+            if value in renames:
+                mapping[key] = renames[value]
+                changes.append(f"{section}: {key} → {renames[value]}")
+
+    job_sites = data.get("JobSites")
+    if isinstance(job_sites, dict):
+        for dup, canonical in renames.items():
+            if dup in job_sites:
+                url = job_sites.pop(dup)
+                job_sites.setdefault(canonical, url)
+                changes.append(f"JobSites: {dup} → {canonical}")
+
+    aliases = data.setdefault("aliases", {})
+    if isinstance(aliases, dict):
+        existing = {k.lower() for k in aliases}
+        for dup, canonical in renames.items():
+            if dup.lower() != canonical.lower() and dup.lower() not in existing:
+                aliases[dup] = canonical
+                changes.append(f"aliases: {dup} → {canonical} (added)")
+
+    if changes and not dry_run:
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        tmp.replace(path)
+    return changes
@@ -1,10 +1,27 @@
 """Label propagation utilities.
 
 Functions for propagating message labels to ThreadTracking records.
+
+``propagate_labels_to_threads`` applies the rules to a batch of messages:
+every target ThreadTracking (by thread_id, plus the company fallback for
+prescreen/interview messages) is resolved with one query and the result is
+written with one ``bulk_create`` + ``bulk_update`` in one transaction.
+``propagate_message_label_to_thread`` is the single-message form.
+
+``ThreadStateAggregator`` collects (message, new label) changes and applies
+them in batches: one ``bulk_update`` for the messages, then the batched
+propagation. Bulk labeling, reclassification and the bulk EML import use it;
+while one is open as a context manager, ``propagate_or_defer`` (called by the
+EML ingest path) queues onto it instead of propagating per message.
 """
 
-from typing import Optional
+import threading
+from typing import Dict, Iterable, Optional
+
 from django.db import transaction
+from django.db.models import F, Q, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
 
 from tracker.models import Message, ThreadTracking
 
@@ -22,54 +39,109 @@ def propagate_message_label_to_thread(message: Message) -> Optional[ThreadTracki
     if not message or not getattr(message, "thread_id", None):
         return None
 
-    thread_id = message.thread_id
-    msg_date = message.timestamp.date() if message.timestamp else None
-
     try:
-        with transaction.atomic():
-            tt = ThreadTracking.objects.filter(thread_id=thread_id).first()
+        touched = propagate_labels_to_threads([message])
+    except Exception:
+        # Don't propagate exceptions — callers should handle/log if needed.
+        return None
+    return next(iter(touched.values()), None)
+
+
+def propagate_or_defer(message: Message) -> Optional[ThreadTracking]:
+    """Propagate a saved message now, or queue it on the active aggregator.
+
+    Returns the ThreadTracking when propagated immediately, None when queued.
+    """
+    batch = getattr(_active, "batch", None)
+    if batch is not None:
+        batch.queue(message)
+        return None
+    return propagate_message_label_to_thread(message)
+
+
+def propagate_labels_to_threads(messages: Iterable[Message]) -> Dict[str, ThreadTracking]:
+    """Batched counterpart of ``propagate_message_label_to_thread``.
+
+    Applies the rules to each message in order, but resolves ThreadTracking
+    rows up front (one query covering the thread_ids and the company
+    fallbacks) and writes the result with a single ``bulk_create`` +
+    ``bulk_update``. Must be called with messages that are already saved;
+    runs inside one transaction and lets exceptions bubble up so the caller's
+    transaction rolls back as a unit.
+
+    Returns a dict of thread_id -> ThreadTracking for every thread touched.
+    """
+    msgs = [m for m in messages if m is not None and getattr(m, "thread_id", None)]
+    if not msgs:
+        return {}
+
+    # Company fallback candidates: earliest ThreadTracking per company, used by
+    # prescreen/interview messages whose own thread has no ThreadTracking yet.
+    fallback_company_ids = {
+        m.company_id
+        for m in msgs
+        if m.ml_label in ("prescreen", "interview_invite") and m.company_id
+    }
+    targets = Q(thread_id__in={m.thread_id for m in msgs})
+    if fallback_company_ids:
+        # Only the first row per company, not every thread the company has
+        first_per_company = (
+            ThreadTracking.objects.filter(company_id__in=fallback_company_ids)
+            .annotate(
+                rank=Window(
+                    RowNumber(),
+                    partition_by=[F("company_id")],
+                    order_by=[F("sent_date").asc(), F("pk").asc()],
+                )
+            )
+            .filter(rank=1)
+            .values("pk")
+        )
+        targets |= Q(pk__in=first_per_company)
+
+    with transaction.atomic():
+        # One query resolves both the threads and the company fallbacks
+        by_thread: Dict[str, ThreadTracking] = {}
+        company_first: Dict[int, ThreadTracking] = {}
+        for tt in ThreadTracking.objects.filter(targets).order_by("company_id", "sent_date", "pk"):
+            by_thread[tt.thread_id] = tt
+            if tt.company_id in fallback_company_ids:
+                company_first.setdefault(tt.company_id, tt)
+
+        dirty: Dict[int, ThreadTracking] = {}
+        created: Dict[str, ThreadTracking] = {}
+        touched: Dict[str, ThreadTracking] = {}
+
+        for message in msgs:
+            msg_date = message.timestamp.date() if message.timestamp else None
+            tt = by_thread.get(message.thread_id)
             if tt:
                 changed = False
                 old_label = tt.ml_label
                 if message.ml_label and tt.ml_label != message.ml_label:
                     tt.ml_label = message.ml_label
                     changed = True
-
-                    # Update date fields based on new label
                     if message.ml_label == "prescreen" and not tt.prescreen_date:
                         tt.prescreen_date = msg_date
-                        # Clear interview_date if it was set from old label
                         if old_label == "interview_invite" and tt.interview_date == msg_date:
                             tt.interview_date = None
                     elif message.ml_label == "interview_invite" and not tt.interview_date:
                         tt.interview_date = msg_date
-                        # Clear prescreen_date if it was set from old label
                         if old_label == "prescreen" and tt.prescreen_date == msg_date:
                             tt.prescreen_date = None
-
                 if message.confidence is not None and (
                     tt.ml_confidence is None or tt.ml_confidence != message.confidence
                 ):
                     tt.ml_confidence = message.confidence
                     changed = True
-                if changed:
-                    tt.save()
-                return tt
+                if changed and tt.pk is not None:
+                    dirty[tt.pk] = tt
+                touched[message.thread_id] = tt
+                continue
 
-            # No ThreadTracking for this thread_id exists
-            # For prescreen/interview messages, check if company already has a ThreadTracking
-            # and update that one instead of creating a duplicate
-            if (
-                message.ml_label in ("prescreen", "interview_invite")
-                and message.company
-            ):
-                # Look for existing ThreadTracking for this company
-                existing_tt = ThreadTracking.objects.filter(
-                    company=message.company
-                ).order_by("sent_date").first()
-                
+            if message.ml_label in ("prescreen", "interview_invite") and message.company_id:
+                existing_tt = company_first.get(message.company_id)
                 if existing_tt:
-                    # Update the existing record with the date
                     changed = False
                     if message.ml_label == "prescreen" and not existing_tt.prescreen_date:
                         existing_tt.prescreen_date = msg_date
@@ -77,35 +149,144 @@ def propagate_message_label_to_thread(message: Message) -> Optional[ThreadTracki
                     elif message.ml_label == "interview_invite" and not existing_tt.interview_date:
                         existing_tt.interview_date = msg_date
                         changed = True
-                    if changed:
-                        existing_tt.save()
-                    return existing_tt
+                    if changed and existing_tt.pk is not None:
+                        dirty[existing_tt.pk] = existing_tt
+                    touched[existing_tt.thread_id] = existing_tt
+                    continue
 
-            # Create new ThreadTracking for job_application, or prescreen/interview without existing company record
             if (
                 message.ml_label in ("job_application", "interview_invite", "prescreen")
-                and message.company
+                and message.company_id
             ):
-                # Determine date fields based on label
-                prescreen_date = msg_date if message.ml_label == "prescreen" else None
-                interview_date = msg_date if message.ml_label == "interview_invite" else None
-
-                tt = ThreadTracking.objects.create(
-                    thread_id=thread_id,
-                    company=message.company,
+                tt = ThreadTracking(
+                    thread_id=message.thread_id,
+                    company_id=message.company_id,
                     company_source=message.company_source or "manual",
                     job_title="",
                     job_id="",
                     status="application",
-                    sent_date=(message.timestamp.date() if message.timestamp else None),
-                    prescreen_date=prescreen_date,
-                    interview_date=interview_date,
+                    sent_date=msg_date,
+                    prescreen_date=msg_date if message.ml_label == "prescreen" else None,
+                    interview_date=(
+                        msg_date if message.ml_label == "interview_invite" else None
+                    ),
                     ml_label=message.ml_label,
                     ml_confidence=(message.confidence or 0.0),
                 )
-                return tt
-    except Exception:
-        # Don't propagate exceptions — callers should handle/log if needed.
-        return None
+                by_thread[message.thread_id] = tt
+                created[message.thread_id] = tt
+                touched[message.thread_id] = tt
+                current = company_first.get(message.company_id)
+                if current is None or (msg_date and msg_date < current.sent_date):
+                    company_first[message.company_id] = tt
+
+        if created:
+            ThreadTracking.objects.bulk_create(list(created.values()), batch_size=500)
+        if dirty:
+            stamp = timezone.now()
+            for tt in dirty.values():
+                tt.updated_at = stamp
+            ThreadTracking.objects.bulk_update(
+                list(dirty.values()),
+                ["ml_label", "ml_confidence", "prescreen_date", "interview_date", "updated_at"],
+                batch_size=500,
+            )
+
+    return touched
+
+
+_active = threading.local()
+
+
+class ThreadStateAggregator:
+    """Batch of (message, new label) changes applied to ThreadTracking together.
+
+        with ThreadStateAggregator() as batch:
+            for msg, label, confidence in changes:
+                batch.add(msg, label, confidence)
+
+    ``add`` sets the label on the message in memory (skipping reviewed
+    messages unless `overwrite_reviewed`). ``flush`` saves the queued
+    messages with one ``bulk_update`` and propagates them with
+    ``propagate_labels_to_threads``, all in one transaction. A flush happens
+    every `batch_size` changes and when the ``with`` block exits cleanly.
+    Inside the ``with`` block the aggregator is also the target of
+    ``propagate_or_defer`` in this thread.
+    """
+
+    MESSAGE_FIELDS = ["ml_label", "confidence", "company", "company_source"]
+
+    def __init__(self, batch_size: int = 500, save_messages: bool = True):
+        self.batch_size = batch_size
+        self.save_messages = save_messages
+        self._pending: Dict[int, Message] = {}
+        self._unsaved: Dict[int, Message] = {}  # subset of _pending to bulk_update
+        self._outer = None
+        self.messages_saved = 0
+        self.threads_touched: Dict[str, ThreadTracking] = {}
+
+    def __len__(self):
+        return len(self._pending)
+
+    def __enter__(self):
+        self._outer = getattr(_active, "batch", None)
+        _active.batch = self
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _active.batch = self._outer
+        if exc_type is None:
+            self.flush()
+        return False
+
+    def add(
+        self,
+        message: Message,
+        label: Optional[str],
+        confidence: Optional[float] = None,
+        overwrite_reviewed: bool = False,
+    ) -> bool:
+        """Queue a label change; returns False if a reviewed message was skipped."""
+        if message is None:
+            return False
+        if message.reviewed and not overwrite_reviewed:
+            return False
+        message.ml_label = label
+        if confidence is not None:
+            message.confidence = confidence
+        # Mirror Message.save(): reviewed noise messages have no company
+        if message.ml_label == "noise" and message.reviewed:
+            message.company = None
+            message.company_source = ""
+        self._queue(message, needs_save=self.save_messages)
+        return True
+
+    def queue(self, message: Message):
+        """Queue an already saved message for propagation only."""
+        if message is not None:
+            self._queue(message, needs_save=False)
+
+    def _queue(self, message: Message, needs_save: bool):
+        # Unsaved messages (save_messages=False) are keyed by identity
+        key = message.pk if message.pk is not None else id(message)
+        self._pending[key] = message
+        if needs_save:
+            self._unsaved[key] = message
+        if self.batch_size and len(self._pending) >= self.batch_size:
+            self.flush()
 
-    return None
+    def flush(self) -> Dict[str, ThreadTracking]:
+        """Write queued changes; returns thread_id -> ThreadTracking touched."""
+        msgs = list(self._pending.values())
+        unsaved = list(self._unsaved.values())
+        self._pending, self._unsaved = {}, {}
+        if not msgs:
+            return {}
+        # Joins the caller's transaction when there is one (no extra savepoint)
+        with transaction.atomic(savepoint=False):
+            if unsaved:
+                Message.objects.bulk_update(unsaved, self.MESSAGE_FIELDS, batch_size=500)
+                self.messages_saved += len(unsaved)
+            touched = propagate_labels_to_threads(msgs)
+        self.threads_touched.update(touched)
+        return touched
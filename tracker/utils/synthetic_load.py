@@ -0,0 +1,214 @@
+"""Bulk-load a synthetic mailbox into the tracker tables.
+
+View and query benchmarks need 10k-100k+ rows that look like a real job
+search. ``load_mailbox`` streams synthetic_mailbox.generate() into the
+database with bulk_create:
+
+- Company: one row per company in the generator's pool. Companies that
+  already exist by name are reused and left unchanged. New ones are tagged
+  with SYNTHETIC_NOTE, and their first/last contact are set from their
+  messages at the end.
+- Message: every generated message, in batches of ``batch_size``. Bodies are
+  cut to ``max_body`` characters and HTML is only stored with
+  ``with_html=True``, so 100k rows stay a few hundred MB. ml_label,
+  confidence, reviewed and classification_source follow the message kind.
+- ThreadTracking: one row per thread with an application-type message, with
+  status, sent/prescreen/interview/offer/rejection dates and ml_label taken
+  from the thread's messages in date order.
+
+Everything generated uses the synthetic_mailbox.PREFIX id prefix, so
+``clear_synthetic`` removes it again without touching real rows. Signals are
+not sent for bulk inserts.
+"""
+
+import hashlib
+import random
+import time
+from dataclasses import asdict, dataclass
+from typing import Dict, List
+
+from django.db import transaction
+from django.db.models import Max, Min
+
+import synthetic_mailbox
+from tracker.models import Company, Message, ThreadTracking
+
+SYNTHETIC_NOTE = "Synthetic company (load_synthetic_mailbox)"
+BATCH_SIZE = 2000
+MAX_BODY = 2000
+NAME_CHUNK = 500  # names per name__in lookup
+
+
+@dataclass
+class LoadReport:
+    messages: int = 0
+    threads: int = 0
+    companies_created: int = 0
+    companies_reused: int = 0
+    seconds: float = 0.0
+
+    def as_dict(self) -> Dict:
+        return asdict(self)
+
+
+def synthetic_rows_exist() -> bool:
+    return Message.objects.filter(msg_id__startswith=synthetic_mailbox.PREFIX).exists()
+
+
+def _company_ids(generator: synthetic_mailbox.MailboxGenerator, report: LoadReport) -> Dict[str, int]:
+    names = [name for name, _ in generator.companies]
+    ids: Dict[str, int] = {}
+    for i in range(0, len(names), NAME_CHUNK):
+        ids.update(Company.objects.filter(name__in=names[i : i + NAME_CHUNK]).values_list("name", "pk"))
+    report.companies_reused = len(ids)
+    new = [
+        Company(
+            name=name,
+            domain=domain,
+            status="application",
+            first_contact=generator.end,
+            last_contact=generator.end,
+            notes=SYNTHETIC_NOTE,
+        )
+        for name, domain in generator.companies
+        if name not in ids
+    ]
+    Company.objects.bulk_create(new, batch_size=BATCH_SIZE)
+    report.companies_created = len(new)
+    created = [c.name for c in new]
+    for i in range(0, len(created), NAME_CHUNK):
+        ids.update(
+            Company.objects.filter(name__in=created[i : i + NAME_CHUNK], notes=SYNTHETIC_NOTE).values_list("name", "pk")
+        )
+    return ids
+
+
+def _track(threads: Dict[str, Dict], msg: synthetic_mailbox.SyntheticMessage, company_id: int):
+    """Fold one application-type message into its thread's ThreadTracking fields."""
+    status = synthetic_mailbox.THREAD_STATUS.get(msg.kind)
+    if status is None or company_id is None:
+        return
+    day = msg.date.date()
+    thread = threads.get(msg.thread_id)
+    if thread is None:
+        thread = threads[msg.thread_id] = {
+            "company_id": company_id,
+            "job_title": msg.job_title,
+            "job_id": msg.job_id.replace(" ", ""),
+            "sent_date": day,
+            "latest": None,
+        }
+    thread["sent_date"] = min(thread["sent_date"], day)
+    date_field = {"prescreen": "prescreen_date", "interview": "interview_date", "offer": "offer_date", "rejection": "rejection_date"}.get(msg.kind)
+    if date_field:
+        thread[date_field] = max(thread.get(date_field) or day, day)
+    if thread["latest"] is None or msg.date >= thread["latest"]:
+        thread["latest"] = msg.date
+        thread["status"] = status
+        thread["ml_label"] = msg.ml_label
+
+
+def load_mailbox(
+    count: int,
+    seed: int = 0,
+    batch_size: int = BATCH_SIZE,
+    with_html: bool = False,
+    max_body: int = MAX_BODY,
+    **generator_kwargs,
+) -> LoadReport:
+    """Generate `count` synthetic messages and bulk-insert them (see module docstring).
+
+    Raises:
+        ValueError: synthetic rows are already loaded (run clear_synthetic first)
+    """
+    if synthetic_rows_exist():
+        raise ValueError("Synthetic messages are already loaded; clear them first.")
+    started = time.perf_counter()
+    report = LoadReport()
+    rng = random.Random(seed)
+    generator = synthetic_mailbox.MailboxGenerator(seed=seed, **generator_kwargs)
+    company_ids = _company_ids(generator, report)
+    threads: Dict[str, Dict] = {}
+
+    batch: List[Message] = []
+
+    def flush():
+        with transaction.atomic():
+            Message.objects.bulk_create(batch, batch_size=batch_size)
+        report.messages += len(batch)
+        batch.clear()
+
+    for msg in generator.messages(count):
+        company_id = company_ids.get(msg.company) if msg.company else None
+        _track(threads, msg, company_id)
+        source = "rules" if rng.random() < 0.6 else "ml"
+        batch.append(
+            Message(
+                msg_id=msg.msg_id,
+                thread_id=msg.thread_id,
+                company_id=company_id,
+                company_source="synthetic" if company_id else None,
+                sender=msg.sender,
+                subject=msg.subject,
+                body=msg.text[:max_body],
+                body_html=msg.html if with_html else None,
+                body_hash=hashlib.sha256(msg.text.encode("utf-8")).hexdigest(),
+                timestamp=msg.date,
+                ml_label=msg.ml_label,
+                confidence=round(rng.uniform(0.55, 0.99), 3),
+                reviewed=rng.random() < 0.3,
+                classification_source=source,
+            )
+        )
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+
+    tracked = [
+        ThreadTracking(
+            thread_id=thread_id,
+            company_id=t["company_id"],
+            company_source="synthetic",
+            job_title=t["job_title"],
+            job_id=t["job_id"],
+            status=t["status"],
+            sent_date=t["sent_date"],
+            prescreen_date=t.get("prescreen_date"),
+            interview_date=t.get("interview_date"),
+            offer_date=t.get("offer_date"),
+            rejection_date=t.get("rejection_date"),
+            ml_label=t["ml_label"],
+            ml_confidence=round(rng.uniform(0.6, 0.99), 3),
+        )
+        for thread_id, t in threads.items()
+    ]
+    with transaction.atomic():
+        ThreadTracking.objects.bulk_create(tracked, batch_size=batch_size)
+        spans = (
+            Message.objects.filter(company__notes=SYNTHETIC_NOTE, msg_id__startswith=synthetic_mailbox.PREFIX)
+            .values("company_id")
+            .annotate(first=Min("timestamp"), last=Max("timestamp"))
+            .order_by()
+        )
+        companies = []
+        for row in spans:
+            companies.append(Company(pk=row["company_id"], first_contact=row["first"], last_contact=row["last"]))
+        Company.objects.bulk_update(companies, ["first_contact", "last_contact"], batch_size=batch_size)
+    report.threads = len(tracked)
+    report.seconds = round(time.perf_counter() - started, 2)
+    return report
+
+
+def clear_synthetic() -> Dict[str, int]:
+    """Delete synthetic messages, threads and companies; returns rows deleted per model."""
+    prefix = synthetic_mailbox.PREFIX
+    with transaction.atomic():
+        _, threads = ThreadTracking.objects.filter(thread_id__startswith=prefix).delete()
+        _, messages = Message.objects.filter(msg_id__startswith=prefix).delete()
+        _, companies = Company.objects.filter(notes=SYNTHETIC_NOTE).delete()
+    return {
+        "messages": messages.get(Message._meta.label, 0),
+        "threads": threads.get(ThreadTracking._meta.label, 0),
+        "companies": companies.get(Company._meta.label, 0),
+    }
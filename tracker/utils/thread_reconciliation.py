@@ -0,0 +1,282 @@
+"""ThreadTracking reconciliation.
+
+Computes the ThreadTracking state implied by each thread's messages with two
+grouped queries (an aggregate per thread_id and a ROW_NUMBER() window for the
+latest message), diffs it against the stored rows and applies the result with
+``bulk_create`` / ``bulk_update`` and one DELETE, in a single transaction.
+
+Expected state of a thread's ThreadTracking:
+- ``ml_label`` / ``ml_confidence``: those of the most recent message
+- ``rejection_date`` / ``interview_date`` / ``prescreen_date``: the date of
+  the most recent message labeled rejection / interview_invite / prescreen,
+  or None
+- a ThreadTracking whose thread has no messages is an orphan
+
+The management commands check_threadtracking_health, sync_threadtracking,
+sync_message_threadtracking_labels and cleanup_threads are modes on top of
+this module; ``recompute_threads`` serves the deferred Message delete hook in
+tracker.message_signals.
+"""
+
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Count, Exists, F, Max, OuterRef, Q, QuerySet, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from tracker.models import Message, ThreadTracking
+
+# ThreadTracking date field -> message label that sets it
+DATE_LABELS = {
+    "rejection_date": "rejection",
+    "interview_date": "interview_invite",
+    "prescreen_date": "prescreen",
+}
+# Labels counted per thread (ThreadState.label_counts)
+COUNTED_LABELS = ("job_application", "rejection", "interview_invite", "prescreen")
+RECONCILE_FIELDS = ("rejection_date", "interview_date", "prescreen_date", "ml_label")
+BATCH_SIZE = 500
+
+
+@dataclass
+class ThreadState:
+    """ThreadTracking state implied by one thread's messages."""
+
+    thread_id: str
+    message_count: int = 0
+    latest_label: Optional[str] = None
+    latest_confidence: Optional[float] = None
+    dates: Dict[str, Optional[date]] = field(default_factory=dict)
+    label_counts: Dict[str, int] = field(default_factory=dict)
+
+
+@dataclass
+class FieldChange:
+    thread: ThreadTracking
+    field: str
+    old: object
+    new: object
+
+
+@dataclass
+class ReconcileReport:
+    """Differences between stored ThreadTracking rows and their messages."""
+
+    checked: int = 0
+    orphans: List[ThreadTracking] = field(default_factory=list)
+    changes: List[FieldChange] = field(default_factory=list)
+    applied: bool = False
+
+    def count(self, field_name: str) -> int:
+        return sum(1 for c in self.changes if c.field == field_name)
+
+    @property
+    def changed_threads(self) -> List[ThreadTracking]:
+        return list({c.thread.pk: c.thread for c in self.changes}.values())
+
+
+def _scopes(thread_ids: Optional[Iterable[str]]) -> Iterator[Q]:
+    """Q filters covering `thread_ids` in batches (everything when None)."""
+    if thread_ids is None:
+        yield Q()
+        return
+    ids = sorted({t for t in thread_ids if t})
+    for i in range(0, len(ids), BATCH_SIZE):
+        yield Q(thread_id__in=ids[i : i + BATCH_SIZE])
+
+
+def expected_states(thread_ids: Optional[Iterable[str]] = None) -> Dict[str, ThreadState]:
+    """Expected ThreadTracking state per thread_id, from grouped Message queries.
+
+    Two queries per batch of BATCH_SIZE thread ids, or two in total when
+    `thread_ids` is None (all threads).
+    """
+    aggregates = {"message_count": Count("id")}
+    for date_field, label in DATE_LABELS.items():
+        aggregates[date_field] = Max("timestamp", filter=Q(ml_label=label))
+    for label in COUNTED_LABELS:
+        aggregates[f"n_{label}"] = Count("id", filter=Q(ml_label=label))
+
+    states: Dict[str, ThreadState] = {}
+    for scope in _scopes(thread_ids):
+        for row in Message.objects.filter(scope).values("thread_id").annotate(**aggregates).order_by():
+            states[row["thread_id"]] = ThreadState(
+                thread_id=row["thread_id"],
+                message_count=row["message_count"],
+                dates={f: row[f].date() if row[f] else None for f in DATE_LABELS},
+                label_counts={label: row[f"n_{label}"] for label in COUNTED_LABELS},
+            )
+        latest = (
+            Message.objects.filter(scope)
+            .annotate(
+                rank=Window(
+                    RowNumber(),
+                    partition_by=[F("thread_id")],
+                    order_by=[F("timestamp").desc(), F("pk").desc()],
+                )
+            )
+            .filter(rank=1)
+            .values_list("thread_id", "ml_label", "confidence")
+        )
+        for thread_id, label, confidence in latest:
+            state = states.get(thread_id)
+            if state is not None:
+                state.latest_label = label
+                state.latest_confidence = confidence
+    return states
+
+
+def diff_threads(
+    threads: Optional[QuerySet] = None,
+    fields: Iterable[str] = RECONCILE_FIELDS,
+    orphans: bool = True,
+) -> ReconcileReport:
+    """Compare ThreadTracking rows with their messages.
+
+    Changed rows are updated in memory (FieldChange keeps the old value);
+    nothing is written until ``apply_report``. Changing ``ml_label`` also
+    sets ``ml_confidence`` from the same (latest) message.
+
+    Args:
+        threads: ThreadTracking queryset to check (default: all)
+        fields: fields to reconcile, a subset of RECONCILE_FIELDS
+        orphans: report threads without messages as orphans
+    """
+    fields = tuple(fields)
+    unknown = set(fields) - set(RECONCILE_FIELDS)
+    if unknown:
+        raise ValueError(f"Cannot reconcile field(s): {', '.join(sorted(unknown))}")
+
+    scoped = threads is not None
+    rows = list((threads if scoped else ThreadTracking.objects.all()).select_related("company"))
+    states = expected_states([tt.thread_id for tt in rows] if scoped else None)
+
+    report = ReconcileReport(checked=len(rows))
+    for tt in rows:
+        state = states.get(tt.thread_id)
+        if state is None:
+            if orphans:
+                report.orphans.append(tt)
+            continue
+        for name in fields:
+            if name == "ml_label":
+                if state.latest_label != tt.ml_label:
+                    report.changes.append(FieldChange(tt, name, tt.ml_label, state.latest_label))
+                    tt.ml_label = state.latest_label
+                    tt.ml_confidence = state.latest_confidence
+                continue
+            expected = state.dates[name]
+            if getattr(tt, name) != expected:
+                report.changes.append(FieldChange(tt, name, getattr(tt, name), expected))
+                setattr(tt, name, expected)
+    return report
+
+
+def apply_report(report: ReconcileReport) -> ReconcileReport:
+    """Write a diff_threads report: one DELETE for orphans, one bulk_update."""
+    changed = report.changed_threads
+    fields = {c.field for c in report.changes}
+    if "ml_label" in fields:
+        fields.add("ml_confidence")
+    with transaction.atomic():
+        orphan_ids = [tt.pk for tt in report.orphans]
+        for i in range(0, len(orphan_ids), BATCH_SIZE):
+            ThreadTracking.objects.filter(pk__in=orphan_ids[i : i + BATCH_SIZE]).delete()
+        if changed:
+            stamp = timezone.now()
+            for tt in changed:
+                tt.updated_at = stamp
+            ThreadTracking.objects.bulk_update(changed, sorted(fields) + ["updated_at"], batch_size=BATCH_SIZE)
+    report.applied = True
+    return report
+
+
+def reconcile(
+    threads: Optional[QuerySet] = None,
+    fields: Iterable[str] = RECONCILE_FIELDS,
+    orphans: bool = True,
+    dry_run: bool = True,
+) -> ReconcileReport:
+    """diff_threads, then apply_report unless `dry_run`."""
+    report = diff_threads(threads, fields=fields, orphans=orphans)
+    if not dry_run:
+        apply_report(report)
+    return report
+
+
+# Fields the Message delete hook has always recomputed
+RECOMPUTE_FIELDS = ("rejection_date", "interview_date", "ml_label")
+
+
+def recompute_threads(thread_ids: Iterable[str]) -> Tuple[int, int]:
+    """Bring the ThreadTracking rows of `thread_ids` in line with their messages.
+
+    Used after messages are deleted: threads left without messages lose their
+    ThreadTracking, the others get rejection/interview dates and ml_label
+    recomputed. About five queries per BATCH_SIZE threads.
+
+    Returns:
+        (threads deleted, threads updated)
+    """
+    deleted = updated = 0
+    for scope in _scopes(thread_ids):
+        report = reconcile(ThreadTracking.objects.filter(scope), fields=RECOMPUTE_FIELDS, dry_run=False)
+        deleted += len(report.orphans)
+        updated += len(report.changed_threads)
+    return deleted, updated
+
+
+def messages_missing_threads(messages: QuerySet) -> QuerySet:
+    """The messages in `messages` whose thread has no ThreadTracking (one query)."""
+    return messages.exclude(Exists(ThreadTracking.objects.filter(thread_id=OuterRef("thread_id"))))
+
+
+def create_missing(
+    messages: Iterable[Message],
+    build: Callable[[Message], ThreadTracking],
+    dry_run: bool = False,
+) -> Tuple[List[Tuple[Message, ThreadTracking]], List[Message]]:
+    """Build one ThreadTracking per thread from its first message in `messages`.
+
+    `messages` should come from ``messages_missing_threads``; later messages of
+    a thread that already got a row are ignored. Messages without a company
+    cannot back a ThreadTracking and are returned separately. Rows are saved
+    with one ``bulk_create`` unless `dry_run`. Like the per-row get_or_create
+    this replaces, it is best effort: a thread that got a row since `messages`
+    was evaluated keeps it and is left out of the result, instead of failing
+    the whole batch.
+
+    Returns:
+        ([(message, thread_tracking), ...], [messages skipped for having no company])
+    """
+    created: Dict[str, Tuple[Message, ThreadTracking]] = {}
+    no_company: List[Message] = []
+    for msg in messages:
+        if msg.thread_id in created:
+            continue
+        if not msg.company_id:
+            no_company.append(msg)
+            continue
+        created[msg.thread_id] = (msg, build(msg))
+    if created and not dry_run:
+        for scope in _scopes(created):
+            for thread_id in ThreadTracking.objects.filter(scope).values_list("thread_id", flat=True):
+                created.pop(thread_id, None)
+        # ignore_conflicts covers rows inserted between that check and the insert
+        ThreadTracking.objects.bulk_create(
+            [tt for _, tt in created.values()], batch_size=BATCH_SIZE, ignore_conflicts=True
+        )
+    return list(created.values()), no_company
+
+
+def label_mismatches(label: str) -> QuerySet:
+    """ThreadTracking rows of threads with a `label` message but another ml_label."""
+    has_label = Message.objects.filter(thread_id=OuterRef("thread_id"), ml_label=label)
+    return (
+        ThreadTracking.objects.filter(Exists(has_label))
+        .exclude(ml_label=label)
+        .select_related("company")
+    )
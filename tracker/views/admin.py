@@ -10,13 +10,15 @@ import subprocess
 import sys
 from datetime import datetime
 from pathlib import Path
+from urllib.parse import urlencode
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.csrf import csrf_exempt
 from django.shortcuts import render, redirect
 from django.http import JsonResponse, StreamingHttpResponse
 from tracker.models import IngestionStats, Message
-from tracker.services import StatsService, CompanyService
+from tracker.services import StatsService, CompanyService, RetrainScheduler, LogFilter, LogService
+from tracker.services.log_service import display_line
 from tracker.views.helpers import sanitize_string, validate_domain
 from parser import ingest_message
 from scripts.import_gmail_filters import (
@@ -25,50 +27,101 @@ from scripts.import_gmail_filters import (
     make_or_pattern,
 )
 from gmail_auth import get_gmail_service
+import model_store
 
 python_path = sys.executable
 
 
-@login_required
-def log_viewer(request):
-    """Display and refresh log files from the logs directory."""
+def _log_request(request):
+    """Resolve the requested log file (only names listed in logs/) and its filter."""
     from django.conf import settings
     from django.utils import timezone
 
     logs_dir = Path(settings.BASE_DIR) / "logs"
-    log_files = [f.name for f in logs_dir.glob("*.log") if f.is_file()]
-    log_files.sort()
-    
-    # Default to today's tracker log (where ingestion debug output goes)
+    log_files = sorted(f.name for f in logs_dir.glob("*.log") if f.is_file())
+
+    # Default to the current tracker log (JSON lines from tracker_logger; rotated
+    # daily to tracker-YYYY-MM-DD.log), then to today's file from older versions
     today = timezone.localtime(timezone.now()).strftime("%Y-%m-%d")
-    default_log = f"tracker-{today}.log"
-    
-    # Use today's tracker log if it exists, otherwise fall back to first log file
-    if not request.GET.get("logfile"):
-        if default_log in log_files:
-            selected_log = default_log
-        else:
-            selected_log = log_files[0] if log_files else None
-    else:
-        selected_log = request.GET.get("logfile")
+    default_logs = ["tracker.log", f"tracker-{today}.log"]
+
+    selected_log = request.GET.get("logfile")
+    if selected_log not in log_files:
+        present = [name for name in default_logs if name in log_files]
+        selected_log = present[0] if present else (log_files[0] if log_files else None)
+    log_filter = LogFilter(
+        level=request.GET.get("level", ""),
+        msg_id=request.GET.get("msg_id", "").strip(),
+        text=request.GET.get("q", "").strip(),
+    )
+    log_path = logs_dir / selected_log if selected_log else None
+    return log_files, selected_log, log_path, log_filter
+
+
+def _int_param(request, name):
+    try:
+        return int(request.GET[name])
+    except (KeyError, ValueError):
+        return None
+
+
+@login_required
+def log_viewer(request):
+    """Display a log file page by page, newest first, with server-side filters.
+
+    Reads backwards from the end of the file (or from ?before=<offset> for older
+    pages) instead of loading the whole file.
+    """
+    log_files, selected_log, log_path, log_filter = _log_request(request)
+    page = None
     log_content = ""
-    if selected_log and (logs_dir / selected_log).exists():
+    if log_path and log_path.exists():
         try:
-            with open(
-                logs_dir / selected_log, "r", encoding="utf-8", errors="replace"
-            ) as f:
-                # Read last 100KB to avoid memory issues with huge logs
-                log_content = f.read()[-100_000:]
-        except Exception as e:
+            page = LogService.read_page(log_path, _int_param(request, "before"), log_filter)
+            log_content = "\n".join(display_line(line) for line in page["lines"])
+        except OSError as e:
             log_content = f"[Error reading log: {e}]"
+    filter_query = urlencode(
+        {
+            k: v
+            for k, v in (
+                ("logfile", selected_log or ""),
+                ("level", log_filter.level),
+                ("msg_id", log_filter.msg_id),
+                ("q", request.GET.get("q", "").strip()),
+            )
+            if v
+        }
+    )
     ctx = {
         "log_files": log_files,
         "selected_log": selected_log,
         "log_content": log_content,
+        "page": page,
+        "is_newest_page": _int_param(request, "before") is None,
+        "log_filter": log_filter,
+        "filter_text": request.GET.get("q", "").strip(),
+        "filter_query": filter_query,
+        "log_levels": ["DEBUG", "INFO", "WARNING", "ERROR"],
     }
     return render(request, "tracker/log_viewer.html", ctx)
 
 
+@login_required
+def log_tail(request):
+    """Return the lines appended to a log file since ?offset=<bytes> (live tail)."""
+    log_files, selected_log, log_path, log_filter = _log_request(request)
+    offset = _int_param(request, "offset")
+    if offset is None:
+        return JsonResponse({"error": "offset is required"}, status=400)
+    if not log_path or not log_path.exists():
+        return JsonResponse({"error": "log file not found"}, status=404)
+    result = LogService.read_since(log_path, offset, log_filter)
+    result["lines"] = [display_line(line) for line in result["lines"]]
+    result["logfile"] = selected_log
+    return JsonResponse(result)
+
+
 @csrf_exempt
 @login_required
 def json_file_viewer(request):
@@ -828,10 +881,17 @@ def retrain_model(request):
             with open("model/model_audit.json", "w", encoding="utf-8") as f:
                 json.dump({"training_output": training_output}, f)
         except subprocess.CalledProcessError as e:
-            training_output = f"Retraining failed:\n{e.stderr}"
+            if e.returncode == model_store.EXIT_LOCKED:
+                training_output = (
+                    "Another training run is already in progress. "
+                    "Check the retrain queue and try again when it finishes."
+                )
+            else:
+                training_output = f"Retraining failed:\n{e.stderr}"
     ctx = {
         "metrics": {},
         "training_output": training_output,
+        "retrain_status": RetrainScheduler.get_status(),
     }
     return render(request, "tracker/metrics.html", ctx)
 
@@ -900,6 +960,7 @@ def system_info(request):
 
 __all__ = [
     "log_viewer",
+    "log_tail",
     "retrain_model",
     "json_file_viewer",
     "reingest_admin",
@@ -4,27 +4,52 @@ Extracted from monolithic views.py (Phase 5 refactoring).
 Provides API endpoints for frontend JavaScript to poll application state.
 """
 
-from datetime import datetime
+from datetime import datetime, timedelta
+
 from django.http import JsonResponse
+from django.utils import timezone
+
+from tracker.models import IngestionRun
+
+# A running IngestionRun whose heartbeat is older than this is treated as dead
+# (e.g. the ingest process was killed before it could mark the run finished).
+STALE_AFTER = timedelta(seconds=120)
+
+
+def _run_payload(run):
+    return {
+        "id": run.pk,
+        "source": run.source,
+        "phase": run.phase,
+        "processed": run.processed,
+        "total": run.total,
+        "eta_seconds": run.eta_seconds,
+        "messages_per_sec": run.messages_per_sec,
+        "started_at": run.started_at.isoformat() if run.started_at else None,
+        "heartbeat_at": run.heartbeat_at.isoformat() if run.heartbeat_at else None,
+    }
 
 
 def ingestion_status_api(request):
-    """API endpoint to check if Gmail ingestion is currently running."""
-    import psutil
-
-    # Check if any process is running ingest_gmail
-    is_running = False
-    for proc in psutil.process_iter(["pid", "name", "cmdline"]):
-        try:
-            cmdline = proc.info.get("cmdline") or []
-            if cmdline and any("ingest_gmail" in str(arg) for arg in cmdline):
-                is_running = True
-                break
-        except (psutil.NoSuchProcess, psutil.AccessDenied):
-            pass
+    """API endpoint to check if Gmail ingestion is currently running.
+
+    Reads the newest running IngestionRun (one indexed query) instead of
+    scanning the process table; ingest_gmail keeps that row's phase, progress
+    and heartbeat current.
+    """
+    run = IngestionRun.objects.filter(status="running").order_by("-started_at").first()
+    stale = False
+    if run is not None:
+        last_seen = run.heartbeat_at or run.started_at
+        stale = last_seen is None or timezone.now() - last_seen > STALE_AFTER
 
     return JsonResponse(
-        {"is_running": is_running, "timestamp": datetime.now().isoformat()}
+        {
+            "is_running": run is not None and not stale,
+            "stale": stale,
+            "run": _run_payload(run) if run is not None else None,
+            "timestamp": datetime.now().isoformat(),
+        }
     )
 
 
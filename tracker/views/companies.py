@@ -7,8 +7,6 @@ import json
 import logging
 import os
 import re
-import subprocess
-import sys
 from datetime import datetime, timedelta
 from pathlib import Path
 from django.contrib import messages
@@ -26,14 +24,13 @@ from tracker.models import (
     UnresolvedCompany,
     AuditEvent,
 )
-from tracker.services import CompanyService
+from tracker.services import CompanyService, RetrainScheduler
 from tracker.forms import CompanyEditForm
 from tracker.views.helpers import build_sidebar_context
 from db import PATTERNS_PATH
 from scripts.import_gmail_filters import load_json
 
 # Module-level constants
-python_path = sys.executable
 logger = logging.getLogger(__name__)
 
 
@@ -115,34 +112,16 @@ def delete_company(request, company_id):
                 f"📊 Removed {total_message_count} messages and {application_count} applications.",
             )
 
-        # Trigger model retraining in background
-        messages.info(request, "🔄 Retraining model to update training data...")
+        # Queue a debounced background retrain (single-flight, see RetrainScheduler)
         try:
-            result = subprocess.run(
-                [python_path, "train_model.py"],
-                capture_output=True,
-                text=True,
-                timeout=60,
-                check=False,
-            )
-            if result.returncode == 0:
-                messages.success(
-                    request, "✅ Model retrained successfully. Training data updated."
-                )
-            else:
-                messages.warning(
-                    request,
-                    f"⚠️ Model retraining encountered issues. You may need to retrain manually.",
-                )
-        except subprocess.TimeoutExpired:
-            messages.warning(
-                request,
-                "⚠️ Model retraining timed out. Please retrain manually from the sidebar.",
+            RetrainScheduler.request_retrain(reason=f"delete_company:{company_name}")
+            messages.info(
+                request, "🔄 Model retraining queued to update training data."
             )
         except Exception as e:
             messages.warning(
                 request,
-                f"⚠️ Could not auto-retrain model: {str(e)}. Please retrain manually.",
+                f"⚠️ Could not queue model retraining: {str(e)}. Please retrain manually.",
             )
 
         return redirect("label_companies")
@@ -1194,7 +1173,6 @@ def label_companies(request):
 
 @login_required
 def merge_companies(request):
-    """Merge multiple companies: reassign all messages/applications to canonical company, delete duplicates."""
     """Merge multiple companies: reassign all messages/applications to canonical company, delete duplicates."""
     if request.method == "POST":
         company_ids = request.POST.getlist("company_ids")
@@ -1210,42 +1188,18 @@ def merge_companies(request):
             )
             return redirect("label_companies")
 
-        try:
-            canonical_company = Company.objects.get(id=canonical_id)
-            duplicate_ids = [cid for cid in company_ids if cid != canonical_id]
-            duplicates = Company.objects.filter(id__in=duplicate_ids)
-
-            # Reassign all messages
-            messages_moved = Message.objects.filter(company__in=duplicates).update(
-                company=canonical_company
-            )
-            # Reassign all applications
-            apps_moved = ThreadTracking.objects.filter(company__in=duplicates).update(
-                company=canonical_company
-            )
-
-            # Update canonical company timestamps if needed
-            all_messages = Message.objects.filter(company=canonical_company).order_by(
-                "timestamp"
-            )
-            if all_messages.exists():
-                canonical_company.first_contact = all_messages.first().timestamp
-                canonical_company.last_contact = all_messages.last().timestamp
-                canonical_company.save()
-
-            # Delete duplicate companies
-            dup_names = list(duplicates.values_list("name", flat=True))
-            duplicates.delete()
-
+        ok, error, stats = CompanyService.merge_companies(company_ids, canonical_id)
+        if ok:
             messages.success(
                 request,
-                f"✅ Merged {len(dup_names)} companies into '{canonical_company.name}'. "
-                f"Moved {messages_moved} messages and {apps_moved} applications. Deleted: {', '.join(dup_names)}.",
+                f"✅ Merged {len(stats['duplicate_names'])} companies into '{stats['canonical_name']}'. "
+                f"Moved {stats['messages_moved']} messages and {stats['applications_moved']} applications. "
+                f"Deleted: {', '.join(stats['duplicate_names'])}.",
             )
-        except Company.DoesNotExist:
-            messages.error(request, "⚠️ Canonical company not found.")
-        except Exception as e:
-            messages.error(request, f"❌ Merge failed: {e}")
+        elif error == "Canonical company not found.":
+            messages.error(request, f"⚠️ {error}")
+        else:
+            messages.error(request, f"❌ {error}")
 
         return redirect("label_companies")
 
@@ -19,9 +19,11 @@ from tracker.models import (
     Company,
     Message,
     ThreadTracking,
+    IngestionRun,
     IngestionStats,
     UnresolvedCompany,
 )
+from tracker.services import RetrainScheduler
 from tracker.views.helpers import extract_body_content, build_sidebar_context
 
 
@@ -121,6 +123,16 @@ def dashboard(request):
         chart_skipped = []
         chart_ignored = []
 
+    # Ingestion run history: throughput trend over the last 30 finished runs
+    recent_runs = list(IngestionRun.objects.exclude(status="running")[:30])
+    recent_runs.reverse()
+    run_chart = {
+        "labels": [r.started_at.strftime("%Y-%m-%d %H:%M") for r in recent_runs],
+        "messages_per_sec": [r.messages_per_sec for r in recent_runs],
+        "processed": [r.processed for r in recent_runs],
+        "mb_fetched": [round(r.bytes_fetched / 1_000_000, 2) for r in recent_runs],
+    }
+
     # Multi-line chart: daily totals for rejections, applications, interviews, total
     # Use earliest non-null of sent_date, rejection_date, or interview_date so standalone
     # rejections/interviews (without a sent_date) still show up on the chart
@@ -807,6 +819,8 @@ def dashboard(request):
         "ghosted_count": ghosted_count,
         "all_companies": all_companies,
         "focus_area_wordcloud_data": focus_area_wordcloud_data,
+        "recent_ingestion_runs": recent_runs[::-1][:5],
+        "ingestion_run_chart": json.dumps(run_chart),
     }
     # Ensure single source of truth for sidebar cards like Applications This Week
     # First-time user flag: show onboarding modal if no messages exist
@@ -951,6 +965,7 @@ def metrics(request):
         "chart_inserted": chart_inserted,
         "chart_skipped": chart_skipped,
         "chart_ignored": chart_ignored,
+        "retrain_status": RetrainScheduler.get_status(),
     }
     return render(request, "tracker/metrics.html", ctx)
 
@@ -6,10 +6,7 @@ Extracted from monolithic views.py (Phase 5 refactoring).
 import json
 import logging
 import os
-import subprocess
-import sys
 from pathlib import Path
-from bs4 import BeautifulSoup
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.db.models import (
@@ -28,10 +25,10 @@ from django.http import JsonResponse
 from django.shortcuts import render, redirect
 from django.utils.timezone import now
 from tracker.models import Company, Message, ThreadTracking, AuditEvent, IngestionStats
-from tracker.services import MessageService
+from tracker.services import MessageService, RetrainScheduler
 from gmail_auth import get_gmail_service
+import html_text
 
-python_path = sys.executable
 logger = logging.getLogger(__name__)
 
 
@@ -186,30 +183,11 @@ def label_messages(request):
             bulk_label = request.POST.get("bulk_label")
 
             if selected_ids and bulk_label:
-                updated_count = 0
-                touched_threads = set()
-                from tracker.label_helpers import label_message_and_propagate
-
-                for msg_id in selected_ids:
-                    try:
-                        msg = Message.objects.get(pk=msg_id)
-                        # Use centralized helper to save+propagate label changes
-                        # This is a manual/admin action — allow overwriting reviewed flags
-                        label_message_and_propagate(
-                            msg, bulk_label, confidence=1.0, overwrite_reviewed=True
-                        )
-                        if msg.thread_id:
-                            touched_threads.add(msg.thread_id)
-                        updated_count += 1
-                    except Message.DoesNotExist:
-                        continue
-
-                # Also update corresponding Application rows by thread_id
-                apps_updated = 0
-                if touched_threads:
-                    apps_updated = ThreadTracking.objects.filter(
-                        thread_id__in=list(touched_threads)
-                    ).update(ml_label=bulk_label, reviewed=True)
+                # Manual/admin action — allow overwriting reviewed flags. Messages are
+                # labeled, propagated and their threads marked reviewed in one transaction.
+                updated_count, apps_updated = MessageService.bulk_label_messages(
+                    selected_ids, bulk_label, confidence=1.0, overwrite_reviewed=True
+                )
 
                 messages.success(
                     request,
@@ -221,13 +199,13 @@ def label_messages(request):
                     ),
                 )
 
-                # Trigger model retraining in background whenever messages are labeled
-                messages.info(request, "🔄 Retraining model to update training data...")
+                # Queue a debounced background retrain (coalesces rapid labeling sessions)
                 try:
-                    # pylint: disable=consider-using-with
-                    subprocess.Popen([python_path, "train_model.py"])
-                    messages.success(
-                        request, "✅ Model retraining started in background"
+                    state = RetrainScheduler.request_retrain(reason="bulk_label")
+                    messages.info(
+                        request,
+                        f"🔄 Model retraining queued ({state.get('requests', 1)} pending request(s); "
+                        "runs once labeling goes quiet)",
                     )
                 except Exception as e:
                     messages.warning(
@@ -248,16 +226,9 @@ def label_messages(request):
                     else:
                         company = Company.objects.get(pk=int(company_id))
 
-                    updated_count = 0
-                    for msg_id in selected_ids:
-                        try:
-                            msg = Message.objects.get(pk=msg_id)
-                            msg.company = company
-                            # Explicitly preserve existing label - only update company
-                            msg.save(update_fields=["company"])
-                            updated_count += 1
-                        except Message.DoesNotExist:
-                            continue
+                    updated_count = MessageService.bulk_reassign_company(
+                        selected_ids, company
+                    )
 
                     company_name = company.name if company else "None"
                     messages.success(
@@ -285,13 +256,13 @@ def label_messages(request):
                     f"✅ Marked {updated_count} selected message(s) as reviewed",
                 )
 
-                # Trigger model retraining in background when messages are marked as reviewed
-                messages.info(request, "🔄 Retraining model to update training data...")
+                # Queue a debounced background retrain (coalesces rapid labeling sessions)
                 try:
-                    # pylint: disable=consider-using-with
-                    subprocess.Popen([python_path, "train_model.py"])
-                    messages.success(
-                        request, "✅ Model retraining started in background"
+                    state = RetrainScheduler.request_retrain(reason="mark_reviewed")
+                    messages.info(
+                        request,
+                        f"🔄 Model retraining queued ({state.get('requests', 1)} pending request(s); "
+                        "runs once labeling goes quiet)",
                     )
                 except Exception as e:
                     messages.warning(
@@ -607,21 +578,15 @@ def label_messages(request):
             selected_ids = request.POST.getlist("selected_messages")
 
             if selected_ids:
-                # Get thread IDs before deletion for cleanup
-                thread_ids = set(
-                    Message.objects.filter(pk__in=selected_ids)
-                    .exclude(thread_id__isnull=True)
-                    .values_list("thread_id", flat=True)
-                )
-
                 # Count messages by date for stats update
                 messages_by_date = {}
                 for msg in Message.objects.filter(pk__in=selected_ids).values('timestamp'):
                     msg_date = msg['timestamp'].date()
                     messages_by_date[msg_date] = messages_by_date.get(msg_date, 0) + 1
 
-                # Delete the messages
-                deleted_count = Message.objects.filter(pk__in=selected_ids).delete()[0]
+                # Delete the messages; their ThreadTracking rows are recomputed
+                # (or removed when no messages remain) in one batch
+                deleted_count, _, _ = MessageService.bulk_delete_messages(selected_ids)
 
                 # Update ingestion stats - decrement total_inserted for each date
                 for msg_date, count in messages_by_date.items():
@@ -629,15 +594,6 @@ def label_messages(request):
                         total_inserted=F('total_inserted') - count
                     )
 
-                # Clean up ThreadTracking records that have no remaining messages
-                threads_to_check = list(thread_ids)
-                if threads_to_check:
-                    # Find threads that now have zero messages
-                    for thread_id in threads_to_check:
-                        remaining_msgs = Message.objects.filter(thread_id=thread_id).count()
-                        if remaining_msgs == 0:
-                            ThreadTracking.objects.filter(thread_id=thread_id).delete()
-
                 messages.success(
                     request,
                     f"✅ Deleted {deleted_count} message(s) and updated statistics",
@@ -826,10 +782,7 @@ def label_messages(request):
     # Extract body snippets for display (plain text only)
     for msg in messages_page:
         if msg.body and msg.body.strip():
-            soup = BeautifulSoup(msg.body, "html.parser")
-            for tag in soup(["script", "style", "noscript"]):
-                tag.decompose()
-            plain_text = soup.get_text(separator="\n", strip=True)
+            plain_text = html_text.html_to_text(msg.body, separator="\n", skip=("noscript",))
             # Normalize whitespace within lines but preserve line breaks
             lines = [" ".join(line.split()) for line in plain_text.split("\n") if line.strip()]
             # Short snippet for preview (collapsed view)
@@ -1,51 +1,188 @@
 """
 tracker_logger.py
 
-Provides a logger that writes all console messages to a daily log file under logs/ with
-timestamps. Each day a new file is used (tracker-YYYY-MM-DD.log).
+Logging backend for ingest output, built on the stdlib `logging` package.
+
+Callers log through `log_console(message)`; the record goes onto an in-memory
+queue (QueueHandler) and a background QueueListener thread writes it to:
+- logs/tracker.log as one JSON object per line ({"ts", "level", "logger",
+  "msg", ...extra fields}). The TimedRotatingFileHandler stays open between
+  calls and rolls over at midnight to tracker-YYYY-MM-DD.log.
+- stdout as "[YYYY-MM-DD HH:MM:SS] message", the format log_console always
+  printed.
 
 Usage:
     from tracker_logger import log_console
     log_console("Your message")
+    log_console("Ignored", level=logging.WARNING, msg_id=msg_id, reason="newsletter")
+
+Parser debug output is gated by the level of the "tracker.parser" logger
+(PARSER_LOG_LEVEL, default INFO). `parser.DEBUG` is a LevelFlag that is truthy
+only while that logger is enabled for DEBUG, so `set_level("tracker.parser",
+"DEBUG")` turns the [DEBUG ...] output on at runtime.
 
-Optionally, monkey-patch print to also log to file.
+Settings (environment):
+    TRACKER_LOG_LEVEL    minimum level for log_console (default INFO)
+    PARSER_LOG_LEVEL     DEBUG enables parser debug output (default INFO)
+    TRACKER_LOG_BACKUPS  rotated daily files to keep, 0 = all (default 0)
 """
 
+import atexit
+import json
+import logging
+import logging.handlers
 import os
+import queue
+import sys
+import threading
+from datetime import datetime, timezone as dt_timezone
 
 # Use Django timezone for consistent local time across the app
 try:
+    from django.conf import settings as django_settings
     from django.utils import timezone
-    def _get_local_now():
-        return timezone.localtime(timezone.now())
+
+    def _local_time(created):
+        moment = datetime.fromtimestamp(created, tz=dt_timezone.utc)
+        if django_settings.configured:
+            return timezone.localtime(moment)
+        return moment.astimezone()
+
 except ImportError:
     # Fallback if Django not available (standalone script use)
-    from datetime import datetime
-    def _get_local_now():
-        return datetime.now()
+    def _local_time(created):
+        return datetime.fromtimestamp(created)
+
 
 LOG_DIR = os.path.join(os.path.dirname(__file__), "logs")
+LOG_FILE = os.path.join(LOG_DIR, "tracker.log")
+LOG_LEVEL = os.environ.get("TRACKER_LOG_LEVEL", "INFO").upper()
+PARSER_LOG_LEVEL = os.environ.get("PARSER_LOG_LEVEL", "INFO").upper()
+LOG_BACKUPS = int(os.environ.get("TRACKER_LOG_BACKUPS", "0"))
 
 if not os.path.exists(LOG_DIR):
     os.makedirs(LOG_DIR)
 
+logger = logging.getLogger("tracker")
+logger.setLevel(LOG_LEVEL)
+logger.propagate = False
+logging.getLogger("tracker.parser").setLevel(PARSER_LOG_LEVEL)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: ts, level, logger, msg plus extra fields."""
+
+    def format(self, record):
+        entry = {
+            "ts": _local_time(record.created).strftime("%Y-%m-%d %H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", None) or {})
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class ConsoleFormatter(logging.Formatter):
+    """The "[timestamp] message" line log_console has always printed."""
+
+    def format(self, record):
+        ts = _local_time(record.created).strftime("%Y-%m-%d %H:%M:%S")
+        return f"[{ts}] {record.getMessage()}"
+
+
+def _rotated_name(default_name):
+    # logs/tracker.log.2025-10-18 -> logs/tracker-2025-10-18.log
+    base, _, day = default_name.rpartition(".")
+    root, ext = os.path.splitext(base)
+    return f"{root}-{day}{ext}"
+
+
+class LevelFlag:
+    """Truthy while `logger` is enabled for `level`.
+
+    Lets existing `if DEBUG:` checks follow the logger's runtime level.
+    """
+
+    __slots__ = ("logger", "level")
+
+    def __init__(self, logger_or_name, level=logging.DEBUG):
+        if isinstance(logger_or_name, str):
+            logger_or_name = logging.getLogger(logger_or_name)
+        self.logger = logger_or_name
+        self.level = level
+
+    def __bool__(self):
+        return self.logger.isEnabledFor(self.level)
+
+    def __repr__(self):
+        return repr(bool(self))
+
+
+_lock = threading.Lock()
+_listener = None
+
+
+def _start():
+    """Attach the QueueHandler and start the listener thread (once)."""
+    global _listener
+    with _lock:
+        if _listener is not None:
+            return
+        file_handler = logging.handlers.TimedRotatingFileHandler(
+            LOG_FILE, when="midnight", backupCount=LOG_BACKUPS, encoding="utf-8"
+        )
+        file_handler.namer = _rotated_name
+        file_handler.setFormatter(JsonFormatter())
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(ConsoleFormatter())
+
+        log_queue = queue.SimpleQueue()
+        logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        _listener = logging.handlers.QueueListener(log_queue, file_handler, console_handler)
+        _listener.start()
+
+
+def stop():
+    """Drain the queue and close the log file (runs at interpreter exit)."""
+    global _listener
+    with _lock:
+        listener, _listener = _listener, None
+        if listener is None:
+            return
+        listener.stop()
+        for handler in list(logger.handlers):
+            if isinstance(handler, logging.handlers.QueueHandler):
+                logger.removeHandler(handler)
+        for handler in listener.handlers:
+            handler.close()
+
+
+atexit.register(stop)
+
+
+def flush():
+    """Block until everything logged so far has been written."""
+    stop()
+    _start()
+
+
+def set_level(name, level):
+    """Change a logger's level at runtime, e.g. set_level("tracker.parser", "DEBUG")."""
+    logging.getLogger(name).setLevel(level.upper() if isinstance(level, str) else level)
+
+
+def log_console(message, level=logging.INFO, **fields):
+    """Log a message to logs/tracker.log (JSON line) and stdout.
 
-def log_console(message):
-    """Write a timestamped message to a daily log file (tracker-YYYY-MM-DD.log)."""
-    now = _get_local_now()
-    ts = now.strftime("%Y-%m-%d %H:%M:%S")
-    # Compute today's file name at call time so midnight rollovers create a new file automatically
-    log_path = os.path.join(LOG_DIR, f"tracker-{now.strftime('%Y-%m-%d')}.log")
-    entry = f"[{ts}] {message}\n"
-    with open(log_path, "a", encoding="utf-8") as f:
-        f.write(entry)
-    print(entry, end="")
-
-
-# Optional: monkey-patch print to also log
-# import builtins
-# orig_print = builtins.print
-# def patched_print(*args, **kwargs):
-#     msg = ' '.join(str(a) for a in args)
-#     log_console(msg)
-# builtins.print = patched_print
+    Keyword arguments are added to the JSON record (e.g. msg_id=..., stage=...).
+    """
+    if isinstance(level, str):
+        level = logging.getLevelName(level.upper())
+    if not logger.isEnabledFor(level):
+        return
+    if _listener is None:
+        _start()
+    logger.log(level, message, extra={"fields": fields})
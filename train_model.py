@@ -5,6 +5,15 @@ body text with TF-IDF, trains a LogisticRegression wrapped in
 CalibratedClassifierCV, evaluates on a held-out split, and saves artifacts to
 `model/` (classifier, vectorizers, label encoder). Metrics are optionally
 persisted to the database for the dashboard.
+
+Artifacts are published as a new version via `model_store` (atomic pointer
+swap), and the run holds `model/.training.lock` so only one training process
+can write artifacts at a time. A run that finds the lock held exits with
+`model_store.EXIT_LOCKED` so the retrain scheduler can try again later.
+
+`--mode incremental` (or TRAINING_MODE=incremental) switches to the warm-start
+path in `ml_incremental`: only newly reviewed rows are fitted, with a periodic
+full rebuild as a consistency check.
 """
 
 import os
@@ -16,12 +25,12 @@ os.environ.setdefault("DJANGO_SETTINGS_MODULE", "dashboard.settings")
 django.setup()
 
 import argparse
+import atexit
 import json
 import re
 from datetime import datetime
 from pathlib import Path
 
-import joblib
 import pandas as pd
 from scipy.sparse import hstack
 from sklearn.calibration import CalibratedClassifierCV
@@ -31,6 +40,9 @@ from sklearn.metrics import classification_report
 from sklearn.model_selection import train_test_split
 from sklearn.utils.class_weight import compute_sample_weight
 
+import feature_store
+import model_bundle
+import model_store
 from db import load_training_data
 
 # --- Config ---
@@ -40,8 +52,45 @@ os.makedirs(MODEL_DIR, exist_ok=True)
 
 parser = argparse.ArgumentParser(description="Train message-type classifier")
 parser.add_argument("--verbose", action="store_true", help="Enable verbose output")
+parser.add_argument(
+    "--lock-timeout",
+    type=float,
+    default=0.0,
+    help="Seconds to wait for a concurrent training run to finish (default: fail fast)",
+)
+parser.add_argument(
+    "--mode",
+    choices=["full", "incremental"],
+    default=os.getenv("TRAINING_MODE", "full"),
+    help=(
+        "full: refit TF-IDF + calibrated LogisticRegression on all rows; "
+        "incremental: hashed vocabulary + partial_fit on newly reviewed rows "
+        "(default: $TRAINING_MODE or full)"
+    ),
+)
+parser.add_argument(
+    "--feature-cache",
+    action=argparse.BooleanOptionalAction,
+    default=os.getenv("FEATURE_CACHE", "0").strip().lower() in {"1", "true", "yes"},
+    help=(
+        "Full mode: reuse cached per-message hashed features (model/features.npz) "
+        "and only tokenize new/changed messages (default: $FEATURE_CACHE or off)"
+    ),
+)
+parser.add_argument(
+    "--full-rebuild",
+    action="store_true",
+    help="In incremental mode, rebuild the incremental state from all rows",
+)
 args = parser.parse_args()
 
+_training_lock = model_store.TrainingLock()
+if not _training_lock.acquire(timeout=args.lock_timeout):
+    holder = _training_lock.owner() or {}
+    print(f"[Info] Another training run is in progress (pid {holder.get('pid')}); exiting.")
+    raise SystemExit(model_store.EXIT_LOCKED)
+atexit.register(_training_lock.release)
+
 print(f"[OK] Training started at {datetime.now().isoformat()}")
 
 PATTERNS_PATH = Path(__file__).parent / "json" / "patterns.json"
@@ -141,41 +190,76 @@ if len(y_filtered) < 10:
 
 print(f"Training with {len(y_filtered)} samples across {y_filtered.nunique()} classes")
 
-X_subject = df_filtered["subject"].fillna("")
-X_body = df_filtered["body"].fillna("")
+if args.mode == "incremental":
+    # Hashed vocabulary + partial_fit on newly reviewed rows (see ml_incremental)
+    import ml_incremental
 
-subject_vec = TfidfVectorizer(
-    lowercase=True, ngram_range=(1, 2), max_df=0.9, min_df=2, max_features=10000
-)
-body_vec = TfidfVectorizer(
-    lowercase=True, ngram_range=(1, 2), max_df=0.9, min_df=2, max_features=40000
-)
+    result = ml_incremental.train(
+        df_filtered, y_filtered, force_full=args.full_rebuild, verbose=args.verbose
+    )
+    clf = result["clf"]
+    subject_vec = result["subject_vec"]
+    body_vec = result["body_vec"]
+    yte = result["y_test"]
+    y_pred = result["y_pred"]
+    incremental_info = result["info"]
+elif args.feature_cache:
+    # Same pruning/weighting as the TfidfVectorizers below, but tokenization comes
+    # from the feature cache, so only new or edited messages are re-tokenized
+    store = feature_store.FeatureStore.open()
+    subject_counts, body_counts = store.rows(store.sync(df_filtered))
+    print(
+        f"[Info] Feature cache: {store.last_sync['cached']} cached, "
+        f"{store.last_sync['vectorized']} vectorized"
+    )
+    subject_vec = feature_store.fit_vectorizer(
+        subject_counts, feature_store.SUBJECT_FEATURES, max_df=0.9, min_df=2, max_features=10000
+    )
+    body_vec = feature_store.fit_vectorizer(
+        body_counts, feature_store.BODY_FEATURES, max_df=0.9, min_df=2, max_features=40000
+    )
+    X_subject_vec = feature_store.transform_counts(subject_vec, subject_counts)
+    X_body_vec = feature_store.transform_counts(body_vec, body_counts)
+else:
+    X_subject = df_filtered["subject"].fillna("")
+    X_body = df_filtered["body"].fillna("")
 
-X_subject_vec = subject_vec.fit_transform(X_subject)
-X_body_vec = body_vec.fit_transform(X_body)
+    subject_vec = TfidfVectorizer(
+        lowercase=True, ngram_range=(1, 2), max_df=0.9, min_df=2, max_features=10000
+    )
+    body_vec = TfidfVectorizer(
+        lowercase=True, ngram_range=(1, 2), max_df=0.9, min_df=2, max_features=40000
+    )
 
-Xv = hstack([X_subject_vec, X_body_vec])
+    X_subject_vec = subject_vec.fit_transform(X_subject)
+    X_body_vec = body_vec.fit_transform(X_body)
 
-Xtr, Xte, ytr, yte = train_test_split(
-    Xv,
-    y_filtered,
-    test_size=0.2,
-    stratify=y_filtered,  # ensures balanced split
-    random_state=42,
-)
+if args.mode != "incremental":
 
-sample_weights = compute_sample_weight("balanced", ytr)
+    Xv = hstack([X_subject_vec, X_body_vec])
 
-base = LogisticRegression(
-    solver="lbfgs",
-    max_iter=2000,
-    C=0.5,
-)
-clf = CalibratedClassifierCV(base, method="isotonic", cv=3)
-clf.fit(Xtr, ytr, sample_weight=sample_weights)  # pass weights here
+    Xtr, Xte, ytr, yte = train_test_split(
+        Xv,
+        y_filtered,
+        test_size=0.2,
+        stratify=y_filtered,  # ensures balanced split
+        random_state=42,
+    )
+
+    sample_weights = compute_sample_weight("balanced", ytr)
+
+    base = LogisticRegression(
+        solver="lbfgs",
+        max_iter=2000,
+        C=0.5,
+    )
+    clf = CalibratedClassifierCV(base, method="isotonic", cv=3)
+    clf.fit(Xtr, ytr, sample_weight=sample_weights)  # pass weights here
+
+    # Evaluate on held-out validation split
+    y_pred = clf.predict(Xte)
+    incremental_info = None
 
-# Evaluate on held-out validation split
-y_pred = clf.predict(Xte)
 print(classification_report(yte, y_pred, zero_division=0))
 
 # Optional, richer diagnostics under --verbose
@@ -189,35 +273,60 @@ if args.verbose:
     except Exception:
         pass
 
-    # Show effective training weights per class (illustrates balancing effect of class weights)
-    try:
-        sw_df = _pd.DataFrame(
-            {"label": _pd.Series(ytr).reset_index(drop=True), "weight": sample_weights}
-        )
-        eff_weights = (
-            sw_df.groupby("label")["weight"].sum().sort_values(ascending=False)
-        )
-        print(
-            f"[Info] Effective training class weights (sum of sample weights):\n{eff_weights}"
-        )
-    except Exception:
-        pass
+    # Show effective training weights per class (illustrates balancing effect of class weights).
+    # Full mode only: incremental runs have no ytr/sample_weights; their weights come
+    # from running class counts (see incremental_info).
+    if args.mode != "incremental":
+        try:
+            sw_df = _pd.DataFrame(
+                {"label": _pd.Series(ytr).reset_index(drop=True), "weight": sample_weights}
+            )
+            eff_weights = (
+                sw_df.groupby("label")["weight"].sum().sort_values(ascending=False)
+            )
+            print(
+                f"[Info] Effective training class weights (sum of sample weights):\n{eff_weights}"
+            )
+        except Exception:
+            pass
+
+if incremental_info and args.verbose:
+    print(f"[Info] Incremental run: {json.dumps(incremental_info, indent=2)}")
 
 # Capture metrics for persistence
 report_text = classification_report(yte, y_pred, zero_division=0)
 report_dict = classification_report(yte, y_pred, zero_division=0, output_dict=True)
-os.makedirs("model", exist_ok=True)
-joblib.dump(clf, "model/message_classifier.pkl")
-joblib.dump(sorted(y_filtered.unique().tolist()), "model/message_label_encoder.pkl")
-joblib.dump(subject_vec, "model/subject_vectorizer.pkl")
-joblib.dump(body_vec, "model/body_vectorizer.pkl")
+# Write into a private staging directory; nothing is visible to readers until publish
+model_version = model_store.new_version_id()
+staged_dir = model_store.staging_dir(model_version)
+model_store.dump(clf, staged_dir, "message_classifier.pkl")
+model_store.dump(sorted(y_filtered.unique().tolist()), staged_dir, "message_label_encoder.pkl")
+model_store.dump(subject_vec, staged_dir, "subject_vectorizer.pkl")
+model_store.dump(body_vec, staged_dir, "body_vectorizer.pkl")
 
 # Save model info for metrics page
 # Filter out HTML/CSS artifacts and keep only meaningful features
-all_features = (
-    subject_vec.get_feature_names_out().tolist()
-    + body_vec.get_feature_names_out().tolist()
-)
+if isinstance(subject_vec, TfidfVectorizer):
+    all_features = (
+        subject_vec.get_feature_names_out().tolist()
+        + body_vec.get_feature_names_out().tolist()
+    )
+    total_features = len(all_features)
+else:
+    # Hashed vectorizers have no vocabulary; recover terms from a sample of messages
+    def _columns(vec):
+        select = vec.named_steps.get("select")
+        return None if select is None else select.columns
+
+    all_features = feature_store.feature_names_sample(
+        df_filtered["subject"].fillna(""), feature_store.SUBJECT_FEATURES, _columns(subject_vec)
+    ) + feature_store.feature_names_sample(
+        df_filtered["body"].fillna(""), feature_store.BODY_FEATURES, _columns(body_vec)
+    )
+    if incremental_info:
+        total_features = incremental_info["total_features"]
+    else:
+        total_features = len(_columns(subject_vec)) + len(_columns(body_vec))
 
 
 def is_meaningful_feature(feature):
@@ -261,19 +370,22 @@ def is_meaningful_feature(feature):
 meaningful_features = [f for f in all_features if is_meaningful_feature(f)][:100]
 
 model_info = {
+    "version": model_version,
     "trained_on": datetime.now().isoformat(),
     "labels": sorted(y_filtered.unique().tolist()),
     "num_samples": len(y_filtered),
-    "total_features": len(all_features),
+    "total_features": total_features,
     "meaningful_features_sample": sorted(meaningful_features),
+    "training_mode": args.mode,
+    "feature_cache": bool(args.feature_cache) or args.mode == "incremental",
 }
-with open("model/model_info.json", "w", encoding="utf-8") as f:
+if incremental_info:
+    model_info["incremental"] = incremental_info
+with open(staged_dir / "model_info.json", "w", encoding="utf-8") as f:
     json.dump(model_info, f, indent=2)
 
-print("Message-level model artifacts saved to /model/")
-print(f"Model trained on {len(y_filtered)} samples with {y_filtered.nunique()} labels")
-
-# --- Persist training metrics to DB ---
+# --- Persist training metrics to DB (before publishing, so the manifest can reference the run) ---
+training_run_id = None
 try:
     from tracker.models import (
         ModelTrainingLabelMetric,
@@ -301,7 +413,9 @@ try:
         weighted_f1=float(weighted.get("f1-score") or 0.0),
         label_distribution=json.dumps(y_filtered.value_counts().to_dict(), indent=2),
         classification_report=report_text,
+        model_version=model_version,
     )
+    training_run_id = run.id
 
     # Per-label metrics
     special_keys = {"accuracy", "macro avg", "weighted avg"}
@@ -322,3 +436,30 @@ try:
     print("[OK] Saved training metrics to DB.")
 except Exception as e:
     print(f"[Warn] Could not persist training metrics to DB: {e}")
+
+# Compact memory-mappable copy of the model for fast loading (see model_bundle);
+# the pickles above remain the fallback if the model cannot be bundled
+try:
+    model_bundle.export_bundle(
+        clf,
+        subject_vec,
+        body_vec,
+        staged_dir,
+        manifest={"version": model_version, "training_run_id": training_run_id},
+    )
+except Exception as e:
+    print(f"[Warn] Could not write compact model bundle: {e}")
+
+model_store.publish_version(
+    model_version,
+    staged_dir,
+    manifest={
+        "labels": model_info["labels"],
+        "num_samples": model_info["num_samples"],
+        "training_mode": args.mode,
+        "training_run_id": training_run_id,
+    },
+)
+
+print(f"Message-level model artifacts published to /model/ (version {model_version})")
+print(f"Model trained on {len(y_filtered)} samples with {y_filtered.nunique()} labels")